@@ -0,0 +1,106 @@
+"""
+Benchmark dos bloqueios temporários de assentos durante uma estreia.
+
+Monta um cinema sem ingressos, bloqueia BLOQUEIOS assentos (50.000 por
+padrão) com prazos espalhados entre 1 e 10 minutos e avança o relógio de
+segundo em segundo até todos vencerem, medindo o custo por tick de soltar
+os vencidos:
+
+  roda      - sessao._expira_bloqueios(): só a posição da roda do tick
+  varredura - o equivalente percorrendo todos os bloqueios a cada tick
+
+O relógio da roda é simulado, então o benchmark não espera os prazos.
+
+Uso: python benchmarks/bloqueios.py [--bloqueios 50000]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import gerador
+import modulos.sessao.sessao as Sessao
+import padrao_retornos
+from modulos.sessao.roda_temporizacao import RodaTemporizacao
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+def bloqueia(dados: dict, quantidade: int, aleatorio: random.Random) -> float:
+    """Bloqueia `quantidade` assentos distintos; retorna o tempo gasto."""
+    pedidos = [(sessao["id"], assento) for sessao in dados["sessoes"]
+               for assento in range(1, sessao["capacidade"] + 1)]
+    pedidos = aleatorio.sample(pedidos, quantidade)
+
+    inicio = time.perf_counter()
+    for sessao_id, assento in pedidos:
+        codigo, _ = Sessao.bloqueia_assentos(sessao_id, [assento], duracao=aleatorio.uniform(60, 600))
+        if codigo != padrao_retornos.SUCESSO:
+            raise RuntimeError(f"bloqueio falhou: {codigo}")
+    return time.perf_counter() - inicio
+
+
+def varre(relogio: Relogio) -> None:
+    """O que cada tick custaria sem a roda: olhar o prazo de todos os bloqueios."""
+    vencidos = [bloqueio_id for bloqueio_id, (_, _, vencimento) in Sessao._bloqueios.items()
+                if vencimento <= relogio.agora]
+    for bloqueio_id in vencidos:
+        Sessao.libera_bloqueio(bloqueio_id)
+
+
+def avanca_ate_vencer(relogio: Relogio, expira) -> dict:
+    """Avança o relógio um segundo por vez até não sobrar bloqueio."""
+    ticks = 0
+    pior = 0.0
+    inicio = time.perf_counter()
+    while Sessao._bloqueios:
+        relogio.agora += 1.0
+        antes = time.perf_counter()
+        expira()
+        pior = max(pior, time.perf_counter() - antes)
+        ticks += 1
+    duracao = time.perf_counter() - inicio
+    return {"ticks": ticks, "us_por_tick": round(duracao / ticks * 1e6, 1), "pior_tick_us": round(pior * 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da expiração dos bloqueios de assentos")
+    parser.add_argument("--bloqueios", type=int, default=50_000)
+    argumentos = parser.parse_args()
+
+    dados = gerador.gera_cinema(filmes=20, salas=40, sessoes=40 * len(gerador.HORARIOS), clientes=0, ingressos=0)
+    relatorio = {"bloqueios": argumentos.bloqueios}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        gerador.instala(dados, pasta)
+        for nome, expira in (("roda", Sessao._expira_bloqueios), ("varredura", None)):
+            relogio = Relogio()
+            Sessao._rodaBloqueios = RodaTemporizacao(resolucao=1.0, relogio=relogio)
+            tempo_bloqueio = bloqueia(dados, argumentos.bloqueios, random.Random(42))
+            if expira is None:
+                # Sem a roda: os prazos ficam só nos bloqueios
+                Sessao._rodaBloqueios.limpa()
+                expira = lambda: varre(relogio)
+            relatorio[nome] = {"bloqueios_por_s": round(argumentos.bloqueios / tempo_bloqueio),
+                               **avanca_ate_vencer(relogio, expira)}
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
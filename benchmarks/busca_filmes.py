@@ -0,0 +1,117 @@
+"""
+Benchmark da busca textual no catálogo de filmes.
+
+Monta um catálogo de FILMES filmes (20.000 por padrão) com títulos,
+gêneros e sinopses sorteados de um vocabulário com acentos e mede:
+
+  busca      - filme.busca_filmes_texto() pelo índice invertido contra
+               percorrer todos os filmes a cada consulta (com os textos
+               já normalizados, para medir só a varredura)
+  duplicado  - o teste de título repetido do cria_filme pelo mapa de
+               títulos normalizados contra comparar com todos os filmes
+
+Uso: python benchmarks/busca_filmes.py [--filmes 20000] [--consultas 2000]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import modulos.filme.filme as Filme
+from modulos.filme.indice_texto import termos
+
+SILABAS = ["ba", "ca", "dé", "fi", "gô", "la", "mã", "ne", "pó", "ri", "sa", "tú", "vi", "xo", "ção"]
+GENEROS = ["Ação", "Animação", "Comédia", "Drama", "Ficção", "Suspense", "Romance", "Terror"]
+
+
+def vocabulario(aleatorio: random.Random, tamanho: int) -> list[str]:
+    palavras = set()
+    while len(palavras) < tamanho:
+        palavras.add("".join(aleatorio.choice(SILABAS) for _ in range(aleatorio.randint(2, 4))))
+    return sorted(palavras)
+
+
+def cadastra(quantidade: int, palavras: list[str], aleatorio: random.Random) -> float:
+    """Cadastra os filmes pelo cria_filme (que imprime cada resultado); retorna o tempo gasto."""
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(quantidade):
+            titulo = " ".join(aleatorio.sample(palavras, aleatorio.randint(2, 4))) + f" {i}"
+            sinopse = " ".join(aleatorio.choices(palavras, k=30)) + "."
+            Filme.cria_filme(titulo, sinopse, aleatorio.choice(GENEROS), 100.0, 12, "2020-01-01")
+    return time.perf_counter() - inicio
+
+
+def normaliza_catalogo() -> list[tuple]:
+    """(filme, termos do filme) de todo o catálogo, para a varredura."""
+    return [(filme, set(termos(filme["titulo"])) | set(termos(filme["genero"])) | set(termos(filme["sinopse"])))
+            for filme in Filme.filmesEmCartaz]
+
+
+def varre(catalogo: list[tuple], consulta: str) -> list:
+    """O que cada consulta custaria sem o índice: olhar todos os filmes."""
+    palavras = termos(consulta)
+    encontrados = []
+    for filme, texto in catalogo:
+        if all(palavra in texto for palavra in palavras[:-1]) and \
+           any(termo.startswith(palavras[-1]) for termo in texto):
+            encontrados.append(filme)
+    return encontrados
+
+
+def mede(funcao, argumentos: list) -> float:
+    inicio = time.perf_counter()
+    for argumento in argumentos:
+        funcao(argumento)
+    return (time.perf_counter() - inicio) / len(argumentos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da busca textual de filmes")
+    parser.add_argument("--filmes", type=int, default=20_000)
+    parser.add_argument("--consultas", type=int, default=2_000)
+    argumentos = parser.parse_args()
+
+    aleatorio = random.Random(42)
+    palavras = vocabulario(aleatorio, 5_000)
+    relatorio = {"filmes": argumentos.filmes, "consultas": argumentos.consultas}
+
+    with tempfile.TemporaryDirectory() as pasta:
+        Filme.carrega(pasta)
+        relatorio["cadastro_filmes_por_s"] = round(argumentos.filmes / cadastra(argumentos.filmes, palavras, aleatorio))
+        # A gravação adiada do filmes.xml não pode disputar o processador com as medições
+        Filme.flush()
+
+        # Duas palavras, a última incompleta, como em uma busca enquanto se digita
+        consultas = [f"{aleatorio.choice(palavras)} {aleatorio.choice(palavras)[:3]}" for _ in range(argumentos.consultas)]
+        poucas = consultas[:max(1, argumentos.consultas // 20)]
+        catalogo = normaliza_catalogo()
+        relatorio["busca_us"] = {
+            "indice": round(mede(Filme.busca_filmes_texto, consultas) * 1e6, 1),
+            "varredura": round(mede(lambda consulta: varre(catalogo, consulta), poucas) * 1e6, 1),
+        }
+
+        titulos = [filme["titulo"].upper() for filme in aleatorio.sample(Filme.filmesEmCartaz, argumentos.consultas)]
+        relatorio["duplicado_us"] = {
+            "mapa": round(mede(lambda titulo: Filme._chave_titulo(titulo) in Filme._titulosNormalizados, titulos) * 1e6, 2),
+            "varredura": round(mede(lambda titulo: any(filme["titulo"] == titulo.title() for filme in Filme.filmesEmCartaz),
+                                    titulos[:len(poucas)]) * 1e6, 1),
+        }
+        Filme.flush()
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark do cadastro de clientes em massa.
+
+Cadastra N clientes (1.000.000 por padrão) com cliente.cadastra_cliente,
+em blocos, e mede o tempo de cada bloco. Com a checagem de CPF feita pelo
+índice, o tempo por bloco fica constante (custo total linear); com a
+varredura antiga de listaClientes, cada bloco demorava mais que o anterior.
+
+Uso: python benchmarks/cadastro_clientes.py [--clientes 1000000] [--blocos 10]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import gerador
+import modulos.cliente.cliente as Cliente
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cadastro de clientes")
+    parser.add_argument("--clientes", type=int, default=1_000_000)
+    parser.add_argument("--blocos", type=int, default=10)
+    argumentos = parser.parse_args()
+
+    tamanho_bloco = argumentos.clientes // argumentos.blocos
+    blocos = []
+    with tempfile.TemporaryDirectory() as pasta:
+        Cliente.carrega(pasta)
+        inicio_total = time.perf_counter()
+        for bloco in range(argumentos.blocos):
+            primeiro = bloco * tamanho_bloco + 1
+            inicio = time.perf_counter()
+            for numero in range(primeiro, primeiro + tamanho_bloco):
+                Cliente.cadastra_cliente(f"Cliente {numero}", gerador.cpf_sintetico(numero))
+            blocos.append(round(time.perf_counter() - inicio, 3))
+        duracao = time.perf_counter() - inicio_total
+        Cliente.grava_pendentes()
+
+    relatorio = {
+        "clientes": tamanho_bloco * argumentos.blocos,
+        "segundos": round(duracao, 3),
+        "cadastros_por_segundo": round(tamanho_bloco * argumentos.blocos / duracao, 1),
+        "segundos_por_bloco": blocos,
+        # ~1.0 para custo linear; cresceria com o número de blocos se fosse quadrático
+        "ultimo_sobre_primeiro": round(blocos[-1] / blocos[0], 2),
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
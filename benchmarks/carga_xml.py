@@ -0,0 +1,120 @@
+"""
+Benchmark da leitura de sessoes.xml.
+
+Gera um arquivo com 1.000.000 de assentos ocupados (2.000 sessões de 500
+lugares, no formato antigo com um <assento> por lugar, ou no formato bitmap)
+e compara o pico de memória e o tempo de carga de:
+
+  dom       - ElementTree.parse + dicionários, mantendo a árvore viva
+              (como sessao.ler_dados_xml fazia antes)
+  iterparse - sessao.ler_dados_xml atual, em fluxo
+
+Uso: python benchmarks/carga_xml.py [--sessoes 2000] [--capacidade 500] [--formato antigo|bitmap]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from xml.etree import ElementTree
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import modulos.sessao.sessao as Sessao
+from modulos.sessao.mapa_assentos import MapaAssentos
+
+
+def gera_arquivo(caminho: str, sessoes: int, capacidade: int, formato: str) -> None:
+    """Escreve um sessoes.xml com todas as sessões lotadas."""
+    mapa_cheio = MapaAssentos(capacidade, range(1, capacidade + 1)).para_texto()
+    with open(caminho, 'w') as arquivo:
+        arquivo.write('<sessoes>\n')
+        for sessao_id in range(1, sessoes + 1):
+            arquivo.write(
+                f'  <sessao><id>{sessao_id}</id><filme_id>{sessao_id % 50 + 1}</filme_id>'
+                f'<sala>{sessao_id % 20 + 1}</sala><horario>{sessao_id % 24:02d}:00</horario>'
+                f'<capacidade>{capacidade}</capacidade><formato_exibicao>dublado</formato_exibicao>'
+            )
+            if formato == 'bitmap':
+                arquivo.write(f'<assentos_ocupados formato="bitmap">{mapa_cheio}</assentos_ocupados>')
+            else:
+                arquivo.write('<assentos_ocupados>')
+                arquivo.write(''.join(f'<assento>{n}</assento>' for n in range(1, capacidade + 1)))
+                arquivo.write('</assentos_ocupados>')
+            arquivo.write('</sessao>\n')
+        arquivo.write('</sessoes>')
+
+
+def carga_dom(caminho: str):
+    """Leitura antiga: árvore inteira em memória, retida junto com os dicionários."""
+    with open(caminho, 'rt') as f:
+        raiz = ElementTree.parse(f).getroot()
+
+    sessoes = []
+    for sessao_xml in raiz.findall('sessao'):
+        capacidade = int(sessao_xml.find('capacidade').text)
+        sessoes.append({
+            "id": int(sessao_xml.find('id').text),
+            "filme_id": int(sessao_xml.find('filme_id').text),
+            "sala": int(sessao_xml.find('sala').text),
+            "horario": sessao_xml.find('horario').text,
+            "capacidade": capacidade,
+            "formato_exibicao": sessao_xml.find('formato_exibicao').text,
+            "assentos_ocupados": Sessao._le_assentos_xml(sessao_xml.find('assentos_ocupados'), capacidade),
+        })
+    return raiz, sessoes
+
+
+def carga_iterparse(caminho: str):
+    Sessao.nome_arquivo = caminho
+    Sessao.nome_arquivo_journal = caminho + '.journal'
+    Sessao.ler_dados_xml()
+    return Sessao.listaSessoes
+
+
+def mede(funcao, caminho: str) -> dict:
+    """Tempo medido sem tracemalloc (que distorce a medida); memória em uma segunda carga."""
+    inicio = time.perf_counter()
+    resultado = funcao(caminho)
+    duracao = time.perf_counter() - inicio
+    del resultado
+
+    tracemalloc.start()
+    resultado = funcao(caminho)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return {"segundos": round(duracao, 3), "pico_memoria_mb": round(pico / 2**20, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da carga de sessoes.xml")
+    parser.add_argument("--sessoes", type=int, default=2000)
+    parser.add_argument("--capacidade", type=int, default=500)
+    parser.add_argument("--formato", choices=("antigo", "bitmap"), default="antigo")
+    argumentos = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'sessoes.xml')
+        gera_arquivo(caminho, argumentos.sessoes, argumentos.capacidade, argumentos.formato)
+
+        relatorio = {
+            "sessoes": argumentos.sessoes,
+            "assentos": argumentos.sessoes * argumentos.capacidade,
+            "formato": argumentos.formato,
+            "tamanho_arquivo_mb": round(os.path.getsize(caminho) / 2**20, 1),
+            "dom": mede(carga_dom, caminho),
+            "iterparse": mede(carga_iterparse, caminho),
+        }
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
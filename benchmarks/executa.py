@@ -0,0 +1,234 @@
+"""
+Benchmarks dos caminhos críticos da bilheteria.
+
+Para cada cenário e tamanho, monta um cinema sintético com gerador.py
+(N clientes, N ingressos, N/10 sessões, N/100 filmes) e mede operações
+sobre ele. Cada medição roda em um processo próprio, para que o pico de
+memória de uma não contamine a outra.
+
+Cenários:
+  cadastra_cliente  cria_sessao  reserva_assento  cria_ingresso
+  lista_sessoes     carga        grava_xml
+
+Uso:
+  python benchmarks/executa.py [--tamanhos 1000,10000,100000] [--cenarios cria_ingresso,lista_sessoes]
+                               [--operacoes 200] [--backend xml|sqlite] [--semente 42] [--saida resultado.json]
+
+A saída é uma lista JSON com um objeto por medição:
+  {"cenario", "tamanho", "backend", "operacoes", "ops_por_segundo",
+   "p50_us", "p99_us", "pico_memoria_mb"}
+Tamanhos de 10^6 funcionam, mas cenários que regravam o XML inteiro a cada
+operação (cria_sessao, grava_xml) ficam lentos nessa escala; use
+--operacoes menor.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import gerador
+import modulos.cliente.cliente as Cliente
+import modulos.filme.filme as Filme
+import modulos.ingresso.ingresso as Ingresso
+import modulos.sessao.sessao as Sessao
+
+TAMANHOS_PADRAO = "1000,10000,100000"
+
+
+def _assentos_livres_sorteados(dados: dict, aleatorio: random.Random, quantidade: int) -> list[tuple]:
+    """Sorteia `quantidade` pares (sessao_id, assento) distintos e ainda livres."""
+    sorteados = set()
+    while len(sorteados) < quantidade:
+        sessao = aleatorio.choice(dados["sessoes"])
+        numero_assento = aleatorio.randint(1, sessao["capacidade"])
+        if numero_assento not in sessao["assentos_ocupados"]:
+            sorteados.add((sessao["id"], numero_assento))
+    return sorted(sorteados)
+
+
+# Cada cenário recebe (dados, aleatorio, operacoes) e devolve a função a medir
+# e a lista de argumentos de cada chamada, preparados fora da medição.
+
+def cenario_cadastra_cliente(dados, aleatorio, operacoes):
+    primeiro = len(dados["clientes"]) + 1
+    argumentos = [(f"Novo Cliente {n}", gerador.cpf_sintetico(n)) for n in range(primeiro, primeiro + operacoes)]
+    return Cliente.cadastra_cliente, argumentos
+
+
+def cenario_cria_sessao(dados, aleatorio, operacoes):
+    # Salas novas, para não conflitar com as sessões geradas
+    primeira_sala = max(sessao["sala"] for sessao in dados["sessoes"]) + 1
+    horarios = gerador.HORARIOS
+    argumentos = [
+        (aleatorio.randint(1, len(dados["filmes"])), primeira_sala + n // len(horarios),
+         horarios[n % len(horarios)], 200, aleatorio.choice(gerador.FORMATOS))
+        for n in range(operacoes)
+    ]
+    return Sessao.cria_sessao, argumentos
+
+
+def cenario_reserva_assento(dados, aleatorio, operacoes):
+    return Sessao.reserva_assento, _assentos_livres_sorteados(dados, aleatorio, operacoes)
+
+
+def cenario_cria_ingresso(dados, aleatorio, operacoes):
+    argumentos = [
+        (aleatorio.randint(1, len(dados["clientes"])), sessao_id, numero_assento, 25.0)
+        for sessao_id, numero_assento in _assentos_livres_sorteados(dados, aleatorio, operacoes)
+    ]
+    return Ingresso.cria_ingresso, argumentos
+
+
+def cenario_lista_sessoes(dados, aleatorio, operacoes):
+    argumentos = [
+        (aleatorio.choice([None, aleatorio.randint(1, len(dados["filmes"]))]),
+         aleatorio.choice([None] + gerador.FORMATOS),
+         aleatorio.choice([None, aleatorio.choice(gerador.HORARIOS)]))
+        for _ in range(operacoes)
+    ]
+    return Sessao.lista_sessoes, argumentos
+
+
+def _carga():
+    Filme.carrega()
+    Sessao.carrega()
+    Cliente.carrega()
+    Ingresso.carrega()
+
+
+def cenario_carga(dados, aleatorio, operacoes):
+    return _carga, [()] * operacoes
+
+
+def _grava_xml():
+    Filme.grava_dados_xml()
+    Sessao.grava_dados_xml()
+
+
+def cenario_grava_xml(dados, aleatorio, operacoes):
+    return _grava_xml, [()] * operacoes
+
+
+CENARIOS = {
+    "cadastra_cliente": cenario_cadastra_cliente,
+    "cria_sessao": cenario_cria_sessao,
+    "reserva_assento": cenario_reserva_assento,
+    "cria_ingresso": cenario_cria_ingresso,
+    "lista_sessoes": cenario_lista_sessoes,
+    "carga": cenario_carga,
+    "grava_xml": cenario_grava_xml,
+}
+
+# Cenários que leem ou gravam o cinema inteiro: poucas repetições bastam
+REPETICOES_MAXIMAS = {"carga": 5, "grava_xml": 5}
+
+
+def _percentil(valores_ordenados: list, fracao: float):
+    indice = min(len(valores_ordenados) - 1, int(round(fracao * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+def _pico_memoria_mb() -> float | None:
+    if resource is None:
+        return None
+    # ru_maxrss vem em KiB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def mede(cenario: str, tamanho: int, operacoes: int, backend: str, semente: int) -> dict:
+    """Monta o cinema, executa o cenário e devolve as estatísticas."""
+    operacoes = min(operacoes, REPETICOES_MAXIMAS.get(cenario, operacoes))
+    aleatorio = random.Random(semente)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        dados = gerador.gera_cinema(**gerador.dimensiona(tamanho), semente=semente)
+        funcao, argumentos = CENARIOS[cenario](dados, aleatorio, operacoes)
+        gerador.instala(dados, pasta, backend)
+
+        latencias = []
+        inicio = time.perf_counter()
+        for parametros in argumentos:
+            antes = time.perf_counter_ns()
+            funcao(*parametros)
+            latencias.append(time.perf_counter_ns() - antes)
+        duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "cenario": cenario,
+        "tamanho": tamanho,
+        "backend": backend,
+        "operacoes": len(latencias),
+        "ops_por_segundo": round(len(latencias) / duracao, 1),
+        "p50_us": round(_percentil(latencias, 0.50) / 1000, 1),
+        "p99_us": round(_percentil(latencias, 0.99) / 1000, 1),
+        "pico_memoria_mb": _pico_memoria_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks da bilheteria")
+    parser.add_argument("--tamanhos", default=TAMANHOS_PADRAO)
+    parser.add_argument("--cenarios", default=",".join(CENARIOS))
+    parser.add_argument("--operacoes", type=int, default=200)
+    parser.add_argument("--backend", choices=("xml", "sqlite"), default="xml")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--interno", action="store_true", help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    cenarios = argumentos.cenarios.split(",")
+    tamanhos = [int(tamanho) for tamanho in argumentos.tamanhos.split(",")]
+    for cenario in cenarios:
+        if cenario not in CENARIOS:
+            parser.error(f"cenário desconhecido: {cenario}")
+
+    # Processo filho: uma única medição, resultado em JSON no stdout
+    if argumentos.interno:
+        print(json.dumps(mede(cenarios[0], tamanhos[0], argumentos.operacoes,
+                              argumentos.backend, argumentos.semente)))
+        return
+
+    resultados = []
+    for cenario in cenarios:
+        for tamanho in tamanhos:
+            if cenario == "grava_xml" and argumentos.backend != "xml":
+                continue
+            processo = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--interno",
+                 "--cenarios", cenario, "--tamanhos", str(tamanho),
+                 "--operacoes", str(argumentos.operacoes), "--backend", argumentos.backend,
+                 "--semente", str(argumentos.semente)],
+                capture_output=True, text=True, check=True
+            )
+            resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+            resultados.append(resultado)
+            print(f"{cenario:>17} N={tamanho:<8} {resultado['ops_por_segundo']:>10} ops/s  "
+                  f"p50={resultado['p50_us']}us  p99={resultado['p99_us']}us  "
+                  f"pico={resultado['pico_memoria_mb']}MB", file=sys.stderr)
+
+    saida = json.dumps(resultados, indent=2, ensure_ascii=False)
+    if argumentos.saida:
+        with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(saida + "\n")
+    else:
+        print(saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Gerador determinístico de cinemas sintéticos para os benchmarks.
+
+gera_cinema() produz listas de dicionários no mesmo formato usado pelos
+módulos (filmes, sessões com mapa de assentos, clientes e ingressos), sempre
+iguais para a mesma semente. instala() coloca esses dados nos módulos, pelo
+armazenamento escolhido, para que os cenários rodem sobre um cinema cheio.
+"""
+
+import os
+import random
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import modulos.armazenamento.armazenamento as Armazenamento
+import modulos.armazenamento.armazenamento_sqlite as ArmazenamentoSqlite
+import modulos.cliente.cliente as Cliente
+import modulos.filme.filme as Filme
+import modulos.ingresso.ingresso as Ingresso
+import modulos.monitoramento.monitoramento as Monitoramento
+import modulos.sessao.sessao as Sessao
+from modulos.sessao.mapa_assentos import MapaAssentos
+
+GENEROS = ["Ação", "Animação", "Comédia", "Drama", "Ficção", "Suspense", "Terror", "Documentário"]
+FORMATOS = ["dublado", "legendado"]
+
+# Horários possíveis de uma sala: um a cada 200 minutos, para que o filme
+# mais longo (180 min) e a limpeza da sala caibam entre duas sessões
+HORARIOS = [f"{minuto // 60:02d}:{minuto % 60:02d}" for minuto in range(0, 24 * 60 - 195, 200)]
+
+
+def dimensiona(tamanho: int) -> dict:
+    """
+    Converte um tamanho N nas quantidades de cada entidade: N clientes,
+    N ingressos, N/10 sessões e N/100 filmes.
+    """
+    sessoes = max(10, tamanho // 10)
+    return {
+        "filmes": max(10, tamanho // 100),
+        "salas": -(-sessoes // len(HORARIOS)),
+        "sessoes": sessoes,
+        "clientes": tamanho,
+        "ingressos": tamanho,
+    }
+
+
+def cpf_sintetico(numero: int) -> str:
+    digitos = f"{numero:011d}"
+    return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}"
+
+
+def gera_cinema(filmes: int, salas: int, sessoes: int, clientes: int, ingressos: int,
+                capacidade: int = 200, semente: int = 42) -> dict:
+    """
+    Gera um cinema completo e consistente: cada ingresso ocupa um assento
+    distinto de uma sessão existente, e as sessões de uma mesma sala nunca
+    se sobrepõem.
+    """
+    if sessoes > salas * len(HORARIOS):
+        raise ValueError("Salas insuficientes para o número de sessões")
+    if ingressos > sessoes * capacidade:
+        raise ValueError("Assentos insuficientes para o número de ingressos")
+
+    aleatorio = random.Random(semente)
+
+    lista_filmes = [
+        {
+            "id": filme_id,
+            "titulo": f"Filme {filme_id:07d}",
+            "sinopse": f"Sinopse sintética do filme {filme_id}.",
+            "genero": aleatorio.choice(GENEROS),
+            "duracao": float(aleatorio.randint(80, 180)),
+            "classificacao": aleatorio.choice([0, 10, 12, 14, 16, 18]),
+            "dataLancamento": f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/{aleatorio.randint(1980, 2025)}",
+        }
+        for filme_id in range(1, filmes + 1)
+    ]
+
+    lista_sessoes = [
+        {
+            "id": sessao_id,
+            "filme_id": aleatorio.randint(1, filmes),
+            "sala": (sessao_id - 1) % salas + 1,
+            "horario": HORARIOS[(sessao_id - 1) // salas],
+            "capacidade": capacidade,
+            "formato_exibicao": aleatorio.choice(FORMATOS),
+            "assentos_ocupados": MapaAssentos(capacidade),
+        }
+        for sessao_id in range(1, sessoes + 1)
+    ]
+
+    lista_clientes = [
+        {"id": cliente_id, "nome": f"Cliente {cliente_id}", "cpf": cpf_sintetico(cliente_id), "historico": []}
+        for cliente_id in range(1, clientes + 1)
+    ]
+
+    # O ingresso i ocupa o assento i // sessoes + 1 da sessão i % sessoes + 1,
+    # então nunca há dois ingressos para o mesmo lugar.
+    lista_ingressos = []
+    for indice in range(ingressos):
+        sessao = lista_sessoes[indice % sessoes]
+        numero_assento = indice // sessoes + 1
+        sessao["assentos_ocupados"].ocupa(numero_assento)
+        lista_ingressos.append({
+            "id": indice + 1,
+            "cliente_id": aleatorio.randint(1, clientes) if clientes else 1,
+            "sessao_id": sessao["id"],
+            "numero_assento": numero_assento,
+            "preco": float(aleatorio.choice([15, 20, 25, 30, 40])),
+        })
+
+    return {
+        "filmes": lista_filmes,
+        "sessoes": lista_sessoes,
+        "clientes": lista_clientes,
+        "ingressos": lista_ingressos,
+    }
+
+
+def instala(dados: dict, pasta: str, backend: str = "xml") -> None:
+    """
+    Coloca o cinema gerado nos módulos, com os arquivos de dados em `pasta`.
+
+    backend="xml":    grava filmes.xml, sessoes.xml, clientes.log e
+                      ingressos.log e os carrega pelos módulos.
+    backend="sqlite": importa tudo em um banco novo e carrega pelos módulos.
+    """
+    Monitoramento.zera_contadores()
+
+    if backend == "sqlite":
+        Armazenamento.usa_sqlite(os.path.join(pasta, "bilheteria.db"))
+        ArmazenamentoSqlite.importa(dados["filmes"], dados["sessoes"], dados["clientes"], dados["ingressos"])
+        Filme.carrega(pasta)
+        Sessao.carrega(pasta)
+        Cliente.carrega(pasta)
+        Ingresso.carrega(pasta)
+        return
+
+    Armazenamento.usa_xml()
+    Filme.carrega(pasta)
+    Sessao.carrega(pasta)
+
+    Filme.filmesEmCartaz.extend(dados["filmes"])
+    Filme.grava_dados_xml()
+
+    Sessao.listaSessoes.extend(dados["sessoes"])
+    Sessao.grava_dados_xml()
+
+    # Relê tudo pelos carregadores normais, que montam os índices
+    Filme.carrega(pasta)
+    Sessao.carrega(pasta)
+
+    Cliente.carrega(pasta)
+    Cliente.listaClientes.extend(dados["clientes"])
+    Cliente.compacta()
+    Cliente.carrega(pasta)
+
+    Ingresso.carrega(pasta)
+    Ingresso._persiste_ingressos(dados["ingressos"])
+    Ingresso.carrega(pasta)
@@ -0,0 +1,83 @@
+"""
+Benchmark da gravação adiada de filmes e sessões.
+
+Cadastra N filmes e N sessões (1.000 de cada por padrão) em uma pasta
+temporária e mede o tempo total e quantas vezes os arquivos XML foram
+regravados:
+
+  imediata - intervalo 0: cada cadastro regrava o arquivo inteiro
+  adiada   - intervalo padrão: os cadastros de cada intervalo saem em
+             uma única gravação, feita por uma thread de fundo
+
+Uso: python benchmarks/gravacao_adiada.py [--quantidade 1000]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import gerador
+import modulos.filme.filme as Filme
+import modulos.sessao.sessao as Sessao
+
+
+def cadastra(dados: dict, pasta: str, intervalo: float) -> dict:
+    Filme.carrega(pasta)
+    Sessao.carrega(pasta)
+    Filme.gravacao.intervalo = intervalo
+    Sessao.gravacao.intervalo = intervalo
+    gravacoes_antes = Filme.gravacao.gravacoes + Sessao.gravacao.gravacoes
+
+    inicio = time.perf_counter()
+    # Os cadastros imprimem o resultado de cada operação
+    with contextlib.redirect_stdout(io.StringIO()):
+        _cria_todos(dados)
+    Filme.flush()
+    Sessao.flush()
+    duracao = time.perf_counter() - inicio
+
+    return {
+        "tempo_s": round(duracao, 2),
+        "gravacoes": Filme.gravacao.gravacoes + Sessao.gravacao.gravacoes - gravacoes_antes,
+    }
+
+
+def _cria_todos(dados: dict) -> None:
+    for filme in dados["filmes"]:
+        Filme.cria_filme(filme["titulo"], filme["sinopse"], filme["genero"], filme["duracao"],
+                         filme["classificacao"], "2020-01-01")
+    for sessao in dados["sessoes"]:
+        Sessao.cria_sessao(sessao["filme_id"], sessao["sala"], sessao["horario"],
+                           sessao["capacidade"], sessao["formato_exibicao"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da gravação adiada dos arquivos XML")
+    parser.add_argument("--quantidade", type=int, default=1000)
+    argumentos = parser.parse_args()
+
+    n = argumentos.quantidade
+    dados = gerador.gera_cinema(filmes=n, salas=-(-n // len(gerador.HORARIOS)), sessoes=n,
+                                clientes=0, ingressos=0)
+    intervalo_padrao = Filme.gravacao.intervalo
+
+    relatorio = {"filmes": n, "sessoes": n, "intervalo_s": intervalo_padrao}
+    for nome, intervalo in (("imediata", 0), ("adiada", intervalo_padrao)):
+        with tempfile.TemporaryDirectory() as pasta:
+            relatorio[nome] = cadastra(dados, pasta, intervalo)
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
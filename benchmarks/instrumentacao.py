@@ -0,0 +1,99 @@
+"""
+Benchmark do custo da instrumentação das operações.
+
+Roda a mesma carga duas vezes, em processos novos, com
+BILHETERIA_INSTRUMENTACAO desligada e ligada (a variável só é lida na
+importação dos módulos), e mede:
+
+  venda   - ingresso.cria_ingresso() em sessões e assentos sorteados (que
+            mede também busca_cliente, busca_sessao e reserva_assento)
+  busca   - sessao.busca_sessao(), a operação mais barata, onde o custo
+            fixo da medição pesa mais
+
+Com a instrumentação ligada, inclui o resumo de algumas operações.
+
+Uso: python benchmarks/instrumentacao.py [--vendas 100000] [--buscas 1000000]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+OPERACOES_RESUMO = ("ingresso.cria_ingresso", "sessao.reserva_assento", "sessao.busca_sessao",
+                    "cliente.busca_cliente", "ingresso.grava_pendentes")
+
+
+def carga(vendas: int, buscas: int) -> dict:
+    """Executada no processo filho, já com a variável de ambiente definida."""
+    import gerador
+    import modulos.ingresso.ingresso as Ingresso
+    import modulos.instrumentacao as Instrumentacao
+    import modulos.sessao.sessao as Sessao
+
+    dados = gerador.gera_cinema(filmes=20, salas=100, sessoes=100 * len(gerador.HORARIOS), clientes=1_000,
+                                ingressos=0, capacidade=500)
+    aleatorio = random.Random(42)
+    sessoes = [sessao["id"] for sessao in dados["sessoes"]]
+    pedidos = [(aleatorio.randint(1, 1_000), aleatorio.choice(sessoes), aleatorio.randint(1, 500), 25.0)
+               for _ in range(vendas)]
+    consultas = [aleatorio.choice(sessoes) for _ in range(buscas)]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        gerador.instala(dados, pasta)
+        Sessao.busca_sessao(sessoes[0])
+        Instrumentacao.zera()
+
+        inicio = time.perf_counter()
+        for pedido in pedidos:
+            Ingresso.cria_ingresso(*pedido)
+        venda = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for sessao_id in consultas:
+            Sessao.busca_sessao(sessao_id)
+        busca = time.perf_counter() - inicio
+
+        Ingresso.grava_pendentes()
+        Sessao.flush()
+
+    relatorio = {"venda_us": round(venda / vendas * 1e6, 2), "busca_us": round(busca / buscas * 1e6, 3)}
+    if Instrumentacao.ATIVA:
+        resumo = Instrumentacao.resumo()
+        relatorio["resumo"] = {nome: resumo[nome] for nome in OPERACOES_RESUMO if nome in resumo}
+    return relatorio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do custo da instrumentação")
+    parser.add_argument("--vendas", type=int, default=100_000)
+    parser.add_argument("--buscas", type=int, default=1_000_000)
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    if argumentos.filho:
+        print(json.dumps(carga(argumentos.vendas, argumentos.buscas)))
+        return
+
+    relatorio = {"vendas": argumentos.vendas, "buscas": argumentos.buscas}
+    for nome, valor in (("desligada", "0"), ("ligada", "1")):
+        ambiente = {**os.environ, "BILHETERIA_INSTRUMENTACAO": valor}
+        saida = subprocess.run([sys.executable, os.path.abspath(__file__), "--filho",
+                                "--vendas", str(argumentos.vendas), "--buscas", str(argumentos.buscas)],
+                               env=ambiente, capture_output=True, text=True, check=True).stdout
+        relatorio[nome] = json.loads(saida.splitlines()[-1])
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
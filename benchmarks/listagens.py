@@ -0,0 +1,96 @@
+"""
+Benchmark das listagens: cópia da lista contra gerador e página por cursor.
+
+Com N clientes e N ingressos em memória (10⁶ por padrão), mede o tempo e
+o pico de memória (tracemalloc) de:
+
+  primeira_pagina  - as 20 primeiras linhas, como o menu exibe:
+                     lista_clientes()[:20] (copia tudo) contra
+                     itera_clientes(0, 20) e pagina_clientes(20)
+  pagina_no_meio   - 20 registros a partir do meio do cadastro, por
+                     pagina_*(20, cursor) contra filtrar a cópia
+  percorrer_tudo   - somar um campo de todos os registros pela cópia
+                     contra pelo gerador itera_*()
+
+Uso: python benchmarks/listagens.py [--quantidade 1000000]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import modulos.cliente.cliente as Cliente
+import modulos.ingresso.ingresso as Ingresso
+from modulos.ingresso.livro_ingressos import LivroIngressos
+from modulos.registros import RegistroCliente
+
+TAMANHO_PAGINA = 20
+
+
+def popula(quantidade: int) -> None:
+    """Clientes e ingressos direto na memória, como se lidos do snapshot."""
+    Cliente.restaura([RegistroCliente(i, f"Cliente {i}", f"{i:011d}") for i in range(1, quantidade + 1)],
+                     [f"{i:011d}" for i in range(1, quantidade + 1)])
+    livro = LivroIngressos()
+    for i in range(1, quantidade + 1):
+        livro.anexa(i, i % 1000 + 1, i % 500 + 1, i % 200 + 1, 20.0 + i % 3 * 5)
+    Ingresso.restaura(livro.exporta())
+
+
+def mede(funcao) -> dict:
+    """Tempo de uma chamada e, em outra (o tracemalloc a deixa mais lenta), o pico de memória alocada."""
+    inicio = time.perf_counter()
+    funcao()
+    tempo = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": round(tempo * 1e3, 3), "pico_kib": round(pico / 1024, 1)}
+
+
+def compara(lista, itera, pagina, campo: str, quantidade: int) -> dict:
+    meio = quantidade // 2
+    return {
+        "primeira_pagina": {
+            "copia": mede(lambda: lista()[:TAMANHO_PAGINA]),
+            "gerador": mede(lambda: list(itera(0, TAMANHO_PAGINA))),
+            "cursor": mede(lambda: pagina(TAMANHO_PAGINA)),
+        },
+        "pagina_no_meio": {
+            "copia": mede(lambda: [r for r in lista() if r["id"] > meio][:TAMANHO_PAGINA]),
+            "cursor": mede(lambda: pagina(TAMANHO_PAGINA, meio)),
+        },
+        "percorrer_tudo": {
+            "copia": mede(lambda: sum(r[campo] for r in lista())),
+            "gerador": mede(lambda: sum(r[campo] for r in itera())),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das listagens por cópia, gerador e cursor")
+    parser.add_argument("--quantidade", type=int, default=1_000_000)
+    argumentos = parser.parse_args()
+
+    n = argumentos.quantidade
+    popula(n)
+    relatorio = {
+        "quantidade": n,
+        "clientes": compara(Cliente.lista_clientes, Cliente.itera_clientes, Cliente.pagina_clientes, "id", n),
+        "ingressos": compara(Ingresso.obtem_todos_ingressos, Ingresso.itera_ingressos,
+                             Ingresso.pagina_ingressos, "preco", n),
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark da sugestão de melhores assentos durante as vendas.
+
+Monta um cinema com salas de CAPACIDADE lugares (500 por padrão, 25 por
+fileira) e intercala vendas aleatórias com pedidos de N lugares juntos
+(2 a 6), até as salas ficarem quase cheias, medindo o custo por consulta:
+
+  indice    - sessao.melhores_assentos(): trechos livres por fileira,
+              atualizados a cada venda
+  varredura - o equivalente percorrendo todos os assentos da sala a cada
+              pedido, fileira por fileira
+
+Uso: python benchmarks/melhores_assentos.py [--capacidade 500] [--consultas 20000]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import gerador
+import modulos.sessao.sessao as Sessao
+
+LARGURA = 25
+
+
+def varre(sessao_id: int, quantidade: int) -> list[int]:
+    """O que cada pedido custaria sem o índice: olhar todos os assentos da sala."""
+    sessao = Sessao.busca_sessao(sessao_id)
+    ocupados = sessao["assentos_ocupados"]
+    capacidade = sessao["capacidade"]
+    fileiras = -(-capacidade // LARGURA)
+    centro_sala = (fileiras - 1) / 2
+
+    melhor = None
+    for fileira in range(fileiras):
+        primeiro = fileira * LARGURA + 1
+        ultimo = min(primeiro + LARGURA - 1, capacidade)
+        centro = (primeiro + ultimo) / 2
+        seguidos = 0
+        for numero in range(primeiro, ultimo + 1):
+            seguidos = 0 if numero in ocupados else seguidos + 1
+            if seguidos >= quantidade:
+                comeco = numero - quantidade + 1
+                chave = (abs(fileira - centro_sala), abs(comeco + (quantidade - 1) / 2 - centro), fileira)
+                if melhor is None or chave < melhor[0]:
+                    melhor = (chave, comeco)
+    if melhor is None:
+        return []
+    return list(range(melhor[1], melhor[1] + quantidade))
+
+
+def simula(dados: dict, consultas: int, sugere) -> dict:
+    """Intercala `consultas` pedidos com a venda do bloco sugerido (ou de um assento qualquer)."""
+    aleatorio = random.Random(42)
+    sessoes = [sessao["id"] for sessao in dados["sessoes"]]
+    tempo = 0.0
+    vazias = 0
+    for _ in range(consultas):
+        sessao_id = aleatorio.choice(sessoes)
+        quantidade = aleatorio.randint(2, 6)
+
+        inicio = time.perf_counter()
+        assentos = sugere(sessao_id, quantidade)
+        tempo += time.perf_counter() - inicio
+
+        if assentos:
+            Sessao.reserva_assentos(sessao_id, assentos)
+        else:
+            vazias += 1
+        # Vendas avulsas espalham buracos pela sala
+        livres = Sessao.lista_assentos_livres(sessao_id)
+        if livres:
+            Sessao.reserva_assento(sessao_id, aleatorio.choice(livres))
+    return {"us_por_consulta": round(tempo / consultas * 1e6, 1), "sem_bloco": vazias}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da sugestão de melhores assentos")
+    parser.add_argument("--capacidade", type=int, default=500)
+    parser.add_argument("--consultas", type=int, default=20_000)
+    argumentos = parser.parse_args()
+
+    dados = gerador.gera_cinema(filmes=20, salas=20, sessoes=20 * len(gerador.HORARIOS), clientes=0, ingressos=0)
+    for sessao in dados["sessoes"]:
+        sessao["capacidade"] = argumentos.capacidade
+    relatorio = {"capacidade": argumentos.capacidade, "assentos_por_fileira": LARGURA,
+                 "sessoes": len(dados["sessoes"]), "consultas": argumentos.consultas}
+
+    for nome, sugere in (("indice", Sessao.melhores_assentos), ("varredura", varre)):
+        with tempfile.TemporaryDirectory() as pasta:
+            gerador.instala(dados, pasta)
+            for sala in {sessao["sala"] for sessao in dados["sessoes"]}:
+                Sessao.define_layout_sala(sala, LARGURA)
+            relatorio[nome] = simula(dados, argumentos.consultas, sugere)
+            Sessao.flush()
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
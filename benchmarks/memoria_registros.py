@@ -0,0 +1,75 @@
+"""
+Relatório de memória por registro: dicionário x registro com __slots__.
+
+Para cada entidade (filme, sessão, cliente, ingresso), cria N registros
+gerados por gerador.py como dicionários e como os tipos de
+modulos/registros.py, e mede com tracemalloc os bytes por registro. Os
+valores dos campos são os mesmos nos dois casos, então a diferença é só
+o contêiner.
+
+Uso: python benchmarks/memoria_registros.py [--quantidade 100000]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import gerador
+from modulos.registros import RegistroCliente, RegistroFilme, RegistroIngresso, RegistroSessao
+
+TIPOS = {
+    "filmes": RegistroFilme,
+    "sessoes": RegistroSessao,
+    "clientes": RegistroCliente,
+    "ingressos": RegistroIngresso,
+}
+
+
+def bytes_por_registro(construtor, linhas: list[dict]) -> float:
+    """Memória alocada pelos contêineres, dividida pelo número de registros."""
+    tracemalloc.start()
+    antes, _ = tracemalloc.get_traced_memory()
+    registros = [construtor(**linha) for linha in linhas]
+    depois, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # A própria lista de registros é igual nos dois casos
+    total = depois - antes - sys.getsizeof(registros)
+    del registros
+    return round(total / len(linhas), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória por registro: dict x __slots__")
+    parser.add_argument("--quantidade", type=int, default=100_000)
+    argumentos = parser.parse_args()
+
+    n = argumentos.quantidade
+    dados = gerador.gera_cinema(filmes=n, salas=-(-n // len(gerador.HORARIOS)), sessoes=n,
+                                clientes=n, ingressos=n)
+
+    relatorio = {"quantidade": n}
+    for entidade, tipo in TIPOS.items():
+        # Os valores (inclusive o mapa de assentos e o histórico) são
+        # compartilhados com `linhas`, então só o contêiner é medido
+        linhas = dados[entidade]
+        dicionario = bytes_por_registro(dict, linhas)
+        registro = bytes_por_registro(tipo, linhas)
+        relatorio[entidade] = {
+            "dict_bytes": dicionario,
+            "slots_bytes": registro,
+            "economia_bytes": round(dicionario - registro, 1),
+            "economia_pct": round(100 * (dicionario - registro) / dicionario, 1),
+        }
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
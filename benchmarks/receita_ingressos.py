@@ -0,0 +1,94 @@
+"""
+Benchmark dos relatórios de receita sobre o livro de ingressos.
+
+Gera N ingressos (1.000.000 por padrão) com gerador.py e mede o tempo de
+reconstruir os contadores de monitoramento (receita e ingressos por sessão,
+por filme e no total):
+
+  registros - recalcula_contadores sobre uma lista de RegistroIngresso,
+              um ingresso por vez (como era com a lista de dicionários)
+  colunas   - recalcula_contadores sobre o LivroIngressos, com as somas
+              por sessão feitas nas colunas
+
+Também mede a busca dos ingressos de uma sessão e a memória do livro
+(colunas e índices por sessão e cliente) contra a lista de registros.
+
+Uso: python benchmarks/receita_ingressos.py [--ingressos 1000000]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import gerador
+import modulos.monitoramento.monitoramento as Monitoramento
+import modulos.sessao.sessao as Sessao
+from modulos.ingresso.livro_ingressos import LivroIngressos, numpy
+from modulos.registros import RegistroIngresso
+
+
+def cronometra(funcao, *argumentos) -> float:
+    inicio = time.perf_counter()
+    funcao(*argumentos)
+    return round((time.perf_counter() - inicio) * 1000, 1)
+
+
+def memoria_mb(construtor) -> float:
+    tracemalloc.start()
+    resultado = construtor()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return round(pico / 2**20, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da receita sobre o livro de ingressos")
+    parser.add_argument("--ingressos", type=int, default=1_000_000)
+    argumentos = parser.parse_args()
+
+    dimensoes = gerador.dimensiona(argumentos.ingressos)
+    dados = gerador.gera_cinema(**dimensoes)
+
+    # As sessões ficam em memória para a busca do filme de cada uma
+    Sessao.listaSessoes.clear()
+    Sessao.indiceSessoes.clear()
+    for sessao in dados["sessoes"]:
+        Sessao.listaSessoes.append(sessao)
+        Sessao.indiceSessoes[sessao["id"]] = sessao
+    Sessao._carregado = True
+
+    registros = [RegistroIngresso(**ingresso) for ingresso in dados["ingressos"]]
+    livro = LivroIngressos(dados["ingressos"])
+    sessao_id = dados["sessoes"][0]["id"]
+
+    relatorio = {
+        "ingressos": len(livro),
+        "sessoes": len(dados["sessoes"]),
+        "numpy": numpy is not None,
+        "recalcula_ms": {
+            "registros": cronometra(Monitoramento.recalcula_contadores, registros),
+            "colunas": cronometra(Monitoramento.recalcula_contadores, livro),
+        },
+        "ingressos_da_sessao_ms": {
+            "varredura": cronometra(lambda: [i for i in registros if i["sessao_id"] == sessao_id]),
+            "colunas": cronometra(livro.da_sessao, sessao_id),
+        },
+        "memoria_mb": {
+            "registros": memoria_mb(lambda: [RegistroIngresso(**i) for i in dados["ingressos"]]),
+            "colunas_com_indices": memoria_mb(lambda: LivroIngressos(dados["ingressos"])),
+        },
+    }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
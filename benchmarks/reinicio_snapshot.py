@@ -0,0 +1,80 @@
+"""
+Benchmark do reinício: arquivos de dados x snapshot binário.
+
+Gera um cinema de tamanho N (1.000.000 por padrão, ver gerador.dimensiona),
+grava os arquivos de dados e o snapshot, e mede o tempo de carregar tudo
+de novo (filmes, sessões com assentos, clientes, ingressos e contadores):
+
+  arquivos - carrega() de cada módulo: XML de filmes e sessões, logs de
+             clientes e ingressos
+  snapshot - snapshot.restaura(): uma leitura do bilheteria.snapshot
+
+Uso: python benchmarks/reinicio_snapshot.py [--tamanho 1000000]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import gerador
+import modulos.armazenamento.snapshot as Snapshot
+import modulos.cliente.cliente as Cliente
+import modulos.filme.filme as Filme
+import modulos.ingresso.ingresso as Ingresso
+import modulos.sessao.sessao as Sessao
+
+
+def carrega_arquivos(pasta: str) -> None:
+    for modulo in (Filme, Sessao, Cliente, Ingresso):
+        modulo.carrega(pasta)
+
+
+def restaura_snapshot(pasta: str) -> None:
+    if not Snapshot.restaura(pasta):
+        raise RuntimeError("snapshot não aproveitado")
+
+
+def cronometra(funcao, pasta: str) -> float:
+    inicio = time.perf_counter()
+    funcao(pasta)
+    return round(time.perf_counter() - inicio, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do reinício com snapshot binário")
+    parser.add_argument("--tamanho", type=int, default=1_000_000)
+    argumentos = parser.parse_args()
+
+    dados = gerador.gera_cinema(**gerador.dimensiona(argumentos.tamanho))
+
+    with tempfile.TemporaryDirectory() as pasta:
+        gerador.instala(dados, pasta)
+        Snapshot.grava()
+        del dados
+
+        relatorio = {
+            "tamanho": argumentos.tamanho,
+            "sessoes": len(Sessao.listaSessoes),
+            "ingressos": len(Ingresso.listaIngressos),
+            "arquivos_mb": round(sum(os.path.getsize(os.path.join(pasta, nome))
+                                     for nome in os.listdir(pasta) if nome != Snapshot.NOME_ARQUIVO) / 2**20, 1),
+            "snapshot_mb": round(os.path.getsize(Snapshot.caminho_snapshot()) / 2**20, 1),
+            "reinicio_s": {
+                "arquivos": cronometra(carrega_arquivos, pasta),
+                "snapshot": cronometra(restaura_snapshot, pasta),
+            },
+        }
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
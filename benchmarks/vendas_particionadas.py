@@ -0,0 +1,120 @@
+"""
+Benchmark das vendas em processos particionados por sala.
+
+Monta um cinema sem ingressos e vende VENDAS ingressos (20.000 por padrão)
+a partir de vários terminais simulados (threads), espalhados por todas as
+sessões, medindo vendas por segundo:
+
+  processo_unico - os terminais chamam ingresso.cria_ingresso direto,
+                   todos disputando o GIL de um só processo
+  particoes_N    - os terminais chamam Roteador.cria_ingresso, que
+                   encaminha cada venda ao processo dono da sala
+
+O ganho das partições depende de haver núcleos livres (ver "nucleos" na
+saída): com um só núcleo, os processos se revezam nele e o que sobra é o
+custo da troca de mensagens.
+
+Uso: python benchmarks/vendas_particionadas.py [--vendas 20000] [--terminais 8] [--particoes 1,2,4]
+O resultado é impresso em JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import gerador
+import modulos.cliente.cliente as Cliente
+import modulos.filme.filme as Filme
+import modulos.ingresso.ingresso as Ingresso
+import modulos.particao.particao as Particao
+import modulos.sessao.sessao as Sessao
+import padrao_retornos
+
+
+def _vendas(dados: dict, quantidade: int) -> list[tuple]:
+    """(cliente_id, sessao_id, assento) intercalando as sessões, para todas as salas venderem juntas."""
+    vendas = []
+    assento = 1
+    while len(vendas) < quantidade:
+        for sessao in dados["sessoes"]:
+            if assento <= sessao["capacidade"] and len(vendas) < quantidade:
+                vendas.append((len(vendas) % len(dados["clientes"]) + 1, sessao["id"], assento))
+        assento += 1
+    return vendas
+
+
+def vende(cria_ingresso, vendas: list[tuple], terminais: int) -> dict:
+    """Divide as vendas entre `terminais` threads e mede o tempo até todas terminarem."""
+    falhas = []
+
+    def terminal(parte):
+        for cliente_id, sessao_id, assento in parte:
+            if cria_ingresso(cliente_id, sessao_id, assento, 20.0) != padrao_retornos.SUCESSO:
+                falhas.append((sessao_id, assento))
+
+    threads = [threading.Thread(target=terminal, args=(vendas[i::terminais],)) for i in range(terminais)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    if falhas:
+        raise RuntimeError(f"{len(falhas)} vendas falharam")
+    return {"tempo_s": round(duracao, 2), "vendas_por_s": round(len(vendas) / duracao)}
+
+
+def grava_pendentes() -> None:
+    """Grava o que os módulos deste processo têm pendente antes de a pasta ser apagada."""
+    Filme.flush()
+    Sessao.flush()
+    Cliente.grava_pendentes()
+    Ingresso.grava_pendentes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das vendas em processos particionados por sala")
+    parser.add_argument("--vendas", type=int, default=20_000)
+    parser.add_argument("--terminais", type=int, default=8)
+    parser.add_argument("--particoes", default="1,2,4")
+    argumentos = parser.parse_args()
+
+    dados = gerador.gera_cinema(filmes=20, salas=32, sessoes=32 * len(gerador.HORARIOS), clientes=1000, ingressos=0)
+    vendas = _vendas(dados, argumentos.vendas)
+    relatorio = {
+        "vendas": len(vendas),
+        "terminais": argumentos.terminais,
+        "salas": len({sessao["sala"] for sessao in dados["sessoes"]}),
+        "nucleos": os.cpu_count(),
+    }
+
+    with tempfile.TemporaryDirectory() as pasta:
+        gerador.instala(dados, pasta)
+        relatorio["processo_unico"] = vende(Ingresso.cria_ingresso, vendas, argumentos.terminais)
+        grava_pendentes()
+
+    for total in (int(n) for n in argumentos.particoes.split(",")):
+        with tempfile.TemporaryDirectory() as pasta:
+            gerador.instala(dados, pasta)
+            roteador = Particao.Roteador(pasta, total)
+            roteador.inicia()
+            try:
+                relatorio[f"particoes_{total}"] = vende(roteador.cria_ingresso, vendas, argumentos.terminais)
+            finally:
+                roteador.encerra()
+            grava_pendentes()
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Seleção do armazenamento usado pelos módulos.
+
+Por padrão (backend = None) filmes e sessões ficam nos arquivos XML de cada
+módulo. Com usa_sqlite() todos os módulos passam a ler e gravar no backend
+escolhido, que deve oferecer as funções:
+
+  salva_filme(filme)            remove_filme(filme_id)      carrega_filmes()
+  salva_sessao(sessao)          remove_sessao(sessao_id)    carrega_sessoes()
+  ultimo_id_sessao()
+  reserva_assentos(sessao_id, assentos)
+  salva_layout_sala(sala, assentos_por_fileira)            carrega_layouts_salas()
+  salva_cliente(cliente)        remove_cliente(cliente_id)  carrega_clientes()
+  ultimo_id_cliente()
+  salva_ingressos(ingressos)    carrega_ingressos()
+  importa(filmes, sessoes, clientes, ingressos, layouts_salas)
+
+Uso (migração dos XML para SQLite):
+  python -m modulos.armazenamento.armazenamento --xml PASTA --banco bilheteria.db
+"""
+
+import modulos.armazenamento.armazenamento_sqlite as ArmazenamentoSqlite
+import argparse
+import os
+
+__all__ = [
+    "usa_sqlite",
+    "usa_xml",
+    "migra_xml"
+]
+
+backend = None
+
+
+def usa_sqlite(caminho: str) -> None:
+    """
+    Passa a usar o banco SQLite em `caminho` (criado se não existir).
+    Deve ser chamada antes do primeiro acesso aos dados; módulos já
+    carregados precisam ser recarregados com carrega().
+    """
+    global backend
+
+    ArmazenamentoSqlite.conecta(caminho)
+    backend = ArmazenamentoSqlite
+
+
+def usa_xml() -> None:
+    """Volta ao armazenamento padrão em arquivos XML."""
+    global backend
+
+    if backend is not None:
+        backend.desconecta()
+    backend = None
+
+
+def migra_xml(diretorio_xml: str, caminho_banco: str) -> dict:
+    """
+    Copia filmes e sessões (inclusive as reservas ainda no journal), clientes
+    e ingressos dos arquivos de `diretorio_xml` (XML e logs) para o banco
+    SQLite em `caminho_banco`, junto com o maior id de cliente já usado.
+    Os arquivos não são alterados; filme, sessao, cliente e ingresso ficam
+    carregados com o conteúdo de `diretorio_xml`.
+
+    Retorna {"filmes": int, "sessoes": int, "assentos": int, "clientes": int, "ingressos": int}.
+    """
+    global backend
+
+    import modulos.filme.filme as Filme
+    import modulos.sessao.sessao as Sessao
+    import modulos.cliente.cliente as Cliente
+    import modulos.ingresso.ingresso as Ingresso
+
+    backend_anterior = backend
+    banco_anterior = ArmazenamentoSqlite.caminho_banco
+    backend = None
+    try:
+        Filme.carrega(diretorio_xml)
+        Sessao.carrega(diretorio_xml)
+        Cliente.carrega(diretorio_xml)
+        # Depois das sessões: os contadores de receita consultam as sessões
+        Ingresso.carrega(diretorio_xml)
+
+        ArmazenamentoSqlite.conecta(caminho_banco)
+        ArmazenamentoSqlite.importa(Filme.filmesEmCartaz, Sessao.listaSessoes, Cliente.listaClientes,
+                                    Ingresso.listaIngressos, layouts_salas=Sessao.layoutSalas,
+                                    ultimos_ids={"sessoes": Sessao.ultimo_id_sessao(),
+                                                 "clientes": Cliente.ultimo_id_cliente()})
+
+        return {
+            "filmes": len(Filme.filmesEmCartaz),
+            "sessoes": len(Sessao.listaSessoes),
+            "assentos": sum(len(sessao["assentos_ocupados"]) for sessao in Sessao.listaSessoes),
+            "clientes": len(Cliente.listaClientes),
+            "ingressos": len(Ingresso.listaIngressos)
+        }
+    finally:
+        if banco_anterior is None:
+            ArmazenamentoSqlite.desconecta()
+        elif banco_anterior != caminho_banco:
+            ArmazenamentoSqlite.conecta(banco_anterior)
+        backend = backend_anterior
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra os arquivos XML da bilheteria para SQLite")
+    parser.add_argument("--xml", default=os.getcwd(),
+                        help="Pasta com filmes.xml, sessoes.xml, clientes.log e ingressos.log")
+    parser.add_argument("--banco", default="bilheteria.db")
+    argumentos = parser.parse_args()
+
+    totais = migra_xml(argumentos.xml, argumentos.banco)
+    print(f"[Info] Migrados {totais['filmes']} filmes, {totais['sessoes']} sessões, "
+          f"{totais['assentos']} assentos ocupados, {totais['clientes']} clientes "
+          f"e {totais['ingressos']} ingressos para {argumentos.banco}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Backend de armazenamento em SQLite (módulo padrão sqlite3).
+
+Cada alteração vira uma escrita pequena e indexada (um INSERT/DELETE por
+registro) em vez de regravar um arquivo inteiro. O banco usa WAL, para que
+leituras não bloqueiem a escrita, e todas as consultas são parametrizadas,
+então o sqlite3 reaproveita os statements já preparados.
+
+Implementa a interface descrita em armazenamento.py.
+"""
+
+import sqlite3
+import threading
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS filmes (
+    id INTEGER PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    sinopse TEXT,
+    genero TEXT,
+    duracao REAL,
+    classificacao INTEGER,
+    dataLancamento TEXT
+);
+CREATE TABLE IF NOT EXISTS sessoes (
+    id INTEGER PRIMARY KEY,
+    filme_id INTEGER NOT NULL,
+    sala INTEGER NOT NULL,
+    horario TEXT NOT NULL,
+    capacidade INTEGER NOT NULL,
+    formato_exibicao TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessoes_filme ON sessoes (filme_id);
+CREATE INDEX IF NOT EXISTS idx_sessoes_sala_horario ON sessoes (sala, horario);
+CREATE INDEX IF NOT EXISTS idx_sessoes_horario ON sessoes (horario);
+CREATE TABLE IF NOT EXISTS layouts_salas (
+    sala INTEGER PRIMARY KEY,
+    assentos_por_fileira INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS assentos (
+    sessao_id INTEGER NOT NULL,
+    numero_assento INTEGER NOT NULL,
+    PRIMARY KEY (sessao_id, numero_assento)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS clientes (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    cpf TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_clientes_cpf ON clientes (cpf);
+CREATE TABLE IF NOT EXISTS ingressos (
+    id INTEGER PRIMARY KEY,
+    cliente_id INTEGER NOT NULL,
+    sessao_id INTEGER NOT NULL,
+    numero_assento INTEGER NOT NULL,
+    preco REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ingressos_cliente ON ingressos (cliente_id);
+CREATE INDEX IF NOT EXISTS idx_ingressos_sessao ON ingressos (sessao_id);
+CREATE TABLE IF NOT EXISTS ultimos_ids (
+    tabela TEXT PRIMARY KEY,
+    id INTEGER NOT NULL
+);
+"""
+
+# Guarda o maior id já gravado na tabela; sobrevive à remoção da linha
+_SQL_ULTIMO_ID = ("INSERT INTO ultimos_ids (tabela, id) VALUES (?, ?) "
+                  "ON CONFLICT (tabela) DO UPDATE SET id = max(id, excluded.id)")
+
+_conexao = None
+caminho_banco = None
+
+# Uma única conexão é compartilhada pelas threads do servidor
+_trava = threading.Lock()
+
+
+def conecta(caminho: str) -> None:
+    """Abre (ou cria) o banco em `caminho` e garante o esquema."""
+    global _conexao, caminho_banco
+
+    desconecta()
+    conexao = sqlite3.connect(caminho, check_same_thread=False, cached_statements=256)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("PRAGMA synchronous=NORMAL")
+    conexao.executescript(_ESQUEMA)
+    conexao.commit()
+    _conexao = conexao
+    caminho_banco = caminho
+
+
+def desconecta() -> None:
+    global _conexao, caminho_banco
+
+    with _trava:
+        if _conexao is not None:
+            _conexao.close()
+            _conexao = None
+            caminho_banco = None
+
+
+def _executa(sql: str, parametros=()) -> None:
+    with _trava, _conexao:
+        _conexao.execute(sql, parametros)
+
+
+def _executa_varios(sql: str, linhas) -> None:
+    with _trava, _conexao:
+        _conexao.executemany(sql, linhas)
+
+
+def _consulta(sql: str) -> list[tuple]:
+    with _trava:
+        return _conexao.execute(sql).fetchall()
+
+
+def _ultimo_id(tabela: str) -> int:
+    with _trava:
+        linha = _conexao.execute("SELECT id FROM ultimos_ids WHERE tabela = ?", (tabela,)).fetchone()
+    return linha[0] if linha else 0
+
+
+# --- Filmes ---
+
+def salva_filme(filme: dict) -> None:
+    """Insere ou atualiza um filme."""
+    _executa(
+        "INSERT OR REPLACE INTO filmes (id, titulo, sinopse, genero, duracao, classificacao, dataLancamento) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (filme["id"], filme["titulo"], filme["sinopse"], filme["genero"],
+         filme["duracao"], filme["classificacao"], filme["dataLancamento"])
+    )
+
+
+def remove_filme(filme_id: int) -> None:
+    _executa("DELETE FROM filmes WHERE id = ?", (filme_id,))
+
+
+def carrega_filmes() -> list[dict]:
+    return [
+        {"id": id, "titulo": titulo, "sinopse": sinopse, "genero": genero, "duracao": duracao,
+         "classificacao": classificacao, "dataLancamento": dataLancamento}
+        for id, titulo, sinopse, genero, duracao, classificacao, dataLancamento in _consulta(
+            "SELECT id, titulo, sinopse, genero, duracao, classificacao, dataLancamento FROM filmes ORDER BY id")
+    ]
+
+
+# --- Sessões e assentos ---
+
+def salva_sessao(sessao: dict) -> None:
+    """Insere ou atualiza os dados de uma sessão (os assentos ficam em reserva_assentos)."""
+    with _trava, _conexao:
+        _conexao.execute(
+            "INSERT OR REPLACE INTO sessoes (id, filme_id, sala, horario, capacidade, formato_exibicao) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (sessao["id"], sessao["filme_id"], sessao["sala"], sessao["horario"],
+             sessao["capacidade"], sessao["formato_exibicao"])
+        )
+        _conexao.execute(_SQL_ULTIMO_ID, ("sessoes", sessao["id"]))
+
+
+def remove_sessao(sessao_id: int) -> None:
+    with _trava, _conexao:
+        _conexao.execute("DELETE FROM assentos WHERE sessao_id = ?", (sessao_id,))
+        _conexao.execute("DELETE FROM sessoes WHERE id = ?", (sessao_id,))
+
+
+def reserva_assentos(sessao_id: int, assentos: list[int]) -> None:
+    """Grava os assentos recém-ocupados de uma sessão em uma única transação."""
+    _executa_varios(
+        "INSERT OR IGNORE INTO assentos (sessao_id, numero_assento) VALUES (?, ?)",
+        [(sessao_id, numero_assento) for numero_assento in assentos]
+    )
+
+
+def carrega_sessoes() -> list[dict]:
+    """
+    Retorna as sessões com a chave "assentos_ocupados" contendo a lista
+    dos números ocupados (o chamador monta o mapa de assentos).
+    """
+    sessoes = {
+        id: {"id": id, "filme_id": filme_id, "sala": sala, "horario": horario,
+             "capacidade": capacidade, "formato_exibicao": formato_exibicao, "assentos_ocupados": []}
+        for id, filme_id, sala, horario, capacidade, formato_exibicao in _consulta(
+            "SELECT id, filme_id, sala, horario, capacidade, formato_exibicao FROM sessoes ORDER BY id")
+    }
+    for sessao_id, numero_assento in _consulta("SELECT sessao_id, numero_assento FROM assentos"):
+        sessao = sessoes.get(sessao_id)
+        if sessao is not None:
+            sessao["assentos_ocupados"].append(numero_assento)
+    return list(sessoes.values())
+
+
+def ultimo_id_sessao() -> int:
+    """Maior id de sessão já gravado, mesmo que a sessão tenha sido removida."""
+    return _ultimo_id("sessoes")
+
+
+def salva_layout_sala(sala: int, assentos_por_fileira: int) -> None:
+    _executa("INSERT OR REPLACE INTO layouts_salas (sala, assentos_por_fileira) VALUES (?, ?)",
+             (sala, assentos_por_fileira))
+
+
+def carrega_layouts_salas() -> dict[int, int]:
+    """Retorna {sala: assentos_por_fileira} das salas com layout definido."""
+    return dict(_consulta("SELECT sala, assentos_por_fileira FROM layouts_salas"))
+
+
+# --- Clientes ---
+
+def salva_cliente(cliente: dict) -> None:
+    with _trava, _conexao:
+        _conexao.execute("INSERT OR REPLACE INTO clientes (id, nome, cpf) VALUES (?, ?, ?)",
+                         (cliente["id"], cliente["nome"], cliente["cpf"]))
+        _conexao.execute(_SQL_ULTIMO_ID, ("clientes", cliente["id"]))
+
+
+def remove_cliente(cliente_id: int) -> None:
+    _executa("DELETE FROM clientes WHERE id = ?", (cliente_id,))
+
+
+def carrega_clientes() -> list[dict]:
+    return [
+        {"id": id, "nome": nome, "cpf": cpf, "historico": []}
+        for id, nome, cpf in _consulta("SELECT id, nome, cpf FROM clientes ORDER BY id")
+    ]
+
+
+def ultimo_id_cliente() -> int:
+    """Maior id de cliente já gravado, mesmo que o cliente tenha sido removido."""
+    return _ultimo_id("clientes")
+
+
+# --- Ingressos ---
+
+def salva_ingressos(ingressos: list[dict]) -> None:
+    """Grava um ou mais ingressos vendidos em uma única transação."""
+    _executa_varios(
+        "INSERT OR REPLACE INTO ingressos (id, cliente_id, sessao_id, numero_assento, preco) VALUES (?, ?, ?, ?, ?)",
+        [(i["id"], i["cliente_id"], i["sessao_id"], i["numero_assento"], i["preco"]) for i in ingressos]
+    )
+
+
+def carrega_ingressos() -> list[dict]:
+    return [
+        {"id": id, "cliente_id": cliente_id, "sessao_id": sessao_id,
+         "numero_assento": numero_assento, "preco": preco}
+        for id, cliente_id, sessao_id, numero_assento, preco in _consulta(
+            "SELECT id, cliente_id, sessao_id, numero_assento, preco FROM ingressos ORDER BY id")
+    ]
+
+
+# --- Importação em massa (migração) ---
+
+def importa(filmes: list[dict], sessoes: list[dict], clientes: list[dict] = (),
+            ingressos: list[dict] = (), layouts_salas: dict | None = None,
+            ultimos_ids: dict[str, int] | None = None) -> None:
+    """
+    Grava de uma vez filmes, sessões (com seus assentos ocupados), clientes,
+    ingressos e os layouts das salas em uma única transação. Usado na migração a partir dos
+    arquivos XML e para montar os dados dos benchmarks.
+    `ultimos_ids` traz, por tabela ("clientes", "sessoes"), o maior id já
+    usado na origem, inclusive por registros removidos; sem ele, vale o
+    maior id importado.
+    """
+    ultimos = dict(ultimos_ids or {})
+    for tabela, registros in (("sessoes", sessoes), ("clientes", clientes)):
+        if registros:
+            ultimos[tabela] = max(ultimos.get(tabela, 0), max(r["id"] for r in registros))
+    with _trava, _conexao:
+        _conexao.executemany(
+            "INSERT OR REPLACE INTO filmes (id, titulo, sinopse, genero, duracao, classificacao, dataLancamento) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(f["id"], f["titulo"], f["sinopse"], f["genero"], f["duracao"], f["classificacao"], f["dataLancamento"])
+             for f in filmes]
+        )
+        _conexao.executemany(
+            "INSERT OR REPLACE INTO sessoes (id, filme_id, sala, horario, capacidade, formato_exibicao) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(s["id"], s["filme_id"], s["sala"], s["horario"], s["capacidade"], s["formato_exibicao"])
+             for s in sessoes]
+        )
+        _conexao.executemany(
+            "INSERT OR IGNORE INTO assentos (sessao_id, numero_assento) VALUES (?, ?)",
+            ((s["id"], numero_assento) for s in sessoes for numero_assento in s["assentos_ocupados"])
+        )
+        _conexao.executemany(
+            "INSERT OR REPLACE INTO clientes (id, nome, cpf) VALUES (?, ?, ?)",
+            ((c["id"], c["nome"], c["cpf"]) for c in clientes)
+        )
+        _conexao.executemany(
+            "INSERT OR REPLACE INTO ingressos (id, cliente_id, sessao_id, numero_assento, preco) VALUES (?, ?, ?, ?, ?)",
+            ((i["id"], i["cliente_id"], i["sessao_id"], i["numero_assento"], i["preco"]) for i in ingressos)
+        )
+        _conexao.executemany(
+            "INSERT OR REPLACE INTO layouts_salas (sala, assentos_por_fileira) VALUES (?, ?)",
+            (layouts_salas or {}).items()
+        )
+        _conexao.executemany(_SQL_ULTIMO_ID, ultimos.items())
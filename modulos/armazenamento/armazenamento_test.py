@@ -0,0 +1,383 @@
+import unittest
+import sys
+import os
+import pickle
+import tempfile
+import time
+from unittest.mock import patch
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(os.path.dirname(TEST_DIR))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import padrao_retornos
+import modulos.armazenamento.armazenamento as Armazenamento
+import modulos.armazenamento.armazenamento_sqlite as ArmazenamentoSqlite
+import modulos.armazenamento.snapshot as Snapshot
+from modulos.armazenamento.log_anexavel import LogAnexavel, le_arquivo
+import modulos.filme.filme as modulo_filme
+import modulos.sessao.sessao as modulo_sessao
+import modulos.cliente.cliente as modulo_cliente
+import modulos.ingresso.ingresso as modulo_ingresso
+import modulos.monitoramento.monitoramento as modulo_monitoramento
+
+
+class TestArmazenamentoSqlite(unittest.TestCase):
+
+    def setUp(self):
+        """Cada teste usa um banco novo em uma pasta temporária."""
+        self.pasta = tempfile.TemporaryDirectory()
+        self.banco = os.path.join(self.pasta.name, "bilheteria.db")
+
+        # Os módulos guardam os caminhos dos arquivos XML; restaurados no tearDown
+        self.arquivos = patch.multiple(modulo_sessao, nome_arquivo=modulo_sessao.nome_arquivo,
+                                       nome_arquivo_journal=modulo_sessao.nome_arquivo_journal)
+        self.arquivo_filme = patch.object(modulo_filme, "nome_arquivo", modulo_filme.nome_arquivo)
+        self.arquivos.start()
+        self.arquivo_filme.start()
+        # A migração aponta os logs de clientes e ingressos para a pasta migrada
+        for modulo in (modulo_cliente, modulo_ingresso):
+            arquivo = patch.object(modulo, "nome_arquivo", modulo.nome_arquivo)
+            arquivo.start()
+            self.addCleanup(arquivo.stop)
+
+        Armazenamento.usa_sqlite(self.banco)
+        self._recarrega_modulos()
+
+    def tearDown(self):
+        Armazenamento.usa_xml()
+        self.arquivos.stop()
+        self.arquivo_filme.stop()
+        modulo_filme.filmesEmCartaz.clear()
+        modulo_filme.indiceFilmes.clear()
+        modulo_sessao.listaSessoes.clear()
+        modulo_sessao.indiceSessoes.clear()
+        modulo_cliente.listaClientes.clear()
+        modulo_cliente.indiceClientes.clear()
+        modulo_cliente.indiceCpf.clear()
+        modulo_ingresso.listaIngressos.clear()
+        modulo_monitoramento.zera_contadores()
+        self.pasta.cleanup()
+
+    def _recarrega_modulos(self):
+        """Simula o reinício do processo: tudo é lido de novo do banco."""
+        modulo_filme.carrega()
+        modulo_sessao.carrega()
+        modulo_cliente.carrega()
+        modulo_ingresso.carrega()
+
+    def test_01_filmes_persistidos(self):
+        print("\nTeste 01: Filmes gravados e relidos do SQLite")
+        modulo_filme.cria_filme("Matrix", "Um hacker descobre a verdade.", "Ficção", 136.0, 14, "1999-05-21")
+        modulo_filme.cria_filme("Toy Story", "Brinquedos ganham vida.", "Animação", 81.0, 0, "1995-11-22")
+        modulo_filme.atualiza_dados_filme(1, "Matrix Reloaded", None)
+        modulo_filme.remove_filme(2)
+
+        self._recarrega_modulos()
+
+        self.assertEqual(len(modulo_filme.lista_filmes()), 1)
+        self.assertEqual(modulo_filme.busca_filme(1)["titulo"], "Matrix Reloaded")
+
+    def test_02_sessoes_assentos_clientes_ingressos(self):
+        print("Teste 02: Sessões, assentos, clientes e ingressos persistidos")
+        modulo_filme.cria_filme("Matrix", "Um hacker descobre a verdade.", "Ficção", 136.0, 14, "1999-05-21")
+        modulo_sessao.cria_sessao(1, 1, "20:00", 10, "dublado")
+        modulo_sessao.cria_sessao(1, 2, "21:00", 10, "legendado")
+        modulo_cliente.cadastra_cliente("Ana", "111.111.111-11")
+
+        self.assertEqual(modulo_ingresso.cria_ingresso(1, 1, 3, 20.0), padrao_retornos.SUCESSO)
+        self.assertEqual(modulo_ingresso.cria_ingressos_lote(1, 1, [4, 5], 20.0), padrao_retornos.SUCESSO)
+        self.assertEqual(modulo_sessao.apaga_sessao(2), padrao_retornos.SUCESSO)
+        self.assertEqual(modulo_sessao.define_layout_sala(1, 5), padrao_retornos.SUCESSO)
+
+        self._recarrega_modulos()
+
+        self.assertEqual(len(modulo_sessao.obtem_todas_sessoes()), 1)
+        self.assertEqual(modulo_sessao.assentos_por_fileira(1), 5)
+        self.assertEqual(list(modulo_sessao.busca_sessao(1)["assentos_ocupados"]), [3, 4, 5])
+        self.assertEqual(modulo_cliente.busca_cliente(1)["nome"], "Ana")
+        self.assertEqual(len(modulo_ingresso.lista_ingressos_sessao(1)), 3)
+        self.assertEqual(modulo_monitoramento.receita_e_ingressos(1)["ingressos_vendidos"], 3)
+
+        # Novos ingressos continuam a numeração depois do reinício
+        modulo_ingresso.cria_ingresso(1, 1, 6, 20.0)
+        self.assertEqual(modulo_ingresso.obtem_todos_ingressos()[-1]["id"], 4)
+
+        # Nem o de uma sessão apagada
+        self.assertEqual(modulo_sessao.cria_sessao(1, 2, "22:00", 10, "dublado"), padrao_retornos.SUCESSO)
+        self.assertEqual(modulo_sessao.obtem_todas_sessoes()[-1]["id"], 3)
+
+        # O id de um cliente removido não volta a ser usado depois do reinício
+        modulo_cliente.cadastra_cliente("Bruno", "222.222.222-22")
+        modulo_cliente.remove_cliente(2)
+        self._recarrega_modulos()
+        modulo_cliente.cadastra_cliente("Carla", "333.333.333-33")
+        self.assertEqual(modulo_cliente.busca_cliente_por_cpf("33333333333")["id"], 3)
+
+    def test_03_migracao_xml(self):
+        print("Teste 03: Migração dos arquivos XML para o SQLite")
+        Armazenamento.usa_xml()
+        pasta_xml = os.path.join(self.pasta.name, "xml")
+        os.mkdir(pasta_xml)
+
+        modulo_filme.carrega(pasta_xml)
+        modulo_sessao.carrega(pasta_xml)
+        modulo_filme.cria_filme("Matrix", "Um hacker descobre a verdade.", "Ficção", 136.0, 14, "1999-05-21")
+        modulo_sessao.cria_sessao(1, 1, "20:00", 10, "dublado")
+        modulo_sessao.reserva_assentos(1, [1, 2])  # ainda só no journal
+        modulo_sessao.define_layout_sala(1, 5)
+
+        totais = Armazenamento.migra_xml(pasta_xml, self.banco)
+        self.assertEqual(totais, {"filmes": 1, "sessoes": 1, "assentos": 2, "clientes": 0, "ingressos": 0})
+        self.assertIsNone(Armazenamento.backend)
+
+        Armazenamento.usa_sqlite(self.banco)
+        self._recarrega_modulos()
+        self.assertEqual(modulo_filme.busca_filme(1)["titulo"], "Matrix")
+        self.assertEqual(modulo_sessao.assentos_disponiveis(1), 8)
+        self.assertEqual(modulo_sessao.layoutSalas, {1: 5})
+
+    def test_04_indices_e_wal(self):
+        print("Teste 04: Banco em modo WAL e com os índices de consulta")
+        conexao = ArmazenamentoSqlite._conexao
+        self.assertEqual(conexao.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+        indices = {linha[0] for linha in conexao.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for indice in ("idx_sessoes_filme", "idx_sessoes_sala_horario", "idx_ingressos_cliente"):
+            self.assertIn(indice, indices)
+
+    def test_05_migracao_com_clientes_e_ingressos(self):
+        print("Teste 05: Migração leva clientes e ingressos junto com os assentos ocupados")
+        Armazenamento.usa_xml()
+        pasta_xml = os.path.join(self.pasta.name, "xml")
+        os.mkdir(pasta_xml)
+
+        for modulo in (modulo_filme, modulo_sessao, modulo_cliente, modulo_ingresso):
+            modulo.carrega(pasta_xml)
+        modulo_filme.cria_filme("Matrix", "Um hacker descobre a verdade.", "Ficção", 136.0, 14, "1999-05-21")
+        modulo_sessao.cria_sessao(1, 1, "20:00", 10, "dublado")
+        modulo_sessao.cria_sessao(1, 2, "20:00", 10, "dublado")
+        modulo_sessao.apaga_sessao(2)
+        modulo_cliente.cadastra_cliente("Ana", "111.111.111-11")
+        modulo_cliente.cadastra_cliente("Bruno", "222.222.222-22")
+        modulo_cliente.remove_cliente(2)
+        modulo_ingresso.cria_ingresso(1, 1, 3, 20.0)
+        modulo_ingresso.cria_ingressos_lote(1, 1, [4, 5], 25.0)
+
+        totais = Armazenamento.migra_xml(pasta_xml, self.banco)
+        self.assertEqual(totais, {"filmes": 1, "sessoes": 1, "assentos": 3, "clientes": 1, "ingressos": 3})
+
+        Armazenamento.usa_sqlite(self.banco)
+        self._recarrega_modulos()
+        ingressos = modulo_ingresso.obtem_todos_ingressos()
+        self.assertEqual(sorted(modulo_sessao.busca_sessao(1)["assentos_ocupados"]),
+                         sorted(i["numero_assento"] for i in ingressos))
+        self.assertEqual([(i["id"], i["cliente_id"], i["numero_assento"], i["preco"]) for i in ingressos],
+                         [(1, 1, 3, 20.0), (2, 1, 4, 25.0), (3, 1, 5, 25.0)])
+        self.assertEqual([c["nome"] for c in modulo_cliente.lista_clientes()], ["Ana"])
+        self.assertEqual(modulo_monitoramento.receita_e_ingressos(1)["ingressos_vendidos"], 3)
+
+        # Os ids do cliente e da sessão removidos antes da migração seguem reservados
+        self.assertEqual(modulo_sessao.cria_sessao(1, 2, "22:00", 10, "dublado"), padrao_retornos.SUCESSO)
+        self.assertEqual(modulo_sessao.obtem_todas_sessoes()[-1]["id"], 3)
+        modulo_cliente.cadastra_cliente("Carla", "333.333.333-33")
+        self.assertEqual(modulo_cliente.busca_cliente_por_cpf("33333333333")["id"], 3)
+        modulo_ingresso.cria_ingresso(3, 1, 6, 20.0)
+        self.assertEqual(modulo_ingresso.obtem_todos_ingressos()[-1]["id"], 4)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    MODULOS = (modulo_filme, modulo_sessao, modulo_cliente, modulo_ingresso)
+
+    def setUp(self):
+        """Cada teste grava os arquivos de dados e o snapshot em uma pasta temporária."""
+        self.pasta = tempfile.TemporaryDirectory()
+        for modulo in self.MODULOS:
+            # _esquece_dados desliga _carregado; os outros testes recebem de volta o estado de antes
+            for atributo in ("nome_arquivo", "_carregado"):
+                original = patch.object(modulo, atributo, getattr(modulo, atributo))
+                original.start()
+                self.addCleanup(original.stop)
+        journal = patch.object(modulo_sessao, "nome_arquivo_journal", modulo_sessao.nome_arquivo_journal)
+        journal.start()
+        self.addCleanup(journal.stop)
+
+        for modulo in self.MODULOS:
+            modulo.carrega(self.pasta.name)
+
+    def tearDown(self):
+        modulo_filme.gravacao.descarta_pendentes()
+        modulo_sessao.gravacao.descarta_pendentes()
+        modulo_cliente._log.descarta_pendentes()
+        modulo_ingresso._log.descarta_pendentes()
+        self._esquece_dados()
+        modulo_monitoramento.zera_contadores()
+        self.pasta.cleanup()
+
+    def _esquece_dados(self):
+        """Simula o reinício do processo: nada em memória."""
+        modulo_filme.filmesEmCartaz.clear()
+        modulo_filme.indiceFilmes.clear()
+        modulo_sessao.listaSessoes.clear()
+        modulo_sessao.indiceSessoes.clear()
+        modulo_sessao._reconstroi_indices()
+        modulo_cliente.listaClientes.clear()
+        modulo_cliente.indiceClientes.clear()
+        modulo_cliente.indiceCpf.clear()
+        modulo_ingresso.listaIngressos.clear()
+        modulo_monitoramento.zera_contadores()
+        for modulo in self.MODULOS:
+            modulo._carregado = False
+
+    def _popula(self):
+        modulo_filme.cria_filme("Matrix", "Um hacker descobre a verdade.", "Ficção", 136.0, 14, "1999-05-21")
+        modulo_sessao.cria_sessao(1, 1, "20:00", 10, "dublado")
+        modulo_sessao.cria_sessao(1, 2, "21:00", 500, "legendado")
+        modulo_cliente.cadastra_cliente("Ana", "111.111.111-11")
+        modulo_ingresso.cria_ingressos_lote(1, 1, [3, 4], 20.0)
+        modulo_ingresso.cria_ingresso(1, 2, 500, 32.5)
+        modulo_sessao.define_layout_sala(2, 25)
+
+    def test_01_snapshot_restaurado_sem_ler_arquivos(self):
+        print("\nTeste 01 (snapshot): Estado completo restaurado do snapshot binário")
+        self._popula()
+        modulo_cliente.cadastra_cliente("Bruno", "222.222.222-22")
+        modulo_cliente.remove_cliente(2)
+        modulo_sessao.cria_sessao(1, 3, "20:00", 10, "dublado")
+        modulo_sessao.apaga_sessao(3)
+        totais = Snapshot.grava()
+        self.assertEqual((totais["filmes"], totais["sessoes"], totais["clientes"], totais["ingressos"]),
+                         (1, 2, 1, 3))
+
+        self._esquece_dados()
+        with patch.object(modulo_filme, "ler_dados_xml", side_effect=AssertionError), \
+             patch.object(modulo_sessao, "ler_dados_xml", side_effect=AssertionError), \
+             patch.object(modulo_cliente, "_le_log", side_effect=AssertionError), \
+             patch.object(modulo_ingresso, "_le_log", side_effect=AssertionError):
+            self.assertTrue(Snapshot.restaura(self.pasta.name))
+
+            self.assertEqual(modulo_filme.busca_filme(1)["titulo"], "Matrix")
+            self.assertEqual(list(modulo_sessao.busca_sessao(1)["assentos_ocupados"]), [3, 4])
+            self.assertEqual(list(modulo_sessao.busca_sessao(2)["assentos_ocupados"]), [500])
+            self.assertEqual(modulo_sessao.melhores_assentos(2, 2), [237, 238])
+            self.assertEqual(modulo_cliente.busca_cliente_por_cpf("11111111111")["nome"], "Ana")
+            self.assertEqual([i["numero_assento"] for i in modulo_ingresso.lista_ingressos_cliente(1)], [3, 4, 500])
+            self.assertEqual(modulo_monitoramento.receita_e_ingressos(1), {"ingressos_vendidos": 3, "receita": 72.5})
+
+            # Os índices foram reconstruídos: a sala 1 segue ocupada às 20:00
+            self.assertEqual(modulo_sessao.cria_sessao(1, 1, "21:00", 10, "dublado"), padrao_retornos.CONFLITO)
+            modulo_ingresso.cria_ingresso(1, 1, 5, 20.0)
+            self.assertEqual(modulo_ingresso.obtem_todos_ingressos()[-1]["id"], 4)
+
+            # Os ids do cliente e da sessão removidos antes do snapshot seguem reservados
+            modulo_sessao.cria_sessao(1, 4, "20:00", 10, "dublado")
+            self.assertEqual(modulo_sessao.obtem_todas_sessoes()[-1]["id"], 4)
+            modulo_cliente.cadastra_cliente("Carla", "333.333.333-33")
+            self.assertEqual(modulo_cliente.busca_cliente_por_cpf("33333333333")["id"], 3)
+
+    def test_02_snapshot_velho_ignorado(self):
+        print("Teste 02 (snapshot): Alteração depois do snapshot volta a ler os arquivos")
+        self._popula()
+        Snapshot.grava()
+        modulo_cliente.cadastra_cliente("Bruno", "222.222.222-22")
+        modulo_cliente.grava_pendentes()
+
+        self._esquece_dados()
+        self.assertFalse(Snapshot.restaura())
+        self.assertFalse(modulo_cliente._carregado)
+
+        # Os arquivos de dados têm tudo, inclusive o que veio depois do snapshot
+        self.assertEqual(modulo_cliente.busca_cliente(2)["nome"], "Bruno")
+        self.assertEqual(list(modulo_sessao.busca_sessao(1)["assentos_ocupados"]), [3, 4])
+
+    def test_03_snapshot_de_outra_versao_ou_corrompido(self):
+        print("Teste 03 (snapshot): Versão diferente ou arquivo truncado são ignorados")
+        self._popula()
+        Snapshot.grava()
+        caminho = Snapshot.caminho_snapshot()
+        with open(caminho, "rb") as arquivo:
+            original = arquivo.read()
+
+        with patch.object(Snapshot, "VERSAO", Snapshot.VERSAO + 1):
+            self.assertFalse(Snapshot.restaura())
+
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(original[:-10])
+        self.assertFalse(Snapshot.restaura())
+        os.remove(caminho)
+        self.assertFalse(Snapshot.restaura())
+
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(original)
+        self.assertTrue(Snapshot.restaura())
+
+    def test_04_snapshot_com_referencia_a_funcao_recusado(self):
+        print("Teste 04 (snapshot): Pickle que referencia classes ou funções é recusado")
+        self._popula()
+        Snapshot.grava()
+        caminho = Snapshot.caminho_snapshot()
+        with open(caminho, "rb") as arquivo:
+            estado = pickle.loads(arquivo.read()[Snapshot._CABECALHO.size:])
+
+        # Um estado válido, salvo por trazer uma função (que o pickle chamaria ao ler)
+        estado["extra"] = _Chamada()
+        corpo = pickle.dumps(estado)
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(Snapshot._CABECALHO.pack(Snapshot._ASSINATURA, Snapshot.VERSAO, len(corpo)))
+            arquivo.write(corpo)
+
+        _Chamada.chamadas = 0
+        self.assertFalse(Snapshot.restaura())
+        self.assertEqual(_Chamada.chamadas, 0)
+
+
+class _Chamada:
+    """Objeto cujo unpickle chama uma função: o que um snapshot adulterado faria."""
+
+    chamadas = 0
+
+    @staticmethod
+    def registra():
+        _Chamada.chamadas += 1
+
+    def __reduce__(self):
+        return (_Chamada.registra, ())
+
+
+class TestLogAnexavel(unittest.TestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+        self.caminho = os.path.join(self.pasta.name, "registros.log")
+        self.log = LogAnexavel(tamanho_lote=64, intervalo_lote=0.05)
+        self.addCleanup(self.log.descarta_pendentes)
+
+    def _espera_gravacao(self, esperado: bytes, limite: float = 2.0) -> bytes:
+        fim = time.monotonic() + limite
+        while le_arquivo(self.caminho) != esperado and time.monotonic() < fim:
+            time.sleep(0.01)
+        return le_arquivo(self.caminho)
+
+    def test_01_lote_parado_gravado_no_intervalo(self):
+        print("Teste 01 (log): Um registro sozinho chega ao disco sem esperar o próximo")
+        self.log.anexa(self.caminho, b"um\n")
+        self.assertEqual(self._espera_gravacao(b"um\n"), b"um\n")
+
+        # O lote seguinte agenda a sua própria gravação
+        self.log.anexa(self.caminho, b"dois\n")
+        self.log.anexa(self.caminho, b"tres\n")
+        self.assertEqual(self._espera_gravacao(b"um\ndois\ntres\n"), b"um\ndois\ntres\n")
+
+    def test_02_descartados_nao_sao_gravados(self):
+        print("Teste 02 (log): Lote descartado não é gravado pela thread de fundo")
+        self.log.anexa(self.caminho, b"um\n")
+        self.log.descarta_pendentes()
+        time.sleep(0.15)
+        self.assertFalse(os.path.exists(self.caminho))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Gravação adiada (group commit) dos arquivos XML de filmes e sessões.
+
+Cada alteração só marca os dados como alterados; a primeira marcação
+agenda uma gravação para daqui a `intervalo` segundos, em uma thread de
+fundo, e as alterações que chegarem até lá saem na mesma gravação. Assim,
+um pico de cadastros regrava o arquivo uma vez por intervalo, e não uma
+vez por operação. flush() grava na hora o que estiver pendente (usado ao
+encerrar); os pendentes também são gravados ao encerrar o processo.
+
+Os arquivos são escritos com arquivo_atomico(): um temporário renomeado
+por cima do original, para que uma queda no meio nunca deixe o XML pela
+metade.
+"""
+
+import atexit
+import contextlib
+import os
+import threading
+
+_gravacoesAbertas = []
+
+
+@contextlib.contextmanager
+def arquivo_atomico(caminho: str, modo: str = 'w'):
+    """
+    Abre um temporário ao lado de `caminho` e, se o bloco terminar sem
+    erro, o renomeia por cima do original (os.replace é atômico).
+    """
+    temporario = caminho + '.tmp'
+    try:
+        with open(temporario, modo) as arquivo:
+            yield arquivo
+        os.replace(temporario, caminho)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporario)
+        raise
+
+
+class GravacaoAdiada:
+    """Junta as alterações de um intervalo em uma única chamada a `grava`."""
+
+    def __init__(self, grava, intervalo: float = 1.0):
+        self.grava = grava
+        # Com intervalo <= 0 cada alteração é gravada na hora, como antes
+        self.intervalo = intervalo
+        self.gravacoes = 0
+        self._alterado = False
+        self._agendamento = None
+        self._trava = threading.Lock()
+        self._travaGravacao = threading.Lock()
+        _gravacoesAbertas.append(self)
+
+    def marca_alterado(self) -> None:
+        """Registra uma alteração e agenda a gravação, se ainda não houver uma."""
+        with self._trava:
+            self._alterado = True
+            if self.intervalo > 0:
+                if self._agendamento is None:
+                    self._agendamento = threading.Timer(self.intervalo, self._dispara)
+                    self._agendamento.daemon = True
+                    self._agendamento.start()
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """Grava imediatamente as alterações pendentes, se houver."""
+        with self._trava:
+            if self._agendamento is not None:
+                self._agendamento.cancel()
+                self._agendamento = None
+        self._grava_pendentes()
+
+    def descarta_pendentes(self) -> None:
+        """Esquece as alterações pendentes sem gravá-las (usado nos testes)."""
+        with self._trava:
+            if self._agendamento is not None:
+                self._agendamento.cancel()
+                self._agendamento = None
+            self._alterado = False
+
+    def _dispara(self) -> None:
+        with self._trava:
+            self._agendamento = None
+        self._grava_pendentes()
+
+    def _grava_pendentes(self) -> None:
+        with self._travaGravacao:
+            with self._trava:
+                if not self._alterado:
+                    return
+                # Alterações feitas durante a gravação agendam a próxima
+                self._alterado = False
+            try:
+                self.grava()
+            except BaseException:
+                # Continua pendente para a próxima tentativa
+                with self._trava:
+                    self._alterado = True
+                raise
+            self.gravacoes += 1
+
+
+@atexit.register
+def _grava_todas() -> None:
+    for gravacao in _gravacoesAbertas:
+        gravacao.flush()
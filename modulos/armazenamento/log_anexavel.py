@@ -0,0 +1,111 @@
+"""
+Log de registros só-anexados, gravado em lotes.
+
+Usado por cliente e ingresso: cada alteração vira um registro curto no fim
+do arquivo, e os registros são acumulados em memória e gravados com uma
+única escrita quando o lote enche ou fica velho demais. O primeiro registro
+de um lote agenda, em uma thread de fundo, a gravação do lote para daqui a
+intervalo_lote segundos, então um lote que não enche chega ao disco mesmo
+sem novos registros. Os pendentes também são gravados ao encerrar o processo.
+"""
+
+import atexit
+import os
+import threading
+import time
+
+_logsAbertos = []
+
+
+class LogAnexavel:
+    """Buffer de registros (bytes) anexados a um arquivo em lotes."""
+
+    def __init__(self, tamanho_lote: int = 64, intervalo_lote: float = 1.0):
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_lote = intervalo_lote
+        self._caminho = None
+        self._pendentes = []
+        self._inicioPendentes = 0.0
+        self._agendamento = None
+        self._trava = threading.Lock()
+        _logsAbertos.append(self)
+
+    def anexa(self, caminho: str, registros: bytes) -> None:
+        """
+        Acrescenta registros ao lote de `caminho`. O lote é gravado quando
+        atinge tamanho_lote registros ou tem mais de intervalo_lote segundos.
+        Passar tamanho_lote = 1 grava cada registro imediatamente.
+        """
+        with self._trava:
+            if self._caminho != caminho:
+                self._grava()
+                self._caminho = caminho
+            if not self._pendentes:
+                self._inicioPendentes = time.monotonic()
+            self._pendentes.append(registros)
+
+            if (len(self._pendentes) >= self.tamanho_lote or
+                    time.monotonic() - self._inicioPendentes >= self.intervalo_lote):
+                self._grava()
+            elif self._agendamento is None:
+                self._agendamento = threading.Timer(self.intervalo_lote, self._dispara)
+                self._agendamento.daemon = True
+                self._agendamento.start()
+
+    def grava_pendentes(self) -> None:
+        """Grava imediatamente o lote em aberto, se houver."""
+        with self._trava:
+            self._grava()
+
+    def descarta_pendentes(self) -> None:
+        """Esquece o lote em aberto sem gravá-lo (usado ao recarregar/reescrever)."""
+        with self._trava:
+            self._cancela_agendamento()
+            self._pendentes.clear()
+
+    def reescreve(self, caminho: str, conteudo: bytes) -> None:
+        """
+        Substitui o arquivo inteiro por `conteudo` (compactação), gravando
+        em um arquivo temporário e renomeando, para nunca deixar o log pela metade.
+        """
+        with self._trava:
+            self._cancela_agendamento()
+            self._pendentes.clear()
+            temporario = caminho + '.tmp'
+            with open(temporario, 'wb') as arquivo:
+                arquivo.write(conteudo)
+            os.replace(temporario, caminho)
+
+    def _dispara(self) -> None:
+        with self._trava:
+            # Um agendamento já substituído (o lote dele foi gravado antes) não faz nada
+            if self._agendamento is threading.current_thread():
+                self._agendamento = None
+                self._grava()
+
+    def _cancela_agendamento(self) -> None:
+        if self._agendamento is not None:
+            self._agendamento.cancel()
+            self._agendamento = None
+
+    def _grava(self) -> None:
+        self._cancela_agendamento()
+        if self._pendentes:
+            with open(self._caminho, 'ab') as arquivo:
+                arquivo.write(b''.join(self._pendentes))
+            self._pendentes.clear()
+
+
+def le_arquivo(caminho: str) -> bytes:
+    """Lê o log inteiro de uma vez (vazio se o arquivo não existir)."""
+    try:
+        with open(caminho, 'rb') as arquivo:
+            return arquivo.read()
+    except FileNotFoundError:
+        return b''
+
+
+@atexit.register
+def _grava_todos() -> None:
+    for log in _logsAbertos:
+        log.grava_pendentes()
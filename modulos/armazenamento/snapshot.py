@@ -0,0 +1,287 @@
+"""
+Snapshot binário do estado em memória, para reiniciar sem reler os XML.
+
+grava() junta filmes, sessões (com o bitmap de assentos), clientes e as
+colunas do livro de ingressos em um único arquivo (bilheteria.snapshot, na
+pasta dos dados): um cabeçalho com assinatura e versão do formato, seguido
+do estado serializado com pickle em tuplas, bytes e dicionários simples.
+restaura() lê o arquivo de uma vez e repõe os dados nos módulos, sem
+converter campo por campo. A leitura recusa qualquer referência a classe ou
+função (_UnpicklerRestrito): o estado só tem tipos básicos, e um arquivo
+adulterado na pasta dos dados não pode fazer o pickle executar código.
+
+O snapshot guarda o tamanho e a data de modificação de cada arquivo de
+dados (filmes.xml, sessoes.xml, sessoes.journal, clientes.log,
+ingressos.log) no momento da gravação. Se algum deles mudou depois disso,
+ou se o arquivo não existe, é de outra versão ou está corrompido,
+restaura() retorna False e os módulos continuam carregando dos arquivos
+de dados, como antes. Só vale para o armazenamento em arquivos; com
+SQLite os dados já vêm do banco.
+
+Uso:
+  python -m modulos.armazenamento.snapshot --dados PASTA
+"""
+
+import modulos.armazenamento.armazenamento as Armazenamento
+from modulos.armazenamento.gravacao_adiada import arquivo_atomico
+from modulos.registros import RegistroCliente, RegistroFilme, RegistroSessao
+from modulos.sessao.mapa_assentos import MapaAssentos
+from modulos.instrumentacao import instrumentado
+import argparse
+import contextlib
+import gc
+import io
+import os
+import pickle
+import struct
+
+__all__ = [
+    "grava",
+    "restaura"
+]
+
+NOME_ARQUIVO = 'bilheteria.snapshot'
+VERSAO = 4
+_ASSINATURA = b'BILHSNAP'
+# assinatura, versão do formato, tamanho do corpo
+_CABECALHO = struct.Struct('<8sHQ')
+
+
+def _modulos():
+    # Importados aqui: os módulos de dados importam o armazenamento
+    import modulos.cliente.cliente as Cliente
+    import modulos.filme.filme as Filme
+    import modulos.ingresso.ingresso as Ingresso
+    import modulos.sessao.sessao as Sessao
+    return Filme, Sessao, Cliente, Ingresso
+
+
+def _arquivos_de_dados() -> list[str]:
+    Filme, Sessao, Cliente, Ingresso = _modulos()
+    return [Filme.nome_arquivo, Sessao.nome_arquivo, Sessao.nome_arquivo_journal,
+            Cliente.nome_arquivo, Ingresso.nome_arquivo]
+
+
+def _assinatura_fontes() -> dict[str, tuple[int, int] | None]:
+    """Tamanho e data de modificação de cada arquivo de dados (None se não existe)."""
+    fontes = {}
+    for caminho in _arquivos_de_dados():
+        try:
+            estado = os.stat(caminho)
+            fontes[os.path.basename(caminho)] = (estado.st_size, estado.st_mtime_ns)
+        except FileNotFoundError:
+            fontes[os.path.basename(caminho)] = None
+    return fontes
+
+
+def _grava_pendentes() -> None:
+    Filme, Sessao, Cliente, Ingresso = _modulos()
+    Filme.flush()
+    Sessao.flush()
+    Cliente.grava_pendentes()
+    Ingresso.grava_pendentes()
+
+
+def _usa_diretorio(diretorio: str) -> None:
+    """
+    Aponta os módulos para os arquivos de dados de `diretorio`, sem lê-los:
+    eles são lidos no próximo acesso, se o snapshot não servir.
+    """
+    _grava_pendentes()
+    Sessao = _modulos()[1]
+    with Sessao._travaCarga:
+        Sessao.nome_arquivo_journal = os.path.join(diretorio, os.path.basename(Sessao.nome_arquivo_journal))
+    for modulo in _modulos():
+        with modulo._travaCarga:
+            modulo.nome_arquivo = os.path.join(diretorio, os.path.basename(modulo.nome_arquivo))
+    _descarta_carga()
+
+
+def _descarta_carga() -> None:
+    """Faz os módulos lerem os arquivos de dados no próximo acesso."""
+    for modulo in _modulos():
+        with modulo._travaCarga:
+            modulo._carregado = False
+
+
+def caminho_snapshot() -> str:
+    """O snapshot fica na mesma pasta do filmes.xml em uso."""
+    Filme = _modulos()[0]
+    return os.path.join(os.path.dirname(Filme.nome_arquivo), NOME_ARQUIVO)
+
+
+@instrumentado
+def grava(diretorio: str | None = None) -> dict | None:
+    """
+    Grava o snapshot do estado atual (usado ao encerrar ou sob demanda).
+    As gravações pendentes de todos os módulos vão antes para o disco, de
+    modo que o snapshot corresponda aos arquivos de dados. Deve ser chamada
+    sem vendas em andamento; uma alteração no meio invalida o snapshot.
+    Com `diretorio`, passa a usar os arquivos de dados dessa pasta.
+
+    Retorna {"filmes", "sessoes", "clientes", "ingressos", "bytes"}, ou
+    None se o armazenamento em uso não for o de arquivos.
+    """
+    if Armazenamento.backend is not None:
+        return None
+
+    Filme, Sessao, Cliente, Ingresso = _modulos()
+    if diretorio is not None:
+        Filme.carrega(diretorio)
+        Sessao.carrega(diretorio)
+        Cliente.carrega(diretorio)
+        Ingresso.carrega(diretorio)
+
+    for modulo in (Filme, Sessao, Cliente, Ingresso):
+        modulo._garante_carregado()
+    _grava_pendentes()
+
+    # As fontes são lidas antes dos dados: uma alteração feita entre as duas
+    # leituras muda algum arquivo depois, e o snapshot passa a ser ignorado
+    estado = {
+        "fontes": _assinatura_fontes(),
+        "filmes": [tuple(filme.values()) for filme in Filme.filmesEmCartaz[:]],
+        "sessoes": [
+            (s.id, s.filme_id, s.sala, s.horario, s.capacidade, s.formato_exibicao,
+             s.assentos_ocupados.para_bytes())
+            for s in Sessao.listaSessoes[:]
+        ],
+        "layouts_salas": dict(Sessao.layoutSalas),
+        "ultimo_id_sessao": Sessao.ultimo_id_sessao(),
+        "clientes": [(c.id, c.nome, c.cpf) for c in Cliente.listaClientes[:]],
+        "chaves_cpf": Cliente.chaves_cpf(),
+        "ultimo_id_cliente": Cliente.ultimo_id_cliente(),
+        "ingressos": Ingresso.listaIngressos.exporta(),
+    }
+    corpo = pickle.dumps(estado, protocol=pickle.HIGHEST_PROTOCOL)
+
+    with arquivo_atomico(caminho_snapshot(), 'wb') as arquivo:
+        arquivo.write(_CABECALHO.pack(_ASSINATURA, VERSAO, len(corpo)))
+        arquivo.write(corpo)
+
+    return {
+        "filmes": len(estado["filmes"]),
+        "sessoes": len(estado["sessoes"]),
+        "clientes": len(estado["clientes"]),
+        "ingressos": len(Ingresso.listaIngressos),
+        "bytes": _CABECALHO.size + len(corpo),
+    }
+
+
+class _UnpicklerRestrito(pickle.Unpickler):
+    """Só monta tipos básicos: nenhuma classe ou função é importada do arquivo."""
+
+    def find_class(self, modulo, nome):
+        raise pickle.UnpicklingError(f"referência a {modulo}.{nome} não permitida no snapshot")
+
+
+def _le_estado() -> dict | None:
+    """Lê e valida o snapshot; None se ausente, de outra versão, corrompido ou velho."""
+    try:
+        with open(caminho_snapshot(), 'rb') as arquivo:
+            dados = arquivo.read()
+    except OSError:
+        return None
+
+    if len(dados) < _CABECALHO.size:
+        return None
+    assinatura, versao, tamanho = _CABECALHO.unpack_from(dados)
+    if assinatura != _ASSINATURA or versao != VERSAO or len(dados) - _CABECALHO.size != tamanho:
+        return None
+
+    # BytesIO compartilha os bytes lidos, sem copiá-los
+    corpo = io.BytesIO(dados)
+    corpo.seek(_CABECALHO.size)
+    try:
+        estado = _UnpicklerRestrito(corpo).load()
+    except (pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+        return None
+
+    if not isinstance(estado, dict) or estado.get("fontes") != _assinatura_fontes():
+        return None
+    return estado
+
+
+@contextlib.contextmanager
+def _sem_coleta_de_lixo():
+    """
+    Pausa o coletor de ciclos: montar milhões de registros de uma vez o
+    dispara centenas de vezes, cada uma percorrendo tudo o que já foi criado.
+    """
+    ativo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if ativo:
+            gc.enable()
+
+
+@instrumentado
+def restaura(diretorio: str | None = None) -> bool:
+    """
+    Carrega filmes, sessões, clientes e ingressos do snapshot, se ele
+    existir e ainda corresponder aos arquivos de dados. Com `diretorio`,
+    passa a usar o snapshot e os arquivos de dados dessa pasta.
+
+    Retorna True se os dados vieram do snapshot; com False, os dados são
+    lidos dos arquivos no primeiro acesso, como de costume.
+    """
+    if Armazenamento.backend is not None:
+        return False
+
+    if diretorio is not None:
+        _usa_diretorio(diretorio)
+
+    with _sem_coleta_de_lixo():
+        estado = _le_estado()
+        return estado is not None and _repoe_estado(estado)
+
+
+def _repoe_estado(estado: dict) -> bool:
+    Filme, Sessao, Cliente, Ingresso = _modulos()
+
+    try:
+        filmes = [RegistroFilme(*campos) for campos in estado["filmes"]]
+        sessoes = [
+            RegistroSessao(id, filme_id, sala, horario, capacidade, formato,
+                           MapaAssentos.de_bytes(capacidade, assentos))
+            for id, filme_id, sala, horario, capacidade, formato, assentos in estado["sessoes"]
+        ]
+        layouts_salas = dict(estado["layouts_salas"])
+        ultimo_id_sessao = int(estado["ultimo_id_sessao"])
+        clientes = [RegistroCliente(*campos) for campos in estado["clientes"]]
+        chaves_cpf = estado["chaves_cpf"]
+        ultimo_id_cliente = int(estado["ultimo_id_cliente"])
+        ingressos = estado["ingressos"]
+    except (KeyError, TypeError, ValueError):
+        return False
+    if len(chaves_cpf) != len(clientes):
+        return False
+
+    Filme.restaura(filmes)
+    Sessao.restaura(sessoes, layouts_salas, ultimo_id_sessao)
+    Cliente.restaura(clientes, chaves_cpf, ultimo_id_cliente)
+    try:
+        # Por último: os contadores de receita consultam as sessões
+        Ingresso.restaura(ingressos)
+    except (KeyError, TypeError, ValueError):
+        # Nada fica pela metade: tudo volta a ser lido dos arquivos
+        _descarta_carga()
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grava o snapshot binário da bilheteria")
+    parser.add_argument("--dados", default=os.getcwd(), help="Pasta com os arquivos de dados")
+    argumentos = parser.parse_args()
+
+    totais = grava(argumentos.dados)
+    print(f"[Info] Snapshot com {totais['filmes']} filmes, {totais['sessoes']} sessões, "
+          f"{totais['clientes']} clientes e {totais['ingressos']} ingressos "
+          f"({totais['bytes']} bytes) gravado em {caminho_snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,253 @@
 import padrao_retornos
+import modulos.armazenamento.armazenamento as Armazenamento
+from modulos.armazenamento.log_anexavel import LogAnexavel, le_arquivo
+from modulos.registros import RegistroCliente
+import modulos.paginacao as Paginacao
+from modulos.instrumentacao import instrumentado
+import json
+import os
+import threading
 
 listaClientes = []
 
+# Serializa cadastro e remoção (verificação de CPF + alocação de id)
+_travaCadastro = threading.Lock()
 
+# Índice id -> cliente, mantido em sincronia com listaClientes
+indiceClientes = {}
+
+# Índice CPF normalizado (só dígitos) -> cliente
+indiceCpf = {}
+
+# Maior id já usado, inclusive por clientes removidos: um cadastro novo
+# nunca recebe o id de outro (nem o do mais novo, depois de removido)
+_ultimoIdCliente = 0
+
+# Persistência: log só-anexado, uma linha JSON por alteração
+#   ["+", id, nome, cpf]   cadastro
+#   ["-", id]              remoção
+# gravado em lotes (ver modulos/armazenamento/log_anexavel.py).
+nome_arquivo = 'clientes.log'
+_log = LogAnexavel()
+
+_carregado = False
+_travaCarga = threading.Lock()
+
+
+def carrega(diretorio: str | None = None) -> None:
+    """
+    Carrega (ou recarrega) os clientes do armazenamento em uso.
+    Se `diretorio` for informado, passa a usar o clientes.log dessa pasta.
+    """
+    global nome_arquivo
+
+    with _travaCarga:
+        _log.grava_pendentes()
+        if diretorio is not None:
+            nome_arquivo = os.path.join(diretorio, 'clientes.log')
+
+        if Armazenamento.backend is not None:
+            clientes = [RegistroCliente(**linha) for linha in Armazenamento.backend.carrega_clientes()]
+            ultimo_id = Armazenamento.backend.ultimo_id_cliente()
+        else:
+            clientes, ultimo_id = _le_log()
+        _repoe(clientes, ultimo_id=ultimo_id)
+
+
+def restaura(clientes: list[RegistroCliente], chaves_cpf: list[str], ultimo_id: int = 0) -> None:
+    """
+    Substitui os clientes em memória pelos já lidos (usado pelo snapshot).
+    `chaves_cpf` traz o CPF normalizado de cada cliente, na mesma ordem;
+    `ultimo_id` é o maior id já usado (ver ultimo_id_cliente()).
+    """
+    with _travaCarga:
+        _repoe(clientes, chaves_cpf, ultimo_id)
+
+
+def ultimo_id_cliente() -> int:
+    """Maior id já usado, inclusive por clientes removidos."""
+    return _ultimoIdCliente
+
+
+def chaves_cpf() -> list[str]:
+    """CPF normalizado de cada cliente, na ordem de listaClientes."""
+    chavePorId = {cliente.id: chave for chave, cliente in indiceCpf.items()}
+    return [chavePorId[cliente.id] for cliente in listaClientes]
+
+
+def _repoe(clientes: list[RegistroCliente], chaves_cpf: list[str] | None = None, ultimo_id: int = 0) -> None:
+    global _carregado, _ultimoIdCliente
+
+    if chaves_cpf is None:
+        chaves_cpf = [normaliza_cpf(cliente.cpf) for cliente in clientes]
+
+    listaClientes[:] = clientes
+    indiceClientes.clear()
+    indiceCpf.clear()
+    for cliente, chave in zip(clientes, chaves_cpf):
+        indiceClientes[cliente.id] = cliente
+        indiceCpf[chave] = cliente
+    _ultimoIdCliente = max(ultimo_id, clientes[-1].id if clientes else 0)
+    _carregado = True
+
+
+def _le_log() -> tuple[list[RegistroCliente], int]:
+    """
+    Reconstrói os clientes em uma passada pelo log, junto com o maior id
+    que aparece nele (também nas remoções). Uma última linha incompleta
+    (queda no meio de uma escrita) é ignorada.
+    """
+    clientes = {}
+    ultimo_id = 0
+    for linha in le_arquivo(nome_arquivo).splitlines():
+        try:
+            registro = json.loads(linha)
+        except ValueError:
+            break
+        if registro[0] == "+":
+            clientes[registro[1]] = RegistroCliente(registro[1], registro[2], registro[3])
+        else:
+            clientes.pop(registro[1], None)
+        ultimo_id = max(ultimo_id, registro[1])
+    return list(clientes.values()), ultimo_id
+
+
+def aplica_registro(registro: list) -> None:
+    """
+    Aplica em memória, sem gravar, um registro no formato do log
+    (["+", id, nome, cpf] ou ["-", id]). Usado pelos processos de venda do
+    modo particionado para acompanhar os cadastros feitos no roteador.
+    """
+    global _ultimoIdCliente
+
+    _garante_carregado()
+    with _travaCadastro:
+        _ultimoIdCliente = max(_ultimoIdCliente, registro[1])
+        if registro[0] == "+":
+            cliente = RegistroCliente(registro[1], registro[2], registro[3])
+            listaClientes.append(cliente)
+            indiceClientes[cliente.id] = cliente
+            indiceCpf[normaliza_cpf(cliente.cpf)] = cliente
+        else:
+            cliente = indiceClientes.pop(registro[1], None)
+            if cliente is not None:
+                listaClientes.remove(cliente)
+                indiceCpf.pop(normaliza_cpf(cliente.cpf), None)
+
+
+def _registra_log(*registro) -> None:
+    _log.anexa(nome_arquivo, (json.dumps(registro, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+@instrumentado
+def grava_pendentes() -> None:
+    """Grava no disco os cadastros e remoções ainda no lote em memória."""
+    _log.grava_pendentes()
+
+
+@instrumentado
+def compacta() -> None:
+    """
+    Reescreve o log só com os clientes atuais, descartando as remoções.
+    Se o maior id já usado foi removido, a remoção dele fica no log, para
+    que o id não volte a ser usado depois de recarregar.
+    """
+    with _travaCadastro:
+        linhas = [["+", cliente["id"], cliente["nome"], cliente["cpf"]] for cliente in listaClientes]
+        if _ultimoIdCliente > (listaClientes[-1]["id"] if listaClientes else 0):
+            linhas.append(["-", _ultimoIdCliente])
+        conteudo = "".join(json.dumps(linha, ensure_ascii=False) + "\n" for linha in linhas)
+        _log.reescreve(nome_arquivo, conteudo.encode("utf-8"))
+
+
+def normaliza_cpf(cpf: str) -> str:
+    """
+    Chave de comparação do CPF: só os dígitos, então "123.456.789-09" e
+    "12345678909" são o mesmo CPF. Sem dígitos, usa o texto como veio.
+    """
+    digitos = "".join(caractere for caractere in cpf if caractere.isdigit())
+    return digitos or cpf.strip()
+
+
+def _garante_carregado() -> None:
+    """Carrega os dados no primeiro acesso, em vez de na importação do módulo."""
+    if not _carregado:
+        carrega()
+
+
+@instrumentado
 def cadastra_cliente(nome: str, cpf: str) -> int:
     """
     cadastra um novo cliente no sistema
     retorno:
       0  - cliente criado com sucesso
-      2  - cpf já existe
+      2  - cpf já existe (comparado só pelos dígitos)
      -1  - parâmetros inválidos
     """
+    global _ultimoIdCliente
 
     if (not isinstance(nome, str) or nome.strip() == "" or
         not isinstance(cpf, str) or cpf.strip() == ""):
         return padrao_retornos.PARAMETRO_INVALIDO
 
-    # verificar cpf
-    for cliente in listaClientes:
-        if cliente["cpf"] == cpf:
+    _garante_carregado()
+    with _travaCadastro:
+        # verificar cpf
+        chave_cpf = normaliza_cpf(cpf)
+        if chave_cpf in indiceCpf:
             return padrao_retornos.JA_EXISTE
 
-    novo_cliente = {
-        "id": len(listaClientes) + 1,
-        "nome": nome.strip(),
-        "cpf": cpf.strip(),
-        "historico": []   # histórico de ingressos
-    }
+        # Depois do maior id já usado: o do último da lista voltaria a ser
+        # usado se o cliente mais novo tivesse sido removido
+        _ultimoIdCliente += 1
+        novo_cliente = RegistroCliente(
+            id=_ultimoIdCliente,
+            nome=nome.strip(),
+            cpf=cpf.strip(),
+            historico=[]   # histórico de ingressos
+        )
+
+        listaClientes.append(novo_cliente)
+        indiceClientes[novo_cliente["id"]] = novo_cliente
+        indiceCpf[chave_cpf] = novo_cliente
 
-    listaClientes.append(novo_cliente)
+        if Armazenamento.backend is not None:
+            Armazenamento.backend.salva_cliente(novo_cliente)
+        else:
+            _registra_log("+", novo_cliente["id"], novo_cliente["nome"], novo_cliente["cpf"])
     return padrao_retornos.SUCESSO
 
 
-def busca_cliente(id: int) -> dict | None:
+@instrumentado
+def busca_cliente(id: int) -> RegistroCliente | None:
     """
     busca um cliente específico pelo ID
     retorno:
-      dict(cliente) - se encontrado
+      RegistroCliente - se encontrado (acessível como dict)
       None          - se inválido ou não encontrado
     """
 
     if not isinstance(id, int) or id <= 0:
         return None
 
-    for cliente in listaClientes:
-        if cliente["id"] == id:
-            return cliente
+    _garante_carregado()
+    return indiceClientes.get(id)
+
+
+@instrumentado
+def busca_cliente_por_cpf(cpf: str) -> RegistroCliente | None:
+    """
+    busca um cliente pelo CPF, com ou sem pontuação
+    retorno:
+      RegistroCliente - se encontrado (acessível como dict)
+      None          - se inválido ou não encontrado
+    """
+
+    if not isinstance(cpf, str) or cpf.strip() == "":
+        return None
 
-    return None
+    _garante_carregado()
+    return indiceCpf.get(normaliza_cpf(cpf))
 
 
 def lista_clientes() -> list[dict]:
@@ -56,9 +256,53 @@ def lista_clientes() -> list[dict]:
     retorno:
       list[dict] - lista completa (possivelmente vazia)
     """
+    _garante_carregado()
     return listaClients.copy() if (listaClients := listaClientes) else []
 
 
+def visao_clientes():
+    """
+    todos os clientes, sem copiar a lista (somente leitura; acompanha
+    os cadastros e remoções feitos depois)
+    retorno:
+      VisaoLista - len(), índice, fatia e iteração sobre os clientes
+    """
+    _garante_carregado()
+    return Paginacao.VisaoLista(listaClientes)
+
+
+def itera_clientes(inicio: int = 0, limite: int | None = None):
+    """
+    percorre os clientes a partir da posição `inicio`, no máximo `limite`
+    deles, sem copiar a lista inteira
+    retorno:
+      gerador de clientes
+     -1  - parâmetro inválido
+    """
+    if not Paginacao.parametros_validos(inicio=inicio, limite=limite):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+    return Paginacao.itera(listaClientes, inicio, limite)
+
+
+@instrumentado
+def pagina_clientes(tamanho: int, cursor: int | None = None) -> dict | int:
+    """
+    uma página de clientes, em ordem de id, depois do cliente `cursor`
+    (None para a primeira página)
+    retorno:
+      dict - {"registros": [...], "proximo_cursor": id para a próxima página ou None no fim}
+     -1  - parâmetro inválido
+    """
+    if not Paginacao.parametros_validos(tamanho=tamanho, cursor=cursor):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+    return Paginacao.pagina(listaClientes, tamanho, cursor)
+
+
+@instrumentado
 def remove_cliente(id: int) -> int:
     """
     remove um cliente do sistema
@@ -71,9 +315,17 @@ def remove_cliente(id: int) -> int:
     if not isinstance(id, int) or id <= 0:
         return padrao_retornos.PARAMETRO_INVALIDO
 
-    for cliente in listaClientes:
-        if cliente["id"] == id:
-            listaClientes.remove(cliente)
-            return padrao_retornos.SUCESSO
+    _garante_carregado()
+    with _travaCadastro:
+        cliente = indiceClientes.pop(id, None)
+        if cliente is None:
+            return padrao_retornos.NAO_ENCONTRADO
 
-    return padrao_retornos.NAO_ENCONTRADO
+        listaClientes.remove(cliente)
+        indiceCpf.pop(normaliza_cpf(cliente["cpf"]), None)
+
+        if Armazenamento.backend is not None:
+            Armazenamento.backend.remove_cliente(id)
+        else:
+            _registra_log("-", id)
+    return padrao_retornos.SUCESSO
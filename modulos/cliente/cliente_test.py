@@ -1,6 +1,8 @@
 import unittest
 import sys
 import os
+import tempfile
+from unittest.mock import patch
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(os.path.dirname(TEST_DIR))
@@ -12,6 +14,7 @@ import modulos.cliente.cliente as cliente_mod
 from modulos.cliente.cliente import (
     cadastra_cliente,
     busca_cliente,
+    busca_cliente_por_cpf,
     lista_clientes,
     remove_cliente
 )
@@ -33,13 +36,31 @@ class TestCliente(unittest.TestCase):
         Limpa a listaClientes para garantir independência.
         """
         self.old_lista = cliente_mod.listaClientes
+        self.old_indice = cliente_mod.indiceClientes
+        self.old_indice_cpf = cliente_mod.indiceCpf
+        self.old_arquivo = cliente_mod.nome_arquivo
         cliente_mod.listaClientes = []
+        cliente_mod.indiceClientes = {}
+        cliente_mod.indiceCpf = {}
+        for atributo, valor in (("_carregado", True), ("_ultimoIdCliente", 0)):
+            original = patch.object(cliente_mod, atributo, valor)
+            original.start()
+            self.addCleanup(original.stop)
+
+        # O log de clientes vai para uma pasta temporária
+        self.pasta = tempfile.TemporaryDirectory()
+        cliente_mod.nome_arquivo = os.path.join(self.pasta.name, "clientes.log")
 
     def tearDown(self):
         """
         Restaura lista original.
         """
+        cliente_mod._log.descarta_pendentes()
         cliente_mod.listaClientes = self.old_lista
+        cliente_mod.indiceClientes = self.old_indice
+        cliente_mod.indiceCpf = self.old_indice_cpf
+        cliente_mod.nome_arquivo = self.old_arquivo
+        self.pasta.cleanup()
 
     # ----------------------------------------------------------
     # TESTES cadastra_cliente
@@ -128,6 +149,154 @@ class TestCliente(unittest.TestCase):
         ret = remove_cliente(-1)
         self.assertEqual(ret, padrao_retornos.PARAMETRO_INVALIDO)
 
+    def test_12_busca_apos_remocao(self):
+        print("Test 12: Cliente removido não é mais encontrado pelo índice")
+        cadastra_cliente("Fulano", "111")
+        cadastra_cliente("Beltrano", "222")
+        remove_cliente(1)
+
+        self.assertIsNone(busca_cliente(1))
+        self.assertEqual(busca_cliente(2)["nome"], "Beltrano")
+
+    # ----------------------------------------------------------
+    # TESTES de persistência
+    # ----------------------------------------------------------
+
+    def _simula_reinicio(self):
+        cliente_mod.grava_pendentes()
+        cliente_mod.listaClientes = []
+        cliente_mod.indiceClientes = {}
+        cliente_mod.indiceCpf = {}
+        cliente_mod.carrega()
+
+    def test_13_clientes_persistidos(self):
+        print("Teste 13: clientes relidos do log após reinício")
+        cadastra_cliente("Ana", "111")
+        cadastra_cliente("Bruno", "222")
+        cadastra_cliente("Carla", "333")
+        remove_cliente(2)
+
+        self._simula_reinicio()
+
+        self.assertEqual([c["nome"] for c in lista_clientes()], ["Ana", "Carla"])
+        self.assertEqual(busca_cliente(3)["cpf"], "333")
+        self.assertIsNone(busca_cliente(2))
+
+    def test_14_id_nao_reaproveitado(self):
+        print("Teste 14: id de cliente removido não é reaproveitado")
+        cadastra_cliente("Ana", "111")
+        cadastra_cliente("Bruno", "222")
+        remove_cliente(1)
+        cadastra_cliente("Carla", "333")
+
+        self.assertEqual(busca_cliente(3)["nome"], "Carla")
+        self.assertEqual(busca_cliente(2)["nome"], "Bruno")
+
+    def test_15_linha_truncada_e_compactacao(self):
+        print("Teste 15: linha incompleta ignorada e log compactado")
+        cadastra_cliente("Ana", "111")
+        cadastra_cliente("Bruno", "222")
+        remove_cliente(1)
+        cliente_mod.grava_pendentes()
+        with open(cliente_mod.nome_arquivo, "ab") as log:
+            log.write(b'["+", 9, "Meia')
+
+        self._simula_reinicio()
+        self.assertEqual([c["nome"] for c in lista_clientes()], ["Bruno"])
+
+        cliente_mod.compacta()
+        with open(cliente_mod.nome_arquivo, encoding="utf-8") as log:
+            self.assertEqual(len(log.readlines()), 1)
+
+        self._simula_reinicio()
+        self.assertEqual(busca_cliente(2)["nome"], "Bruno")
+
+    # ----------------------------------------------------------
+    # TESTES busca_cliente_por_cpf
+    # ----------------------------------------------------------
+
+    def test_16_busca_por_cpf(self):
+        print("Teste 16: busca por CPF com ou sem pontuação")
+        cadastra_cliente("Ana", "123.456.789-09")
+        cadastra_cliente("Bruno", "98765432100")
+
+        self.assertEqual(busca_cliente_por_cpf("12345678909")["nome"], "Ana")
+        self.assertEqual(busca_cliente_por_cpf(" 987.654.321-00 ")["nome"], "Bruno")
+        self.assertIsNone(busca_cliente_por_cpf("111.111.111-11"))
+        self.assertIsNone(busca_cliente_por_cpf(""))
+        self.assertIsNone(busca_cliente_por_cpf(123))
+
+        # O mesmo CPF com outra pontuação é duplicado
+        self.assertEqual(cadastra_cliente("Outra Ana", "123456789-09"), padrao_retornos.JA_EXISTE)
+
+    def test_17_cpf_liberado_apos_remocao(self):
+        print("Teste 17: índice de CPF acompanha remoção e recarga")
+        cadastra_cliente("Ana", "111")
+        cadastra_cliente("Bruno", "222")
+        remove_cliente(1)
+
+        self.assertIsNone(busca_cliente_por_cpf("111"))
+        self.assertEqual(cadastra_cliente("Ana de Novo", "111"), padrao_retornos.SUCESSO)
+
+        self._simula_reinicio()
+        self.assertEqual(busca_cliente_por_cpf("111")["id"], 3)
+        self.assertEqual(busca_cliente_por_cpf("222")["nome"], "Bruno")
+
+    # ----------------------------------------------------------
+    # TESTES visao/itera/pagina_clientes
+    # ----------------------------------------------------------
+
+    def test_18_listagem_paginada(self):
+        print("Teste 18: listagem por gerador e por páginas, sem copiar a lista")
+        for i in range(1, 8):
+            cadastra_cliente(f"Cliente {i}", str(i))
+
+        visao = cliente_mod.visao_clientes()
+        self.assertEqual(len(visao), 7)
+        self.assertEqual(visao, lista_clientes())
+        self.assertFalse(hasattr(visao, "append"))
+
+        self.assertEqual([c["id"] for c in cliente_mod.itera_clientes(2, 3)], [3, 4, 5])
+        self.assertEqual(len(list(cliente_mod.itera_clientes())), 7)
+
+        primeira = cliente_mod.pagina_clientes(3)
+        self.assertEqual([c["id"] for c in primeira["registros"]], [1, 2, 3])
+        self.assertEqual(primeira["proximo_cursor"], 3)
+
+        # O cursor é um id: remover um cliente já exibido não faz a página pular ninguém
+        remove_cliente(2)
+        segunda = cliente_mod.pagina_clientes(3, primeira["proximo_cursor"])
+        self.assertEqual([c["id"] for c in segunda["registros"]], [4, 5, 6])
+        ultima = cliente_mod.pagina_clientes(3, segunda["proximo_cursor"])
+        self.assertEqual([c["id"] for c in ultima["registros"]], [7])
+        self.assertIsNone(ultima["proximo_cursor"])
+        self.assertEqual(len(visao), 6)
+
+        self.assertEqual(cliente_mod.pagina_clientes(0), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(cliente_mod.pagina_clientes(3, "1"), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(cliente_mod.itera_clientes(-1), padrao_retornos.PARAMETRO_INVALIDO)
+
+    def test_19_id_do_mais_novo_nao_reaproveitado(self):
+        print("Teste 19: id do cliente mais novo não volta a ser usado, nem após reinício ou compactação")
+        cadastra_cliente("Ana", "111")
+        cadastra_cliente("Bruno", "222")
+        remove_cliente(2)
+        cadastra_cliente("Carla", "333")
+        self.assertIsNone(busca_cliente(2))
+        self.assertEqual(busca_cliente(3)["nome"], "Carla")
+
+        remove_cliente(3)
+        self._simula_reinicio()
+        cadastra_cliente("Davi", "444")
+        self.assertEqual(busca_cliente_por_cpf("444")["id"], 4)
+
+        remove_cliente(4)
+        cliente_mod.compacta()
+        self._simula_reinicio()
+        self.assertEqual([c["nome"] for c in lista_clientes()], ["Ana"])
+        cadastra_cliente("Eva", "555")
+        self.assertEqual(busca_cliente_por_cpf("555")["id"], 5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,82 +1,115 @@
 from datetime import date
 from typing import Optional
 from xml.etree import ElementTree
-from xml.etree.ElementTree import Element, SubElement, Comment
+from xml.etree.ElementTree import Element, SubElement
 
+import os
 import sys
+import threading
 from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT.parent))
 import padrao_retornos
-
+import modulos.armazenamento.armazenamento as Armazenamento
+from modulos.armazenamento.gravacao_adiada import GravacaoAdiada, arquivo_atomico
+from modulos.registros import RegistroFilme
+from modulos.filme.indice_texto import IndiceTexto, normaliza
+import modulos.paginacao as Paginacao
+from modulos.instrumentacao import instrumentado
+
+@instrumentado
 def cria_filme(titulo: str, sinopse: str, genero: str, duracao: float, classificacao: int, dataLancamento: str) -> int: 
     """
     Cria um novo filme e o adiciona à lista de filmes em cartaz se ainda não existir.
     Retorna 0 se criado com sucesso, 1 se já existir, ou -1 se algum parâmetro for inválido.
     """
 
+    _garante_carregado()
+
     if (isinstance(titulo, str) and isinstance(sinopse, str) and isinstance(genero, str) and isinstance(duracao, float) and isinstance(classificacao, int) and (dataLancamento is None or isinstance(date.fromisoformat(dataLancamento), date))):
-        tituloFormatado = titulo.strip().title()
+        global _ultimoIdFilme
 
-        for filme in filmesEmCartaz:
-            if filme["titulo"] == tituloFormatado:
-                padrao_retornos.imprime_mensagem(padrao_retornos.JA_EXISTE)
-                return padrao_retornos.JA_EXISTE
-    
-        id = len(filmesEmCartaz) + 1
+        tituloFormatado = titulo.strip().title()
         sinopse = sinopse.strip()
         genero = genero.strip().title()
         dataLancamento = date.fromisoformat(dataLancamento.strip()).strftime("%d/%m/%Y") if dataLancamento else ''
 
-        filme = SubElement(filmesElement, 'filme')
-        idFilme = SubElement(filme, 'id')
-        idFilme.text = str(id)
-        tituloFilme = SubElement(filme, 'titulo')
-        tituloFilme.text = tituloFormatado
-        sinopseFilme = SubElement(filme, 'sinopse')
-        sinopseFilme.text = sinopse
-        generoFilme = SubElement(filme, 'genero')
-        generoFilme.text = genero
-        duracaoFilme = SubElement(filme, 'duracao')
-        duracaoFilme.text = str(duracao)
-        classificacaoFilme = SubElement(filme, 'classificacao')
-        classificacaoFilme.text = str(classificacao)
-        dataLancamentoFilme = SubElement(filme, 'dataLancamento')
-        dataLancamentoFilme.text = dataLancamento
-
-        grava_dados_xml()
-
-        filme = {
-            "id": id,
-            "titulo": tituloFormatado,
-            "sinopse": sinopse,
-            "genero": genero,
-            "duracao": duracao,
-            "classificacao": classificacao,
-            "dataLancamento": dataLancamento
-        }
-
-        filmesEmCartaz.append(filme)
+        with _travaCadastro:
+            if _chave_titulo(tituloFormatado) in _titulosNormalizados:
+                padrao_retornos.imprime_mensagem(padrao_retornos.JA_EXISTE)
+                return padrao_retornos.JA_EXISTE
+
+            # Depois do maior id já usado: len() + 1 repetiria o id de outro filme após remoções
+            _ultimoIdFilme += 1
+            filme = RegistroFilme(
+                id=_ultimoIdFilme,
+                titulo=tituloFormatado,
+                sinopse=sinopse,
+                genero=genero,
+                duracao=duracao,
+                classificacao=classificacao,
+                dataLancamento=dataLancamento
+            )
+
+            filmesEmCartaz.append(filme)
+            indiceFilmes[filme.id] = filme
+            _indexa_filme(filme)
+        _persiste_filme(filme)
         padrao_retornos.imprime_mensagem(padrao_retornos.SUCESSO)
         return padrao_retornos.SUCESSO
 
     padrao_retornos.imprime_mensagem(padrao_retornos.PARAMETRO_INVALIDO)
     return padrao_retornos.PARAMETRO_INVALIDO
 
-def busca_filme(filme_id: int) -> dict | None | int:
+@instrumentado
+def busca_filme(filme_id: int) -> RegistroFilme | None | int:
     """
     Busca um filme pelo ID.
-    Retorna o dicionário do filme se encontrado, None se não encontrado, ou -1 se o parâmetro for inválido.
+    Retorna o registro do filme (acessível como dicionário) se encontrado, None se não encontrado, ou -1 se o parâmetro for inválido.
     """
 
+    _garante_carregado()
+
     if (isinstance(filme_id, int)):
-        for filme in filmesEmCartaz:
-            if filme["id"] == filme_id:
-                return filme
-        return None
+        return indiceFilmes.get(filme_id)
     else:
         return padrao_retornos.PARAMETRO_INVALIDO
 
+@instrumentado
+def busca_filmes_texto(consulta: str, limite: int | None = None) -> list | int:
+    """
+    Busca filmes pelas palavras de `consulta` no título, gênero e sinopse,
+    sem diferenciar acentos nem maiúsculas; a última palavra pode estar
+    incompleta. Só entram filmes com todas as palavras, os mais relevantes
+    primeiro (palavras do título pesam mais, e palavras raras mais que as comuns).
+    Retorna a lista de filmes (vazia se nada combinar), ou -1 se o parâmetro for inválido.
+    """
+
+    _garante_carregado()
+
+    if not isinstance(consulta, str) or (limite is not None and (not isinstance(limite, int) or limite <= 0)):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    return [indiceFilmes[filme_id] for filme_id, _ in indiceTexto.busca(consulta, limite)]
+
+@instrumentado
+def completa_termos(prefixo: str, limite: int = 10) -> list | int:
+    """
+    Palavras do catálogo que começam com `prefixo`, sem acentos e em
+    minúsculas, em ordem alfabética (para sugerir enquanto se digita).
+    Retorna a lista, ou -1 se o parâmetro for inválido.
+    """
+
+    _garante_carregado()
+
+    if not isinstance(prefixo, str) or not isinstance(limite, int) or limite <= 0:
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    prefixo = normaliza(prefixo.strip())
+    if not prefixo:
+        return []
+    return indiceTexto.completa(prefixo, limite)
+
 def exibe_filme(filme_id: int) -> None:
     """
     Exibe os detalhes de um filme pelo ID.
@@ -90,20 +123,40 @@ def exibe_filme(filme_id: int) -> None:
 
     return None
 
-def lista_filmes() -> list:
-    return filmesEmCartaz
+def lista_filmes() -> Paginacao.VisaoLista:
+    """
+    Retorna os filmes em cartaz sem copiar a lista, somente para leitura
+    (len, índice, fatia e iteração; alterações passam por cria/atualiza/remove).
+    """
+    _garante_carregado()
+    return Paginacao.VisaoLista(filmesEmCartaz)
+
+def itera_filmes(inicio: int = 0, limite: int | None = None):
+    """
+    Percorre os filmes a partir da posição `inicio`, no máximo `limite` deles.
+    Retorna um gerador, ou -1 se algum parâmetro for inválido.
+    """
+
+    if not Paginacao.parametros_validos(inicio=inicio, limite=limite):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+    return Paginacao.itera(filmesEmCartaz, inicio, limite)
 
 def exibe_filmes() -> None:
     """
     Exibe a lista de todos os filmes em cartaz.
     """
 
+    _garante_carregado()
+
     if not filmesEmCartaz:
         print("Nenhum filme em cartaz.")
     else:
         for filme in filmesEmCartaz:
             print(f"\nId: {filme["id"]}\nFilme: {filme["titulo"]}\nSinopse: {filme["sinopse"]}\nGênero: {filme["genero"]}\nDuração: {filme["duracao"]} min\nClassificação: {filme["classificacao"]} anos\nData de Lançamento: {filme["dataLancamento"]}")
 
+@instrumentado
 def remove_filme(filme_id: int) -> int:
     """
     Remove um filme pelo ID.
@@ -112,16 +165,17 @@ def remove_filme(filme_id: int) -> int:
 
     filme = busca_filme(filme_id)
 
-    if isinstance(filme, dict):
+    if isinstance(filme, RegistroFilme):
         filmesEmCartaz.remove(filme)
+        del indiceFilmes[filme_id]
+        _desindexa_filme(filme)
 
-        for filmeElem in filmesElement.findall('filme'):
-            idFilmeElem = filmeElem.find('id')
-            if int(idFilmeElem.text) == filme_id:
-                filmesElement.remove(filmeElem)
-                grava_dados_xml()
-                padrao_retornos.imprime_mensagem(padrao_retornos.SUCESSO)
-                return padrao_retornos.SUCESSO
+        if Armazenamento.backend is not None:
+            Armazenamento.backend.remove_filme(filme_id)
+        else:
+            gravacao.marca_alterado()
+        padrao_retornos.imprime_mensagem(padrao_retornos.SUCESSO)
+        return padrao_retornos.SUCESSO
     elif filme is None:
         padrao_retornos.imprime_mensagem(padrao_retornos.NAO_ENCONTRADO)
         return padrao_retornos.NAO_ENCONTRADO
@@ -129,6 +183,7 @@ def remove_filme(filme_id: int) -> int:
         padrao_retornos.imprime_mensagem(padrao_retornos.PARAMETRO_INVALIDO)
         return padrao_retornos.PARAMETRO_INVALIDO
 
+@instrumentado
 def atualiza_dados_filme(filme_id: int, novo_titulo: Optional[str], novo_genero: Optional[str]) -> int:
     """
     Atualiza o título e/ou gênero de um filme pelo ID.
@@ -138,24 +193,17 @@ def atualiza_dados_filme(filme_id: int, novo_titulo: Optional[str], novo_genero:
     if (isinstance(filme_id, int) and (isinstance(novo_titulo, str) or novo_titulo is None) and (isinstance(novo_genero, str) or novo_genero is None)):
         filme = busca_filme(filme_id)
 
-        if isinstance(filme, dict):
+        if isinstance(filme, RegistroFilme):
+            _desindexa_filme(filme)
             if novo_titulo is not None:
                 filme["titulo"] = novo_titulo.strip().title()
             if novo_genero is not None:
                 filme["genero"] = novo_genero.strip().title()
+            _indexa_filme(filme)
 
-            for filmeElem in filmesElement.findall('filme'):
-                idFilmeElem = filmeElem.find('id')
-                if int(idFilmeElem.text) == filme_id:
-                    if novo_titulo is not None:
-                        tituloElem = filmeElem.find('titulo')
-                        tituloElem.text = filme["titulo"]
-                    if novo_genero is not None:
-                        generoElem = filmeElem.find('genero')
-                        generoElem.text = filme["genero"]
-                    grava_dados_xml()
-                    padrao_retornos.imprime_mensagem(padrao_retornos.SUCESSO)
-                    return padrao_retornos.SUCESSO
+            _persiste_filme(filme)
+            padrao_retornos.imprime_mensagem(padrao_retornos.SUCESSO)
+            return padrao_retornos.SUCESSO
         else:
             padrao_retornos.imprime_mensagem(padrao_retornos.NAO_ENCONTRADO)
             return padrao_retornos.NAO_ENCONTRADO
@@ -163,52 +211,195 @@ def atualiza_dados_filme(filme_id: int, novo_titulo: Optional[str], novo_genero:
         padrao_retornos.imprime_mensagem(padrao_retornos.PARAMETRO_INVALIDO)
         return padrao_retornos.PARAMETRO_INVALIDO
 
-def formata_saida_xml(elem):
-    ElementTree.indent(elem, space="  ")
+def _chave_titulo(titulo: str) -> str:
+    """Título normalizado para detectar duplicados ("Ação  Total" e "acao total" são o mesmo)."""
+    return " ".join(normaliza(titulo or "").split())
+
+def _indexa_filme(filme: dict) -> None:
+    """Coloca o filme na busca textual e no mapa de títulos."""
+    indiceTexto.adiciona(filme["id"], {"titulo": filme["titulo"], "genero": filme["genero"], "sinopse": filme["sinopse"]})
+    _titulosNormalizados.setdefault(_chave_titulo(filme["titulo"]), set()).add(filme["id"])
+
+def _desindexa_filme(filme: dict) -> None:
+    """Tira o filme da busca textual e do mapa de títulos (antes de removê-lo ou alterá-lo)."""
+    indiceTexto.remove(filme["id"])
+    chave = _chave_titulo(filme["titulo"])
+    ids = _titulosNormalizados.get(chave)
+    if ids is not None:
+        ids.discard(filme["id"])
+        if not ids:
+            del _titulosNormalizados[chave]
+
+def _limpa_carga() -> None:
+    """Esvazia os filmes em memória antes de uma nova carga."""
+    global _ultimoIdFilme
+    filmesEmCartaz.clear()
+    indiceFilmes.clear()
+    _ultimoIdFilme = 0
+
+def _adiciona_lido(filme: RegistroFilme) -> None:
+    """Acrescenta um filme lido do armazenamento; um id repetido é recusado (fica o primeiro)."""
+    global _ultimoIdFilme
+
+    if filme.id in indiceFilmes:
+        print(f"Aviso: filme com id {filme.id} repetido nos dados; mantido o primeiro.", file=sys.stderr)
+        return
+    filmesEmCartaz.append(filme)
+    indiceFilmes[filme.id] = filme
+    _ultimoIdFilme = max(_ultimoIdFilme, filme.id)
+
+def _reconstroi_indices() -> None:
+    """Monta a busca textual e o mapa de títulos a partir dos filmes carregados."""
+    indiceTexto.limpa()
+    _titulosNormalizados.clear()
+    for filme in filmesEmCartaz:
+        _indexa_filme(filme)
+
+def formata_saida_xml(elem, nivel: int = 0):
+    ElementTree.indent(elem, space="  ", level=nivel)
     return ElementTree.tostring(elem, encoding='unicode')
 
+def _filme_para_xml(filme: dict) -> Element:
+    """Monta o elemento <filme> a partir do dicionário."""
+    filmeElem = Element('filme')
+    SubElement(filmeElem, 'id').text = str(filme["id"])
+    SubElement(filmeElem, 'titulo').text = filme["titulo"]
+    SubElement(filmeElem, 'sinopse').text = filme["sinopse"]
+    SubElement(filmeElem, 'genero').text = filme["genero"]
+    SubElement(filmeElem, 'duracao').text = str(filme["duracao"])
+    SubElement(filmeElem, 'classificacao').text = str(filme["classificacao"])
+    SubElement(filmeElem, 'dataLancamento').text = filme["dataLancamento"]
+    return filmeElem
+
+@instrumentado
 def grava_dados_xml():
-    with open(nome_arquivo, 'w') as file_object:
-        file_object.write(formata_saida_xml(filmesElement))
+    """
+    Grava filmesEmCartaz no arquivo, um <filme> por vez, sem montar
+    a árvore XML inteira em memória. O arquivo só é substituído quando a
+    gravação termina (ver arquivo_atomico).
+    """
+    with arquivo_atomico(nome_arquivo) as file_object:
+        file_object.write('<filmes>\n')
+        file_object.write('  <!--Dados de Filmes em Cartaz-->\n')
+        for filme in filmesEmCartaz[:]:
+            file_object.write('  ' + formata_saida_xml(_filme_para_xml(filme), nivel=1) + '\n')
+        file_object.write('</filmes>')
+
+def _persiste_filme(filme: dict) -> None:
+    """
+    Grava um filme novo ou alterado no armazenamento em uso. No XML, só
+    agenda a regravação do arquivo (ver gravacao e flush).
+    """
+    if Armazenamento.backend is not None:
+        Armazenamento.backend.salva_filme(filme)
+    else:
+        gravacao.marca_alterado()
+
+@instrumentado
+def flush() -> None:
+    """Grava agora no filmes.xml as alterações ainda pendentes."""
+    gravacao.flush()
+
+def _le_dados() -> None:
+    """Carrega os filmes do armazenamento em uso (XML por padrão)."""
+    global _carregado
+
+    if Armazenamento.backend is None:
+        ler_dados_xml()
+        return
 
+    _limpa_carga()
+    for linha in Armazenamento.backend.carrega_filmes():
+        _adiciona_lido(RegistroFilme(**linha))
+    _reconstroi_indices()
+    _carregado = True
+
+@instrumentado
 def ler_dados_xml():
-    global filmesEmCartaz, filmesElement
+    """
+    Lê o arquivo XML em fluxo (iterparse) e popula filmesEmCartaz e indiceFilmes.
+    Cada <filme> é descartado logo depois de convertido, então a árvore
+    do documento nunca fica inteira em memória.
+    """
+    global _carregado
+    _limpa_carga()
     try:
-        with open('filmes.xml', 'rt') as f:
-            tree = ElementTree.parse(f)
-            root = tree.getroot()
-
-        for filme in root.findall('filme'):
-            dictFilme = {}
-            dictFilme = {
-                "id": int(filme.find('id').text),
-                "titulo": filme.find('titulo').text,
-                "sinopse": filme.find('sinopse').text,
-                "genero": filme.find('genero').text,
-                "duracao": float(filme.find('duracao').text),
-                "classificacao": int(filme.find('classificacao').text),
-                "dataLancamento": filme.find('dataLancamento').text
-            }
-            filmesEmCartaz.append(dictFilme)
-
-        # Recria o elemento raiz para futuras gravações
-        filmesElement = root
+        with open(nome_arquivo, 'rt') as f:
+            for _, elem in ElementTree.iterparse(f):
+                if elem.tag != 'filme':
+                    continue
+
+                filme = RegistroFilme(
+                    id=int(elem.find('id').text),
+                    titulo=elem.find('titulo').text,
+                    sinopse=elem.find('sinopse').text,
+                    genero=elem.find('genero').text,
+                    duracao=float(elem.find('duracao').text),
+                    classificacao=int(elem.find('classificacao').text),
+                    dataLancamento=elem.find('dataLancamento').text
+                )
+                _adiciona_lido(filme)
+
+                # Solta os filhos do elemento já lido; na raiz fica só o <filme> vazio
+                elem.clear()
 
     except FileNotFoundError:
-        filmesElement = Element('filmes')
-        comment = Comment('Dados de Filmes em Cartaz')
-        filmesElement.append(comment)
+        pass
 
-filmesEmCartaz = []
-nome_arquivo = 'filmes.xml'
+    _reconstroi_indices()
+    _carregado = True
 
+def carrega(diretorio: str | None = None) -> None:
+    """
+    Carrega (ou recarrega) os filmes do disco.
+    Se `diretorio` for informado, passa a usar o filmes.xml dessa pasta.
+    """
+    global nome_arquivo
+
+    with _travaCarga:
+        # Pendências vão para o arquivo atual antes de ele ser trocado ou relido
+        gravacao.flush()
+        if diretorio is not None:
+            nome_arquivo = os.path.join(diretorio, 'filmes.xml')
+        _le_dados()
+
+def restaura(filmes: list[RegistroFilme]) -> None:
+    """Substitui os filmes em memória pelos já lidos (usado pelo snapshot)."""
+    global _carregado
+
+    with _travaCarga:
+        gravacao.descarta_pendentes()
+        _limpa_carga()
+        for filme in filmes:
+            _adiciona_lido(filme)
+        _reconstroi_indices()
+        _carregado = True
+
+def _garante_carregado() -> None:
+    """Carrega os dados no primeiro acesso, em vez de na importação do módulo."""
+    if not _carregado:
+        with _travaCarga:
+            if not _carregado:
+                _le_dados()
+
+filmesEmCartaz = []
+# Índice id -> filme, mantido em sincronia com filmesEmCartaz
+indiceFilmes = {}
+# Maior id já usado: um filme novo nunca recebe o id de um removido (nem o do mais novo)
+_ultimoIdFilme = 0
+# Teste de título repetido, alocação do id e inclusão nas listas acontecem juntos
+_travaCadastro = threading.Lock()
+# Busca textual (ver indice_texto.py) e título normalizado -> ids, também em sincronia
+indiceTexto = IndiceTexto({"titulo": 3, "genero": 2, "sinopse": 1})
+_titulosNormalizados = {}
 # Persistência em arquivo xml
-filmesElement = Element('filmes')
-comment = Comment('Dados de Filmes em Cartaz')
-filmesElement.append(comment)
+nome_arquivo = 'filmes.xml'
+# As alterações de cada intervalo (em segundos) saem em uma única gravação
+gravacao = GravacaoAdiada(grava_dados_xml, intervalo=1.0)
 
-# Lê dados existentes (se houver) ou cria novo arquivo
-ler_dados_xml()
+# Os dados existentes são lidos no primeiro acesso (ver _garante_carregado)
+_carregado = False
+_travaCarga = threading.Lock()
 
 if __name__ == "__main__":
     # cria_filme("Interstellar", "As reservas naturais da Terra estão chegando ao fim e um grupo de astronautas recebe a missão de verificar possíveis planetas para receberem a população mundial, possibilitando a continuação da espécie. Cooper é chamado para liderar o grupo e aceita a missão sabendo que pode nunca mais ver os filhos. Ao lado de Brand, Jenkins e Doyle, ele seguirá em busca de um novo lar.", "Ficção Científica", 169.0, 10, "2014-11-06")
@@ -219,3 +410,4 @@ if __name__ == "__main__":
     # atualiza_dados_filme(1, "Interestelar", None)
 
     # exibe_filmes()
+    pass
@@ -4,7 +4,6 @@ import os
 import tempfile
 import shutil
 from pathlib import Path
-from xml.etree.ElementTree import Element, Comment
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(os.path.dirname(TEST_DIR))
@@ -13,6 +12,7 @@ if ROOT_DIR not in sys.path:
 
 import padrao_retornos
 import filme as f
+from modulos.filme.indice_texto import IndiceTexto, normaliza, termos
 
 class TestFilme(unittest.TestCase):
     """Testes para o módulo filme com isolamento de arquivos."""
@@ -22,8 +22,10 @@ class TestFilme(unittest.TestCase):
         """Executado uma vez antes de todos os testes."""
         # Salva referências originais
         cls.original_arquivo = f.nome_arquivo
-        cls.original_element = f.filmesElement
         cls.original_lista = f.filmesEmCartaz.copy()
+        cls.original_indice = f.indiceFilmes.copy()
+        cls.original_carregado = f._carregado
+        cls.original_ultimo_id = f._ultimoIdFilme
 
     def setUp(self):
         """Executado antes de cada teste."""
@@ -34,12 +36,17 @@ class TestFilme(unittest.TestCase):
         # Define ambiente de teste
         f.nome_arquivo = self.test_arquivo
         f.filmesEmCartaz  = []
-        f.filmesElement = Element('filmes')
-        comment = Comment('Dados de Filmes em Cartaz')
-        f.filmesElement.append(comment)
+        f.indiceFilmes = {}
+        f._ultimoIdFilme = 0
+        f._reconstroi_indices()
+        f._carregado = True
+        # Grava na hora, para os testes lerem o arquivo logo após a alteração
+        f.gravacao.intervalo = 0
 
     def tearDown(self):
         """Executado depois de cada teste."""
+        f.gravacao.descarta_pendentes()
+        f.gravacao.intervalo = 1.0
         # Remove diretório temporário
         if os.path.exists(self.test_dir):
             shutil.rmtree(self.test_dir)
@@ -49,8 +56,10 @@ class TestFilme(unittest.TestCase):
         """Executado uma vez depois de todos os testes."""
         # Restaura configurações originais
         f.nome_arquivo = cls.original_arquivo
-        f.filmesElement = cls.original_element
         f.filmesEmCartaz = cls.original_lista
+        f.indiceFilmes = cls.original_indice
+        f._carregado = cls.original_carregado
+        f._ultimoIdFilme = cls.original_ultimo_id
 
     # -------------------------
     # Testes para cria_filme()
@@ -239,5 +248,214 @@ class TestFilme(unittest.TestCase):
 
         self.assertEqual(retorno_esperado, -1)
 
+    def test_18_carga_sob_demanda(self):
+        print("Caso de Teste 18 - Filmes lidos do disco só no primeiro acesso")
+        f.carrega(self.test_dir)
+        f.cria_filme("Matrix", "Um hacker descobre a verdade sobre a realidade.", "Ficção", 136.0, 14, "1999-05-21")
+
+        # Simula um processo novo: nada em memória até o primeiro acesso
+        f.filmesEmCartaz.clear()
+        f.indiceFilmes.clear()
+        f._carregado = False
+
+        self.assertEqual(f.busca_filme(1)["titulo"], "Matrix")
+        self.assertTrue(f._carregado)
+
+    def test_19_alteracoes_persistidas(self):
+        print("Caso de Teste 19 - Atualização e remoção gravadas no arquivo")
+        f.cria_filme("Matrix", "Um hacker descobre a verdade sobre a realidade.", "Ficção", 136.0, 14, "1999-05-21")
+        f.cria_filme("Toy Story", "Brinquedos ganham vida.", "Animação", 81.0, 0, "1995-11-22")
+        f.atualiza_dados_filme(1, "Matrix Reloaded", None)
+        f.remove_filme(2)
+
+        f.ler_dados_xml()
+
+        self.assertEqual(len(f.filmesEmCartaz), 1)
+        self.assertEqual(f.busca_filme(1)["titulo"], "Matrix Reloaded")
+        self.assertIsNone(f.busca_filme(2))
+
+    def test_20_registro_compacto(self):
+        print("Caso de Teste 20 - Filme é um registro com __slots__ acessível como dicionário")
+        f.cria_filme("Matrix", "Um hacker descobre a verdade sobre a realidade.", "Ficção", 136.0, 14, "1999-05-21")
+        filme = f.busca_filme(1)
+
+        self.assertFalse(hasattr(filme, "__dict__"))
+        self.assertEqual(filme.titulo, filme["titulo"])
+        self.assertEqual(filme.get("genero"), "Ficção")
+        self.assertIsNone(filme.get("inexistente"))
+        self.assertIn("duracao", filme)
+        self.assertEqual(dict(filme), filme.para_dict())
+        self.assertEqual(dict(filme)["dataLancamento"], "21/05/1999")
+
+        filme["classificacao"] = 16
+        self.assertEqual(filme.classificacao, 16)
+        with self.assertRaises(KeyError):
+            filme["inexistente"]
+        with self.assertRaises(KeyError):
+            filme["inexistente"] = 1
+
+    def test_21_gravacao_adiada_agrupa_alteracoes(self):
+        print("Caso de Teste 21 - Alterações em sequência saem em uma única gravação")
+        f.gravacao.intervalo = 60
+        gravacoes_antes = f.gravacao.gravacoes
+
+        for i in range(50):
+            f.cria_filme(f"Filme {i}", "Sinopse.", "Drama", 100.0, 12, "2020-01-01")
+        f.atualiza_dados_filme(1, "Primeiro", None)
+        f.remove_filme(2)
+
+        # Nada foi gravado ainda: a gravação está agendada
+        self.assertFalse(os.path.exists(self.test_arquivo))
+        f.flush()
+        self.assertEqual(f.gravacao.gravacoes - gravacoes_antes, 1)
+        self.assertFalse(os.path.exists(self.test_arquivo + ".tmp"))
+
+        f.ler_dados_xml()
+        self.assertEqual(len(f.filmesEmCartaz), 49)
+        self.assertEqual(f.busca_filme(1)["titulo"], "Primeiro")
+
+        # Sem alterações novas, flush não regrava
+        f.flush()
+        self.assertEqual(f.gravacao.gravacoes - gravacoes_antes, 1)
+
+    # -------------------------------
+    # Testes para busca_filmes_texto()
+    # -------------------------------
+
+    def _catalogo(self):
+        f.cria_filme("Procurando Nemo", "Marlin cruza o oceano para achar o filho com a ajuda de Dory.", "Animação", 100.0, 0, "2003-05-30")
+        f.cria_filme("Procurando Dory", "Dory busca a família perdida no oceano.", "Animação", 97.0, 0, "2016-06-17")
+        f.cria_filme("Tropa de Elite", "O Capitão Nascimento comanda uma operação do BOPE.", "Ação", 115.0, 18, "2007-10-05")
+        f.cria_filme("Oceano Vermelho", "Uma operação de resgate no mar.", "Ação", 120.0, 14, "2010-01-01")
+
+    def test_22_busca_texto_sem_acentos_e_ordenada(self):
+        print("Caso de Teste 22 - Busca textual ignora acentos e ordena por relevância")
+        self._catalogo()
+
+        # "oceano" no título pesa mais que na sinopse
+        self.assertEqual([filme["id"] for filme in f.busca_filmes_texto("oceano")], [4, 1, 2])
+        self.assertEqual([filme["id"] for filme in f.busca_filmes_texto("ACAO operacao")], [3, 4])
+        self.assertEqual([filme["id"] for filme in f.busca_filmes_texto("capitão")], [3])
+        self.assertEqual([filme["id"] for filme in f.busca_filmes_texto("oceano", limite=1)], [4])
+        self.assertEqual(f.busca_filmes_texto("dory marte"), [])
+        self.assertEqual(f.busca_filmes_texto("  "), [])
+        self.assertEqual(f.busca_filmes_texto(None), -1)
+
+    def test_23_busca_texto_prefixo_e_completa(self):
+        print("Caso de Teste 23 - Última palavra incompleta e sugestão de palavras")
+        self._catalogo()
+
+        # "do" completa "dory", que está no título do 2 e na sinopse do 1
+        self.assertEqual([filme["id"] for filme in f.busca_filmes_texto("procurando do")], [2, 1])
+        self.assertEqual(f.completa_termos("Proc"), ["procurando"])
+        self.assertEqual(f.completa_termos("o", limite=2), ["o", "oceano"])
+        self.assertEqual(f.completa_termos("xyz"), [])
+        self.assertEqual(f.completa_termos(5), -1)
+
+    def test_24_indice_acompanha_alteracoes(self):
+        print("Caso de Teste 24 - Busca e duplicados acompanham atualização, remoção e releitura")
+        self._catalogo()
+
+        # Duplicado mesmo com acentos, maiúsculas e espaços diferentes
+        self.assertEqual(f.cria_filme("tropa  de élite", "Outra.", "Ação", 100.0, 18, "2020-01-01"), 2)
+
+        f.atualiza_dados_filme(3, "Tropa de Elite 2", "Policial")
+        self.assertEqual(f.busca_filmes_texto("acao operacao")[0]["id"], 4)
+        self.assertEqual([filme["id"] for filme in f.busca_filmes_texto("policial")], [3])
+        self.assertEqual(f.cria_filme("Tropa de Elite", "De novo.", "Ação", 100.0, 18, "2020-01-01"), 0)
+
+        f.remove_filme(1)
+        self.assertEqual([filme["id"] for filme in f.busca_filmes_texto("nemo")], [])
+        self.assertEqual(f.completa_termos("nem"), [])
+
+        f.ler_dados_xml()
+        self.assertEqual([filme["id"] for filme in f.busca_filmes_texto("procurando")], [2])
+        self.assertEqual(f.cria_filme("Procurando Nemo", "Volta.", "Animação", 100.0, 0, "2003-05-30"), 0)
+
+    # -------------------------------
+    # Testes para lista_filmes() e itera_filmes()
+    # -------------------------------
+
+    def test_25_lista_sem_copia_e_gerador(self):
+        print("Caso de Teste 25 - Lista de filmes somente leitura e percorrida por partes")
+        self._catalogo()
+
+        lista = f.lista_filmes()
+        self.assertEqual(len(lista), 4)
+        self.assertEqual(lista, f.filmesEmCartaz)
+        self.assertEqual(lista[-1]["titulo"], "Oceano Vermelho")
+        self.assertFalse(hasattr(lista, "append"))
+
+        # Acompanha os cadastros feitos depois
+        f.cria_filme("Novo", "Sinopse.", "Drama", 90.0, 10, "2024-01-01")
+        self.assertEqual(len(lista), 5)
+
+        self.assertEqual([filme["id"] for filme in f.itera_filmes(3)], [4, 5])
+        self.assertEqual([filme["id"] for filme in f.itera_filmes(0, 2)], [1, 2])
+        self.assertEqual(list(f.itera_filmes(10)), [])
+        self.assertEqual(f.itera_filmes("0"), -1)
+
+    def test_26_ids_nao_reaproveitados(self):
+        print("Caso de Teste 26 - Filme novo não reaproveita o id de um removido")
+        f.cria_filme("A", "Sinopse.", "Drama", 90.0, 10, "2024-01-01")
+        f.cria_filme("B", "Sinopse.", "Drama", 90.0, 10, "2024-01-01")
+
+        f.remove_filme(1)
+        f.cria_filme("C", "Sinopse.", "Drama", 90.0, 10, "2024-01-01")
+        self.assertEqual([filme["id"] for filme in f.filmesEmCartaz], [2, 3])
+        self.assertEqual(f.busca_filme(2)["titulo"], "B")
+        self.assertEqual([filme["id"] for filme in f.busca_filmes_texto("b")], [2])
+
+        # Nem o id do mais novo, depois de removido
+        f.remove_filme(3)
+        f.cria_filme("D", "Sinopse.", "Drama", 90.0, 10, "2024-01-01")
+        self.assertEqual(f.busca_filme(4)["titulo"], "D")
+        self.assertIsNone(f.busca_filme(3))
+
+    def test_27_id_repetido_na_carga(self):
+        print("Caso de Teste 27 - Carga recusa um segundo filme com o mesmo id")
+        filme = ("<filme><id>{}</id><titulo>{}</titulo><sinopse>S.</sinopse><genero>Drama</genero>"
+                 "<duracao>90.0</duracao><classificacao>10</classificacao><dataLancamento>01/01/2024</dataLancamento></filme>")
+        with open(self.test_arquivo, "w", encoding="utf-8") as arquivo:
+            arquivo.write("<filmes>" + filme.format(1, "Primeiro") + filme.format(1, "Repetido")
+                          + filme.format(5, "Quinto") + "</filmes>")
+
+        f.ler_dados_xml()
+        self.assertEqual([filme["titulo"] for filme in f.filmesEmCartaz], ["Primeiro", "Quinto"])
+        self.assertEqual(f.busca_filme(1)["titulo"], "Primeiro")
+
+        # O próximo id vem depois do maior lido
+        f.cria_filme("Novo", "Sinopse.", "Drama", 90.0, 10, "2024-01-01")
+        self.assertEqual(f.filmesEmCartaz[-1]["id"], 6)
+
+
+class TestIndiceTexto(unittest.TestCase):
+    """Testes do índice invertido usado pela busca textual."""
+
+    def test_01_normaliza_e_quebra_em_termos(self):
+        print("Índice 01 - Termos sem acentos nem maiúsculas, sem pontuação")
+        self.assertEqual(normaliza("AÇÃO Épica"), "acao epica")
+        self.assertEqual(termos("Ficção/Científica, 2ª parte!"), ["ficcao", "cientifica", "2a", "parte"])
+        self.assertEqual(termos(None), [])
+
+    def test_02_remove_limpa_termos(self):
+        print("Índice 02 - Documento removido some das listas e da completação")
+        indice = IndiceTexto({"titulo": 2, "sinopse": 1})
+        indice.adiciona(1, {"titulo": "Casa Verde", "sinopse": "Uma casa."})
+        indice.adiciona(2, {"titulo": "Casamento", "sinopse": "Festa."})
+
+        self.assertEqual(indice.completa("cas"), ["casa", "casamento"])
+        self.assertEqual([doc_id for doc_id, _ in indice.busca("cas")], [1, 2])
+        # "casa" no título e na sinopse soma os pesos dos dois campos
+        self.assertEqual(indice._postagens["casa"], {1: 3})
+
+        # Reindexar troca os termos do documento
+        indice.adiciona(1, {"titulo": "Verde", "sinopse": ""})
+        self.assertEqual(indice.completa("cas"), ["casamento"])
+        self.assertTrue(indice.remove(2))
+        self.assertFalse(indice.remove(2))
+        self.assertEqual(indice.completa("c"), [])
+        self.assertEqual(len(indice), 1)
+
 if __name__ == "__main__":
     unittest.main()
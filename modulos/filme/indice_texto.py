@@ -0,0 +1,149 @@
+"""
+Índice invertido para a busca textual no catálogo de filmes.
+
+Os textos são normalizados (minúsculas, sem acentos) e quebrados em
+termos; cada termo aponta para os documentos em que aparece, com um peso
+que soma as ocorrências de cada campo multiplicadas pelo peso do campo
+(um termo do título vale mais que um da sinopse). A busca só visita as
+listas dos termos da consulta, em vez de ler todos os documentos.
+
+Os termos ficam também em uma lista ordenada, para completar prefixos
+com bisect: o último termo da consulta pode estar incompleto ("matr"
+encontra "matrix"), como em uma busca enquanto se digita.
+"""
+
+import bisect
+import math
+import re
+import unicodedata
+
+_PALAVRA = re.compile(r"\w+")
+
+
+def normaliza(texto: str) -> str:
+    """Texto em minúsculas e sem acentos ("Ação" -> "acao")."""
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+def termos(texto: str) -> list[str]:
+    """Palavras normalizadas de `texto`, na ordem em que aparecem."""
+    return _PALAVRA.findall(normaliza(texto or ""))
+
+
+class IndiceTexto:
+    """Documentos (por id) indexados pelos termos dos seus campos de texto."""
+
+    __slots__ = ("pesos", "_postagens", "_termosDoc", "_termosOrdenados")
+
+    def __init__(self, pesos: dict[str, float]):
+        # Campo -> peso de cada ocorrência de um termo nele
+        self.pesos = pesos
+        # Termo -> {id do documento: peso do termo no documento}
+        self._postagens = {}
+        # Id -> {termo: peso}, para tirar o documento sem reler os textos
+        self._termosDoc = {}
+        self._termosOrdenados = []
+
+    def __len__(self) -> int:
+        return len(self._termosDoc)
+
+    def limpa(self) -> None:
+        self._postagens.clear()
+        self._termosDoc.clear()
+        self._termosOrdenados.clear()
+
+    def adiciona(self, doc_id, campos: dict[str, str]) -> None:
+        """Indexa (ou reindexa) o documento com os textos de `campos`."""
+        self.remove(doc_id)
+        pesoTermos = {}
+        for campo, peso in self.pesos.items():
+            for termo in termos(campos.get(campo)):
+                pesoTermos[termo] = pesoTermos.get(termo, 0) + peso
+
+        self._termosDoc[doc_id] = pesoTermos
+        for termo, peso in pesoTermos.items():
+            documentos = self._postagens.get(termo)
+            if documentos is None:
+                documentos = self._postagens[termo] = {}
+                bisect.insort(self._termosOrdenados, termo)
+            documentos[doc_id] = peso
+
+    def remove(self, doc_id) -> bool:
+        """Tira o documento do índice; False se ele não estava indexado."""
+        pesoTermos = self._termosDoc.pop(doc_id, None)
+        if pesoTermos is None:
+            return False
+
+        for termo in pesoTermos:
+            documentos = self._postagens[termo]
+            del documentos[doc_id]
+            if not documentos:
+                del self._postagens[termo]
+                del self._termosOrdenados[bisect.bisect_left(self._termosOrdenados, termo)]
+        return True
+
+    def completa(self, prefixo: str, limite: int | None = None) -> list[str]:
+        """Termos indexados que começam com `prefixo` (já normalizado), em ordem alfabética."""
+        ordenados = self._termosOrdenados
+        posicao = bisect.bisect_left(ordenados, prefixo)
+        encontrados = []
+        while posicao < len(ordenados) and ordenados[posicao].startswith(prefixo):
+            if limite is not None and len(encontrados) >= limite:
+                break
+            encontrados.append(ordenados[posicao])
+            posicao += 1
+        return encontrados
+
+    def _idf(self, termo: str) -> float:
+        # Termos raros discriminam mais que os que aparecem em quase tudo
+        return math.log(1 + len(self._termosDoc) / len(self._postagens[termo]))
+
+    def busca(self, consulta: str, limite: int | None = None) -> list[tuple]:
+        """
+        Documentos que contêm todos os termos da consulta (o último também
+        como prefixo), do mais relevante para o menos: retorna
+        [(id, pontuação)], empatados em ordem de id.
+        """
+        palavras = termos(consulta)
+        if not palavras:
+            return []
+
+        # Cada palavra da consulta aceita um conjunto de termos do índice
+        alternativas = [[palavra] if palavra in self._postagens else [] for palavra in palavras[:-1]]
+        alternativas.append(self.completa(palavras[-1]))
+        if not all(alternativas):
+            return []
+
+        # Começa pela palavra com menos documentos, para a interseção ficar pequena logo
+        documentos = [(sum(len(self._postagens[t]) for t in opcoes), opcoes) for opcoes in alternativas]
+        documentos.sort(key=lambda item: item[0])
+
+        pontuacao = None
+        for total, opcoes in documentos:
+            parcial = {}
+            if pontuacao is not None and len(pontuacao) < total:
+                # Poucos candidatos: olha os termos de cada um em vez das listas inteiras
+                aceitos = set(opcoes)
+                idfs = {}
+                for doc_id in pontuacao:
+                    for termo, peso in self._termosDoc[doc_id].items():
+                        if termo in aceitos:
+                            idf = idfs.get(termo)
+                            if idf is None:
+                                idf = idfs[termo] = self._idf(termo)
+                            parcial[doc_id] = max(parcial.get(doc_id, 0.0), peso * idf)
+            else:
+                for termo in opcoes:
+                    idf = self._idf(termo)
+                    for doc_id, peso in self._postagens[termo].items():
+                        if pontuacao is None or doc_id in pontuacao:
+                            parcial[doc_id] = max(parcial.get(doc_id, 0.0), peso * idf)
+            if pontuacao is not None:
+                parcial = {doc_id: valor + pontuacao[doc_id] for doc_id, valor in parcial.items()}
+            pontuacao = parcial
+            if not pontuacao:
+                return []
+
+        ordenados = sorted(pontuacao.items(), key=lambda item: (-item[1], item[0]))
+        return ordenados if limite is None else ordenados[:limite]
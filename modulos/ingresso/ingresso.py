@@ -1,12 +1,150 @@
 # ingresso.py
 
-from modulos.sessao.sessao import reserva_assento, busca_sessao
+from modulos.sessao.sessao import reserva_assento, reserva_assentos, busca_sessao, busca_bloqueio, confirma_bloqueio
 from modulos.cliente.cliente import busca_cliente
+import modulos.monitoramento.monitoramento as Monitoramento
+import modulos.armazenamento.armazenamento as Armazenamento
+from modulos.armazenamento.log_anexavel import LogAnexavel, le_arquivo
+from modulos.armazenamento.gravacao_adiada import arquivo_atomico
+from modulos.ingresso.livro_ingressos import LivroIngressos
+from modulos.registros import RegistroIngresso
+import modulos.paginacao as Paginacao
+from modulos.instrumentacao import instrumentado
 import padrao_retornos
+import os
+import struct
+import threading
 
-listaIngressos = []
+# Ingressos vendidos, em colunas (ver livro_ingressos.py); aceita len(),
+# índice, fatias, iteração, append e clear como a lista que era antes.
+# Fica sempre em ordem crescente de id (a paginação por cursor depende
+# disso): ids são alocados e anexados sob a mesma trava, _travaIdIngresso.
+listaIngressos = LivroIngressos()
 
+# Alocador de ids: vários terminais vendem em paralelo, então o id não pode
+# vir de len(listaIngressos) + 1. Reentrante: _anexa_ingressos aloca os ids
+# com a trava já adquirida.
+_ultimoIdIngresso = 0
+_travaIdIngresso = threading.RLock()
 
+# No modo particionado (ver modulos/particao) cada processo só usa ids com
+# id % passo_ids == resto_ids e acima de id_minimo, para que processos
+# diferentes nunca gerem o mesmo id. Com passo 1, os ids são consecutivos.
+passo_ids = 1
+resto_ids = 0
+id_minimo = 0
+
+
+def _aloca_ids_ingresso(quantidade: int = 1) -> range:
+    """Reserva `quantidade` ids de ingresso de forma atômica."""
+    global _ultimoIdIngresso
+
+    with _travaIdIngresso:
+        base = max(_ultimoIdIngresso, id_minimo) + 1
+        primeiro = base + (resto_ids - base) % passo_ids
+        _ultimoIdIngresso = primeiro + (quantidade - 1) * passo_ids
+    return range(primeiro, primeiro + quantidade * passo_ids, passo_ids)
+
+
+# Persistência: log só-anexado com um registro de tamanho fixo por ingresso
+# (id, cliente_id, sessao_id, numero_assento, preco), gravado em lotes
+# (ver modulos/armazenamento/log_anexavel.py).
+nome_arquivo = 'ingressos.log'
+_REGISTRO_INGRESSO = struct.Struct('<IIIId')
+_log = LogAnexavel()
+
+_carregado = False
+_travaCarga = threading.Lock()
+
+
+def carrega(diretorio: str | None = None) -> None:
+    """
+    Carrega (ou recarrega) os ingressos do armazenamento em uso e
+    reconstrói o alocador de ids e os contadores do monitoramento.
+    Se `diretorio` for informado, passa a usar o ingressos.log dessa pasta.
+    """
+    global nome_arquivo
+
+    with _travaCarga:
+        _log.grava_pendentes()
+        if diretorio is not None:
+            nome_arquivo = os.path.join(diretorio, 'ingressos.log')
+
+        listaIngressos.clear()
+        if Armazenamento.backend is not None:
+            listaIngressos.extend(Armazenamento.backend.carrega_ingressos())
+        else:
+            _le_log(listaIngressos)
+        _reconstroi_derivados()
+
+
+def restaura(estado: dict) -> None:
+    """
+    Substitui os ingressos em memória pelas colunas gravadas com
+    LivroIngressos.exporta() (usado pelo snapshot).
+    """
+    with _travaCarga:
+        listaIngressos.restaura(estado)
+        _reconstroi_derivados()
+
+
+def _reconstroi_derivados() -> None:
+    """Alocador de ids e contadores do monitoramento, a partir do livro."""
+    global _carregado, _ultimoIdIngresso
+
+    with _travaIdIngresso:
+        _ultimoIdIngresso = max(listaIngressos.ids, default=0)
+    Monitoramento.recalcula_contadores(listaIngressos)
+    _carregado = True
+
+
+def _le_log(livro: LivroIngressos) -> None:
+    """
+    Reconstrói os ingressos em uma passada pelo log, direto nas colunas
+    do livro. Um registro incompleto no fim (queda no meio de uma escrita)
+    é ignorado.
+    """
+    conteudo = le_arquivo(nome_arquivo)
+    tamanho_valido = len(conteudo) - len(conteudo) % _REGISTRO_INGRESSO.size
+    for campos in _REGISTRO_INGRESSO.iter_unpack(conteudo[:tamanho_valido]):
+        livro.anexa(*campos)
+
+
+def _persiste_ingressos(ingressos: list[dict]) -> None:
+    """Grava os ingressos vendidos no armazenamento em uso."""
+    if Armazenamento.backend is not None:
+        Armazenamento.backend.salva_ingressos(ingressos)
+        return
+
+    _log.anexa(nome_arquivo, _empacota(ingressos))
+
+
+def _empacota(ingressos) -> bytes:
+    return b''.join(
+        _REGISTRO_INGRESSO.pack(i["id"], i["cliente_id"], i["sessao_id"], i["numero_assento"], i["preco"])
+        for i in ingressos
+    )
+
+
+def exporta_log(caminho: str, ingressos) -> None:
+    """Escreve `ingressos` em `caminho`, no formato do ingressos.log."""
+    with arquivo_atomico(caminho, 'wb') as arquivo:
+        arquivo.write(_empacota(ingressos))
+
+
+@instrumentado
+def grava_pendentes() -> None:
+    """Grava no disco os ingressos ainda no lote em memória."""
+    _log.grava_pendentes()
+
+
+def _garante_carregado() -> None:
+    """Carrega os dados no primeiro acesso, em vez de na importação do módulo."""
+    if not _carregado:
+        carrega()
+
+
+@instrumentado
 def cria_ingresso(cliente_id, sessao_id, numero_assento, preco) -> int:
     """
     Efetiva a venda de um ingresso.
@@ -25,6 +163,8 @@ def cria_ingresso(cliente_id, sessao_id, numero_assento, preco) -> int:
         not isinstance(preco, (int, float)) or preco < 0):
         return padrao_retornos.PARAMETRO_INVALIDO
 
+    _garante_carregado()
+
     cliente = busca_cliente(cliente_id)
     if cliente is None:
         return padrao_retornos.NAO_ENCONTRADO
@@ -36,16 +176,124 @@ def cria_ingresso(cliente_id, sessao_id, numero_assento, preco) -> int:
     codigo_reserva = reserva_assento(sessao_id, numero_assento)
 
     if codigo_reserva == padrao_retornos.SUCESSO:
-        novo_ingresso = {
-            "id": len(listaIngressos) + 1,
-            "cliente_id": cliente_id,
-            "sessao_id": sessao_id,
-            "numero_assento": numero_assento,
-            "preco": preco
-        }
-        listaIngressos.append(novo_ingresso)
+        _emite_ingressos(cliente_id, sessao, [numero_assento], preco)
         return padrao_retornos.SUCESSO
 
+    return _traduz_codigo_reserva(codigo_reserva)
+
+
+@instrumentado
+def cria_ingressos_lote(cliente_id, sessao_id, assentos, preco) -> int:
+    """
+    Efetiva a venda de vários ingressos de uma mesma sessão para um cliente.
+    Os assentos são reservados em conjunto (tudo ou nada) e persistidos
+    com uma única escrita.
+
+    Retornos:
+      0  - todos os ingressos vendidos com sucesso
+      2  - algum assento já ocupado (nenhum é vendido)
+      1  - cliente/sessão inexistentes
+      5  - sessão lotada
+     -1  - parâmetros inválidos
+    """
+
+    if (not isinstance(cliente_id, int) or cliente_id <= 0 or
+        not isinstance(sessao_id, int) or sessao_id <= 0 or
+        not isinstance(assentos, (list, tuple)) or not assentos or
+        not isinstance(preco, (int, float)) or preco < 0):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+
+    cliente = busca_cliente(cliente_id)
+    if cliente is None:
+        return padrao_retornos.NAO_ENCONTRADO
+
+    sessao = busca_sessao(sessao_id)
+    if sessao is None:
+        return padrao_retornos.NAO_ENCONTRADO
+
+    codigo_reserva = reserva_assentos(sessao_id, list(assentos))
+
+    if codigo_reserva != padrao_retornos.SUCESSO:
+        return _traduz_codigo_reserva(codigo_reserva)
+
+    _emite_ingressos(cliente_id, sessao, assentos, preco)
+
+    return padrao_retornos.SUCESSO
+
+
+@instrumentado
+def compra_bloqueio(cliente_id, bloqueio_id, preco) -> int:
+    """
+    Conclui a compra dos assentos bloqueados com sessao.bloqueia_assentos:
+    confirma o bloqueio e emite um ingresso por assento para o cliente.
+
+    Retornos:
+      0  - ingressos vendidos com sucesso
+      1  - cliente inexistente, ou bloqueio inexistente/vencido
+     -1  - parâmetros inválidos
+    """
+
+    if (not isinstance(cliente_id, int) or cliente_id <= 0 or
+        not isinstance(bloqueio_id, int) or bloqueio_id <= 0 or
+        not isinstance(preco, (int, float)) or preco < 0):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+
+    cliente = busca_cliente(cliente_id)
+    if cliente is None:
+        return padrao_retornos.NAO_ENCONTRADO
+
+    bloqueio = busca_bloqueio(bloqueio_id)
+    if bloqueio is None:
+        return padrao_retornos.NAO_ENCONTRADO
+
+    # Os assentos de um bloqueio não mudam: se a confirmação passar, são estes
+    codigo = confirma_bloqueio(bloqueio_id)
+    if codigo != padrao_retornos.SUCESSO:
+        return codigo
+
+    _emite_ingressos(cliente_id, busca_sessao(bloqueio["sessao_id"]), bloqueio["assentos"], preco)
+
+    return padrao_retornos.SUCESSO
+
+
+def _emite_ingressos(cliente_id: int, sessao, assentos: list[int], preco) -> None:
+    """Registra e persiste um ingresso por assento já reservado."""
+    sessao_id = sessao["id"]
+    filme_id = sessao.get("filme_id")
+    novos_ingressos = _anexa_ingressos(cliente_id, sessao_id, assentos, preco)
+    for _ in novos_ingressos:
+        Monitoramento.registra_venda(sessao_id, filme_id, preco)
+
+    _persiste_ingressos(novos_ingressos)
+
+
+def _anexa_ingressos(cliente_id: int, sessao_id: int, assentos: list[int], preco) -> list[RegistroIngresso]:
+    """
+    Aloca os ids e anexa os ingressos a listaIngressos sem soltar a trava:
+    anexados depois, dois terminais poderiam inverter a ordem dos ids.
+    """
+    with _travaIdIngresso:
+        novos_ingressos = [
+            RegistroIngresso(
+                id=id_ingresso,
+                cliente_id=cliente_id,
+                sessao_id=sessao_id,
+                numero_assento=numero_assento,
+                preco=preco
+            )
+            for id_ingresso, numero_assento in zip(_aloca_ids_ingresso(len(assentos)), assentos)
+        ]
+        listaIngressos.extend(novos_ingressos)
+    return novos_ingressos
+
+
+def _traduz_codigo_reserva(codigo_reserva: int) -> int:
+    """Converte o código de falha da reserva no código de retorno da venda."""
+
     # Tratamento dos códigos da reserva_assento
     if codigo_reserva == padrao_retornos.JA_EXISTE:
         return padrao_retornos.JA_EXISTE
@@ -63,6 +311,7 @@ def cria_ingresso(cliente_id, sessao_id, numero_assento, preco) -> int:
     return padrao_retornos.PARAMETRO_INVALIDO
 
 
+@instrumentado
 def lista_ingressos_cliente(cliente_id: int) -> list[dict] | None:
     """
     Lista todos os ingressos de um cliente.
@@ -75,18 +324,16 @@ def lista_ingressos_cliente(cliente_id: int) -> list[dict] | None:
     if not isinstance(cliente_id, int) or cliente_id <= 0:
         return None
 
+    _garante_carregado()
+
     cliente_encontrado = busca_cliente(cliente_id)
     if cliente_encontrado is None:
         return None
 
-    ingressos_do_cliente = []
-
-    for ingresso in listaIngressos:
-        if ingresso["cliente_id"] == cliente_id:
-            ingressos_do_cliente.append(ingresso)
-
-    return ingressos_do_cliente
+    # O livro guarda as posições dos ingressos de cada cliente
+    return listaIngressos.do_cliente(cliente_id)
 
+@instrumentado
 def lista_ingressos_sessao(sessao_id: int) -> list[dict]:
     """
     Lista todos os ingressos vendidos para uma sessão.
@@ -99,21 +346,52 @@ def lista_ingressos_sessao(sessao_id: int) -> list[dict]:
     if not isinstance(sessao_id, int) or sessao_id <= 0:
         return []
 
+    _garante_carregado()
+
     sessao_encontrada = busca_sessao(sessao_id)
     if sessao_encontrada is None:
         return []
 
-    ingressos_da_sessao = []
-
-    for ingresso in listaIngressos:
-        if ingresso["sessao_id"] == sessao_id:
-            ingressos_da_sessao.append(ingresso)
-
-    return ingressos_da_sessao
+    return listaIngressos.da_sessao(sessao_id)
 
 def obtem_todos_ingressos() -> list:
     """
     Retorna uma cópia da lista de todos os ingressos cadastrados.
     Útil para debug, relatórios e para garantir imutabilidade externa.
     """
+    _garante_carregado()
     return listaIngressos[:]
+
+def visao_ingressos() -> Paginacao.VisaoLista:
+    """
+    Todos os ingressos, sem copiar o livro: somente leitura, e cada
+    ingresso só vira um registro quando é lido.
+    """
+    _garante_carregado()
+    return Paginacao.VisaoLista(listaIngressos)
+
+def itera_ingressos(inicio: int = 0, limite: int | None = None):
+    """
+    Gerador dos ingressos a partir da posição `inicio`, no máximo `limite`
+    deles, montando os registros aos poucos.
+    Retorna -1 se os parâmetros forem inválidos.
+    """
+    if not Paginacao.parametros_validos(inicio=inicio, limite=limite):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+    return Paginacao.itera(listaIngressos, inicio, limite)
+
+@instrumentado
+def pagina_ingressos(tamanho: int, cursor: int | None = None) -> dict | int:
+    """
+    Até `tamanho` ingressos, em ordem de id, depois do ingresso `cursor`
+    (None para a primeira página).
+    Retorna {"registros": [...], "proximo_cursor": id ou None no fim}, ou -1
+    se os parâmetros forem inválidos.
+    """
+    if not Paginacao.parametros_validos(tamanho=tamanho, cursor=cursor):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+    return Paginacao.pagina(listaIngressos, tamanho, cursor)
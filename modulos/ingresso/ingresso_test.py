@@ -1,6 +1,8 @@
 import unittest
 import sys
 import os
+import tempfile
+import threading
 from unittest.mock import patch
 
 # Configurar path
@@ -11,19 +13,41 @@ if ROOT_DIR not in sys.path:
 
 import padrao_retornos
 import modulos.ingresso.ingresso as modulo_ingresso
+import modulos.sessao.sessao as modulo_sessao
+import modulos.cliente.cliente as modulo_cliente
 
 from modulos.ingresso.ingresso import (
     cria_ingresso,
     lista_ingressos_cliente,
     lista_ingressos_sessao,
-    obtem_todos_ingressos
+    obtem_todos_ingressos,
+    cria_ingressos_lote
 )
 
 class TestIngressoCompleto(unittest.TestCase):
 
     def setUp(self):
-        """Limpa apenas a lista de ingressos."""
+        """Limpa a lista de ingressos e manda os logs para uma pasta temporária."""
         modulo_ingresso.listaIngressos.clear()
+        for modulo in (modulo_ingresso, modulo_cliente):
+            carregado = patch.object(modulo, "_carregado", True)
+            carregado.start()
+            self.addCleanup(carregado.stop)
+
+        self.pasta = tempfile.TemporaryDirectory()
+        self.arquivos = [
+            patch.object(modulo_ingresso, "nome_arquivo", os.path.join(self.pasta.name, "ingressos.log")),
+            patch.object(modulo_cliente, "nome_arquivo", os.path.join(self.pasta.name, "clientes.log")),
+        ]
+        for arquivo in self.arquivos:
+            arquivo.start()
+
+    def tearDown(self):
+        modulo_ingresso._log.descarta_pendentes()
+        modulo_cliente._log.descarta_pendentes()
+        for arquivo in self.arquivos:
+            arquivo.stop()
+        self.pasta.cleanup()
 
     # -------------------------------------------------------------------
     # TESTES DE CRIAÇÃO
@@ -149,6 +173,227 @@ class TestIngressoCompleto(unittest.TestCase):
 
         self.assertEqual(len(obtem_todos_ingressos()), 3)
 
+    @patch("modulos.ingresso.ingresso.busca_cliente", lambda cid: {"id": cid})
+    @patch("modulos.ingresso.ingresso.busca_sessao", lambda sid: {"id": sid, "filme_id": 7})
+    @patch("modulos.ingresso.ingresso.reserva_assento", lambda *args: padrao_retornos.SUCESSO)
+    def test_11_venda_atualiza_monitoramento(self):
+        print("Teste 11: Venda atualiza os contadores do monitoramento")
+        modulo_ingresso.Monitoramento.zera_contadores()
+
+        cria_ingresso(10, 1, 1, 20)
+        cria_ingresso(11, 1, 2, 25.5)
+
+        self.assertEqual(modulo_ingresso.Monitoramento.ingressosPorFilme[7], 2)
+        self.assertAlmostEqual(modulo_ingresso.Monitoramento.receitaPorSessao[1], 45.5)
+        self.assertEqual(modulo_ingresso.Monitoramento.totalIngressos, 2)
+
+    # -------------------------------------------------------------------
+    # TESTES DE VENDA EM LOTE
+    # -------------------------------------------------------------------
+
+    @patch("modulos.ingresso.ingresso.busca_cliente", lambda cid: {"id": cid})
+    @patch("modulos.ingresso.ingresso.busca_sessao", lambda sid: {"id": sid, "filme_id": 7})
+    @patch("modulos.ingresso.ingresso.reserva_assentos")
+    def test_12_lote_sucesso(self, mock_reserva_lote):
+        print("Teste 12: Venda em lote cria um ingresso por assento")
+        mock_reserva_lote.return_value = padrao_retornos.SUCESSO
+
+        ret = cria_ingressos_lote(10, 5, [1, 2, 3], 20.0)
+
+        self.assertEqual(ret, padrao_retornos.SUCESSO)
+        mock_reserva_lote.assert_called_once_with(5, [1, 2, 3])
+        ingressos = obtem_todos_ingressos()
+        self.assertEqual([i["numero_assento"] for i in ingressos], [1, 2, 3])
+        self.assertEqual(len({i["id"] for i in ingressos}), 3)
+
+    @patch("modulos.ingresso.ingresso.busca_cliente", lambda cid: {"id": cid})
+    @patch("modulos.ingresso.ingresso.busca_sessao", lambda sid: {"id": sid, "filme_id": 7})
+    @patch("modulos.ingresso.ingresso.reserva_assentos")
+    def test_13_lote_assento_ocupado(self, mock_reserva_lote):
+        print("Teste 13: Venda em lote falha sem criar ingressos")
+        mock_reserva_lote.return_value = padrao_retornos.JA_EXISTE
+
+        ret = cria_ingressos_lote(10, 5, [1, 2, 3], 20.0)
+
+        self.assertEqual(ret, padrao_retornos.JA_EXISTE)
+        self.assertEqual(len(obtem_todos_ingressos()), 0)
+
+    def test_14_lote_parametros_invalidos(self):
+        print("Teste 14: Venda em lote com parâmetros inválidos")
+        self.assertEqual(cria_ingressos_lote(10, 5, [], 20.0), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(cria_ingressos_lote(10, 5, None, 20.0), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(cria_ingressos_lote(10, 5, [1], -1), padrao_retornos.PARAMETRO_INVALIDO)
+
+    # -------------------------------------------------------------------
+    # TESTES DE CONCORRÊNCIA
+    # -------------------------------------------------------------------
+
+    @patch("modulos.sessao.sessao.busca_filme", lambda fid: {"id": fid})
+    def test_15_vendas_concorrentes(self):
+        print("Teste 15: Muitos terminais vendendo ao mesmo tempo")
+
+        with tempfile.TemporaryDirectory() as pasta, \
+             patch.object(modulo_sessao, "nome_arquivo", os.path.join(pasta, "sessoes.xml")), \
+             patch.object(modulo_sessao, "nome_arquivo_journal", os.path.join(pasta, "sessoes.journal")):
+            # A gravação adiada não pode acontecer depois que nome_arquivo voltar ao original
+            self.addCleanup(modulo_sessao.gravacao.descarta_pendentes)
+            modulo_sessao.ler_dados_xml()
+            modulo_sessao.cria_sessao(1, 1, "20:00", 40, "dublado")
+            modulo_sessao.cria_sessao(1, 2, "20:00", 40, "legendado")
+            sessoes = [s["id"] for s in modulo_sessao.obtem_todas_sessoes()]
+
+            modulo_cliente.cadastra_cliente("Terminal Teste", "999.999.999-99")
+            cliente_id = modulo_cliente.listaClientes[-1]["id"]
+
+            largada = threading.Barrier(12)
+
+            def terminal(numero):
+                largada.wait()
+                for assento in range(1, 41):
+                    for sessao_id in sessoes:
+                        if (assento + numero) % 3 == 0:
+                            cria_ingressos_lote(cliente_id, sessao_id, [assento], 20.0)
+                        else:
+                            cria_ingresso(cliente_id, sessao_id, assento, 20.0)
+
+            intervalo_original = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+            try:
+                threads = [threading.Thread(target=terminal, args=(n,)) for n in range(12)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+            finally:
+                sys.setswitchinterval(intervalo_original)
+                modulo_cliente.remove_cliente(cliente_id)
+
+            ingressos = obtem_todos_ingressos()
+            self.assertEqual(len(ingressos), 80)
+            self.assertEqual(len({i["id"] for i in ingressos}), 80)
+            self.assertEqual(len({(i["sessao_id"], i["numero_assento"]) for i in ingressos}), 80)
+
+            # Anexados na ordem dos ids, então a paginação por cursor vê todos
+            ids = [i["id"] for i in ingressos]
+            self.assertEqual(ids, sorted(ids))
+            vistos, cursor = [], None
+            while True:
+                pagina = modulo_ingresso.pagina_ingressos(7, cursor)
+                vistos += [i["id"] for i in pagina["registros"]]
+                cursor = pagina["proximo_cursor"]
+                if cursor is None:
+                    break
+            self.assertEqual(vistos, ids)
+            modulo_sessao.gravacao.descarta_pendentes()
+
+    # -------------------------------------------------------------------
+    # TESTES DE PERSISTÊNCIA
+    # -------------------------------------------------------------------
+
+    @patch("modulos.ingresso.ingresso.busca_cliente", lambda cid: {"id": cid})
+    @patch("modulos.ingresso.ingresso.busca_sessao", lambda sid: {"id": sid, "filme_id": 1})
+    @patch("modulos.ingresso.ingresso.reserva_assento", lambda sid, n: padrao_retornos.SUCESSO)
+    @patch("modulos.ingresso.ingresso.reserva_assentos", lambda sid, a: padrao_retornos.SUCESSO)
+    @patch("modulos.monitoramento.monitoramento.busca_sessao", lambda sid: {"id": sid, "filme_id": 1})
+    def test_16_ingressos_persistidos(self):
+        print("Teste 16: Ingressos relidos do log após reinício")
+        cria_ingresso(10, 5, 1, 20.0)
+        cria_ingressos_lote(11, 5, [2, 3], 25.5)
+        ultimo_id = obtem_todos_ingressos()[-1]["id"]
+
+        modulo_ingresso.grava_pendentes()
+        with open(modulo_ingresso.nome_arquivo, "ab") as log:
+            log.write(b"\x01\x02\x03")  # registro incompleto: queda no meio da escrita
+
+        modulo_ingresso.listaIngressos.clear()
+        modulo_ingresso.carrega()
+
+        ingressos = obtem_todos_ingressos()
+        self.assertEqual([(i["cliente_id"], i["numero_assento"], i["preco"]) for i in ingressos],
+                         [(10, 1, 20.0), (11, 2, 25.5), (11, 3, 25.5)])
+        self.assertEqual(ingressos[-1]["id"], ultimo_id)
+        self.assertEqual(modulo_ingresso._aloca_ids_ingresso()[0], ultimo_id + 1)
+
+        # Relidos como registros compactos, iguais aos dicionários de antes
+        self.assertEqual(ingressos[0], {"id": ingressos[0].id, "cliente_id": 10, "sessao_id": 5,
+                                        "numero_assento": 1, "preco": 20.0})
+        self.assertFalse(hasattr(ingressos[0], "__dict__"))
+
+    @patch("modulos.ingresso.ingresso.busca_cliente")
+    @patch("modulos.ingresso.ingresso.busca_sessao")
+    @patch("modulos.ingresso.ingresso.reserva_assento")
+    def test_17_livro_em_colunas(self, mock_reserva, mock_busca_sessao, mock_busca_cliente):
+        print("Teste 17: Ingressos em colunas, consultados por sessão e por cliente")
+        mock_busca_cliente.return_value = {"id": 1}
+        mock_busca_sessao.side_effect = lambda sessao_id: {"id": sessao_id, "filme_id": 1}
+        mock_reserva.return_value = padrao_retornos.SUCESSO
+
+        cria_ingresso(1, 5, 1, 19.99)
+        cria_ingresso(2, 6, 1, 25)
+        cria_ingresso(1, 6, 2, 25.5)
+
+        livro = modulo_ingresso.listaIngressos
+        self.assertEqual(list(livro.centavos), [1999, 2500, 2550])
+        self.assertEqual(livro.totais_por_sessao(), {5: (1, 1999), 6: (2, 5050)})
+
+        self.assertEqual([i["numero_assento"] for i in lista_ingressos_sessao(6)], [1, 2])
+        self.assertEqual([i["sessao_id"] for i in lista_ingressos_cliente(1)], [5, 6])
+        self.assertEqual(lista_ingressos_cliente(1)[0]["preco"], 19.99)
+        self.assertEqual(livro[-1]["id"], livro.ids[-1])
+
+    @patch("modulos.ingresso.ingresso.busca_cliente")
+    @patch("modulos.ingresso.ingresso.busca_sessao")
+    @patch("modulos.ingresso.ingresso.confirma_bloqueio")
+    @patch("modulos.ingresso.ingresso.busca_bloqueio")
+    def test_18_compra_bloqueio(self, mock_busca_bloqueio, mock_confirma, mock_busca_sessao, mock_busca_cliente):
+        print("Teste 18: Compra dos assentos bloqueados emite um ingresso por assento")
+        mock_busca_cliente.return_value = {"id": 1}
+        mock_busca_sessao.return_value = {"id": 5, "filme_id": 1}
+        mock_busca_bloqueio.return_value = {"id": 7, "sessao_id": 5, "assentos": [3, 4], "segundos_restantes": 30.0}
+        mock_confirma.return_value = padrao_retornos.SUCESSO
+
+        self.assertEqual(modulo_ingresso.compra_bloqueio(1, 7, 20.0), padrao_retornos.SUCESSO)
+        mock_confirma.assert_called_once_with(7)
+        self.assertEqual([(i["sessao_id"], i["numero_assento"]) for i in obtem_todos_ingressos()], [(5, 3), (5, 4)])
+
+        # Bloqueio vencido ou confirmado em paralelo: nada é emitido
+        mock_confirma.return_value = padrao_retornos.NAO_ENCONTRADO
+        self.assertEqual(modulo_ingresso.compra_bloqueio(1, 7, 20.0), padrao_retornos.NAO_ENCONTRADO)
+        mock_busca_bloqueio.return_value = None
+        self.assertEqual(modulo_ingresso.compra_bloqueio(1, 8, 20.0), padrao_retornos.NAO_ENCONTRADO)
+        self.assertEqual(modulo_ingresso.compra_bloqueio(1, "7", 20.0), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(len(obtem_todos_ingressos()), 2)
+
+    @patch("modulos.ingresso.ingresso.busca_cliente")
+    @patch("modulos.ingresso.ingresso.busca_sessao")
+    @patch("modulos.ingresso.ingresso.reserva_assento")
+    def test_19_listagem_paginada(self, mock_reserva, mock_busca_sessao, mock_busca_cliente):
+        print("Teste 19: Ingressos listados por gerador e por páginas do livro")
+        mock_busca_cliente.return_value = {"id": 1}
+        mock_busca_sessao.side_effect = lambda sessao_id: {"id": sessao_id, "filme_id": 1}
+        mock_reserva.return_value = padrao_retornos.SUCESSO
+
+        for assento in range(1, 6):
+            cria_ingresso(1, 5, assento, 20.0)
+
+        visao = modulo_ingresso.visao_ingressos()
+        self.assertEqual(len(visao), 5)
+        self.assertEqual(visao, obtem_todos_ingressos())
+
+        self.assertEqual([i["numero_assento"] for i in modulo_ingresso.itera_ingressos(1, 2)], [2, 3])
+
+        ids = [i["id"] for i in visao]
+        pagina = modulo_ingresso.pagina_ingressos(2)
+        self.assertEqual([i["id"] for i in pagina["registros"]], ids[:2])
+        pagina = modulo_ingresso.pagina_ingressos(2, pagina["proximo_cursor"])
+        self.assertEqual([i["id"] for i in pagina["registros"]], ids[2:4])
+        pagina = modulo_ingresso.pagina_ingressos(2, pagina["proximo_cursor"])
+        self.assertEqual([i["id"] for i in pagina["registros"]], ids[4:])
+        self.assertIsNone(pagina["proximo_cursor"])
+
+        self.assertEqual(modulo_ingresso.pagina_ingressos(-1), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(modulo_ingresso.itera_ingressos(0, "2"), padrao_retornos.PARAMETRO_INVALIDO)
+
 
 if __name__ == "__main__":
     unittest.main()
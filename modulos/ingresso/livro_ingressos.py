@@ -0,0 +1,181 @@
+"""
+Livro de ingressos em colunas.
+
+Em vez de um objeto por ingresso, cada campo fica em um `array` próprio
+(id, cliente_id, sessao_id, numero_assento e o preço em centavos inteiros),
+e a posição i de todas as colunas é o i-ésimo ingresso. Acrescentar custa
+O(1) amortizado, um ingresso ocupa 24 bytes nas colunas (mais 8 nos
+índices abaixo), e as somas por sessão rodam
+sobre as colunas sem criar objetos (com NumPy, se estiver instalado).
+
+Para listar os ingressos de uma sessão ou de um cliente sem varrer o livro:
+  - cada sessão tem um array com as posições dos seus ingressos (são poucas
+    sessões com muitos ingressos cada);
+  - cada ingresso guarda, em mais uma coluna, a posição do ingresso anterior
+    do mesmo cliente, e um dicionário aponta o último de cada cliente (são
+    muitos clientes com poucos ingressos cada, e um array por cliente
+    custaria mais que os próprios ingressos).
+Nos dois casos o custo é o tamanho da resposta. Os ingressos lidos do livro
+são RegistroIngresso montados na hora.
+"""
+
+from array import array
+import threading
+
+from modulos.registros import RegistroIngresso
+
+try:
+    import numpy
+except ImportError:  # opcional: sem NumPy, as somas usam as colunas direto
+    numpy = None
+
+
+def para_centavos(preco: float) -> int:
+    """Converte um preço em reais para centavos inteiros (arredondando)."""
+    return round(preco * 100)
+
+
+class LivroIngressos:
+    """Ingressos vendidos, guardados em colunas paralelas."""
+
+    __slots__ = ("ids", "clientes", "sessoes", "assentos", "centavos",
+                 "_porSessao", "_anteriorDoCliente", "_ultimoDoCliente", "_trava")
+
+    def __init__(self, ingressos=()):
+        self.ids = array('I')
+        self.clientes = array('I')
+        self.sessoes = array('I')
+        self.assentos = array('I')
+        self.centavos = array('q')
+        self._porSessao = {}
+        self._anteriorDoCliente = array('i')
+        self._ultimoDoCliente = {}
+        self._trava = threading.Lock()
+        self.extend(ingressos)
+
+    def anexa(self, id: int, cliente_id: int, sessao_id: int, numero_assento: int, preco: float) -> None:
+        """Acrescenta um ingresso no fim do livro."""
+        with self._trava:
+            posicao = len(self.ids)
+            self.clientes.append(cliente_id)
+            self.sessoes.append(sessao_id)
+            self.assentos.append(numero_assento)
+            self.centavos.append(para_centavos(preco))
+            # A coluna de ids vai por último: quem lê usa len(ids)
+            self.ids.append(id)
+
+            if sessao_id not in self._porSessao:
+                self._porSessao[sessao_id] = array('I')
+            self._porSessao[sessao_id].append(posicao)
+            self._anteriorDoCliente.append(self._ultimoDoCliente.get(cliente_id, -1))
+            self._ultimoDoCliente[cliente_id] = posicao
+
+    def append(self, ingresso) -> None:
+        """Acrescenta um ingresso dado como registro ou dicionário."""
+        self.anexa(ingresso["id"], ingresso["cliente_id"], ingresso["sessao_id"],
+                   ingresso["numero_assento"], ingresso["preco"])
+
+    def extend(self, ingressos) -> None:
+        for ingresso in ingressos:
+            self.append(ingresso)
+
+    def clear(self) -> None:
+        with self._trava:
+            for coluna in self._colunas():
+                del coluna[:]
+            self._porSessao.clear()
+            self._ultimoDoCliente.clear()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _colunas(self) -> tuple[array, ...]:
+        return (self.ids, self.clientes, self.sessoes, self.assentos, self.centavos,
+                self._anteriorDoCliente)
+
+    def exporta(self) -> dict:
+        """Colunas e índices em bytes, para o snapshot binário."""
+        with self._trava:
+            return {
+                "colunas": [(coluna.typecode, coluna.tobytes()) for coluna in self._colunas()],
+                "porSessao": {sessao_id: posicoes.tobytes() for sessao_id, posicoes in self._porSessao.items()},
+                "ultimoDoCliente": dict(self._ultimoDoCliente),
+            }
+
+    def restaura(self, estado: dict) -> None:
+        """
+        Substitui o conteúdo do livro pelo gerado por exporta(), sem
+        reconstruir os índices ingresso por ingresso.
+        """
+        colunas = [array(typecode, dados) for typecode, dados in estado["colunas"]]
+        if ([coluna.typecode for coluna in colunas] != [coluna.typecode for coluna in self._colunas()]
+                or len({len(coluna) for coluna in colunas}) > 1):
+            raise ValueError("colunas do livro inconsistentes")
+        porSessao = {sessao_id: array('I', posicoes) for sessao_id, posicoes in estado["porSessao"].items()}
+        ultimoDoCliente = dict(estado["ultimoDoCliente"])
+
+        with self._trava:
+            for atual, nova in zip(self._colunas(), colunas):
+                del atual[:]
+                atual.extend(nova)
+            self._porSessao = porSessao
+            self._ultimoDoCliente = ultimoDoCliente
+
+    def _registro(self, posicao: int) -> RegistroIngresso:
+        return RegistroIngresso(self.ids[posicao], self.clientes[posicao], self.sessoes[posicao],
+                                self.assentos[posicao], self.centavos[posicao] / 100)
+
+    def __getitem__(self, posicao):
+        if isinstance(posicao, slice):
+            return [self._registro(i) for i in range(*posicao.indices(len(self)))]
+        if posicao < 0:
+            posicao += len(self)
+        if not 0 <= posicao < len(self):
+            raise IndexError("ingresso fora do livro")
+        return self._registro(posicao)
+
+    def __iter__(self):
+        for posicao in range(len(self)):
+            yield self._registro(posicao)
+
+    def da_sessao(self, sessao_id: int) -> list[RegistroIngresso]:
+        """Ingressos de uma sessão, na ordem de venda."""
+        return [self._registro(i) for i in self._porSessao.get(sessao_id, ())]
+
+    def do_cliente(self, cliente_id: int) -> list[RegistroIngresso]:
+        """Ingressos de um cliente, na ordem de venda."""
+        posicoes = []
+        posicao = self._ultimoDoCliente.get(cliente_id, -1)
+        while posicao >= 0:
+            posicoes.append(posicao)
+            posicao = self._anteriorDoCliente[posicao]
+        return [self._registro(i) for i in reversed(posicoes)]
+
+    def totais_por_sessao(self) -> dict[int, tuple[int, int]]:
+        """
+        Agrupa o livro por sessão: {sessao_id: (ingressos, receita em centavos)}.
+        Com NumPy é uma soma vetorizada sobre as colunas; sem ele, a soma de
+        cada sessão percorre só as posições dela, sem montar registros.
+        """
+        # A trava impede vendas no meio da soma (e o array de mudar de
+        # tamanho enquanto o NumPy o enxerga)
+        with self._trava:
+            if numpy is not None and len(self.ids):
+                sessoes = numpy.frombuffer(self.sessoes, dtype=numpy.uint32)
+                centavos = numpy.frombuffer(self.centavos, dtype=numpy.int64)
+                ids_sessao, grupo = numpy.unique(sessoes, return_inverse=True)
+                contagens = numpy.bincount(grupo)
+                somas = numpy.bincount(grupo, weights=centavos)
+                totais = {int(s): (int(c), int(round(r))) for s, c, r in zip(ids_sessao, contagens, somas)}
+                del sessoes, centavos
+                return totais
+
+            centavos = self.centavos
+            return {
+                sessao_id: (len(posicoes), sum(map(centavos.__getitem__, posicoes)))
+                for sessao_id, posicoes in self._porSessao.items()
+            }
+
+    def receita_centavos(self) -> int:
+        """Receita total do livro, em centavos."""
+        return sum(self.centavos)
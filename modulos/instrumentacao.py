@@ -0,0 +1,225 @@
+"""
+Contagem de chamadas, códigos de retorno e latência das operações.
+
+Desligada por padrão: `@instrumentado` devolve a própria função, então as
+operações não pagam nada por estarem marcadas. Com a variável de ambiente
+BILHETERIA_INSTRUMENTACAO=1 definida antes de iniciar o programa, cada
+operação marcada é envolvida por uma função que mede o tempo da chamada e
+acumula, por operação ("ingresso.cria_ingresso", "sessao.grava_dados_xml"...):
+
+  - o número de chamadas;
+  - quantas vezes cada código de padrao_retornos foi devolvido (pelo nome:
+    "SUCESSO", "JA_EXISTE"...; o primeiro item de uma tupla (codigo, valor)
+    conta como código, None conta como "NENHUM", qualquer outro valor como
+    "VALOR" e uma exceção como "EXCECAO"). Operações que devolvem contagens
+    ou outros valores, e não códigos, são marcadas com
+    `@instrumentado(codigos=False)`: nelas um int também conta como "VALOR";
+  - um histograma de latência em faixas de potências de 2 microssegundos
+    (< 1 µs, < 2 µs, < 4 µs, ... até >= 2^24 µs), de onde saem média e
+    percentis aproximados.
+
+estatisticas() devolve os números brutos (que junta() soma, como fazem as
+partições do servidor), resumo() os deixa legíveis e exporta_json() grava
+o resumo em JSON.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+
+import padrao_retornos
+
+ATIVA = os.environ.get("BILHETERIA_INSTRUMENTACAO", "") not in ("", "0")
+
+# Faixa i: latência abaixo de 2^i µs; a última junta tudo a partir de 2^(FAIXAS-2) µs
+FAIXAS = 26
+
+_NOMES_CODIGOS = {getattr(padrao_retornos, nome): nome for nome in padrao_retornos.MENSAGENS}
+
+
+class _Operacao:
+    """Números de uma operação; cada uma tem a sua trava, para as medições não disputarem uma só."""
+
+    __slots__ = ("chamadas", "total_ns", "max_ns", "codigos", "faixas", "trava")
+
+    def __init__(self):
+        self.trava = threading.Lock()
+        self.zera()
+
+    def zera(self) -> None:
+        self.chamadas = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        # Código devolvido (int de padrao_retornos ou rótulo) -> vezes
+        self.codigos = {}
+        self.faixas = [0] * FAIXAS
+
+    def registra(self, duracao_ns: int, codigo) -> None:
+        faixa = (duracao_ns // 1000).bit_length()
+        # acquire/release explícitos custam menos que o `with` neste caminho, chamado a cada operação
+        self.trava.acquire()
+        try:
+            self.chamadas += 1
+            self.total_ns += duracao_ns
+            if duracao_ns > self.max_ns:
+                self.max_ns = duracao_ns
+            self.codigos[codigo] = self.codigos.get(codigo, 0) + 1
+            self.faixas[faixa if faixa < FAIXAS else FAIXAS - 1] += 1
+        finally:
+            self.trava.release()
+
+    def copia(self) -> dict:
+        with self.trava:
+            return {"chamadas": self.chamadas, "total_ns": self.total_ns, "max_ns": self.max_ns,
+                    "codigos": {_nome_codigo(codigo): n for codigo, n in self.codigos.items()},
+                    "faixas": list(self.faixas)}
+
+
+# Nome da operação -> _Operacao, criada quando a função é envolvida
+_operacoes = {}
+_trava = threading.Lock()
+
+
+def _nome_operacao(funcao) -> str:
+    # "modulos.ingresso.ingresso" + "cria_ingresso" -> "ingresso.cria_ingresso"
+    return f"{funcao.__module__.rsplit('.', 1)[-1]}.{funcao.__name__}"
+
+
+def _nome_codigo(codigo) -> str:
+    if type(codigo) is int:
+        return _NOMES_CODIGOS.get(codigo, str(codigo))
+    return codigo
+
+
+def envolve(funcao, nome: str | None = None, codigos: bool = True):
+    """
+    Versão medida de `funcao`, mesmo com a instrumentação desligada. Com
+    codigos=False o retorno nunca é lido como código de padrao_retornos.
+    """
+    nome = nome or _nome_operacao(funcao)
+    with _trava:
+        operacao = _operacoes.get(nome) or _operacoes.setdefault(nome, _Operacao())
+    registra = operacao.registra
+    relogio = time.perf_counter_ns
+
+    @functools.wraps(funcao)
+    def medida(*args, **kwargs):
+        inicio = relogio()
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException:
+            registra(relogio() - inicio, "EXCECAO")
+            raise
+        duracao = relogio() - inicio
+        # Guarda o próprio int; o nome do código só é montado na leitura
+        codigo = resultado[0] if type(resultado) is tuple and resultado else resultado
+        registra(duracao, codigo if type(codigo) is int else "NENHUM" if codigo is None else "VALOR")
+        return resultado
+
+    @functools.wraps(funcao)
+    def medida_valor(*args, **kwargs):
+        inicio = relogio()
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException:
+            registra(relogio() - inicio, "EXCECAO")
+            raise
+        registra(relogio() - inicio, "NENHUM" if resultado is None else "VALOR")
+        return resultado
+
+    return medida if codigos else medida_valor
+
+
+def instrumentado(funcao=None, *, codigos: bool = True):
+    """
+    Marca uma operação para ser medida quando a instrumentação estiver ativa.
+    Usado como `@instrumentado(codigos=False)` nas operações que devolvem
+    contagens ou outros valores em vez de códigos de padrao_retornos.
+    """
+    if funcao is None:
+        return functools.partial(instrumentado, codigos=codigos)
+    return envolve(funcao, codigos=codigos) if ATIVA else funcao
+
+
+def zera() -> None:
+    with _trava:
+        operacoes = list(_operacoes.values())
+    for operacao in operacoes:
+        with operacao.trava:
+            operacao.zera()
+
+
+def estatisticas() -> dict:
+    """Cópia dos números brutos de cada operação já chamada."""
+    with _trava:
+        operacoes = list(_operacoes.items())
+    copias = {nome: operacao.copia() for nome, operacao in operacoes}
+    return {nome: copia for nome, copia in copias.items() if copia["chamadas"]}
+
+
+def junta(*varias: dict) -> dict:
+    """Soma estatísticas brutas de vários processos."""
+    total = {}
+    for estatistica in varias:
+        for nome, dados in estatistica.items():
+            atual = total.get(nome)
+            if atual is None:
+                total[nome] = {**dados, "codigos": dict(dados["codigos"]), "faixas": list(dados["faixas"])}
+                continue
+            atual["chamadas"] += dados["chamadas"]
+            atual["total_ns"] += dados["total_ns"]
+            atual["max_ns"] = max(atual["max_ns"], dados["max_ns"])
+            for codigo, quantidade in dados["codigos"].items():
+                atual["codigos"][codigo] = atual["codigos"].get(codigo, 0) + quantidade
+            atual["faixas"] = [a + b for a, b in zip(atual["faixas"], dados["faixas"])]
+    return total
+
+
+def _rotulo_faixa(faixa: int) -> str:
+    return f">={2 ** (faixa - 1)}us" if faixa == FAIXAS - 1 else f"<{2 ** faixa}us"
+
+
+def _percentil_us(faixas: list[int], fracao: float) -> int:
+    """Limite superior da faixa onde cai o percentil (o limite inferior, na última faixa)."""
+    alvo = fracao * sum(faixas)
+    acumulado = 0
+    for faixa, quantidade in enumerate(faixas):
+        acumulado += quantidade
+        if quantidade and acumulado >= alvo:
+            return 2 ** (faixa - 1) if faixa == FAIXAS - 1 else 2 ** faixa
+    return 0
+
+
+def resumo(brutas: dict | None = None) -> dict:
+    """
+    Por operação (em ordem alfabética): chamadas, códigos, tempo total,
+    média, máximo, percentis 50/95/99 (pelo histograma) e as faixas não vazias.
+    """
+    brutas = estatisticas() if brutas is None else brutas
+    legivel = {}
+    for nome in sorted(brutas):
+        dados = brutas[nome]
+        legivel[nome] = {
+            "chamadas": dados["chamadas"],
+            "codigos": dict(sorted(dados["codigos"].items())),
+            "total_ms": round(dados["total_ns"] / 1e6, 3),
+            "media_us": round(dados["total_ns"] / dados["chamadas"] / 1e3, 2) if dados["chamadas"] else 0.0,
+            "max_us": round(dados["max_ns"] / 1e3, 2),
+            "p50_us": _percentil_us(dados["faixas"], 0.50),
+            "p95_us": _percentil_us(dados["faixas"], 0.95),
+            "p99_us": _percentil_us(dados["faixas"], 0.99),
+            "histograma": {_rotulo_faixa(faixa): quantidade
+                           for faixa, quantidade in enumerate(dados["faixas"]) if quantidade},
+        }
+    return legivel
+
+
+def exporta_json(caminho: str | None = None, brutas: dict | None = None) -> str:
+    """Resumo em JSON; também o grava em `caminho`, se informado."""
+    texto = json.dumps({"ativa": ATIVA, "operacoes": resumo(brutas)}, indent=2, ensure_ascii=False)
+    if caminho is not None:
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto + "\n")
+    return texto
@@ -0,0 +1,130 @@
+import unittest
+import sys
+import os
+import json
+import subprocess
+import tempfile
+from unittest.mock import patch
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TEST_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import padrao_retornos
+import modulos.instrumentacao as Instrumentacao
+
+
+class TestInstrumentacao(unittest.TestCase):
+
+    def setUp(self):
+        Instrumentacao.zera()
+
+    def tearDown(self):
+        Instrumentacao.zera()
+
+    def test_01_conta_chamadas_e_codigos(self):
+        print("Instrumentação 01: Chamadas, códigos de retorno e exceções por operação")
+
+        def operacao(valor):
+            if valor == "erro":
+                raise ValueError(valor)
+            return valor
+
+        medida = Instrumentacao.envolve(operacao, "teste.operacao")
+        self.assertIs(medida.__wrapped__, operacao)
+        for valor in (padrao_retornos.SUCESSO, padrao_retornos.SUCESSO, padrao_retornos.JA_EXISTE,
+                      (padrao_retornos.CONFLITO, None), None, {"id": 1}, 42):
+            self.assertEqual(medida(valor), valor)
+        with self.assertRaises(ValueError):
+            medida("erro")
+
+        dados = Instrumentacao.estatisticas()["teste.operacao"]
+        self.assertEqual(dados["chamadas"], 8)
+        self.assertEqual(dados["codigos"], {"SUCESSO": 2, "JA_EXISTE": 1, "CONFLITO": 1, "NENHUM": 1,
+                                            "VALOR": 1, "42": 1, "EXCECAO": 1})
+        self.assertEqual(sum(dados["faixas"]), 8)
+        self.assertGreaterEqual(dados["total_ns"], dados["max_ns"])
+
+        Instrumentacao.zera()
+        self.assertEqual(Instrumentacao.estatisticas(), {})
+
+    def test_02_desligada_nao_envolve(self):
+        print("Instrumentação 02: Desligada, a operação marcada é a própria função")
+
+        def operacao():
+            return padrao_retornos.SUCESSO
+
+        with patch.object(Instrumentacao, "ATIVA", False):
+            self.assertIs(Instrumentacao.instrumentado(operacao), operacao)
+        with patch.object(Instrumentacao, "ATIVA", True):
+            self.assertIs(Instrumentacao.instrumentado(operacao).__wrapped__, operacao)
+
+    def test_03_junta_resume_e_exporta(self):
+        print("Instrumentação 03: Estatísticas somadas, percentis pelo histograma e JSON")
+        faixas = [0] * Instrumentacao.FAIXAS
+        faixas[3] = 90   # abaixo de 8 µs
+        faixas[10] = 10  # abaixo de 1024 µs
+        processo = {"op": {"chamadas": 100, "total_ns": 2_000_000, "max_ns": 900_000,
+                           "codigos": {"SUCESSO": 99, "CONFLITO": 1}, "faixas": faixas}}
+        outro = {"op": {"chamadas": 1, "total_ns": 20_000, "max_ns": 20_000,
+                        "codigos": {"SUCESSO": 1}, "faixas": [0] * 5 + [1] + [0] * (Instrumentacao.FAIXAS - 6)}}
+
+        somadas = Instrumentacao.junta(processo, outro)
+        self.assertEqual(somadas["op"]["chamadas"], 101)
+        self.assertEqual(somadas["op"]["codigos"], {"SUCESSO": 100, "CONFLITO": 1})
+        self.assertEqual(processo["op"]["chamadas"], 100)
+
+        resumo = Instrumentacao.resumo(somadas)["op"]
+        self.assertEqual((resumo["p50_us"], resumo["p95_us"], resumo["p99_us"]), (8, 1024, 1024))
+        self.assertEqual(resumo["media_us"], 20.0)
+        self.assertEqual(resumo["max_us"], 900.0)
+        self.assertEqual(resumo["histograma"], {"<8us": 90, "<32us": 1, "<1024us": 10})
+
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "instrumentacao.json")
+            Instrumentacao.exporta_json(caminho, somadas)
+            with open(caminho, encoding="utf-8") as arquivo:
+                self.assertEqual(json.load(arquivo)["operacoes"]["op"]["chamadas"], 101)
+
+    def test_04_variavel_de_ambiente_liga_os_modulos(self):
+        print("Instrumentação 04: Com BILHETERIA_INSTRUMENTACAO=1 as operações dos módulos são medidas")
+        programa = (
+            "import json, modulos.ingresso.ingresso as I, modulos.sessao.sessao as S, modulos.instrumentacao as M\n"
+            "import modulos.monitoramento.monitoramento as Mo\n"
+            "assert I.reserva_assento is S.reserva_assento and hasattr(S.reserva_assento, '__wrapped__')\n"
+            "I.cria_ingresso(0, 1, 1, 10.0)\n"
+            "Mo.conta_ingressos([{}])\n"
+            "print(json.dumps(M.resumo()))\n"
+        )
+        ambiente = {**os.environ, "BILHETERIA_INSTRUMENTACAO": "1"}
+        saida = subprocess.run([sys.executable, "-c", programa], cwd=ROOT_DIR, env=ambiente,
+                               capture_output=True, text=True, check=True).stdout
+        resumo = json.loads(saida)
+        self.assertEqual(resumo["ingresso.cria_ingresso"]["chamadas"], 1)
+        self.assertEqual(resumo["ingresso.cria_ingresso"]["codigos"], {"PARAMETRO_INVALIDO": 1})
+        # conta_ingressos devolve 0 ingressos, não SUCESSO
+        self.assertEqual(resumo["monitoramento.conta_ingressos"]["codigos"], {"VALOR": 1})
+
+    def test_05_operacao_de_valores_nao_conta_codigos(self):
+        print("Instrumentação 05: Com codigos=False, contagens inteiras contam como valores")
+
+        def conta(valor):
+            return valor
+
+        medida = Instrumentacao.envolve(conta, "teste.conta", codigos=False)
+        for valor in (1, -1, 0, None, (padrao_retornos.CONFLITO, None)):
+            self.assertEqual(medida(valor), valor)
+
+        dados = Instrumentacao.estatisticas()["teste.conta"]
+        self.assertEqual(dados["chamadas"], 5)
+        self.assertEqual(dados["codigos"], {"VALOR": 4, "NENHUM": 1})
+
+        with patch.object(Instrumentacao, "ATIVA", False):
+            self.assertIs(Instrumentacao.instrumentado(codigos=False)(conta), conta)
+        with patch.object(Instrumentacao, "ATIVA", True):
+            self.assertIs(Instrumentacao.instrumentado(codigos=False)(conta).__wrapped__, conta)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1 +1,208 @@
+from modulos.filme.filme import busca_filme
+from modulos.sessao.sessao import busca_sessao
+from modulos.registros import Registro
+from modulos.paginacao import VisaoLista
+from modulos.instrumentacao import instrumentado
+from modulos.ingresso.livro_ingressos import LivroIngressos
+import padrao_retornos
+import threading
 
+__all__ = [
+    "registra_venda",
+    "zera_contadores",
+    "recalcula_contadores",
+    "receita_e_ingressos",
+    "filme_mais_assistido",
+    "receita_e_ocupacao_sessao",
+    "conta_ingressos"
+]
+
+# Contadores mantidos a cada venda (ver ingresso.cria_ingresso), para que os
+# relatórios não precisem percorrer listaIngressos nem listaSessoes.
+ingressosPorSessao = {}
+receitaPorSessao = {}
+ingressosPorFilme = {}
+receitaPorFilme = {}
+totalIngressos = 0
+receitaTotal = 0.0
+
+# Vendas de terminais diferentes atualizam os contadores em paralelo
+_travaContadores = threading.Lock()
+
+
+def registra_venda(sessao_id: int, filme_id: int | None, preco: float) -> None:
+    """
+    Acumula um ingresso vendido nos contadores por sessão, por filme e globais.
+    """
+    global totalIngressos, receitaTotal
+
+    with _travaContadores:
+        ingressosPorSessao[sessao_id] = ingressosPorSessao.get(sessao_id, 0) + 1
+        receitaPorSessao[sessao_id] = receitaPorSessao.get(sessao_id, 0.0) + preco
+
+        if filme_id is not None:
+            ingressosPorFilme[filme_id] = ingressosPorFilme.get(filme_id, 0) + 1
+            receitaPorFilme[filme_id] = receitaPorFilme.get(filme_id, 0.0) + preco
+
+        totalIngressos += 1
+        receitaTotal += preco
+
+
+def obtem_contadores() -> dict:
+    """Cópia de todos os contadores (usada para somar os de vários processos)."""
+    with _travaContadores:
+        return {
+            "ingressosPorSessao": dict(ingressosPorSessao),
+            "receitaPorSessao": dict(receitaPorSessao),
+            "ingressosPorFilme": dict(ingressosPorFilme),
+            "receitaPorFilme": dict(receitaPorFilme),
+            "totalIngressos": totalIngressos,
+            "receitaTotal": receitaTotal,
+        }
+
+
+def zera_contadores() -> None:
+    """Zera todos os contadores de vendas."""
+    global totalIngressos, receitaTotal
+
+    with _travaContadores:
+        ingressosPorSessao.clear()
+        receitaPorSessao.clear()
+        ingressosPorFilme.clear()
+        receitaPorFilme.clear()
+        totalIngressos = 0
+        receitaTotal = 0.0
+
+
+def recalcula_contadores(ingressos: list[dict] | LivroIngressos) -> None:
+    """
+    Reconstrói os contadores a partir de uma lista de ingressos, em uma
+    única passada (usado ao recarregar os dados). Para o livro de ingressos,
+    usa as somas por sessão feitas sobre as colunas, com a receita em
+    centavos, e busca cada sessão uma vez só.
+    """
+    global totalIngressos, receitaTotal
+
+    zera_contadores()
+
+    if isinstance(ingressos, LivroIngressos):
+        # Soma em centavos e só converte no fim, sem acumular arredondamentos
+        centavosPorFilme = {}
+        with _travaContadores:
+            for sessao_id, (quantidade, centavos) in ingressos.totais_por_sessao().items():
+                ingressosPorSessao[sessao_id] = quantidade
+                receitaPorSessao[sessao_id] = centavos / 100
+                totalIngressos += quantidade
+                receitaTotal += centavos
+
+                sessao = busca_sessao(sessao_id)
+                filme_id = sessao.get("filme_id") if sessao else None
+                if filme_id is not None:
+                    ingressosPorFilme[filme_id] = ingressosPorFilme.get(filme_id, 0) + quantidade
+                    centavosPorFilme[filme_id] = centavosPorFilme.get(filme_id, 0) + centavos
+
+            for filme_id, centavos in centavosPorFilme.items():
+                receitaPorFilme[filme_id] = centavos / 100
+            receitaTotal = receitaTotal / 100
+        return
+
+    for ingresso in ingressos:
+        sessao = busca_sessao(ingresso["sessao_id"])
+        filme_id = sessao.get("filme_id") if sessao else None
+        registra_venda(ingresso["sessao_id"], filme_id, ingresso["preco"])
+
+
+@instrumentado
+def receita_e_ingressos(filme_id: int) -> dict | None:
+    """
+    Retorna a quantidade de ingressos vendidos e a receita de um filme.
+
+    Retorno:
+      dict  - {"ingressos_vendidos": int, "receita": float}
+      None  - se o id for inválido ou o filme não existir
+    """
+
+    if not isinstance(filme_id, int) or filme_id <= 0:
+        return None
+
+    if not isinstance(busca_filme(filme_id), (dict, Registro)):
+        return None
+
+    return {
+        "ingressos_vendidos": ingressosPorFilme.get(filme_id, 0),
+        "receita": receitaPorFilme.get(filme_id, 0.0)
+    }
+
+
+@instrumentado
+def filme_mais_assistido(todas_sessoes: list) -> dict | None:
+    """
+    Retorna o filme com mais ingressos vendidos.
+
+    Retorno:
+      dict  - {"filme_id": int, "titulo_filme": str, "quantidade_ingressos": int}
+      None  - se não houver sessões ou nenhum ingresso vendido
+    """
+
+    if not isinstance(todas_sessoes, (list, VisaoLista)) or not todas_sessoes:
+        return None
+
+    if not ingressosPorFilme:
+        return None
+
+    filme_id = max(ingressosPorFilme, key=ingressosPorFilme.get)
+
+    filme = busca_filme(filme_id)
+    titulo = filme["titulo"] if isinstance(filme, (dict, Registro)) else f"Filme #{filme_id}"
+
+    return {
+        "filme_id": filme_id,
+        "titulo_filme": titulo,
+        "quantidade_ingressos": ingressosPorFilme[filme_id]
+    }
+
+
+@instrumentado
+def receita_e_ocupacao_sessao(sessao_id: int) -> dict | None:
+    """
+    Retorna a receita e a taxa de ocupação de uma sessão.
+
+    Retorno:
+      dict  - {"receita": float, "ingressos_vendidos": int, "ocupacao_porcentagem": float}
+      None  - se o id for inválido ou a sessão não existir
+    """
+
+    if not isinstance(sessao_id, int) or sessao_id <= 0:
+        return None
+
+    sessao = busca_sessao(sessao_id)
+    if sessao is None:
+        return None
+
+    ocupados = len(sessao["assentos_ocupados"])
+
+    return {
+        "receita": receitaPorSessao.get(sessao_id, 0.0),
+        "ingressos_vendidos": ingressosPorSessao.get(sessao_id, 0),
+        "ocupacao_porcentagem": ocupados / sessao["capacidade"] * 100
+    }
+
+
+@instrumentado(codigos=False)
+def conta_ingressos(todas_sessoes: list) -> int | None:
+    """
+    Retorna o total de ingressos vendidos em todas as sessões.
+
+    Retorno:
+      int   - total de ingressos
+      None  - se não houver sessões cadastradas
+     -1     - se o parâmetro for inválido
+    """
+
+    if not isinstance(todas_sessoes, (list, VisaoLista)):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    if not todas_sessoes:
+        return None
+
+    return totalIngressos
@@ -1 +1,157 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
 
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(os.path.dirname(TEST_DIR))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import padrao_retornos
+import modulos.monitoramento.monitoramento as modulo_monitoramento
+from modulos.ingresso.livro_ingressos import LivroIngressos
+
+from modulos.monitoramento.monitoramento import (
+    registra_venda,
+    recalcula_contadores,
+    receita_e_ingressos,
+    filme_mais_assistido,
+    receita_e_ocupacao_sessao,
+    conta_ingressos
+)
+
+
+def filme_fake(filme_id):
+    filmes = {1: {"id": 1, "titulo": "Matrix"}, 2: {"id": 2, "titulo": "Toy Story"}}
+    return filmes.get(filme_id)
+
+
+def sessao_fake(sessao_id):
+    sessoes = {
+        1: {"id": 1, "filme_id": 1, "capacidade": 4, "assentos_ocupados": [1, 2]},
+        2: {"id": 2, "filme_id": 2, "capacidade": 10, "assentos_ocupados": [5]},
+    }
+    return sessoes.get(sessao_id)
+
+
+@patch("modulos.monitoramento.monitoramento.busca_filme", filme_fake)
+@patch("modulos.monitoramento.monitoramento.busca_sessao", sessao_fake)
+class TestMonitoramento(unittest.TestCase):
+
+    def setUp(self):
+        """Zera os contadores antes de cada teste."""
+        modulo_monitoramento.zera_contadores()
+
+    # -------------------------------------------------------------------
+    # TESTES receita_e_ingressos
+    # -------------------------------------------------------------------
+
+    def test_01_receita_e_ingressos(self):
+        print("\nTeste 01: Receita e ingressos de um filme")
+        registra_venda(1, 1, 20.0)
+        registra_venda(1, 1, 25.0)
+        registra_venda(2, 2, 30.0)
+
+        dados = receita_e_ingressos(1)
+        self.assertEqual(dados["ingressos_vendidos"], 2)
+        self.assertAlmostEqual(dados["receita"], 45.0)
+
+    def test_02_receita_filme_sem_vendas(self):
+        print("Teste 02: Filme existente sem vendas")
+        dados = receita_e_ingressos(2)
+        self.assertEqual(dados, {"ingressos_vendidos": 0, "receita": 0.0})
+
+    def test_03_receita_filme_inexistente(self):
+        print("Teste 03: Filme inexistente ou id inválido")
+        self.assertIsNone(receita_e_ingressos(99))
+        self.assertIsNone(receita_e_ingressos("abc"))
+
+    # -------------------------------------------------------------------
+    # TESTES filme_mais_assistido
+    # -------------------------------------------------------------------
+
+    def test_04_filme_mais_assistido(self):
+        print("Teste 04: Filme mais assistido")
+        registra_venda(1, 1, 20.0)
+        registra_venda(2, 2, 20.0)
+        registra_venda(2, 2, 20.0)
+
+        resultado = filme_mais_assistido([sessao_fake(1), sessao_fake(2)])
+        self.assertEqual(resultado["titulo_filme"], "Toy Story")
+        self.assertEqual(resultado["quantidade_ingressos"], 2)
+
+    def test_05_filme_mais_assistido_sem_dados(self):
+        print("Teste 05: Sem sessões ou sem ingressos")
+        self.assertIsNone(filme_mais_assistido([]))
+        self.assertIsNone(filme_mais_assistido([sessao_fake(1)]))
+
+    # -------------------------------------------------------------------
+    # TESTES receita_e_ocupacao_sessao
+    # -------------------------------------------------------------------
+
+    def test_06_receita_e_ocupacao_sessao(self):
+        print("Teste 06: Receita e ocupação de uma sessão")
+        registra_venda(1, 1, 20.0)
+        registra_venda(1, 1, 20.0)
+
+        dados = receita_e_ocupacao_sessao(1)
+        self.assertAlmostEqual(dados["receita"], 40.0)
+        self.assertAlmostEqual(dados["ocupacao_porcentagem"], 50.0)
+
+    def test_07_ocupacao_sessao_inexistente(self):
+        print("Teste 07: Sessão inexistente")
+        self.assertIsNone(receita_e_ocupacao_sessao(99))
+        self.assertIsNone(receita_e_ocupacao_sessao(-1))
+
+    # -------------------------------------------------------------------
+    # TESTES conta_ingressos
+    # -------------------------------------------------------------------
+
+    def test_08_conta_ingressos(self):
+        print("Teste 08: Total de ingressos")
+        registra_venda(1, 1, 20.0)
+        registra_venda(2, 2, 20.0)
+
+        self.assertEqual(conta_ingressos([sessao_fake(1), sessao_fake(2)]), 2)
+
+    def test_09_conta_ingressos_sem_sessoes_ou_invalido(self):
+        print("Teste 09: Sem sessões ou parâmetro inválido")
+        self.assertIsNone(conta_ingressos([]))
+        self.assertEqual(conta_ingressos(None), padrao_retornos.PARAMETRO_INVALIDO)
+
+    # -------------------------------------------------------------------
+    # TESTES recalcula_contadores
+    # -------------------------------------------------------------------
+
+    def test_10_recalcula_contadores(self):
+        print("Teste 10: Recalcular contadores a partir dos ingressos")
+        registra_venda(2, 2, 999.0)
+
+        recalcula_contadores([
+            {"id": 1, "cliente_id": 1, "sessao_id": 1, "numero_assento": 1, "preco": 20.0},
+            {"id": 2, "cliente_id": 1, "sessao_id": 1, "numero_assento": 2, "preco": 30.0},
+        ])
+
+        self.assertEqual(receita_e_ingressos(1)["ingressos_vendidos"], 2)
+        self.assertEqual(receita_e_ingressos(2)["ingressos_vendidos"], 0)
+        self.assertEqual(modulo_monitoramento.totalIngressos, 2)
+
+    def test_11_recalcula_contadores_livro(self):
+        print("Teste 11: Recalcular contadores pelas somas do livro de ingressos")
+        livro = LivroIngressos()
+        livro.anexa(1, 1, 1, 1, 20.10)
+        livro.anexa(2, 1, 2, 1, 0.20)
+        livro.anexa(3, 2, 1, 2, 30.05)
+
+        recalcula_contadores(livro)
+
+        self.assertEqual(receita_e_ingressos(1), {"ingressos_vendidos": 2, "receita": 50.15})
+        self.assertEqual(receita_e_ingressos(2), {"ingressos_vendidos": 1, "receita": 0.2})
+        self.assertEqual(receita_e_ocupacao_sessao(1)["receita"], 50.15)
+        self.assertEqual(modulo_monitoramento.totalIngressos, 3)
+        self.assertEqual(modulo_monitoramento.receitaTotal, 50.35)
+
+
+if __name__ == "__main__":
+    unittest.main()
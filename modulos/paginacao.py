@@ -0,0 +1,94 @@
+"""
+Listagens por partes, sem copiar as listas dos módulos.
+
+Copiar a lista inteira a cada listagem custa uma lista do tamanho do
+cadastro (um milhão de clientes, um milhão de posições) só para exibir as
+primeiras linhas. Os módulos oferecem, sobre as suas listas em memória:
+
+  - itera(lista, inicio, limite): gerador a partir da posição `inicio`,
+    com no máximo `limite` registros, lendo LOTE registros por vez;
+  - pagina(lista, tamanho, cursor): até `tamanho` registros com id maior
+    que `cursor` e o cursor da página seguinte (o id do último registro
+    da página, ou None no fim). Como o cursor é um id e não uma posição,
+    incluir ou remover registros entre uma página e outra não faz a
+    próxima pular nem repetir registros. A lista precisa estar em ordem
+    crescente de id (a busca do cursor é binária): quem acrescenta registros
+    com ids alocados em paralelo deve alocar e anexar sob a mesma trava;
+  - VisaoLista: a própria lista, só para leitura, quando quem chama só
+    percorre o resultado na hora.
+"""
+
+import bisect
+from collections.abc import Sequence
+
+# Registros lidos da lista por vez nos geradores
+LOTE = 256
+
+
+def _id(registro) -> int:
+    return registro["id"]
+
+
+class VisaoLista(Sequence):
+    """Leitura de uma lista sem copiá-la: len, índice, fatia, iteração e comparação."""
+
+    __slots__ = ("_lista",)
+
+    def __init__(self, lista):
+        self._lista = lista
+
+    def __len__(self) -> int:
+        return len(self._lista)
+
+    def __getitem__(self, posicao):
+        # Uma fatia é uma lista nova, do tamanho da fatia
+        return self._lista[posicao]
+
+    def __iter__(self):
+        return iter(self._lista)
+
+    def __eq__(self, outra) -> bool:
+        if isinstance(outra, VisaoLista):
+            outra = outra._lista
+        if not isinstance(outra, Sequence) or isinstance(outra, (str, bytes)):
+            return NotImplemented
+        return len(self._lista) == len(outra) and all(a == b for a, b in zip(self._lista, outra))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"VisaoLista({len(self._lista)} registros)"
+
+
+def itera(lista, inicio: int = 0, limite: int | None = None):
+    """Gera os registros de `lista` a partir da posição `inicio`, no máximo `limite` deles."""
+    posicao = inicio
+    restantes = limite
+    while restantes is None or restantes > 0:
+        lote = lista[posicao:posicao + (LOTE if restantes is None else min(LOTE, restantes))]
+        if not lote:
+            return
+        yield from lote
+        posicao += len(lote)
+        if restantes is not None:
+            restantes -= len(lote)
+
+
+def pagina(lista, tamanho: int, cursor: int | None = None) -> dict:
+    """
+    Até `tamanho` registros de `lista` (em ordem de id) depois do id `cursor`.
+    Retorna {"registros": [...], "proximo_cursor": id do último registro
+    ou None se não há mais nada}.
+    """
+    inicio = 0 if cursor is None else bisect.bisect_right(lista, cursor, key=_id)
+    registros = lista[inicio:inicio + tamanho]
+    fim = inicio + len(registros) >= len(lista)
+    return {"registros": registros, "proximo_cursor": None if fim or not registros else _id(registros[-1])}
+
+
+def parametros_validos(inicio=0, limite=None, tamanho=1, cursor=None) -> bool:
+    """Confere os parâmetros de itera/pagina recebidos pelos módulos."""
+    return (isinstance(inicio, int) and inicio >= 0 and
+            (limite is None or (isinstance(limite, int) and limite >= 0)) and
+            isinstance(tamanho, int) and tamanho > 0 and
+            (cursor is None or isinstance(cursor, int)))
@@ -0,0 +1,500 @@
+"""
+Modo particionado: vendas em vários processos, um por partição de salas.
+
+As sessões são divididas entre `total` processos de venda pela sala
+(partição = sala % total). Cada processo tem as suas sessões, os mapas de
+assentos delas e os ingressos vendidos para elas, com arquivos próprios em
+PASTA/particoes/K/ (sessoes.xml, sessoes.journal, ingressos.log), então
+vendas de salas diferentes rodam em núcleos diferentes, sem disputar o GIL.
+Filmes e clientes continuam com o processo principal (o roteador), nos
+arquivos de PASTA; cada processo de venda os lê ao iniciar, e os cadastros
+e remoções de clientes feitos pelo roteador são repassados a todos.
+
+O Roteador encaminha cada operação ao processo dono da sala ou da sessão
+e junta as respostas de todos para lista_sessoes, os ingressos de um
+cliente e os relatórios. Os ids novos de sessões e ingressos de cada
+processo seguem passo_ids/resto_ids dos módulos, e nunca colidem.
+
+divide_dados() separa os arquivos de PASTA nas partições (feito ao iniciar,
+se ainda não estiverem divididas naquele número) e junta_dados() os reúne
+de volta, para usar a pasta sem partições.
+"""
+
+import modulos.cliente.cliente as Cliente
+import modulos.filme.filme as Filme
+import modulos.ingresso.ingresso as Ingresso
+import modulos.monitoramento.monitoramento as Monitoramento
+import modulos.sessao.sessao as Sessao
+import modulos.instrumentacao as Instrumentacao
+from modulos.armazenamento.gravacao_adiada import arquivo_atomico
+from modulos.registros import Registro
+import padrao_retornos
+import heapq
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import threading
+
+__all__ = [
+    "Roteador",
+    "divide_dados",
+    "junta_dados",
+    "le_manifesto"
+]
+
+DIRETORIO = 'particoes'
+MANIFESTO = 'particoes.json'
+
+
+def _pasta_particao(pasta: str, indice: int) -> str:
+    return os.path.join(pasta, DIRETORIO, str(indice))
+
+
+def le_manifesto(pasta: str) -> dict | None:
+    """Configuração das partições de `pasta`, ou None se ela não está dividida."""
+    try:
+        with open(os.path.join(pasta, DIRETORIO, MANIFESTO)) as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return None
+
+
+def _remove_se_existe(caminho: str) -> None:
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+
+def divide_dados(pasta: str, total: int) -> dict:
+    """
+    Separa as sessões (com os assentos e o journal) e os ingressos de
+    `pasta` em `total` partições por sala. Os arquivos originais de sessões
+    e ingressos são removidos depois que as partições estão gravadas.
+    Retorna o manifesto gravado.
+    """
+    Sessao.carrega(pasta)
+    Ingresso.carrega(pasta)
+    sessoes = Sessao.obtem_todas_sessoes()
+    layouts = dict(Sessao.layoutSalas)
+    ingressos = Ingresso.obtem_todos_ingressos()
+    # Inclui ids de sessões já apagadas, que também não podem ser reusados
+    ultimoIdSessao = Sessao.ultimo_id_sessao()
+
+    particaoDaSessao = {sessao.id: sessao.sala % total for sessao in sessoes}
+    for indice in range(total):
+        destino = _pasta_particao(pasta, indice)
+        os.makedirs(destino, exist_ok=True)
+        _remove_se_existe(os.path.join(destino, 'sessoes.journal'))
+        Sessao.exporta_xml(os.path.join(destino, 'sessoes.xml'),
+                           [s for s in sessoes if particaoDaSessao[s.id] == indice],
+                           {sala: largura for sala, largura in layouts.items() if sala % total == indice},
+                           ultimo_id=ultimoIdSessao)
+        # Ingressos de sessões que não existem mais ficam com a partição 0
+        Ingresso.exporta_log(os.path.join(destino, 'ingressos.log'),
+                             [i for i in ingressos if particaoDaSessao.get(i.sessao_id, 0) == indice])
+
+    manifesto = {
+        "total": total,
+        # Ids novos de cada partição ficam acima de todos os já existentes
+        "id_minimo_sessao": ultimoIdSessao,
+        "id_minimo_ingresso": max((i.id for i in ingressos), default=0),
+    }
+    with arquivo_atomico(os.path.join(pasta, DIRETORIO, MANIFESTO)) as arquivo:
+        json.dump(manifesto, arquivo)
+
+    for nome in ('sessoes.xml', 'sessoes.journal', 'ingressos.log'):
+        _remove_se_existe(os.path.join(pasta, nome))
+    Sessao.carrega(pasta)
+    Ingresso.carrega(pasta)
+    return manifesto
+
+
+def junta_dados(pasta: str) -> None:
+    """
+    Reúne as partições de `pasta` de volta em sessoes.xml e ingressos.log
+    e apaga o diretório das partições. Não faz nada se `pasta` não está dividida.
+    """
+    manifesto = le_manifesto(pasta)
+    if manifesto is None:
+        return
+
+    sessoes = []
+    layouts = {}
+    ingressos = []
+    ultimoIdSessao = manifesto["id_minimo_sessao"]
+    for indice in range(manifesto["total"]):
+        origem = _pasta_particao(pasta, indice)
+        Sessao.carrega(origem)
+        Ingresso.carrega(origem)
+        sessoes.extend(Sessao.obtem_todas_sessoes())
+        layouts.update(Sessao.layoutSalas)
+        ultimoIdSessao = max(ultimoIdSessao, Sessao.ultimo_id_sessao())
+        ingressos.extend(Ingresso.obtem_todos_ingressos())
+
+    sessoes.sort(key=lambda sessao: sessao.id)
+    ingressos.sort(key=lambda ingresso: ingresso.id)
+    Sessao.exporta_xml(os.path.join(pasta, 'sessoes.xml'), sessoes, layouts, ultimo_id=ultimoIdSessao)
+    _remove_se_existe(os.path.join(pasta, 'sessoes.journal'))
+    Ingresso.exporta_log(os.path.join(pasta, 'ingressos.log'), ingressos)
+
+    # Uma queda antes daqui só faz a junção ser repetida no próximo início
+    os.remove(os.path.join(pasta, DIRETORIO, MANIFESTO))
+    shutil.rmtree(os.path.join(pasta, DIRETORIO))
+    Sessao.carrega(pasta)
+    Ingresso.carrega(pasta)
+
+
+# -----------------------------------------------------------------------
+# Processo de venda
+# -----------------------------------------------------------------------
+
+def _cria_sessao(**parametros) -> tuple:
+    """cria_sessao que também devolve o id criado, para o roteador saber o dono."""
+    codigo = Sessao.cria_sessao(**parametros)
+    if codigo != padrao_retornos.SUCESSO:
+        return codigo, None
+    return codigo, Sessao.obtem_todas_sessoes()[-1].id
+
+
+# Operações aceitas pelos processos de venda (atendidas uma por vez)
+_OPERACOES_PARTICAO = {
+    "cria_sessao": _cria_sessao,
+    "apaga_sessao": Sessao.apaga_sessao,
+    "busca_sessao": Sessao.busca_sessao,
+    "assentos_disponiveis": Sessao.assentos_disponiveis,
+    "bloqueia_assentos": Sessao.bloqueia_assentos,
+    "busca_bloqueio": Sessao.busca_bloqueio,
+    "libera_bloqueio": Sessao.libera_bloqueio,
+    "compra_bloqueio": Ingresso.compra_bloqueio,
+    "define_layout_sala": Sessao.define_layout_sala,
+    "melhores_assentos": Sessao.melhores_assentos,
+    "lista_sessoes": Sessao.lista_sessoes,
+    "pagina_sessoes": Sessao.pagina_sessoes,
+    "pagina_ingressos": Ingresso.pagina_ingressos,
+    "ids_sessoes": lambda: [sessao.id for sessao in Sessao.visao_sessoes()],
+    "cria_ingresso": Ingresso.cria_ingresso,
+    "cria_ingressos_lote": Ingresso.cria_ingressos_lote,
+    "lista_ingressos_sessao": Ingresso.lista_ingressos_sessao,
+    "lista_ingressos_cliente": Ingresso.lista_ingressos_cliente,
+    "receita_e_ocupacao_sessao": Monitoramento.receita_e_ocupacao_sessao,
+    "contadores": Monitoramento.obtem_contadores,
+    "instrumentacao": Instrumentacao.estatisticas,
+    "aplica_cliente": Cliente.aplica_registro,
+}
+
+
+def _executa_particao(conexao, pasta: str, indice: int, manifesto: dict) -> None:
+    """Laço de um processo de venda: recebe (operacao, parametros) e responde (ok, resultado)."""
+    # Ctrl+C chega a todo o grupo de processos; quem encerra os processos de venda é o roteador
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    total = manifesto["total"]
+    Filme.carrega(pasta)
+    Cliente.carrega(pasta)
+    Sessao.carrega(_pasta_particao(pasta, indice))
+    Ingresso.carrega(_pasta_particao(pasta, indice))
+    Sessao.passo_ids, Sessao.resto_ids, Sessao.id_minimo = total, indice, manifesto["id_minimo_sessao"]
+    Ingresso.passo_ids, Ingresso.resto_ids, Ingresso.id_minimo = total, indice, manifesto["id_minimo_ingresso"]
+    conexao.send(True)
+
+    while True:
+        try:
+            operacao, parametros = conexao.recv()
+        except EOFError:
+            break
+        if operacao is None:
+            break
+        try:
+            conexao.send((True, _OPERACOES_PARTICAO[operacao](**parametros)))
+        except Exception as erro:
+            conexao.send((False, erro))
+
+    Sessao.flush()
+    Ingresso.grava_pendentes()
+    conexao.send(True)
+    conexao.close()
+
+
+# -----------------------------------------------------------------------
+# Roteador
+# -----------------------------------------------------------------------
+
+class Roteador:
+    """
+    Encaminha as operações de sessões, ingressos e relatórios aos processos
+    de venda. Os métodos têm os mesmos parâmetros e retornos das funções de
+    mesmo nome dos módulos; pode ser usado por várias threads ao mesmo tempo.
+    """
+
+    def __init__(self, pasta: str, total: int):
+        if total < 1:
+            raise ValueError("o número de partições deve ser positivo")
+        self.pasta = pasta
+        self.total = total
+        self._processos = []
+        self._conexoes = []
+        # Cada processo atende uma operação por vez
+        self._travas = [threading.Lock() for _ in range(total)]
+        self._particaoDaSessao = {}
+        self._travaSessoes = threading.Lock()
+        # Cadastros de clientes são repassados na mesma ordem em que acontecem
+        self._travaClientes = threading.Lock()
+
+    def inicia(self) -> None:
+        """Divide os dados, se preciso, e sobe os processos de venda."""
+        manifesto = le_manifesto(self.pasta)
+        if manifesto is not None and manifesto["total"] != self.total:
+            junta_dados(self.pasta)
+            manifesto = None
+        if manifesto is None:
+            manifesto = divide_dados(self.pasta, self.total)
+
+        # Os processos leem filmes e clientes dos arquivos ao iniciar
+        Filme.flush()
+        Cliente.grava_pendentes()
+
+        contexto = multiprocessing.get_context("spawn")
+        for indice in range(self.total):
+            nossa, deles = contexto.Pipe()
+            processo = contexto.Process(target=_executa_particao, args=(deles, self.pasta, indice, manifesto),
+                                        name=f"bilheteria-particao-{indice}", daemon=True)
+            processo.start()
+            deles.close()
+            self._processos.append(processo)
+            self._conexoes.append(nossa)
+        for conexao in self._conexoes:
+            conexao.recv()
+
+        for indice, ids in enumerate(self._em_todas("ids_sessoes")):
+            for sessao_id in ids:
+                self._particaoDaSessao[sessao_id] = indice
+
+    def encerra(self) -> None:
+        """Pede a cada processo que grave o que tem pendente e termine."""
+        for indice, conexao in enumerate(self._conexoes):
+            with self._travas[indice]:
+                try:
+                    conexao.send((None, None))
+                    conexao.recv()
+                except (EOFError, OSError):
+                    # O processo já terminou; o que ele gravou continua nos arquivos
+                    pass
+                conexao.close()
+        for processo in self._processos:
+            processo.join()
+        self._processos.clear()
+        self._conexoes.clear()
+
+    def _chama(self, indice: int, operacao: str, **parametros):
+        with self._travas[indice]:
+            conexao = self._conexoes[indice]
+            conexao.send((operacao, parametros))
+            ok, resultado = conexao.recv()
+        if not ok:
+            raise resultado
+        return resultado
+
+    def _em_todas(self, operacao: str, **parametros) -> list:
+        """Executa a operação em todas as partições ao mesmo tempo; respostas na ordem das partições."""
+        # Travas sempre na mesma ordem, para não haver impasse com outra chamada
+        for trava in self._travas:
+            trava.acquire()
+        try:
+            for conexao in self._conexoes:
+                conexao.send((operacao, parametros))
+            respostas = [conexao.recv() for conexao in self._conexoes]
+        finally:
+            for trava in self._travas:
+                trava.release()
+
+        for ok, resultado in respostas:
+            if not ok:
+                raise resultado
+        return [resultado for _, resultado in respostas]
+
+    def particao_da_sala(self, sala: int) -> int:
+        return sala % self.total
+
+    def _particao_da_sessao(self, sessao_id) -> int:
+        # Ids desconhecidos (ou inválidos) vão para a partição 0, que
+        # responde com o mesmo código que o módulo daria
+        if not isinstance(sessao_id, int):
+            return 0
+        return self._particaoDaSessao.get(sessao_id, 0)
+
+    # Sessões
+
+    def cria_sessao(self, filme_id, sala, horario, capacidade, formato_exibicao) -> int:
+        if not isinstance(sala, int) or sala <= 0:
+            return padrao_retornos.PARAMETRO_INVALIDO
+
+        indice = self.particao_da_sala(sala)
+        codigo, sessao_id = self._chama(indice, "cria_sessao", filme_id=filme_id, sala=sala, horario=horario,
+                                        capacidade=capacidade, formato_exibicao=formato_exibicao)
+        if codigo == padrao_retornos.SUCESSO:
+            with self._travaSessoes:
+                self._particaoDaSessao[sessao_id] = indice
+        return codigo
+
+    def apaga_sessao(self, sessao_id: int) -> int:
+        codigo = self._chama(self._particao_da_sessao(sessao_id), "apaga_sessao", sessao_id=sessao_id)
+        if codigo == padrao_retornos.SUCESSO:
+            with self._travaSessoes:
+                self._particaoDaSessao.pop(sessao_id, None)
+        return codigo
+
+    def busca_sessao(self, sessao_id: int):
+        return self._chama(self._particao_da_sessao(sessao_id), "busca_sessao", sessao_id=sessao_id)
+
+    def assentos_disponiveis(self, sessao_id: int, detalhado: bool = False) -> int | dict:
+        return self._chama(self._particao_da_sessao(sessao_id), "assentos_disponiveis", sessao_id=sessao_id,
+                           detalhado=detalhado)
+
+    # Bloqueios (os ids seguem o passo de cada partição, então id % total é o dono)
+
+    def _particao_do_bloqueio(self, bloqueio_id) -> int:
+        if not isinstance(bloqueio_id, int):
+            return 0
+        return bloqueio_id % self.total
+
+    def bloqueia_assentos(self, sessao_id, assentos, duracao=None) -> tuple:
+        return self._chama(self._particao_da_sessao(sessao_id), "bloqueia_assentos", sessao_id=sessao_id,
+                           assentos=assentos, duracao=duracao)
+
+    def busca_bloqueio(self, bloqueio_id: int) -> dict | None:
+        return self._chama(self._particao_do_bloqueio(bloqueio_id), "busca_bloqueio", bloqueio_id=bloqueio_id)
+
+    def libera_bloqueio(self, bloqueio_id: int) -> int:
+        return self._chama(self._particao_do_bloqueio(bloqueio_id), "libera_bloqueio", bloqueio_id=bloqueio_id)
+
+    def compra_bloqueio(self, cliente_id, bloqueio_id, preco) -> int:
+        return self._chama(self._particao_do_bloqueio(bloqueio_id), "compra_bloqueio", cliente_id=cliente_id,
+                           bloqueio_id=bloqueio_id, preco=preco)
+
+    # Layout das salas (fica com a partição dona da sala)
+
+    def define_layout_sala(self, sala, assentos_por_fileira) -> int:
+        if not isinstance(sala, int) or sala <= 0:
+            return padrao_retornos.PARAMETRO_INVALIDO
+        return self._chama(self.particao_da_sala(sala), "define_layout_sala", sala=sala,
+                           assentos_por_fileira=assentos_por_fileira)
+
+    def melhores_assentos(self, sessao_id, quantidade) -> list[int] | None:
+        return self._chama(self._particao_da_sessao(sessao_id), "melhores_assentos", sessao_id=sessao_id,
+                           quantidade=quantidade)
+
+    def lista_sessoes(self, filtro_filme_id: int = None, formato_exibicao: str = None,
+                      horario_minimo: str = None) -> tuple:
+        """Sessões de todas as partições que passam nos filtros, em ordem de id."""
+        respostas = self._em_todas("lista_sessoes", filtro_filme_id=filtro_filme_id,
+                                   formato_exibicao=formato_exibicao, horario_minimo=horario_minimo)
+        for codigo, _ in respostas:
+            if codigo != padrao_retornos.SUCESSO:
+                return codigo, []
+        # Cada partição já responde em ordem de id
+        return padrao_retornos.SUCESSO, list(heapq.merge(*(lista for _, lista in respostas),
+                                                         key=lambda sessao: sessao["id"]))
+
+    def pagina_sessoes(self, tamanho: int, cursor: int | None = None) -> dict | int:
+        """Página de sessões de todas as partições, em ordem de id (ver sessao.pagina_sessoes)."""
+        return self._junta_paginas(self._em_todas("pagina_sessoes", tamanho=tamanho, cursor=cursor), tamanho)
+
+    @staticmethod
+    def _junta_paginas(paginas: list, tamanho: int) -> dict | int:
+        """Junta as páginas de cada partição (já em ordem de id) em uma só, com o cursor da próxima."""
+        for pagina in paginas:
+            if not isinstance(pagina, dict):
+                return pagina
+        registros = list(heapq.merge(*(pagina["registros"] for pagina in paginas), key=lambda registro: registro["id"]))
+        resto = len(registros) > tamanho or any(pagina["proximo_cursor"] is not None for pagina in paginas)
+        registros = registros[:tamanho]
+        return {"registros": registros, "proximo_cursor": registros[-1]["id"] if resto and registros else None}
+
+    # Ingressos
+
+    def pagina_ingressos(self, tamanho: int, cursor: int | None = None) -> dict | int:
+        """Página de ingressos de todas as partições, em ordem de id (ver ingresso.pagina_ingressos)."""
+        return self._junta_paginas(self._em_todas("pagina_ingressos", tamanho=tamanho, cursor=cursor), tamanho)
+
+    def cria_ingresso(self, cliente_id, sessao_id, numero_assento, preco) -> int:
+        return self._chama(self._particao_da_sessao(sessao_id), "cria_ingresso", cliente_id=cliente_id,
+                           sessao_id=sessao_id, numero_assento=numero_assento, preco=preco)
+
+    def cria_ingressos_lote(self, cliente_id, sessao_id, assentos, preco) -> int:
+        return self._chama(self._particao_da_sessao(sessao_id), "cria_ingressos_lote", cliente_id=cliente_id,
+                           sessao_id=sessao_id, assentos=assentos, preco=preco)
+
+    def lista_ingressos_sessao(self, sessao_id: int) -> list:
+        return self._chama(self._particao_da_sessao(sessao_id), "lista_ingressos_sessao", sessao_id=sessao_id)
+
+    def lista_ingressos_cliente(self, cliente_id: int) -> list | None:
+        """Ingressos do cliente em todas as partições, em ordem de id."""
+        if Cliente.busca_cliente(cliente_id) is None:
+            return None
+        listas = self._em_todas("lista_ingressos_cliente", cliente_id=cliente_id)
+        return list(heapq.merge(*(lista or [] for lista in listas), key=lambda ingresso: ingresso["id"]))
+
+    # Clientes (o roteador grava; os processos de venda recebem uma cópia)
+
+    def cadastra_cliente(self, nome: str, cpf: str) -> int:
+        with self._travaClientes:
+            codigo = Cliente.cadastra_cliente(nome, cpf)
+            if codigo == padrao_retornos.SUCESSO:
+                cliente = Cliente.busca_cliente_por_cpf(cpf)
+                self._em_todas("aplica_cliente", registro=["+", cliente.id, cliente.nome, cliente.cpf])
+        return codigo
+
+    def remove_cliente(self, id: int) -> int:
+        with self._travaClientes:
+            codigo = Cliente.remove_cliente(id)
+            if codigo == padrao_retornos.SUCESSO:
+                self._em_todas("aplica_cliente", registro=["-", id])
+        return codigo
+
+    # Relatórios (contadores somados de todas as partições)
+
+    def _contadores(self) -> list[dict]:
+        return self._em_todas("contadores")
+
+    def conta_ingressos(self) -> int | None:
+        if not self._particaoDaSessao:
+            return None
+        return sum(contadores["totalIngressos"] for contadores in self._contadores())
+
+    def receita_e_ingressos(self, filme_id: int) -> dict | None:
+        if not isinstance(filme_id, int) or filme_id <= 0:
+            return None
+        if not isinstance(Filme.busca_filme(filme_id), (dict, Registro)):
+            return None
+
+        contadores = self._contadores()
+        return {
+            "ingressos_vendidos": sum(c["ingressosPorFilme"].get(filme_id, 0) for c in contadores),
+            "receita": sum(c["receitaPorFilme"].get(filme_id, 0.0) for c in contadores),
+        }
+
+    def filme_mais_assistido(self) -> dict | None:
+        if not self._particaoDaSessao:
+            return None
+
+        ingressosPorFilme = {}
+        for contadores in self._contadores():
+            for filme_id, quantidade in contadores["ingressosPorFilme"].items():
+                ingressosPorFilme[filme_id] = ingressosPorFilme.get(filme_id, 0) + quantidade
+        if not ingressosPorFilme:
+            return None
+
+        filme_id = max(ingressosPorFilme, key=ingressosPorFilme.get)
+        filme = Filme.busca_filme(filme_id)
+        return {
+            "filme_id": filme_id,
+            "titulo_filme": filme["titulo"] if isinstance(filme, (dict, Registro)) else f"Filme #{filme_id}",
+            "quantidade_ingressos": ingressosPorFilme[filme_id],
+        }
+
+    def receita_e_ocupacao_sessao(self, sessao_id: int) -> dict | None:
+        return self._chama(self._particao_da_sessao(sessao_id), "receita_e_ocupacao_sessao", sessao_id=sessao_id)
+
+    def estatisticas_instrumentacao(self) -> dict:
+        """Estatísticas brutas deste processo somadas às de todas as partições (ver instrumentacao.junta)."""
+        return Instrumentacao.junta(Instrumentacao.estatisticas(), *self._em_todas("instrumentacao"))
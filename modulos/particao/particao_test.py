@@ -0,0 +1,191 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(os.path.dirname(TEST_DIR))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+import padrao_retornos
+import modulos.particao.particao as Particao
+import modulos.filme.filme as modulo_filme
+import modulos.sessao.sessao as modulo_sessao
+import modulos.cliente.cliente as modulo_cliente
+import modulos.ingresso.ingresso as modulo_ingresso
+import modulos.monitoramento.monitoramento as modulo_monitoramento
+
+
+class TestParticao(unittest.TestCase):
+
+    MODULOS = (modulo_filme, modulo_sessao, modulo_cliente, modulo_ingresso)
+
+    def setUp(self):
+        """Cada teste usa arquivos de dados novos em uma pasta temporária."""
+        self.pasta = tempfile.TemporaryDirectory()
+        for modulo in self.MODULOS:
+            for atributo in ("nome_arquivo", "_carregado"):
+                original = patch.object(modulo, atributo, getattr(modulo, atributo))
+                original.start()
+                self.addCleanup(original.stop)
+        journal = patch.object(modulo_sessao, "nome_arquivo_journal", modulo_sessao.nome_arquivo_journal)
+        journal.start()
+        self.addCleanup(journal.stop)
+        for modulo in (modulo_filme, modulo_sessao):
+            imediata = patch.object(modulo.gravacao, "intervalo", 0)
+            imediata.start()
+            self.addCleanup(imediata.stop)
+
+        for modulo in self.MODULOS:
+            modulo.carrega(self.pasta.name)
+
+    def tearDown(self):
+        modulo_cliente._log.descarta_pendentes()
+        modulo_ingresso._log.descarta_pendentes()
+        modulo_filme.filmesEmCartaz.clear()
+        modulo_filme.indiceFilmes.clear()
+        modulo_sessao.listaSessoes.clear()
+        modulo_sessao.indiceSessoes.clear()
+        modulo_sessao._reconstroi_indices()
+        modulo_cliente.listaClientes.clear()
+        modulo_cliente.indiceClientes.clear()
+        modulo_cliente.indiceCpf.clear()
+        modulo_ingresso.listaIngressos.clear()
+        modulo_monitoramento.zera_contadores()
+        for modulo in self.MODULOS:
+            modulo._carregado = False
+        self.pasta.cleanup()
+
+    def _popula(self):
+        """Um filme, três sessões (salas 1, 2 e 3), um cliente e três ingressos."""
+        modulo_filme.cria_filme("Matrix", "Um hacker descobre a verdade.", "Ficção", 136.0, 14, "1999-05-21")
+        modulo_sessao.cria_sessao(1, 1, "20:00", 10, "dublado")
+        modulo_sessao.cria_sessao(1, 2, "20:00", 10, "legendado")
+        modulo_sessao.cria_sessao(1, 3, "20:00", 10, "dublado")
+        modulo_cliente.cadastra_cliente("Ana", "111.111.111-11")
+        modulo_ingresso.cria_ingressos_lote(1, 1, [1, 2], 20.0)
+        modulo_ingresso.cria_ingresso(1, 2, 5, 30.0)
+        modulo_cliente.grava_pendentes()
+        modulo_ingresso.grava_pendentes()
+
+    def _recarrega(self):
+        for modulo in self.MODULOS:
+            modulo.carrega(self.pasta.name)
+
+    def test_01_divide_e_junta_dados(self):
+        print("\nTeste 01: Sessões e ingressos divididos por sala e reunidos de volta")
+        self._popula()
+
+        manifesto = Particao.divide_dados(self.pasta.name, 2)
+        self.assertEqual(manifesto, {"total": 2, "id_minimo_sessao": 3, "id_minimo_ingresso": 3})
+        self.assertEqual(Particao.le_manifesto(self.pasta.name), manifesto)
+        self.assertFalse(os.path.exists(os.path.join(self.pasta.name, "sessoes.xml")))
+        self.assertEqual(modulo_sessao.obtem_todas_sessoes(), [])
+
+        # Partição 0: sala 2; partição 1: salas 1 e 3
+        modulo_sessao.carrega(os.path.join(self.pasta.name, "particoes", "0"))
+        modulo_ingresso.carrega(os.path.join(self.pasta.name, "particoes", "0"))
+        self.assertEqual([s["sala"] for s in modulo_sessao.obtem_todas_sessoes()], [2])
+        self.assertEqual([i["id"] for i in modulo_ingresso.obtem_todos_ingressos()], [3])
+        modulo_sessao.carrega(os.path.join(self.pasta.name, "particoes", "1"))
+        modulo_ingresso.carrega(os.path.join(self.pasta.name, "particoes", "1"))
+        self.assertEqual([s["sala"] for s in modulo_sessao.obtem_todas_sessoes()], [1, 3])
+        self.assertEqual([i["id"] for i in modulo_ingresso.obtem_todos_ingressos()], [1, 2])
+
+        Particao.junta_dados(self.pasta.name)
+        self.assertIsNone(Particao.le_manifesto(self.pasta.name))
+        self.assertFalse(os.path.exists(os.path.join(self.pasta.name, "particoes")))
+
+        self._recarrega()
+        self.assertEqual([s["id"] for s in modulo_sessao.obtem_todas_sessoes()], [1, 2, 3])
+        self.assertEqual(modulo_sessao.assentos_disponiveis(1), 8)
+        self.assertEqual([i["id"] for i in modulo_ingresso.obtem_todos_ingressos()], [1, 2, 3])
+        self.assertEqual(modulo_monitoramento.receita_e_ingressos(1), {"ingressos_vendidos": 3, "receita": 70.0})
+
+    def test_02_roteador_com_dois_processos(self):
+        print("Teste 02: Roteador encaminha vendas ao processo dono da sala e junta as respostas")
+        self._popula()
+
+        roteador = Particao.Roteador(self.pasta.name, 2)
+        roteador.inicia()
+        try:
+            # Sala 4 fica na partição 0; o id novo não colide com os existentes
+            self.assertEqual(roteador.cria_sessao(1, 4, "20:00", 10, "dublado"), padrao_retornos.SUCESSO)
+            self.assertEqual(roteador.cria_sessao(1, 5, "20:00", 10, "dublado"), padrao_retornos.SUCESSO)
+            codigo, sessoes = roteador.lista_sessoes()
+            self.assertEqual(codigo, padrao_retornos.SUCESSO)
+            ids = [s["id"] for s in sessoes]
+            self.assertEqual(ids, sorted(set(ids)))
+            self.assertEqual(len(ids), 5)
+            self.assertEqual({s["sala"] for s in sessoes}, {1, 2, 3, 4, 5})
+
+            sessao_sala_4 = next(s["id"] for s in sessoes if s["sala"] == 4)
+            self.assertEqual(roteador.cria_ingresso(1, sessao_sala_4, 1, 10.0), padrao_retornos.SUCESSO)
+            self.assertEqual(roteador.cria_ingresso(1, 1, 1, 10.0), padrao_retornos.JA_EXISTE)
+            self.assertEqual(roteador.cria_ingressos_lote(1, 3, [7, 8], 15.0), padrao_retornos.SUCESSO)
+            self.assertEqual(roteador.cria_ingresso(1, 99, 1, 10.0), padrao_retornos.NAO_ENCONTRADO)
+            self.assertEqual(roteador.assentos_disponiveis(3), 8)
+            self.assertEqual(roteador.define_layout_sala(3, 5), padrao_retornos.SUCESSO)
+            self.assertEqual(roteador.melhores_assentos(3, 2), [2, 3])
+            self.assertIsNone(roteador.melhores_assentos(99, 2))
+
+            # Cliente cadastrado no roteador já pode comprar em qualquer partição
+            self.assertEqual(roteador.cadastra_cliente("Bia", "222.222.222-22"), padrao_retornos.SUCESSO)
+            self.assertEqual(roteador.cria_ingresso(2, 2, 9, 30.0), padrao_retornos.SUCESSO)
+
+            ingressos_ana = roteador.lista_ingressos_cliente(1)
+            ids_ingressos = [i["id"] for i in ingressos_ana]
+            self.assertEqual(len(ids_ingressos), 6)
+            self.assertEqual(ids_ingressos, sorted(set(ids_ingressos)))
+            self.assertIsNone(roteador.lista_ingressos_cliente(99))
+
+            self.assertEqual(roteador.conta_ingressos(), 7)
+            self.assertEqual(roteador.receita_e_ingressos(1), {"ingressos_vendidos": 7, "receita": 140.0})
+            self.assertEqual(roteador.filme_mais_assistido()["quantidade_ingressos"], 7)
+            self.assertEqual(roteador.receita_e_ocupacao_sessao(2)["ingressos_vendidos"], 2)
+
+            # Páginas das duas partições juntas em ordem de id, seguindo o cursor até o fim
+            vistos, cursor = [], None
+            while True:
+                pagina = roteador.pagina_sessoes(2, cursor)
+                vistos += [s["id"] for s in pagina["registros"]]
+                cursor = pagina["proximo_cursor"]
+                if cursor is None:
+                    break
+            self.assertEqual(vistos, ids)
+            self.assertEqual(len(roteador.pagina_ingressos(10)["registros"]), 7)
+        finally:
+            roteador.encerra()
+
+        # De volta a uma pasta sem partições, com tudo o que foi vendido
+        Particao.junta_dados(self.pasta.name)
+        self._recarrega()
+        self.assertEqual(len(modulo_sessao.obtem_todas_sessoes()), 5)
+        self.assertEqual(modulo_sessao.layoutSalas, {3: 5})
+        self.assertEqual(len(modulo_ingresso.obtem_todos_ingressos()), 7)
+        self.assertIsNotNone(modulo_cliente.busca_cliente_por_cpf("222.222.222-22"))
+        self.assertEqual(modulo_monitoramento.receita_e_ingressos(1), {"ingressos_vendidos": 7, "receita": 140.0})
+
+    def test_03_id_de_sessao_apagada_sobrevive_a_divisao(self):
+        print("Teste 03: Id de sessão apagada não é reusado depois de dividir e juntar")
+        self._popula()
+        self.assertEqual(modulo_sessao.apaga_sessao(3), padrao_retornos.SUCESSO)
+
+        manifesto = Particao.divide_dados(self.pasta.name, 2)
+        self.assertEqual(manifesto["id_minimo_sessao"], 3)
+        for indice in range(2):
+            modulo_sessao.carrega(os.path.join(self.pasta.name, "particoes", str(indice)))
+            self.assertEqual(modulo_sessao.ultimo_id_sessao(), 3)
+
+        Particao.junta_dados(self.pasta.name)
+        self._recarrega()
+        self.assertEqual([s["id"] for s in modulo_sessao.obtem_todas_sessoes()], [1, 2])
+        self.assertEqual(modulo_sessao.ultimo_id_sessao(), 3)
+        self.assertEqual(modulo_sessao.cria_sessao(1, 4, "20:00", 10, "dublado"), padrao_retornos.SUCESSO)
+        self.assertEqual(modulo_sessao.obtem_todas_sessoes()[-1]["id"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
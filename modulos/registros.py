@@ -0,0 +1,112 @@
+"""
+Tipos de registro compactos para filmes, sessões, clientes e ingressos.
+
+Cada entidade era um dicionário, que custa algumas centenas de bytes por
+registro. As classes abaixo usam __slots__ (um ponteiro por campo, sem
+__dict__) e continuam aceitando o acesso de dicionário usado pelo resto
+do código: registro["campo"], registro["campo"] = valor, get(), `in`,
+keys()/items() e dict(registro). Um registro é igual a um dicionário com
+os mesmos campos e valores.
+"""
+
+
+class Registro:
+    """Base dos registros: acesso por chave sobre os campos em __slots__."""
+
+    __slots__ = ()
+
+    def __getitem__(self, campo: str):
+        if campo not in self.__slots__:
+            raise KeyError(campo)
+        return getattr(self, campo)
+
+    def __setitem__(self, campo: str, valor) -> None:
+        if campo not in self.__slots__:
+            raise KeyError(campo)
+        setattr(self, campo, valor)
+
+    def __contains__(self, campo) -> bool:
+        return campo in self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def get(self, campo: str, padrao=None):
+        if campo not in self.__slots__:
+            return padrao
+        return getattr(self, campo)
+
+    def keys(self) -> tuple:
+        return self.__slots__
+
+    def values(self) -> list:
+        return [getattr(self, campo) for campo in self.__slots__]
+
+    def items(self) -> list[tuple]:
+        return [(campo, getattr(self, campo)) for campo in self.__slots__]
+
+    def para_dict(self) -> dict:
+        """Cópia do registro como dicionário (para JSON, testes, etc.)."""
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __eq__(self, outro) -> bool:
+        if type(outro) is type(self):
+            return self.values() == outro.values()
+        if isinstance(outro, dict):
+            return self.para_dict() == outro
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.para_dict()!r})"
+
+
+class RegistroFilme(Registro):
+    __slots__ = ("id", "titulo", "sinopse", "genero", "duracao", "classificacao", "dataLancamento")
+
+    def __init__(self, id, titulo, sinopse, genero, duracao, classificacao, dataLancamento):
+        self.id = id
+        self.titulo = titulo
+        self.sinopse = sinopse
+        self.genero = genero
+        self.duracao = duracao
+        self.classificacao = classificacao
+        self.dataLancamento = dataLancamento
+
+
+class RegistroSessao(Registro):
+    __slots__ = ("id", "filme_id", "sala", "horario", "capacidade", "formato_exibicao", "assentos_ocupados")
+
+    def __init__(self, id, filme_id, sala, horario, capacidade, formato_exibicao, assentos_ocupados):
+        self.id = id
+        self.filme_id = filme_id
+        self.sala = sala
+        self.horario = horario
+        self.capacidade = capacidade
+        self.formato_exibicao = formato_exibicao
+        self.assentos_ocupados = assentos_ocupados
+
+
+class RegistroCliente(Registro):
+    __slots__ = ("id", "nome", "cpf", "historico")
+
+    def __init__(self, id, nome, cpf, historico=None):
+        self.id = id
+        self.nome = nome
+        self.cpf = cpf
+        self.historico = [] if historico is None else historico
+
+
+class RegistroIngresso(Registro):
+    __slots__ = ("id", "cliente_id", "sessao_id", "numero_assento", "preco")
+
+    def __init__(self, id, cliente_id, sessao_id, numero_assento, preco):
+        self.id = id
+        self.cliente_id = cliente_id
+        self.sessao_id = sessao_id
+        self.numero_assento = numero_assento
+        self.preco = preco
@@ -0,0 +1,127 @@
+"""
+Trechos livres de cada fileira de uma sessão, para achar blocos de
+assentos vizinhos sem percorrer a sala.
+
+A sala tem `largura` assentos por fileira: o assento N fica na fileira
+(N-1) // largura; a última fileira pode ser incompleta. Para cada fileira
+o índice guarda a lista ordenada dos trechos livres (inicio, fim), com os
+números dos assentos, e o tamanho do maior deles. Ocupar ou liberar um
+assento divide ou junta trechos só daquela fileira, e melhor_bloco() pula
+direto as fileiras cujo maior trecho não comporta o pedido.
+"""
+
+import bisect
+import math
+
+
+class IndiceFileiras:
+    """Trechos de assentos livres por fileira, com a melhor posição para N lugares."""
+
+    __slots__ = ("largura", "capacidade", "_trechos", "_maiorTrecho", "_ordemFileiras")
+
+    def __init__(self, capacidade: int, largura: int, indisponiveis=()):
+        self.capacidade = capacidade
+        self.largura = largura
+        fileiras = -(-capacidade // largura)
+        indisponiveis = set(indisponiveis)
+
+        self._trechos = []
+        for fileira in range(fileiras):
+            primeiro, ultimo = self._limites(fileira)
+            trechos = []
+            inicio = None
+            for numero in range(primeiro, ultimo + 1):
+                if numero in indisponiveis:
+                    if inicio is not None:
+                        trechos.append((inicio, numero - 1))
+                        inicio = None
+                elif inicio is None:
+                    inicio = numero
+            if inicio is not None:
+                trechos.append((inicio, ultimo))
+            self._trechos.append(trechos)
+        self._maiorTrecho = [self._maior(trechos) for trechos in self._trechos]
+
+        # Fileiras da mais central para as das pontas
+        centro = (fileiras - 1) / 2
+        self._ordemFileiras = sorted(range(fileiras), key=lambda fileira: (abs(fileira - centro), fileira))
+
+    def _limites(self, fileira: int) -> tuple[int, int]:
+        primeiro = fileira * self.largura + 1
+        return primeiro, min(primeiro + self.largura - 1, self.capacidade)
+
+    @staticmethod
+    def _maior(trechos: list) -> int:
+        return max((fim - inicio + 1 for inicio, fim in trechos), default=0)
+
+    def fileira(self, numero_assento: int) -> int:
+        return (numero_assento - 1) // self.largura
+
+    def ocupa(self, numero_assento: int) -> None:
+        """Tira o assento do trecho livre que o contém (nada se já estava indisponível)."""
+        fileira = self.fileira(numero_assento)
+        trechos = self._trechos[fileira]
+        posicao = bisect.bisect_right(trechos, (numero_assento, self.capacidade + 1)) - 1
+        if posicao < 0:
+            return
+        inicio, fim = trechos[posicao]
+        if numero_assento > fim:
+            return
+
+        novos = []
+        if inicio < numero_assento:
+            novos.append((inicio, numero_assento - 1))
+        if numero_assento < fim:
+            novos.append((numero_assento + 1, fim))
+        trechos[posicao:posicao + 1] = novos
+        self._maiorTrecho[fileira] = self._maior(trechos)
+
+    def libera(self, numero_assento: int) -> None:
+        """Devolve o assento, juntando-o aos trechos vizinhos."""
+        fileira = self.fileira(numero_assento)
+        trechos = self._trechos[fileira]
+        posicao = bisect.bisect_right(trechos, (numero_assento, self.capacidade + 1))
+        if posicao > 0 and trechos[posicao - 1][1] >= numero_assento:
+            return  # já estava livre
+
+        inicio = fim = numero_assento
+        if posicao > 0 and trechos[posicao - 1][1] == numero_assento - 1:
+            posicao -= 1
+            inicio = trechos.pop(posicao)[0]
+        if posicao < len(trechos) and trechos[posicao][0] == numero_assento + 1:
+            fim = trechos.pop(posicao)[1]
+        trechos.insert(posicao, (inicio, fim))
+        self._maiorTrecho[fileira] = max(self._maiorTrecho[fileira], fim - inicio + 1)
+
+    def melhor_bloco(self, quantidade: int) -> list[int]:
+        """
+        Os `quantidade` assentos vizinhos mais bem posicionados: na fileira
+        mais próxima do centro da sala que tenha espaço e, nela, o bloco
+        mais próximo do centro da fileira. Lista vazia se nenhum couber.
+        """
+        melhor = None
+        distancia_melhor = None
+        centro_sala = (len(self._trechos) - 1) / 2
+        for fileira in self._ordemFileiras:
+            distancia = abs(fileira - centro_sala)
+            if distancia_melhor is not None and distancia > distancia_melhor:
+                break  # só há fileiras mais afastadas daqui em diante
+            if self._maiorTrecho[fileira] < quantidade:
+                continue
+
+            primeiro, ultimo = self._limites(fileira)
+            centro = (primeiro + ultimo) / 2
+            for inicio, fim in self._trechos[fileira]:
+                if fim - inicio + 1 < quantidade:
+                    continue
+                # Início que centraliza o bloco (no empate, o mais à esquerda), limitado ao trecho
+                comeco = math.ceil(centro - (quantidade - 1) / 2 - 0.5)
+                comeco = min(max(comeco, inicio), fim - quantidade + 1)
+                desvio = abs(comeco + (quantidade - 1) / 2 - centro)
+                if melhor is None or desvio < melhor[0]:
+                    melhor = (desvio, comeco)
+                    distancia_melhor = distancia
+
+        if melhor is None:
+            return []
+        return list(range(melhor[1], melhor[1] + quantidade))
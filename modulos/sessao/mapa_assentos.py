@@ -0,0 +1,121 @@
+"""
+Mapa de ocupação de assentos de uma sessão, guardado como bitset.
+
+O assento N (numerado a partir de 1) corresponde ao bit N-1 de um bytearray,
+então testar, ocupar e liberar custam O(1) e uma sala de 500 lugares ocupa
+63 bytes. O mapa se comporta como a antiga lista de ocupados para quem só
+usa `in`, `len()` e iteração.
+"""
+
+import base64
+
+# Posições dos bits livres para cada valor possível de um byte
+_BITS_LIVRES = [tuple(bit for bit in range(8) if not (valor >> bit) & 1) for valor in range(256)]
+
+
+class MapaAssentos:
+    """Conjunto de assentos ocupados de uma sessão com capacidade fixa."""
+
+    __slots__ = ("capacidade", "_bits", "_ocupados")
+
+    def __init__(self, capacidade: int, ocupados=()):
+        self.capacidade = capacidade
+        self._bits = bytearray((capacidade + 7) // 8)
+        self._ocupados = 0
+        for numero_assento in ocupados:
+            self.ocupa(numero_assento)
+
+    def esta_ocupado(self, numero_assento: int) -> bool:
+        """Retorna True se o assento estiver ocupado (False se fora da sala)."""
+        if not 1 <= numero_assento <= self.capacidade:
+            return False
+        indice = numero_assento - 1
+        return bool(self._bits[indice >> 3] & (1 << (indice & 7)))
+
+    def ocupa(self, numero_assento: int) -> bool:
+        """
+        Marca o assento como ocupado.
+        Retorna False se ele já estava ocupado ou não existe na sala.
+        """
+        if not 1 <= numero_assento <= self.capacidade:
+            return False
+        indice = numero_assento - 1
+        mascara = 1 << (indice & 7)
+        if self._bits[indice >> 3] & mascara:
+            return False
+        self._bits[indice >> 3] |= mascara
+        self._ocupados += 1
+        return True
+
+    def libera(self, numero_assento: int) -> bool:
+        """
+        Marca o assento como livre.
+        Retorna False se ele já estava livre ou não existe na sala.
+        """
+        if not self.esta_ocupado(numero_assento):
+            return False
+        indice = numero_assento - 1
+        self._bits[indice >> 3] &= ~(1 << (indice & 7)) & 0xFF
+        self._ocupados -= 1
+        return True
+
+    def quantidade_livres(self) -> int:
+        return self.capacidade - self._ocupados
+
+    def livres(self):
+        """Gera os números dos assentos livres em ordem crescente."""
+        for posicao, valor in enumerate(self._bits):
+            if valor == 0xFF:
+                continue
+            base = posicao * 8 + 1
+            for bit in _BITS_LIVRES[valor]:
+                numero_assento = base + bit
+                if numero_assento > self.capacidade:
+                    return
+                yield numero_assento
+
+    def para_texto(self) -> str:
+        """Serializa o bitset em base64 para gravação no XML."""
+        return base64.b64encode(bytes(self._bits)).decode('ascii')
+
+    def para_bytes(self) -> bytes:
+        """Cópia do bitset, como gravada no snapshot binário."""
+        return bytes(self._bits)
+
+    @classmethod
+    def de_texto(cls, capacidade: int, texto: str | None) -> "MapaAssentos":
+        """Reconstrói o mapa a partir do texto gerado por para_texto()."""
+        return cls.de_bytes(capacidade, base64.b64decode(texto) if texto else b'')
+
+    @classmethod
+    def de_bytes(cls, capacidade: int, dados: bytes) -> "MapaAssentos":
+        """Reconstrói o mapa a partir dos bytes gerados por para_bytes()."""
+        mapa = cls(capacidade)
+        if dados:
+            bits = dados[:len(mapa._bits)]
+            mapa._bits[:len(bits)] = bits
+            # Descarta bits além da capacidade, caso o arquivo esteja inconsistente
+            sobra = len(mapa._bits) * 8 - capacidade
+            if sobra and mapa._bits:
+                mapa._bits[-1] &= 0xFF >> sobra
+            mapa._ocupados = int.from_bytes(mapa._bits, 'little').bit_count()
+        return mapa
+
+    def __contains__(self, numero_assento) -> bool:
+        return isinstance(numero_assento, int) and self.esta_ocupado(numero_assento)
+
+    def __len__(self) -> int:
+        return self._ocupados
+
+    def __iter__(self):
+        """Gera os números dos assentos ocupados em ordem crescente."""
+        for posicao, valor in enumerate(self._bits):
+            if not valor:
+                continue
+            base = posicao * 8 + 1
+            for bit in range(8):
+                if valor & (1 << bit):
+                    yield base + bit
+
+    def __repr__(self) -> str:
+        return f"MapaAssentos(capacidade={self.capacidade}, ocupados={self._ocupados})"
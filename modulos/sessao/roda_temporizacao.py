@@ -0,0 +1,99 @@
+"""
+Roda de temporização (hashed timing wheel) para prazos de expiração.
+
+O tempo é dividido em ticks de `resolucao` segundos e a roda tem `tamanho`
+posições; um item que vence no tick T fica na posição T % tamanho, junto
+com o tick exato em que vence. Agendar e cancelar custam O(1), e avançar
+um tick só percorre a posição daquele tick, não todos os itens agendados:
+os que estão lá mas vencem em uma volta futura da roda continuam nela.
+
+A roda não tem thread própria: quem a usa chama avanca() (tipicamente a
+cada operação), que processa os ticks passados desde a última chamada e
+devolve os itens vencidos.
+"""
+
+import threading
+import time
+
+
+class RodaTemporizacao:
+    """Itens identificados por chave, cada um com o seu prazo de expiração."""
+
+    def __init__(self, resolucao: float = 1.0, tamanho: int = 512, relogio=time.monotonic):
+        if resolucao <= 0 or tamanho <= 0:
+            raise ValueError("resolução e tamanho da roda devem ser positivos")
+        self.resolucao = resolucao
+        self.tamanho = tamanho
+        self.relogio = relogio
+        # Cada posição: {chave: tick em que vence}
+        self._posicoes = [{} for _ in range(tamanho)]
+        self._tickDaChave = {}
+        self._tickAtual = self._tick(relogio())
+        self._trava = threading.Lock()
+
+    def _tick(self, instante: float) -> int:
+        return int(instante // self.resolucao)
+
+    def __len__(self) -> int:
+        return len(self._tickDaChave)
+
+    def __contains__(self, chave) -> bool:
+        return chave in self._tickDaChave
+
+    def agenda(self, chave, duracao: float) -> float:
+        """
+        Agenda `chave` para vencer daqui a `duracao` segundos (arredondado
+        para cima até o próximo tick). Reagendar uma chave troca o prazo.
+        Retorna o instante do vencimento, no relógio da roda.
+        """
+        with self._trava:
+            self._remove(chave)
+            # Nunca no tick atual, que já pode ter sido processado
+            tick = max(self._tick(self.relogio() + duracao) + 1, self._tickAtual + 1)
+            self._posicoes[tick % self.tamanho][chave] = tick
+            self._tickDaChave[chave] = tick
+        return tick * self.resolucao
+
+    def cancela(self, chave) -> bool:
+        """Tira `chave` da roda; False se ela não estava agendada."""
+        with self._trava:
+            return self._remove(chave)
+
+    def _remove(self, chave) -> bool:
+        tick = self._tickDaChave.pop(chave, None)
+        if tick is None:
+            return False
+        del self._posicoes[tick % self.tamanho][chave]
+        return True
+
+    def limpa(self) -> None:
+        """Cancela todos os itens agendados."""
+        with self._trava:
+            for posicao in self._posicoes:
+                posicao.clear()
+            self._tickDaChave.clear()
+
+    def avanca(self) -> list:
+        """Processa os ticks até agora e retorna as chaves vencidas (já removidas)."""
+        agora = self._tick(self.relogio())
+        # Caminho rápido, sem trava: ainda no mesmo tick (relido abaixo com a trava)
+        if agora <= self._tickAtual:
+            return []
+        with self._trava:
+            if agora <= self._tickAtual:
+                return []
+
+            # Parado por mais de uma volta: cada posição é visitada uma vez só
+            passos = min(agora - self._tickAtual, self.tamanho)
+            vencidas = []
+            for tick in range(agora - passos + 1, agora + 1):
+                posicao = self._posicoes[tick % self.tamanho]
+                if not posicao:
+                    continue
+                vencidas_aqui = [chave for chave, vence in posicao.items() if vence <= agora]
+                for chave in vencidas_aqui:
+                    del posicao[chave]
+                    del self._tickDaChave[chave]
+                vencidas.extend(vencidas_aqui)
+            self._tickAtual = agora
+        return vencidas
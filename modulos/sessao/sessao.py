@@ -1,96 +1,482 @@
 from datetime import date
 from modulos.filme.filme import busca_filme 
+from modulos.sessao.mapa_assentos import MapaAssentos
+from modulos.sessao.roda_temporizacao import RodaTemporizacao
+from modulos.sessao.fileiras import IndiceFileiras
+from modulos.registros import Registro, RegistroSessao
+import modulos.paginacao as Paginacao
+from modulos.instrumentacao import instrumentado
 import padrao_retornos
+import modulos.armazenamento.armazenamento as Armazenamento
+from modulos.armazenamento.gravacao_adiada import GravacaoAdiada, arquivo_atomico
+import bisect
+import math
+import os
+import struct
+import threading
 from xml.etree import ElementTree
-from xml.etree.ElementTree import Element, SubElement, Comment
+from xml.etree.ElementTree import Element, SubElement
 nome_arquivo = 'sessoes.xml'
-sessoesElement = Element('sessoes') 
-comment = Comment('Dados de Sessões de Cinema')
-sessoesElement.append(comment)
+
+# Journal de reservas: cada assento vendido vira um registro de tamanho fixo
+# (sessao_id, numero_assento) anexado ao fim do arquivo, em vez de regravar o XML.
+nome_arquivo_journal = 'sessoes.journal'
+modo_journal = True
+_REGISTRO_JOURNAL = struct.Struct('<II')
+
+# No modo particionado (ver modulos/particao) cada processo só cria sessões
+# com id % passo_ids == resto_ids e acima de id_minimo, para que processos
+# diferentes nunca gerem o mesmo id. Com passo 1, é o próximo id livre.
+passo_ids = 1
+resto_ids = 0
+id_minimo = 0
 
 __all__ = [
     "cria_sessao", 
     "busca_sessao", 
     "assentos_disponiveis", 
     "reserva_assento", 
-    "obtem_todas_sessoes"
+    "reserva_assentos",
+    "lista_assentos_livres",
+    "bloqueia_assentos",
+    "confirma_bloqueio",
+    "libera_bloqueio",
+    "busca_bloqueio",
+    "define_layout_sala",
+    "assentos_por_fileira",
+    "melhores_assentos",
+    "obtem_todas_sessoes",
+    "visao_sessoes",
+    "itera_sessoes",
+    "pagina_sessoes"
 ]
 
 listaSessoes = []
 
-def formata_saida_xml(elem):
+# Índice por id, mantido em sincronia com listaSessoes
+indiceSessoes = {}
+
+# Maior id já usado, inclusive por sessões apagadas: uma sessão nova nunca
+# recebe o id de outra (nem o da mais nova, depois de apagada). Gravado
+# no sessoes.xml (<sessoes ultimo_id="...">), no SQLite e no snapshot.
+_ultimoIdSessao = 0
+
+# Agenda de cada sala: lista ordenada de (inicio, fim, sessao_id), em minutos
+# desde a meia-noite, sem sobreposição entre sessões da mesma sala. Uma
+# sessão ocupa a sala do horário de início até o fim do filme mais o
+# intervalo de limpeza; se passar da meia-noite, vira dois intervalos.
+_agendaSalas = {}
+_intervalosSessao = {}
+intervalo_limpeza = 15
+MINUTOS_DIA = 24 * 60
+
+# Índices secundários usados por lista_sessoes:
+#   filme_id -> {sessao_id: sessao}   formato -> {sessao_id: sessao}
+#   lista ordenada de (minutos do início, sessao_id), para busca binária
+# Os dicionários internos preservam a ordem de criação das sessões.
+_sessoesPorFilme = {}
+_sessoesPorFormato = {}
+_sessoesPorHorario = []
+
+# Concorrência: cada sessão tem sua própria trava para a verificação e a
+# ocupação de assentos, de modo que vendas de sessões diferentes não se
+# bloqueiam. Cadastro/remoção de sessões e a gravação em disco usam travas
+# próprias. Ordem de aquisição: _travaCadastro -> trava da sessão -> _travaPersistencia.
+_locksSessao = {}
+_travaLocksSessao = threading.Lock()
+_travaCadastro = threading.Lock()
+_travaPersistencia = threading.RLock()
+
+# Bloqueios temporários de assentos (cliente escolhendo lugares no quiosque
+# ou no site): os assentos bloqueados não são vendidos a mais ninguém até o
+# bloqueio ser confirmado (vira venda), liberado ou vencer, depois de
+# duracao_bloqueio segundos. Ficam só em memória.
+#   bloqueio_id -> (sessao_id, assentos, instante do vencimento)
+#   sessao_id -> {numero_assento: bloqueio_id}
+# Os vencimentos ficam em uma roda de temporização, processada no início
+# das operações com assentos: o custo por tick é o da posição da roda, e
+# não o de percorrer todos os bloqueios. Alterados com a trava da sessão.
+duracao_bloqueio = 600
+_bloqueios = {}
+_assentosBloqueados = {}
+_rodaBloqueios = RodaTemporizacao(resolucao=1.0)
+_ultimoIdBloqueio = 0
+_travaIdBloqueio = threading.Lock()
+
+# Layout das salas: quantos assentos cada fileira tem (sala -> assentos por
+# fileira); salas sem layout definido usam assentos_por_fileira_padrao. O
+# assento N fica na fileira (N-1) // largura. Os trechos livres de cada
+# fileira de uma sessão (ver fileiras.py) são montados na primeira consulta
+# a melhores_assentos e acompanham cada venda e bloqueio, com a trava da sessão.
+assentos_por_fileira_padrao = 20
+layoutSalas = {}
+_indicesFileiras = {}
+
+def _lock_sessao(sessao_id: int) -> threading.Lock:
+    """Retorna a trava da sessão, criando-a na primeira vez."""
+    lock = _locksSessao.get(sessao_id)
+    if lock is None:
+        with _travaLocksSessao:
+            lock = _locksSessao.setdefault(sessao_id, threading.Lock())
+    return lock
+
+def formata_saida_xml(elem, nivel: int = 0):
     """Formata o XML para ficar bonito (indentado)."""
-    ElementTree.indent(elem, space="  ")
+    ElementTree.indent(elem, space="  ", level=nivel)
     return ElementTree.tostring(elem, encoding='unicode')
 
+def _sessao_para_xml(sessao: dict) -> Element:
+    """Monta o elemento <sessao>, com o bitset dos assentos em base64."""
+    sessao_xml = Element('sessao')
+    SubElement(sessao_xml, 'id').text = str(sessao['id'])
+    SubElement(sessao_xml, 'filme_id').text = str(sessao['filme_id'])
+    SubElement(sessao_xml, 'sala').text = str(sessao['sala'])
+    SubElement(sessao_xml, 'horario').text = sessao['horario']
+    SubElement(sessao_xml, 'capacidade').text = str(sessao['capacidade'])
+    SubElement(sessao_xml, 'formato_exibicao').text = sessao['formato_exibicao']
+    SubElement(sessao_xml, 'assentos_ocupados', formato='bitmap').text = sessao['assentos_ocupados'].para_texto()
+    return sessao_xml
+
+def _le_assentos_xml(assentos_xml: Element | None, capacidade: int) -> MapaAssentos:
+    """
+    Lê o mapa de assentos de uma sessão. Aceita o formato bitmap e o formato
+    antigo, com um elemento <assento> por lugar ocupado.
+    """
+    if assentos_xml is None:
+        return MapaAssentos(capacidade)
+    if assentos_xml.get('formato') == 'bitmap':
+        return MapaAssentos.de_texto(capacidade, assentos_xml.text)
+    return MapaAssentos(capacidade, (int(assento.text) for assento in assentos_xml.findall('assento')))
+
+@instrumentado
 def grava_dados_xml():
-    """Salva a estrutura atual do ElementTree no arquivo."""
-    with open(nome_arquivo, 'w') as file_object:
-        file_object.write(formata_saida_xml(sessoesElement))
+    """
+    Salva todas as sessões no arquivo, uma <sessao> por vez, sem montar
+    a árvore XML inteira em memória. O arquivo só é substituído quando a
+    gravação termina (ver arquivo_atomico).
+    O snapshot já contém todos os assentos, então o journal é esvaziado.
+    """
+    with _travaPersistencia:
+        exporta_xml(nome_arquivo, listaSessoes[:], dict(layoutSalas), _ultimoIdSessao)
+        _limpa_journal()
+
+def exporta_xml(caminho: str, sessoes: list, layouts: dict | None = None, ultimo_id: int = 0) -> None:
+    """
+    Escreve `sessoes` (e o layout das salas) em `caminho`, no formato do sessoes.xml.
+    `ultimo_id`, se maior que zero, é o maior id de sessão já usado.
+    """
+    with arquivo_atomico(caminho) as file_object:
+        file_object.write(f'<sessoes ultimo_id="{ultimo_id}">\n' if ultimo_id > 0 else '<sessoes>\n')
+        file_object.write('  <!--Dados de Sessões de Cinema-->\n')
+        for sala, largura in sorted((layouts or {}).items()):
+            file_object.write(f'  <layout_sala sala="{sala}" assentos_por_fileira="{largura}" />\n')
+        for sessao in sessoes:
+            file_object.write('  ' + formata_saida_xml(_sessao_para_xml(sessao), nivel=1) + '\n')
+        file_object.write('</sessoes>')
+
+def _persiste_reserva(sessao_id: int, assentos: list[int]) -> None:
+    """Registra no journal (ou no snapshot) os assentos recém-ocupados."""
+    if Armazenamento.backend is not None:
+        Armazenamento.backend.reserva_assentos(sessao_id, assentos)
+        return
+
+    # O arquivo XML só é regravado no próximo snapshot
+    if modo_journal:
+        with _travaPersistencia:
+            _registra_journal(sessao_id, assentos)
+    else:
+        gravacao.marca_alterado()
+
+@instrumentado
+def flush() -> None:
+    """Grava agora no sessoes.xml as alterações ainda pendentes."""
+    gravacao.flush()
 
+def _registra_journal(sessao_id: int, assentos: list[int]) -> None:
+    """
+    Anexa ao journal um registro por assento reservado (8 bytes cada),
+    em uma única escrita.
+    """
+    registros = b''.join(_REGISTRO_JOURNAL.pack(sessao_id, numero_assento) for numero_assento in assentos)
+    with open(nome_arquivo_journal, 'ab') as journal:
+        journal.write(registros)
+
+def _limpa_journal() -> None:
+    """Descarta o journal depois que o snapshot XML foi gravado."""
+    if os.path.exists(nome_arquivo_journal):
+        open(nome_arquivo_journal, 'wb').close()
+
+def _reaplica_journal() -> None:
+    """
+    Reaplica as reservas do journal sobre as sessões carregadas do snapshot.
+    Registros repetidos, de sessões inexistentes ou truncados (queda no meio
+    de uma escrita) são ignorados.
+    """
+    try:
+        with open(nome_arquivo_journal, 'rb') as journal:
+            conteudo = journal.read()
+    except FileNotFoundError:
+        return
+
+    tamanho_valido = len(conteudo) - len(conteudo) % _REGISTRO_JOURNAL.size
+    for sessao_id, numero_assento in _REGISTRO_JOURNAL.iter_unpack(conteudo[:tamanho_valido]):
+        sessao = indiceSessoes.get(sessao_id)
+        if sessao is not None:
+            sessao["assentos_ocupados"].ocupa(numero_assento)
+
+def _minutos(horario: str) -> int:
+    """Converte 'HH:MM' em minutos desde a meia-noite."""
+    return int(horario[:2]) * 60 + int(horario[3:5])
+
+def _duracao_filme(filme) -> int:
+    """Duração do filme em minutos inteiros (0 se desconhecida)."""
+    duracao = filme.get("duracao") if isinstance(filme, (dict, Registro)) else None
+    if isinstance(duracao, (int, float)) and duracao > 0:
+        return math.ceil(duracao)
+    return 0
+
+def _intervalos_ocupacao(horario: str, duracao: int) -> list[tuple[int, int]]:
+    """Intervalos [inicio, fim) em que a sessão ocupa a sala, no dia de 24h."""
+    inicio = _minutos(horario)
+    fim = inicio + duracao + intervalo_limpeza
+    if fim <= MINUTOS_DIA:
+        return [(inicio, fim)]
+    return [(inicio, MINUTOS_DIA), (0, min(fim - MINUTOS_DIA, inicio))]
+
+def _sessao_em_conflito(sala: int, intervalos: list[tuple[int, int]]) -> int | None:
+    """
+    Retorna o id de uma sessão da sala que se sobrepõe a algum dos
+    intervalos, ou None. Como a agenda está ordenada e sem sobreposição,
+    basta olhar os vizinhos da posição de inserção (busca binária).
+    """
+    agenda = _agendaSalas.get(sala)
+    if not agenda:
+        return None
+
+    for inicio, fim in intervalos:
+        posicao = bisect.bisect_left(agenda, (inicio,))
+        if posicao > 0 and agenda[posicao - 1][1] > inicio:
+            return agenda[posicao - 1][2]
+        if posicao < len(agenda) and agenda[posicao][0] < fim:
+            return agenda[posicao][2]
+    return None
+
+def _indexa_sessao(sessao: dict, duracao: int | None = None) -> None:
+    """Registra a sessão na agenda da sua sala e nos índices de busca."""
+    _sessoesPorFilme.setdefault(sessao["filme_id"], {})[sessao["id"]] = sessao
+    _sessoesPorFormato.setdefault(sessao["formato_exibicao"], {})[sessao["id"]] = sessao
+    bisect.insort(_sessoesPorHorario, (_minutos(sessao["horario"]), sessao["id"]))
+
+    if duracao is None:
+        duracao = _duracao_filme(busca_filme(sessao["filme_id"]))
+
+    intervalos = _intervalos_ocupacao(sessao["horario"], duracao)
+    agenda = _agendaSalas.setdefault(sessao["sala"], [])
+    for inicio, fim in intervalos:
+        bisect.insort(agenda, (inicio, fim, sessao["id"]))
+    _intervalosSessao[sessao["id"]] = (sessao["sala"], intervalos)
+
+def _desindexa_sessao(sessao: dict) -> None:
+    """Tira a sessão da agenda da sua sala e dos índices de busca."""
+    sessao_id = sessao["id"]
+    _sessoesPorFilme.get(sessao["filme_id"], {}).pop(sessao_id, None)
+    _sessoesPorFormato.get(sessao["formato_exibicao"], {}).pop(sessao_id, None)
+    chave = (_minutos(sessao["horario"]), sessao_id)
+    posicao = bisect.bisect_left(_sessoesPorHorario, chave)
+    if posicao < len(_sessoesPorHorario) and _sessoesPorHorario[posicao] == chave:
+        del _sessoesPorHorario[posicao]
+
+    sala, intervalos = _intervalosSessao.pop(sessao_id, (None, ()))
+    agenda = _agendaSalas.get(sala, [])
+    for inicio, fim in intervalos:
+        posicao = bisect.bisect_left(agenda, (inicio, fim, sessao_id))
+        if posicao < len(agenda) and agenda[posicao] == (inicio, fim, sessao_id):
+            del agenda[posicao]
+
+def _reconstroi_indices() -> None:
+    """Monta a agenda das salas e os índices a partir das sessões carregadas."""
+    _agendaSalas.clear()
+    _intervalosSessao.clear()
+    _sessoesPorFilme.clear()
+    _sessoesPorFormato.clear()
+    _sessoesPorHorario.clear()
+    for sessao in listaSessoes:
+        _indexa_sessao(sessao)
+
+def _le_dados() -> None:
+    """Carrega as sessões do armazenamento em uso (XML por padrão)."""
+    global _carregado, _ultimoIdSessao
+
+    _descarta_bloqueios()
+    _indicesFileiras.clear()
+    if Armazenamento.backend is None:
+        ler_dados_xml()
+        return
+
+    listaSessoes.clear()
+    indiceSessoes.clear()
+    layoutSalas.clear()
+    layoutSalas.update(Armazenamento.backend.carrega_layouts_salas())
+    for linha in Armazenamento.backend.carrega_sessoes():
+        linha["assentos_ocupados"] = MapaAssentos(linha["capacidade"], linha["assentos_ocupados"])
+        sessao = RegistroSessao(**linha)
+        listaSessoes.append(sessao)
+        indiceSessoes[sessao["id"]] = sessao
+    _ultimoIdSessao = max(Armazenamento.backend.ultimo_id_sessao(), listaSessoes[-1].id if listaSessoes else 0)
+    _reconstroi_indices()
+    _carregado = True
+
+@instrumentado
 def ler_dados_xml():
-    """Lê o arquivo XML e popula a listaSessoes e o sessoesElement."""
-    global listaSessoes, sessoesElement
+    """
+    Lê o arquivo XML em fluxo (iterparse) e popula a listaSessoes e o indiceSessoes.
+    Cada <sessao> é descartada logo depois de convertida, então a árvore
+    do documento nunca fica inteira em memória.
+    Em seguida reaplica o journal de reservas feitas depois do último snapshot.
+    """
+    global _carregado, _ultimoIdSessao
+
+    # Limpa a lista atual para não duplicar se chamar duas vezes
+    listaSessoes.clear()
+    indiceSessoes.clear()
+    layoutSalas.clear()
+    _ultimoIdSessao = 0
+
     try:
         with open(nome_arquivo, 'rt') as f:
-            tree = ElementTree.parse(f)
-            root = tree.getroot()
-
-        # Limpa a lista atual para não duplicar se chamar duas vezes
-        listaSessoes.clear()
-
-        for sessao_xml in root.findall('sessao'):
-            # Reconstrói o dicionário
-            dict_sessao = {
-                "id": int(sessao_xml.find('id').text),
-                "filme_id": int(sessao_xml.find('filme_id').text),
-                "sala": int(sessao_xml.find('sala').text),
-                "horario": sessao_xml.find('horario').text,
-                "capacidade": int(sessao_xml.find('capacidade').text),
-                "formato_exibicao": sessao_xml.find('formato_exibicao').text,
-                "assentos_ocupados": []
-            }
-            
-            # Recupera a lista de assentos ocupados
-            ocupados_element = sessao_xml.find('assentos_ocupados')
-            if ocupados_element:
-                for assento in ocupados_element.findall('assento'):
-                    dict_sessao["assentos_ocupados"].append(int(assento.text))
-
-            listaSessoes.append(dict_sessao)
-
-        # Atualiza a referência do Elemento Raiz para memória
-        sessoesElement = root
+            for _, sessao_xml in ElementTree.iterparse(f):
+                if sessao_xml.tag == 'layout_sala':
+                    layoutSalas[int(sessao_xml.get('sala'))] = int(sessao_xml.get('assentos_por_fileira'))
+                    continue
+                if sessao_xml.tag == 'sessoes':
+                    # A raiz termina por último; arquivos antigos não têm o atributo
+                    _ultimoIdSessao = int(sessao_xml.get('ultimo_id', 0))
+                    continue
+                if sessao_xml.tag != 'sessao':
+                    continue
+
+                # Reconstrói o registro; o mapa de assentos ocupados no
+                # formato antigo é convertido para bitmap no próximo snapshot
+                capacidade = int(sessao_xml.find('capacidade').text)
+                sessao = RegistroSessao(
+                    id=int(sessao_xml.find('id').text),
+                    filme_id=int(sessao_xml.find('filme_id').text),
+                    sala=int(sessao_xml.find('sala').text),
+                    horario=sessao_xml.find('horario').text,
+                    capacidade=capacidade,
+                    formato_exibicao=sessao_xml.find('formato_exibicao').text,
+                    assentos_ocupados=_le_assentos_xml(sessao_xml.find('assentos_ocupados'), capacidade)
+                )
+
+                listaSessoes.append(sessao)
+                indiceSessoes[sessao.id] = sessao
+
+                # Solta os filhos do elemento já lido; na raiz fica só o <sessao> vazio
+                sessao_xml.clear()
 
     except FileNotFoundError:
-        # Se não existe, cria a estrutura básica
-        sessoesElement = Element('sessoes')
-        sessoesElement.append(Comment('Dados de Sessões de Cinema'))
+        # Se não existe, começa vazio; o arquivo é criado na primeira gravação
+        pass
+
+    _ultimoIdSessao = max(_ultimoIdSessao, listaSessoes[-1].id if listaSessoes else 0)
+    _reconstroi_indices()
+    _reaplica_journal()
+    _carregado = True
+
+def carrega(diretorio: str | None = None) -> None:
+    """
+    Carrega (ou recarrega) as sessões do disco.
+    Se `diretorio` for informado, passa a usar o sessoes.xml e o journal dessa pasta.
+    """
+    global nome_arquivo, nome_arquivo_journal
+
+    with _travaCarga:
+        # Pendências vão para o arquivo atual antes de ele ser trocado ou relido
+        gravacao.flush()
+        if diretorio is not None:
+            nome_arquivo = os.path.join(diretorio, 'sessoes.xml')
+            nome_arquivo_journal = os.path.join(diretorio, 'sessoes.journal')
+        _le_dados()
+
+def restaura(sessoes: list[RegistroSessao], layouts: dict | None = None, ultimo_id: int = 0) -> None:
+    """
+    Substitui as sessões em memória pelas já lidas, com os assentos
+    ocupados, e o layout das salas (usado pelo snapshot). O journal não
+    é reaplicado. `ultimo_id` é o maior id de sessão já usado.
+    """
+    global _carregado, _ultimoIdSessao
+
+    with _travaCarga:
+        gravacao.descarta_pendentes()
+        _descarta_bloqueios()
+        _indicesFileiras.clear()
+        layoutSalas.clear()
+        layoutSalas.update(layouts or {})
+        listaSessoes[:] = sessoes
+        indiceSessoes.clear()
+        for sessao in sessoes:
+            indiceSessoes[sessao.id] = sessao
+        _ultimoIdSessao = max(ultimo_id, sessoes[-1].id if sessoes else 0)
+        _reconstroi_indices()
+        _carregado = True
+
+def _garante_carregado() -> None:
+    """Carrega os dados no primeiro acesso, em vez de na importação do módulo."""
+    if not _carregado:
+        with _travaCarga:
+            if not _carregado:
+                _le_dados()
 
 def obtem_todas_sessoes() -> list:
     """Retorna uma cópia da lista de todas as sessões."""
+    _garante_carregado()
     return listaSessoes[:]
 
-def _valida_conflito_ou_duplicata(nova_sessao: dict) -> int:
+def visao_sessoes() -> Paginacao.VisaoLista:
+    """Todas as sessões, sem copiar a lista (somente leitura, acompanha as alterações)."""
+    _garante_carregado()
+    return Paginacao.VisaoLista(listaSessoes)
+
+def itera_sessoes(inicio: int = 0, limite: int | None = None):
     """
-    Verifica se a nova sessão conflita ou é duplicada de uma existente.
-    Retorna SUCESSO (0) se for válida, ou o código de erro (JA_EXISTE).
+    Gerador das sessões a partir da posição `inicio`, no máximo `limite`
+    delas, sem copiar a lista inteira. Retorna -1 se os parâmetros forem inválidos.
     """
-    for sessao_existente in listaSessoes:
-        if (sessao_existente["filme_id"] == nova_sessao["filme_id"] and
-            sessao_existente["sala"] == nova_sessao["sala"] and
-            sessao_existente["horario"] == nova_sessao["horario"] and
-            sessao_existente["formato_exibicao"] == nova_sessao["formato_exibicao"]):
-            
-            
-            return padrao_retornos.JA_EXISTE 
-            
-        if (sessao_existente["sala"] == nova_sessao["sala"] and
-            sessao_existente["horario"] == nova_sessao["horario"]):
-            
-            return padrao_retornos.JA_EXISTE 
-            
-    return padrao_retornos.SUCESSO
+    if not Paginacao.parametros_validos(inicio=inicio, limite=limite):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+    return Paginacao.itera(listaSessoes, inicio, limite)
+
+@instrumentado
+def pagina_sessoes(tamanho: int, cursor: int | None = None) -> dict | int:
+    """
+    Até `tamanho` sessões, em ordem de id, depois da sessão `cursor` (None
+    para a primeira página): {"registros": [...], "proximo_cursor": id ou
+    None no fim}. Retorna -1 se os parâmetros forem inválidos.
+    """
+    if not Paginacao.parametros_validos(tamanho=tamanho, cursor=cursor):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+    return Paginacao.pagina(listaSessoes, tamanho, cursor)
+
+def _valida_conflito_ou_duplicata(nova_sessao: dict, duracao: int = 0) -> int:
+    """
+    Verifica se a nova sessão conflita ou é duplicada de uma existente,
+    consultando a agenda da sala em O(log n).
+    Retorna SUCESSO (0) se for válida, JA_EXISTE (2) se a sala já tem sessão
+    no mesmo horário, ou CONFLITO (3) se a sala estiver ocupada (filme +
+    limpeza) em parte do período da nova sessão.
+    """
+    intervalos = _intervalos_ocupacao(nova_sessao["horario"], duracao)
+    conflitante = _sessao_em_conflito(nova_sessao["sala"], intervalos)
+    if conflitante is None:
+        return padrao_retornos.SUCESSO
+
+    if indiceSessoes[conflitante]["horario"] == nova_sessao["horario"]:
+        return padrao_retornos.JA_EXISTE
+    return padrao_retornos.CONFLITO
 
 def _valida_horario(horario: str) -> bool:
     """
@@ -126,6 +512,7 @@ def _valida_horario(horario: str) -> bool:
     return True
 
 
+@instrumentado
 def cria_sessao (filme_id, sala, horario, capacidade, formato_exibicao) -> int:
     
 
@@ -147,39 +534,54 @@ def cria_sessao (filme_id, sala, horario, capacidade, formato_exibicao) -> int:
     if filmeEncontrado is None:
         return padrao_retornos.NAO_ENCONTRADO
 
-    # Criação do Dicionário
-    nova_sessao = {
-        "id": len(listaSessoes) + 1,
-        "filme_id": filme_id,
-        "sala": sala,
-        "horario": horario,
-        "capacidade": capacidade,
-        "formato_exibicao": formato_exibicao,
-        "assentos_ocupados": []
-    } 
+    _garante_carregado()
+    with _travaCadastro:
+        return _insere_sessao(filme_id, sala, horario, capacidade, formato_exibicao,
+                              _duracao_filme(filmeEncontrado))
 
-   
-    codigo_validacao = _valida_conflito_ou_duplicata(nova_sessao)
-    if codigo_validacao != padrao_retornos.SUCESSO:
-        return codigo_validacao
 
-    sessao_xml = SubElement(sessoesElement, 'sessao')
-    
-    SubElement(sessao_xml, 'id').text = str(nova_sessao['id'])
-    SubElement(sessao_xml, 'filme_id').text = str(nova_sessao['filme_id'])
-    SubElement(sessao_xml, 'sala').text = str(nova_sessao['sala'])
-    SubElement(sessao_xml, 'horario').text = nova_sessao['horario']
-    SubElement(sessao_xml, 'capacidade').text = str(nova_sessao['capacidade'])
-    SubElement(sessao_xml, 'formato_exibicao').text = nova_sessao['formato_exibicao']
-    
-    # Container para assentos (vazio inicialmente)
-    SubElement(sessao_xml, 'assentos_ocupados')
+def _proximo_id() -> int:
+    """Id da próxima sessão: o primeiro depois do maior já usado (ver passo_ids)."""
+    base = max(_ultimoIdSessao, id_minimo) + 1
+    return base + (resto_ids - base) % passo_ids
+
+def ultimo_id_sessao() -> int:
+    """Maior id de sessão já usado, inclusive por sessões apagadas."""
+    return _ultimoIdSessao
+
+
+def _insere_sessao(filme_id, sala, horario, capacidade, formato_exibicao, duracao: int = 0) -> int:
+    """Cria e persiste a sessão já validada. Deve ser chamada com _travaCadastro."""
+    global _ultimoIdSessao
 
-    grava_dados_xml()
+    # Criação do Dicionário (depois do maior id já usado; len() + 1 ou o id
+    # da última da lista repetiriam ids depois de uma remoção)
+    nova_sessao = RegistroSessao(
+        id=_proximo_id(),
+        filme_id=filme_id,
+        sala=sala,
+        horario=horario,
+        capacidade=capacidade,
+        formato_exibicao=formato_exibicao,
+        assentos_ocupados=MapaAssentos(capacidade)
+    )
 
+   
+    codigo_validacao = _valida_conflito_ou_duplicata(nova_sessao, duracao)
+    if codigo_validacao != padrao_retornos.SUCESSO:
+        return codigo_validacao
 
     # Adiciona na memória
+    _ultimoIdSessao = nova_sessao.id
     listaSessoes.append(nova_sessao)
+    indiceSessoes[nova_sessao["id"]] = nova_sessao
+    _indexa_sessao(nova_sessao, duracao)
+
+    # Persistência
+    if Armazenamento.backend is not None:
+        Armazenamento.backend.salva_sessao(nova_sessao)
+    else:
+        gravacao.marca_alterado()
     
     return padrao_retornos.SUCESSO    
     # Sucesso e Persistência
@@ -187,35 +589,60 @@ def cria_sessao (filme_id, sala, horario, capacidade, formato_exibicao) -> int:
     
 
 
-def busca_sessao(sessao_id: int) -> dict | None:
+@instrumentado
+def busca_sessao(sessao_id: int) -> RegistroSessao | None:
     """
-    Busca uma sessão específica na listaSessoes pelo seu ID.
+    Busca uma sessão específica pelo seu ID (consulta O(1) no indiceSessoes).
     """
     if not isinstance(sessao_id, int) or sessao_id <= 0:
         return None
-        
-    for sessao in listaSessoes:
-        if sessao["id"] == sessao_id:
-            return sessao 
-            
-    return None  
+
+    _garante_carregado()
+    return indiceSessoes.get(sessao_id)
 
 
-def assentos_disponiveis(sessao_id:int) -> int:
+@instrumentado(codigos=False)
+def assentos_disponiveis(sessao_id:int, detalhado: bool = False) -> int | dict:
     """
-    Retornar a quantidade de assentos livres em uma sessão 
+    Retornar a quantidade de assentos livres em uma sessão (nem vendidos
+    nem bloqueados). Com detalhado=True, retorna
+    {"livres": int, "bloqueados": int, "vendidos": int}.
+    Retorna -1 se a sessão não existir.
     """
+    _expira_bloqueios()
     sessao_encontrada = busca_sessao(sessao_id)
 
     if sessao_encontrada is None:
         return -1
-    capacidade_total = sessao_encontrada["capacidade"]
-    capacidade_atual = capacidade_total - len(sessao_encontrada["assentos_ocupados"])
-    return capacidade_atual 
+
+    mapa_ocupados = sessao_encontrada["assentos_ocupados"]
+    bloqueados = len(_assentosBloqueados.get(sessao_id, ()))
+    livres = mapa_ocupados.quantidade_livres() - bloqueados
+    if detalhado:
+        return {"livres": livres, "bloqueados": bloqueados, "vendidos": len(mapa_ocupados)}
+    return livres
+
+
+@instrumentado
+def lista_assentos_livres(sessao_id: int) -> list[int] | None:
+    """
+    Retorna os números dos assentos livres (nem vendidos nem bloqueados)
+    de uma sessão, em ordem crescente.
+    Retorna None se a sessão não existir.
+    """
+    _expira_bloqueios()
+    sessao_encontrada = busca_sessao(sessao_id)
+
+    if sessao_encontrada is None:
+        return None
+    bloqueados = _assentosBloqueados.get(sessao_id, {})
+    return [numero_assento for numero_assento in sessao_encontrada["assentos_ocupados"].livres()
+            if numero_assento not in bloqueados]
 
 
 ERRO_SESSAO_LOTADA = 5
 
+@instrumentado
 def reserva_assento(sessao_id: int, numero_assento: int) -> int:
     """
     Reserva um assento específico em uma sessão.
@@ -227,47 +654,338 @@ def reserva_assento(sessao_id: int, numero_assento: int) -> int:
     if not isinstance(numero_assento, int) or numero_assento <= 0:
         return padrao_retornos.PARAMETRO_INVALIDO
 
+    _expira_bloqueios()
     sessao_encontrada = busca_sessao(sessao_id)
     
     if sessao_encontrada is None:
         return padrao_retornos.NAO_ENCONTRADO 
 
     capacidade_total = sessao_encontrada["capacidade"]
-    lista_de_ocupados = sessao_encontrada["assentos_ocupados"]
+    mapa_ocupados = sessao_encontrada["assentos_ocupados"]
 
-    if len(lista_de_ocupados) >= capacidade_total:
-        return ERRO_SESSAO_LOTADA 
+    # Verificação e ocupação atômicas em relação a outras vendas da sessão
+    with _lock_sessao(sessao_id):
+        if indiceSessoes.get(sessao_id) is not sessao_encontrada:
+            return padrao_retornos.NAO_ENCONTRADO  # apagada em paralelo
 
-    if numero_assento > capacidade_total:
-        return padrao_retornos.PARAMETRO_INVALIDO 
+        bloqueados = _assentosBloqueados.get(sessao_id, {})
+        if len(mapa_ocupados) + len(bloqueados) >= capacidade_total:
+            return ERRO_SESSAO_LOTADA 
 
-    
-    
-    if numero_assento in lista_de_ocupados:
-        return padrao_retornos.JA_EXISTE 
+        if numero_assento > capacidade_total:
+            return padrao_retornos.PARAMETRO_INVALIDO 
 
-    
-    lista_de_ocupados.append(numero_assento)
+        if numero_assento in mapa_ocupados or numero_assento in bloqueados:
+            return padrao_retornos.JA_EXISTE 
 
-    str_id = str(sessao_id)
-    
-    # Busca o elemento da sessão no XML
-    for sess_xml in sessoesElement.findall('sessao'):
-        if sess_xml.find('id').text == str_id:
-            # Encontrou. Agora busca a tag de assentos
-            assentos_xml = sess_xml.find('assentos_ocupados')
-            
-            # Adiciona o novo assento
-            novo_assento_elem = SubElement(assentos_xml, 'assento')
-            novo_assento_elem.text = str(numero_assento)
-            
-            grava_dados_xml()
-            break
+        mapa_ocupados.ocupa(numero_assento)
+        _marca_indisponiveis(sessao_id, [numero_assento])
 
+    _persiste_reserva(sessao_id, [numero_assento])
     
     return padrao_retornos.SUCESSO
 
+
+def _valida_pedido(sessao_id: int, assentos: list[int]) -> tuple:
+    """
+    Valida um pedido de vários assentos de uma sessão (tipos, repetições e
+    limites da sala). Retorna (codigo, sessao); a sessão só vem com SUCESSO.
+    """
+    if not isinstance(sessao_id, int) or sessao_id <= 0:
+        return padrao_retornos.PARAMETRO_INVALIDO, None
+
+    if not isinstance(assentos, (list, tuple)) or not assentos:
+        return padrao_retornos.PARAMETRO_INVALIDO, None
+
+    for numero_assento in assentos:
+        if not isinstance(numero_assento, int) or numero_assento <= 0:
+            return padrao_retornos.PARAMETRO_INVALIDO, None
+
+    # O mesmo assento repetido no pedido
+    if len(set(assentos)) != len(assentos):
+        return padrao_retornos.PARAMETRO_INVALIDO, None
+
+    sessao_encontrada = busca_sessao(sessao_id)
+
+    if sessao_encontrada is None:
+        return padrao_retornos.NAO_ENCONTRADO, None
+
+    for numero_assento in assentos:
+        if numero_assento > sessao_encontrada["capacidade"]:
+            return padrao_retornos.PARAMETRO_INVALIDO, None
+
+    return padrao_retornos.SUCESSO, sessao_encontrada
+
+
+@instrumentado
+def reserva_assentos(sessao_id: int, assentos: list[int]) -> int:
+    """
+    Reserva vários assentos de uma sessão de uma só vez (tudo ou nada).
+    Todos os assentos são validados antes de qualquer reserva, e a
+    persistência é feita com uma única escrita.
+    Retorna um código de status inteiro.
+    """
+    codigo, sessao_encontrada = _valida_pedido(sessao_id, assentos)
+    if codigo != padrao_retornos.SUCESSO:
+        return codigo
+
+    capacidade_total = sessao_encontrada["capacidade"]
+    mapa_ocupados = sessao_encontrada["assentos_ocupados"]
+
+    _expira_bloqueios()
+    with _lock_sessao(sessao_id):
+        if indiceSessoes.get(sessao_id) is not sessao_encontrada:
+            return padrao_retornos.NAO_ENCONTRADO  # apagada em paralelo
+
+        bloqueados = _assentosBloqueados.get(sessao_id, {})
+        if len(mapa_ocupados) + len(bloqueados) >= capacidade_total:
+            return ERRO_SESSAO_LOTADA
+
+        for numero_assento in assentos:
+            if numero_assento in mapa_ocupados or numero_assento in bloqueados:
+                return padrao_retornos.JA_EXISTE
+
+        for numero_assento in assentos:
+            mapa_ocupados.ocupa(numero_assento)
+        _marca_indisponiveis(sessao_id, assentos)
+
+    _persiste_reserva(sessao_id, list(assentos))
+
+    return padrao_retornos.SUCESSO
+
+
+def _aloca_id_bloqueio() -> int:
+    """Próximo id de bloqueio (no modo particionado, com o mesmo passo das sessões)."""
+    global _ultimoIdBloqueio
+
+    with _travaIdBloqueio:
+        base = _ultimoIdBloqueio + 1
+        _ultimoIdBloqueio = base + (resto_ids - base) % passo_ids
+        return _ultimoIdBloqueio
+
+
+@instrumentado
+def bloqueia_assentos(sessao_id: int, assentos: list[int], duracao: float | None = None) -> tuple:
+    """
+    Bloqueia assentos de uma sessão enquanto o cliente conclui a compra
+    (tudo ou nada). Os assentos deixam de estar disponíveis para os outros
+    até o bloqueio ser confirmado, liberado ou vencer, depois de `duracao`
+    segundos (duracao_bloqueio se omitida).
+
+    Retorna uma tupla (codigo, bloqueio_id); o id só vem com SUCESSO.
+    Os códigos de falha são os de reserva_assentos.
+    """
+    if duracao is None:
+        duracao = duracao_bloqueio
+    if not isinstance(duracao, (int, float)) or duracao <= 0:
+        return padrao_retornos.PARAMETRO_INVALIDO, None
+
+    codigo, sessao_encontrada = _valida_pedido(sessao_id, assentos)
+    if codigo != padrao_retornos.SUCESSO:
+        return codigo, None
+
+    mapa_ocupados = sessao_encontrada["assentos_ocupados"]
+
+    _expira_bloqueios()
+    with _lock_sessao(sessao_id):
+        if indiceSessoes.get(sessao_id) is not sessao_encontrada:
+            return padrao_retornos.NAO_ENCONTRADO, None  # apagada em paralelo
+
+        bloqueados = _assentosBloqueados.get(sessao_id, {})
+        if len(mapa_ocupados) + len(bloqueados) >= sessao_encontrada["capacidade"]:
+            return ERRO_SESSAO_LOTADA, None
+
+        for numero_assento in assentos:
+            if numero_assento in mapa_ocupados or numero_assento in bloqueados:
+                return padrao_retornos.JA_EXISTE, None
+
+        bloqueio_id = _aloca_id_bloqueio()
+        vencimento = _rodaBloqueios.agenda(bloqueio_id, duracao)
+        _bloqueios[bloqueio_id] = (sessao_id, tuple(assentos), vencimento)
+        bloqueados = _assentosBloqueados.setdefault(sessao_id, {})
+        for numero_assento in assentos:
+            bloqueados[numero_assento] = bloqueio_id
+        _marca_indisponiveis(sessao_id, assentos)
+
+    return padrao_retornos.SUCESSO, bloqueio_id
+
+
+@instrumentado
+def busca_bloqueio(bloqueio_id: int) -> dict | None:
+    """
+    Retorna {"id", "sessao_id", "assentos", "segundos_restantes"} de um
+    bloqueio ativo, ou None se ele não existir (ou já tiver vencido).
+    """
+    _expira_bloqueios()
+    bloqueio = _bloqueios.get(bloqueio_id)
+    if bloqueio is None:
+        return None
+
+    sessao_id, assentos, vencimento = bloqueio
+    return {
+        "id": bloqueio_id,
+        "sessao_id": sessao_id,
+        "assentos": list(assentos),
+        "segundos_restantes": max(0.0, vencimento - _rodaBloqueios.relogio()),
+    }
+
+
+@instrumentado
+def confirma_bloqueio(bloqueio_id: int) -> int:
+    """
+    Transforma os assentos de um bloqueio ativo em assentos vendidos, como
+    reserva_assentos (para emitir os ingressos, ver ingresso.compra_bloqueio).
+    Retorna NAO_ENCONTRADO se o bloqueio não existir ou já tiver vencido.
+    """
+    _expira_bloqueios()
+    bloqueio = _bloqueios.get(bloqueio_id)
+    if bloqueio is None:
+        return padrao_retornos.NAO_ENCONTRADO
+
+    sessao_id, assentos, _ = bloqueio
+    with _lock_sessao(sessao_id):
+        # Pode ter vencido ou sido liberado em paralelo; os assentos continuam indisponíveis
+        if not _retira_bloqueio(bloqueio_id, devolve=False):
+            return padrao_retornos.NAO_ENCONTRADO
+        mapa_ocupados = indiceSessoes[sessao_id]["assentos_ocupados"]
+        for numero_assento in assentos:
+            mapa_ocupados.ocupa(numero_assento)
+    _rodaBloqueios.cancela(bloqueio_id)
+
+    _persiste_reserva(sessao_id, list(assentos))
+
+    return padrao_retornos.SUCESSO
+
+
+@instrumentado
+def libera_bloqueio(bloqueio_id: int) -> int:
+    """Devolve os assentos de um bloqueio (compra desistida). NAO_ENCONTRADO se ele não existir."""
+    bloqueio = _bloqueios.get(bloqueio_id)
+    if bloqueio is None:
+        return padrao_retornos.NAO_ENCONTRADO
+
+    with _lock_sessao(bloqueio[0]):
+        if not _retira_bloqueio(bloqueio_id):
+            return padrao_retornos.NAO_ENCONTRADO
+    _rodaBloqueios.cancela(bloqueio_id)
+
+    return padrao_retornos.SUCESSO
+
+
+def _retira_bloqueio(bloqueio_id: int, devolve: bool = True) -> bool:
+    """
+    Remove o bloqueio e solta os assentos (com devolve=False, eles estão
+    sendo vendidos). Deve ser chamada com a trava da sessão.
+    """
+    bloqueio = _bloqueios.pop(bloqueio_id, None)
+    if bloqueio is None:
+        return False
+
+    sessao_id, assentos, _ = bloqueio
+    bloqueados = _assentosBloqueados.get(sessao_id, {})
+    for numero_assento in assentos:
+        bloqueados.pop(numero_assento, None)
+    if not bloqueados:
+        _assentosBloqueados.pop(sessao_id, None)
+
+    indice = _indicesFileiras.get(sessao_id)
+    if devolve and indice is not None:
+        for numero_assento in assentos:
+            indice.libera(numero_assento)
+    return True
+
+
+def _expira_bloqueios() -> None:
+    """Solta os assentos dos bloqueios vencidos desde a última chamada."""
+    for bloqueio_id in _rodaBloqueios.avanca():
+        bloqueio = _bloqueios.get(bloqueio_id)
+        if bloqueio is not None:
+            with _lock_sessao(bloqueio[0]):
+                _retira_bloqueio(bloqueio_id)
+
+
+def _descarta_bloqueios() -> None:
+    """Esquece todos os bloqueios (as sessões foram recarregadas)."""
+    _rodaBloqueios.limpa()
+    _bloqueios.clear()
+    _assentosBloqueados.clear()
+
+
+@instrumentado
+def define_layout_sala(sala: int, assentos_por_fileira: int) -> int:
+    """
+    Define quantos assentos cada fileira da sala tem (vale para todas as
+    sessões da sala, inclusive as já cadastradas).
+    Retorna SUCESSO ou PARAMETRO_INVALIDO.
+    """
+    if (not isinstance(sala, int) or sala <= 0 or
+        not isinstance(assentos_por_fileira, int) or assentos_por_fileira <= 0):
+        return padrao_retornos.PARAMETRO_INVALIDO
+
+    _garante_carregado()
+    with _travaCadastro:
+        layoutSalas[sala] = assentos_por_fileira
+        # Os trechos das sessões da sala mudam; são remontados na próxima consulta
+        for sessao_id in [sessao_id for _, _, sessao_id in _agendaSalas.get(sala, ())]:
+            with _lock_sessao(sessao_id):
+                _indicesFileiras.pop(sessao_id, None)
+
+    if Armazenamento.backend is not None:
+        Armazenamento.backend.salva_layout_sala(sala, assentos_por_fileira)
+    else:
+        gravacao.marca_alterado()
+
+    return padrao_retornos.SUCESSO
+
+
+def assentos_por_fileira(sala: int) -> int:
+    """Quantos assentos cada fileira da sala tem."""
+    _garante_carregado()
+    return layoutSalas.get(sala, assentos_por_fileira_padrao)
+
+
+def _marca_indisponiveis(sessao_id: int, assentos) -> None:
+    """Atualiza os trechos livres da sessão, se já montados. Deve ser chamada com a trava da sessão."""
+    indice = _indicesFileiras.get(sessao_id)
+    if indice is not None:
+        for numero_assento in assentos:
+            indice.ocupa(numero_assento)
+
+
+@instrumentado
+def melhores_assentos(sessao_id: int, quantidade: int) -> list[int] | None:
+    """
+    Sugere `quantidade` assentos vizinhos na mesma fileira, livres (nem
+    vendidos nem bloqueados): na fileira mais perto do centro da sala que
+    tenha espaço e, nela, o bloco mais centralizado. Não reserva nada.
+
+    Retorna a lista dos números dos assentos, [] se nenhum bloco couber,
+    ou None se a sessão não existir ou a quantidade for inválida.
+    """
+    if not isinstance(quantidade, int) or quantidade <= 0:
+        return None
+
+    _expira_bloqueios()
+    sessao_encontrada = busca_sessao(sessao_id)
+    if sessao_encontrada is None:
+        return None
+
+    with _lock_sessao(sessao_id):
+        if indiceSessoes.get(sessao_id) is not sessao_encontrada:
+            return None  # apagada em paralelo
+
+        indice = _indicesFileiras.get(sessao_id)
+        if indice is None:
+            indisponiveis = list(sessao_encontrada["assentos_ocupados"])
+            indisponiveis.extend(_assentosBloqueados.get(sessao_id, ()))
+            indice = IndiceFileiras(sessao_encontrada["capacidade"],
+                                    layoutSalas.get(sessao_encontrada["sala"], assentos_por_fileira_padrao),
+                                    indisponiveis)
+            _indicesFileiras[sessao_id] = indice
+        return indice.melhor_bloco(quantidade)
+
     
+@instrumentado
 def lista_sessoes(filtro_filme_id: int = None, 
                   formato_exibicao: str = None, 
                   horario_minimo: str = None) -> tuple:
@@ -280,60 +998,92 @@ def lista_sessoes(filtro_filme_id: int = None,
         horario_minimo (str, opcional): Horário mínimo "HH:MM".
 
     Retorna uma tupla contendo: (codigo,lista)
-    
+    O código é PARAMETRO_INVALIDO se horario_minimo não estiver no formato "HH:MM".
+
+    Percorre só o menor dos conjuntos dados pelos índices (sessões do
+    filme, do formato ou a partir do horário), então o custo acompanha o
+    tamanho do resultado, e não o total de sessões.
     """
-    
-    resultado = []
-    
-    for sessao in listaSessoes:
-        
-        #Filme
-        if filtro_filme_id is not None:
-            if sessao["filme_id"] != filtro_filme_id:
-                continue
 
-        #Formato
-        if formato_exibicao is not None:
-            if sessao["formato_exibicao"] != formato_exibicao:
-                continue # Pula
+    if horario_minimo is not None and (not isinstance(horario_minimo, str) or
+                                       not _valida_horario(horario_minimo)):
+        return padrao_retornos.PARAMETRO_INVALIDO, []
+
+    _garante_carregado()
+    if filtro_filme_id is None and formato_exibicao is None and horario_minimo is None:
+        return padrao_retornos.SUCESSO, listaSessoes.copy()
 
-        #Horário Mínimo (Comparação de String "HH:MM")
-        if horario_minimo is not None:
-            if sessao["horario"] < horario_minimo:
-                continue 
+    # Candidatos: o menor dos índices que se aplicam
+    candidatos = None
+    if filtro_filme_id is not None:
+        candidatos = _sessoesPorFilme.get(filtro_filme_id, {}).values()
+    if formato_exibicao is not None:
+        por_formato = _sessoesPorFormato.get(formato_exibicao, {}).values()
+        if candidatos is None or len(por_formato) < len(candidatos):
+            candidatos = por_formato
 
-        # Se sobreviveu a todos os 'continue', adiciona na lista final
-        resultado.append(sessao)
+    if horario_minimo is not None:
+        inicio = bisect.bisect_left(_sessoesPorHorario, (_minutos(horario_minimo),))
+        if inicio == 0:
+            # Nenhuma sessão começa antes do mínimo: o filtro não elimina nada
+            horario_minimo = None
+            if candidatos is None:
+                return padrao_retornos.SUCESSO, listaSessoes.copy()
+        elif candidatos is None or len(_sessoesPorHorario) - inicio < len(candidatos):
+            # Vêm em ordem de horário; reordena pelo id como nos demais casos
+            ids = sorted([sessao_id for _, sessao_id in _sessoesPorHorario[inicio:]])
+            candidatos = [indiceSessoes[sessao_id] for sessao_id in ids]
+            # Todos já satisfazem o horário mínimo
+            horario_minimo = None
 
+    # Os horários válidos têm sempre o formato "HH:MM", então a comparação
+    # de strings equivale à de minutos
+    resultado = [
+        sessao for sessao in candidatos
+        if (filtro_filme_id is None or sessao["filme_id"] == filtro_filme_id) and
+           (formato_exibicao is None or sessao["formato_exibicao"] == formato_exibicao) and
+           (horario_minimo is None or sessao["horario"] >= horario_minimo)
+    ]
     return padrao_retornos.SUCESSO, resultado
 
+@instrumentado
 def apaga_sessao(sessao_id: int) -> int:
     """
-    Remove uma sessão do sistema, se ela não tiver ingressos vendidos.
+    Remove uma sessão do sistema, se ela não tiver ingressos vendidos
+    nem assentos bloqueados.
     """
 
     if not isinstance(sessao_id, int) or sessao_id <= 0:
         return padrao_retornos.PARAMETRO_INVALIDO
 
+    _garante_carregado()
+    with _travaCadastro:
+        sessao_encontrada = busca_sessao(sessao_id)
 
-    sessao_encontrada = busca_sessao(sessao_id)
-
-    if sessao_encontrada is None:
-        return padrao_retornos.NAO_ENCONTRADO
+        if sessao_encontrada is None:
+            return padrao_retornos.NAO_ENCONTRADO
 
-    if len(sessao_encontrada["assentos_ocupados"]) > 0:
-        return padrao_retornos.JA_EXISTE 
+        _expira_bloqueios()
+        with _lock_sessao(sessao_id):
+            if len(sessao_encontrada["assentos_ocupados"]) > 0 or _assentosBloqueados.get(sessao_id):
+                return padrao_retornos.JA_EXISTE 
 
-    listaSessoes.remove(sessao_encontrada)
-    
-    str_id = str(sessao_id)
-    for sess_xml in sessoesElement.findall('sessao'):
-        if sess_xml.find('id').text == str_id:
-            # Remove o elemento da árvore
-            sessoesElement.remove(sess_xml)
-            grava_dados_xml()
-            break
+            listaSessoes.remove(sessao_encontrada)
+            del indiceSessoes[sessao_id]
+            _indicesFileiras.pop(sessao_id, None)
+            _desindexa_sessao(sessao_encontrada)
+        
+        if Armazenamento.backend is not None:
+            Armazenamento.backend.remove_sessao(sessao_id)
+        else:
+            gravacao.marca_alterado()
     
     
     return padrao_retornos.SUCESSO
-ler_dados_xml()
\ No newline at end of file
+
+# Cadastros e remoções de cada intervalo (em segundos) saem em uma única gravação
+gravacao = GravacaoAdiada(grava_dados_xml, intervalo=1.0)
+
+# Os dados existentes são lidos no primeiro acesso (ver _garante_carregado)
+_carregado = False
+_travaCarga = threading.Lock()
@@ -1,6 +1,9 @@
 import unittest
 import sys
 import os
+import tempfile
+import threading
+import time
 from unittest.mock import patch
 
 
@@ -21,13 +24,37 @@ from modulos.sessao.sessao import (
     obtem_todas_sessoes,
     ERRO_SESSAO_LOTADA
 )
+from modulos.sessao.mapa_assentos import MapaAssentos
+from modulos.sessao.roda_temporizacao import RodaTemporizacao
+from modulos.sessao.fileiras import IndiceFileiras
 
 
 class TestSessaoCompleto(unittest.TestCase):
 
     def setUp(self):
-        """Limpa apenas a lista de sessões local."""
+        """Limpa apenas a lista de sessões local (e seus índices)."""
         modulo_sessao.listaSessoes.clear()
+        modulo_sessao.indiceSessoes.clear()
+        modulo_sessao._reconstroi_indices()
+        modulo_sessao._descarta_bloqueios()
+        modulo_sessao.layoutSalas.clear()
+        modulo_sessao._indicesFileiras.clear()
+
+        # Arquivos em uma pasta temporária, e o estado de carga de volta ao fim do teste
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        for atributo, valor in (("_carregado", True), ("_ultimoIdSessao", 0),
+                                ("nome_arquivo", os.path.join(pasta.name, "sessoes.xml")),
+                                ("nome_arquivo_journal", os.path.join(pasta.name, "sessoes.journal"))):
+            original = patch.object(modulo_sessao, atributo, valor)
+            original.start()
+            self.addCleanup(original.stop)
+
+        # Grava na hora, para os testes lerem o arquivo logo após a alteração
+        gravacao = patch.object(modulo_sessao.gravacao, "intervalo", 0)
+        gravacao.start()
+        self.addCleanup(gravacao.stop)
+        self.addCleanup(modulo_sessao.gravacao.descarta_pendentes)
 
     # -----------------------------------------------------------------------
     # TESTES DE CRIAÇÃO
@@ -302,5 +329,676 @@ class TestSessaoCompleto(unittest.TestCase):
         retorno = apaga_sessao(999)
         self.assertEqual(retorno, padrao_retornos.NAO_ENCONTRADO)
 
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_21b_busca_apos_apagar(self, mock_busca_filme):
+        print("Test 21b: Sessão apagada sai do índice de busca")
+        mock_busca_filme.return_value = {"id": 1}
+
+        cria_sessao(10, 1, "14:00", 100, "dublado") # ID 1
+        cria_sessao(10, 2, "14:00", 100, "dublado") # ID 2
+        apaga_sessao(1)
+
+        self.assertIsNone(busca_sessao(1))
+        self.assertEqual(busca_sessao(2)["sala"], 2)
+
+    # -----------------------------------------------------------------------
+    # TESTES DE JOURNAL
+    # -----------------------------------------------------------------------
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_22_reserva_grava_no_journal(self, mock_busca_filme):
+        print("Test 22: Reserva anexa registro ao journal sem regravar o XML")
+        mock_busca_filme.return_value = {"id": 1}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_xml = os.path.join(pasta, "sessoes.xml")
+            arquivo_journal = os.path.join(pasta, "sessoes.journal")
+
+            with patch.object(modulo_sessao, "nome_arquivo", arquivo_xml), \
+                 patch.object(modulo_sessao, "nome_arquivo_journal", arquivo_journal):
+                modulo_sessao.ler_dados_xml()
+                cria_sessao(1, 5, "20:00", 100, "dublado")
+
+                with open(arquivo_xml) as f:
+                    xml_antes = f.read()
+
+                reserva_assento(1, 10)
+                reserva_assento(1, 11)
+
+                with open(arquivo_xml) as f:
+                    self.assertEqual(f.read(), xml_antes)
+                self.assertEqual(os.path.getsize(arquivo_journal), 2 * modulo_sessao._REGISTRO_JOURNAL.size)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_23_journal_reaplicado_na_carga(self, mock_busca_filme):
+        print("Test 23: Carga reaplica o journal sobre o snapshot")
+        mock_busca_filme.return_value = {"id": 1}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_xml = os.path.join(pasta, "sessoes.xml")
+            arquivo_journal = os.path.join(pasta, "sessoes.journal")
+
+            with patch.object(modulo_sessao, "nome_arquivo", arquivo_xml), \
+                 patch.object(modulo_sessao, "nome_arquivo_journal", arquivo_journal):
+                modulo_sessao.ler_dados_xml()
+                cria_sessao(1, 5, "20:00", 100, "dublado")
+                reserva_assento(1, 10)
+                reserva_assento(1, 20)
+
+                # Registro truncado no fim (queda durante a escrita) deve ser ignorado
+                with open(arquivo_journal, "ab") as f:
+                    f.write(b"\x01\x00")
+
+                # Simula reinício do processo
+                modulo_sessao.listaSessoes.clear()
+                modulo_sessao.indiceSessoes.clear()
+                modulo_sessao.ler_dados_xml()
+
+                sessao = busca_sessao(1)
+                self.assertEqual(sorted(sessao["assentos_ocupados"]), [10, 20])
+                self.assertEqual(reserva_assento(1, 10), padrao_retornos.JA_EXISTE)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_24_snapshot_esvazia_journal(self, mock_busca_filme):
+        print("Test 24: Gravar o snapshot XML esvazia o journal")
+        mock_busca_filme.return_value = {"id": 1}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_xml = os.path.join(pasta, "sessoes.xml")
+            arquivo_journal = os.path.join(pasta, "sessoes.journal")
+
+            with patch.object(modulo_sessao, "nome_arquivo", arquivo_xml), \
+                 patch.object(modulo_sessao, "nome_arquivo_journal", arquivo_journal):
+                modulo_sessao.ler_dados_xml()
+                cria_sessao(1, 5, "20:00", 100, "dublado")
+                reserva_assento(1, 10)
+
+                # Nova sessão grava o snapshot completo, que já inclui o assento 10
+                cria_sessao(1, 6, "20:00", 100, "dublado")
+                self.assertEqual(os.path.getsize(arquivo_journal), 0)
+
+                modulo_sessao.listaSessoes.clear()
+                modulo_sessao.ler_dados_xml()
+                self.assertIn(10, busca_sessao(1)["assentos_ocupados"])
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_25_assentos_gravados_como_bitmap(self, mock_busca_filme):
+        print("Test 25: Assentos persistidos em bitmap e lidos de volta")
+        mock_busca_filme.return_value = {"id": 1}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_xml = os.path.join(pasta, "sessoes.xml")
+            arquivo_journal = os.path.join(pasta, "sessoes.journal")
+
+            with patch.object(modulo_sessao, "nome_arquivo", arquivo_xml), \
+                 patch.object(modulo_sessao, "nome_arquivo_journal", arquivo_journal):
+                modulo_sessao.ler_dados_xml()
+                cria_sessao(1, 5, "20:00", 300, "dublado")
+                for assento in (1, 8, 9, 300):
+                    reserva_assento(1, assento)
+                modulo_sessao.grava_dados_xml()
+
+                with open(arquivo_xml) as f:
+                    conteudo = f.read()
+                self.assertIn('formato="bitmap"', conteudo)
+                self.assertNotIn("<assento>", conteudo)
+
+                modulo_sessao.listaSessoes.clear()
+                modulo_sessao.indiceSessoes.clear()
+                modulo_sessao.ler_dados_xml()
+                self.assertEqual(list(busca_sessao(1)["assentos_ocupados"]), [1, 8, 9, 300])
+                self.assertEqual(assentos_disponiveis(1), 296)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_26_le_formato_antigo(self, mock_busca_filme):
+        print("Test 26: Carga aceita o formato antigo com um <assento> por lugar")
+        mock_busca_filme.return_value = {"id": 1, "duracao": 120.0}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_xml = os.path.join(pasta, "sessoes.xml")
+            with open(arquivo_xml, "w") as f:
+                f.write("<sessoes><sessao><id>1</id><filme_id>1</filme_id><sala>2</sala>"
+                        "<horario>09:00</horario><capacidade>50</capacidade>"
+                        "<formato_exibicao>dublado</formato_exibicao>"
+                        "<assentos_ocupados><assento>3</assento><assento>7</assento></assentos_ocupados>"
+                        "</sessao></sessoes>")
+
+            with patch.object(modulo_sessao, "nome_arquivo", arquivo_xml), \
+                 patch.object(modulo_sessao, "nome_arquivo_journal", os.path.join(pasta, "sessoes.journal")):
+                modulo_sessao.ler_dados_xml()
+                self.assertEqual(list(busca_sessao(1)["assentos_ocupados"]), [3, 7])
+                self.assertEqual(modulo_sessao.lista_assentos_livres(1)[:3], [1, 2, 4])
+
+    # -----------------------------------------------------------------------
+    # TESTES DE RESERVA EM LOTE
+    # -----------------------------------------------------------------------
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_27_reserva_assentos_lote(self, mock_busca_filme):
+        print("Test 27: Reserva em lote com uma única escrita no journal")
+        mock_busca_filme.return_value = {"id": 1}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_journal = os.path.join(pasta, "sessoes.journal")
+
+            with patch.object(modulo_sessao, "nome_arquivo", os.path.join(pasta, "sessoes.xml")), \
+                 patch.object(modulo_sessao, "nome_arquivo_journal", arquivo_journal):
+                modulo_sessao.ler_dados_xml()
+                cria_sessao(1, 5, "20:00", 100, "dublado")
+
+                with patch.object(modulo_sessao, "_registra_journal", wraps=modulo_sessao._registra_journal) as espiao:
+                    retorno = modulo_sessao.reserva_assentos(1, [4, 5, 6])
+
+                self.assertEqual(retorno, padrao_retornos.SUCESSO)
+                self.assertEqual(espiao.call_count, 1)
+                self.assertEqual(list(busca_sessao(1)["assentos_ocupados"]), [4, 5, 6])
+                self.assertEqual(os.path.getsize(arquivo_journal), 3 * modulo_sessao._REGISTRO_JOURNAL.size)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_28_reserva_assentos_tudo_ou_nada(self, mock_busca_filme):
+        print("Test 28: Reserva em lote não reserva nada se um assento falhar")
+        mock_busca_filme.return_value = {"id": 1}
+
+        cria_sessao(1, 5, "20:00", 10, "dublado")
+        reserva_assento(1, 7)
+
+        self.assertEqual(modulo_sessao.reserva_assentos(1, [6, 7, 8]), padrao_retornos.JA_EXISTE)
+        self.assertEqual(modulo_sessao.reserva_assentos(1, [9, 11]), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(modulo_sessao.reserva_assentos(1, [2, 2]), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(modulo_sessao.reserva_assentos(1, []), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(modulo_sessao.reserva_assentos(99, [1]), padrao_retornos.NAO_ENCONTRADO)
+
+        self.assertEqual(list(busca_sessao(1)["assentos_ocupados"]), [7])
+        self.assertEqual(assentos_disponiveis(1), 9)
+
+    # -----------------------------------------------------------------------
+    # TESTES DE CONCORRÊNCIA
+    # -----------------------------------------------------------------------
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_29_reservas_concorrentes(self, mock_busca_filme):
+        print("Test 29: Threads disputando os mesmos assentos não vendem em dobro")
+        mock_busca_filme.return_value = {"id": 1}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_journal = os.path.join(pasta, "sessoes.journal")
+
+            with patch.object(modulo_sessao, "nome_arquivo", os.path.join(pasta, "sessoes.xml")), \
+                 patch.object(modulo_sessao, "nome_arquivo_journal", arquivo_journal):
+                modulo_sessao.ler_dados_xml()
+                cria_sessao(1, 1, "20:00", 64, "dublado")
+                cria_sessao(1, 2, "20:00", 64, "dublado")
+
+                sucessos = []
+                trava_sucessos = threading.Lock()
+                largada = threading.Barrier(16)
+
+                # Cede a vez entre a verificação e a ocupação para expor corridas
+                ocupa_original = MapaAssentos.ocupa
+                def ocupa_lento(mapa, numero_assento):
+                    time.sleep(0)
+                    return ocupa_original(mapa, numero_assento)
+
+                def terminal():
+                    largada.wait()
+                    for assento in range(1, 65):
+                        for sessao_id in (1, 2):
+                            if reserva_assento(sessao_id, assento) == padrao_retornos.SUCESSO:
+                                with trava_sucessos:
+                                    sucessos.append((sessao_id, assento))
+
+                intervalo_original = sys.getswitchinterval()
+                sys.setswitchinterval(1e-6)
+                try:
+                    with patch.object(MapaAssentos, "ocupa", ocupa_lento):
+                        threads = [threading.Thread(target=terminal) for _ in range(16)]
+                        for t in threads:
+                            t.start()
+                        for t in threads:
+                            t.join()
+                finally:
+                    sys.setswitchinterval(intervalo_original)
+
+                self.assertEqual(len(sucessos), 128)
+                self.assertEqual(len(set(sucessos)), 128)
+                self.assertEqual(assentos_disponiveis(1), 0)
+                self.assertEqual(assentos_disponiveis(2), 0)
+                self.assertEqual(os.path.getsize(arquivo_journal), 128 * modulo_sessao._REGISTRO_JOURNAL.size)
+
+    # -----------------------------------------------------------------------
+    # TESTES DE CARGA SOB DEMANDA
+    # -----------------------------------------------------------------------
+
+    @patch('modulos.sessao.sessao.busca_filme', lambda fid: {"id": fid})
+    def test_30_carga_sob_demanda(self):
+        print("Teste 30: Dados lidos só no primeiro acesso")
+        with tempfile.TemporaryDirectory() as pasta, \
+             patch.object(modulo_sessao, "nome_arquivo", modulo_sessao.nome_arquivo), \
+             patch.object(modulo_sessao, "nome_arquivo_journal", modulo_sessao.nome_arquivo_journal):
+            modulo_sessao.carrega(pasta)
+            cria_sessao(1, 1, "20:00", 10, "dublado")
+            reserva_assento(1, 3)
+
+            # Simula um processo novo: nada em memória até o primeiro acesso
+            modulo_sessao.listaSessoes.clear()
+            modulo_sessao.indiceSessoes.clear()
+            modulo_sessao._carregado = False
+
+            self.assertEqual(assentos_disponiveis(1), 9)
+            self.assertTrue(modulo_sessao._carregado)
+            self.assertEqual(modulo_sessao.nome_arquivo, os.path.join(pasta, "sessoes.xml"))
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_31_conflito_pela_duracao(self, mock_busca_filme):
+        print("Teste 31: Sessão que começa durante outra na mesma sala")
+        mock_busca_filme.return_value = {"id": 1, "duracao": 120.0}
+
+        # 20:00 + 120 min de filme + 15 de limpeza = sala livre às 22:15
+        self.assertEqual(cria_sessao(1, 1, "20:00", 50, "dublado"), padrao_retornos.SUCESSO)
+        self.assertEqual(cria_sessao(1, 1, "21:30", 50, "dublado"), padrao_retornos.CONFLITO)
+        self.assertEqual(cria_sessao(1, 1, "22:00", 50, "dublado"), padrao_retornos.CONFLITO)
+        self.assertEqual(cria_sessao(1, 1, "18:00", 50, "dublado"), padrao_retornos.CONFLITO)
+
+        self.assertEqual(cria_sessao(1, 1, "22:15", 50, "dublado"), padrao_retornos.SUCESSO)
+        self.assertEqual(cria_sessao(1, 1, "17:45", 50, "dublado"), padrao_retornos.SUCESSO)
+        self.assertEqual(cria_sessao(1, 2, "21:30", 50, "dublado"), padrao_retornos.SUCESSO)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_32_sessao_apos_meia_noite(self, mock_busca_filme):
+        print("Teste 32: Sessão que atravessa a meia-noite ocupa o começo do dia")
+        mock_busca_filme.return_value = {"id": 1, "duracao": 100.5}
+
+        # 23:00 + 101 + 15 = 00:56
+        self.assertEqual(cria_sessao(1, 3, "23:00", 50, "dublado"), padrao_retornos.SUCESSO)
+        self.assertEqual(cria_sessao(1, 3, "00:30", 50, "dublado"), padrao_retornos.CONFLITO)
+        self.assertEqual(cria_sessao(1, 3, "00:56", 50, "dublado"), padrao_retornos.SUCESSO)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_33_apagar_libera_sala(self, mock_busca_filme):
+        print("Teste 33: Apagar a sessão libera o horário da sala")
+        mock_busca_filme.return_value = {"id": 1, "duracao": 120.0}
+
+        cria_sessao(1, 1, "20:00", 50, "dublado")
+        cria_sessao(1, 1, "14:00", 50, "dublado")
+        self.assertEqual(apaga_sessao(1), padrao_retornos.SUCESSO)
+        self.assertEqual(cria_sessao(1, 1, "21:00", 50, "dublado"), padrao_retornos.SUCESSO)
+
+        # O id novo não repete o de uma sessão existente
+        self.assertEqual(sorted(sessao["id"] for sessao in obtem_todas_sessoes()), [2, 3])
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_34_indices_de_listagem(self, mock_busca_filme):
+        print("Teste 34: Índices de filme, formato e horário seguem criação e remoção")
+        mock_busca_filme.return_value = {"id": 1}
+
+        cria_sessao(10, 1, "20:00", 100, "dublado")
+        cria_sessao(20, 2, "09:30", 100, "legendado")
+        cria_sessao(10, 3, "13:00", 100, "legendado")
+        cria_sessao(10, 4, "09:00", 100, "dublado")
+        apaga_sessao(4)
+
+        _, resultado = modulo_sessao.lista_sessoes(horario_minimo="09:15")
+        self.assertEqual([s["id"] for s in resultado], [1, 2, 3])
+
+        _, resultado = modulo_sessao.lista_sessoes(filtro_filme_id=10, formato_exibicao="legendado")
+        self.assertEqual([s["id"] for s in resultado], [3])
+
+        _, resultado = modulo_sessao.lista_sessoes(formato_exibicao="dublado", horario_minimo="00:00")
+        self.assertEqual([s["id"] for s in resultado], [1])
+
+        self.assertEqual(modulo_sessao.lista_sessoes(filtro_filme_id=99), (padrao_retornos.SUCESSO, []))
+        self.assertEqual(modulo_sessao.lista_sessoes(horario_minimo="9h"), (padrao_retornos.PARAMETRO_INVALIDO, []))
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_35_gravacao_adiada(self, mock_busca_filme):
+        print("Teste 35: Cadastros agrupados em uma gravação atômica, feita pela thread de fundo")
+        mock_busca_filme.return_value = {"id": 1}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_xml = os.path.join(pasta, "sessoes.xml")
+            arquivo_journal = os.path.join(pasta, "sessoes.journal")
+
+            with patch.object(modulo_sessao, "nome_arquivo", arquivo_xml), \
+                 patch.object(modulo_sessao, "nome_arquivo_journal", arquivo_journal), \
+                 patch.object(modulo_sessao, "modo_journal", False), \
+                 patch.object(modulo_sessao.gravacao, "intervalo", 0.5):
+                gravacoes_antes = modulo_sessao.gravacao.gravacoes
+                for sala in range(1, 21):
+                    cria_sessao(1, sala, "20:00", 50, "dublado")
+                reserva_assento(1, 7)
+                apaga_sessao(20)
+
+                # A thread de fundo grava tudo de uma vez, depois do intervalo
+                prazo = time.monotonic() + 5
+                while modulo_sessao.gravacao.gravacoes == gravacoes_antes and time.monotonic() < prazo:
+                    time.sleep(0.01)
+                self.assertEqual(modulo_sessao.gravacao.gravacoes - gravacoes_antes, 1)
+                self.assertFalse(os.path.exists(arquivo_xml + ".tmp"))
+
+                modulo_sessao.listaSessoes.clear()
+                modulo_sessao.indiceSessoes.clear()
+                modulo_sessao.ler_dados_xml()
+                self.assertEqual(len(obtem_todas_sessoes()), 19)
+                self.assertEqual(list(busca_sessao(1)["assentos_ocupados"]), [7])
+
+    def _relogio_falso(self):
+        """Troca a roda dos bloqueios por uma com relógio controlado por self.agora."""
+        self.agora = 0.0
+        roda = patch.object(modulo_sessao, "_rodaBloqueios",
+                            RodaTemporizacao(resolucao=1.0, tamanho=8, relogio=lambda: self.agora))
+        roda.start()
+        self.addCleanup(roda.stop)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_36_bloqueio_segura_assentos(self, mock_busca_filme):
+        print("Teste 36: Assentos bloqueados não são vendidos a outros e aparecem na contagem")
+        mock_busca_filme.return_value = {"id": 1}
+        self._relogio_falso()
+        cria_sessao(1, 1, "20:00", 10, "dublado")
+        reserva_assento(1, 1)
+
+        codigo, bloqueio_id = modulo_sessao.bloqueia_assentos(1, [4, 5], duracao=60)
+        self.assertEqual(codigo, padrao_retornos.SUCESSO)
+        self.assertEqual(reserva_assento(1, 4), padrao_retornos.JA_EXISTE)
+        self.assertEqual(modulo_sessao.reserva_assentos(1, [6, 5]), padrao_retornos.JA_EXISTE)
+        self.assertEqual(modulo_sessao.bloqueia_assentos(1, [5, 7]), (padrao_retornos.JA_EXISTE, None))
+        self.assertEqual(modulo_sessao.bloqueia_assentos(1, [1]), (padrao_retornos.JA_EXISTE, None))
+        self.assertEqual(modulo_sessao.bloqueia_assentos(1, [11])[0], padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(modulo_sessao.bloqueia_assentos(1, [7], duracao=0)[0], padrao_retornos.PARAMETRO_INVALIDO)
+
+        self.assertEqual(assentos_disponiveis(1), 7)
+        self.assertEqual(assentos_disponiveis(1, detalhado=True), {"livres": 7, "bloqueados": 2, "vendidos": 1})
+        self.assertNotIn(4, modulo_sessao.lista_assentos_livres(1))
+        self.assertEqual(modulo_sessao.busca_bloqueio(bloqueio_id)["assentos"], [4, 5])
+        self.assertEqual(apaga_sessao(1), padrao_retornos.JA_EXISTE)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_37_bloqueio_vence(self, mock_busca_filme):
+        print("Teste 37: Bloqueios vencidos devolvem os assentos, inclusive depois de várias voltas da roda")
+        mock_busca_filme.return_value = {"id": 1}
+        self._relogio_falso()
+        cria_sessao(1, 1, "20:00", 10, "dublado")
+
+        _, curto = modulo_sessao.bloqueia_assentos(1, [1], duracao=3)
+        _, longo = modulo_sessao.bloqueia_assentos(1, [2], duracao=20)
+
+        # O longo cai na mesma posição da roda (tamanho 8) e precisa sobreviver às voltas
+        self.agora = 4.0
+        self.assertIsNone(modulo_sessao.busca_bloqueio(curto))
+        self.assertIsNotNone(modulo_sessao.busca_bloqueio(longo))
+        self.assertEqual(reserva_assento(1, 1), padrao_retornos.SUCESSO)
+
+        self.agora = 12.0
+        self.assertEqual(assentos_disponiveis(1, detalhado=True), {"livres": 8, "bloqueados": 1, "vendidos": 1})
+
+        # Parado por várias voltas: cada posição é visitada uma vez
+        self.agora = 100.0
+        self.assertEqual(assentos_disponiveis(1, detalhado=True), {"livres": 9, "bloqueados": 0, "vendidos": 1})
+        self.assertEqual(modulo_sessao.confirma_bloqueio(longo), padrao_retornos.NAO_ENCONTRADO)
+        self.assertEqual(len(modulo_sessao._rodaBloqueios), 0)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_38_confirma_e_libera_bloqueio(self, mock_busca_filme):
+        print("Teste 38: Confirmar vende os assentos bloqueados; liberar os devolve")
+        mock_busca_filme.return_value = {"id": 1}
+        self._relogio_falso()
+        cria_sessao(1, 1, "20:00", 10, "dublado")
+
+        _, compra = modulo_sessao.bloqueia_assentos(1, [1, 2])
+        _, desistencia = modulo_sessao.bloqueia_assentos(1, [3])
+
+        self.assertEqual(modulo_sessao.confirma_bloqueio(compra), padrao_retornos.SUCESSO)
+        self.assertEqual(list(busca_sessao(1)["assentos_ocupados"]), [1, 2])
+        self.assertEqual(modulo_sessao.confirma_bloqueio(compra), padrao_retornos.NAO_ENCONTRADO)
+
+        self.assertEqual(modulo_sessao.libera_bloqueio(desistencia), padrao_retornos.SUCESSO)
+        self.assertEqual(modulo_sessao.libera_bloqueio(desistencia), padrao_retornos.NAO_ENCONTRADO)
+        self.assertEqual(assentos_disponiveis(1, detalhado=True), {"livres": 8, "bloqueados": 0, "vendidos": 2})
+
+        # Nada fica na roda para vencer depois
+        self.assertEqual(len(modulo_sessao._rodaBloqueios), 0)
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_39_sessao_lotada_por_bloqueios(self, mock_busca_filme):
+        print("Teste 39: Sessão com todos os assentos vendidos ou bloqueados está lotada")
+        mock_busca_filme.return_value = {"id": 1}
+        self._relogio_falso()
+        cria_sessao(1, 1, "20:00", 3, "dublado")
+        reserva_assento(1, 1)
+        modulo_sessao.bloqueia_assentos(1, [2, 3])
+
+        self.assertEqual(reserva_assento(1, 2), ERRO_SESSAO_LOTADA)
+        self.assertEqual(modulo_sessao.bloqueia_assentos(1, [3]), (ERRO_SESSAO_LOTADA, None))
+        self.assertEqual(modulo_sessao.lista_assentos_livres(1), [])
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_40_melhores_assentos_centralizados(self, mock_busca_filme):
+        print("Teste 40: Melhores assentos ficam na fileira central, no meio dela")
+        mock_busca_filme.return_value = {"id": 1}
+        self.assertEqual(modulo_sessao.define_layout_sala(1, 10), padrao_retornos.SUCESSO)
+        self.assertEqual(modulo_sessao.define_layout_sala(1, 0), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(modulo_sessao.assentos_por_fileira(1), 10)
+        self.assertEqual(modulo_sessao.assentos_por_fileira(2), modulo_sessao.assentos_por_fileira_padrao)
+        cria_sessao(1, 1, "20:00", 50, "dublado")
+
+        # 5 fileiras de 10: a central é a dos assentos 21 a 30
+        self.assertEqual(modulo_sessao.melhores_assentos(1, 4), [24, 25, 26, 27])
+        self.assertEqual(modulo_sessao.melhores_assentos(1, 0), None)
+        self.assertEqual(modulo_sessao.melhores_assentos(99, 2), None)
+        self.assertEqual(modulo_sessao.melhores_assentos(1, 11), [])
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_41_melhores_assentos_acompanham_vendas_e_bloqueios(self, mock_busca_filme):
+        print("Teste 41: Sugestão acompanha vendas e bloqueios e volta quando o bloqueio é liberado")
+        mock_busca_filme.return_value = {"id": 1}
+        self._relogio_falso()
+        modulo_sessao.define_layout_sala(1, 10)
+        cria_sessao(1, 1, "20:00", 30, "dublado")
+        self.assertEqual(modulo_sessao.melhores_assentos(1, 4), [14, 15, 16, 17])
+
+        # Meio da fileira central vendido: o bloco desvia para o lado
+        modulo_sessao.reserva_assentos(1, [15, 16])
+        self.assertEqual(modulo_sessao.melhores_assentos(1, 4), [11, 12, 13, 14])
+
+        # Fileira central sem 4 vizinhos livres: vai para outra fileira
+        _, bloqueio_id = modulo_sessao.bloqueia_assentos(1, [11, 12, 13, 14, 17, 18, 19, 20])
+        self.assertEqual(modulo_sessao.melhores_assentos(1, 4), [4, 5, 6, 7])
+        self.assertEqual(modulo_sessao.libera_bloqueio(bloqueio_id), padrao_retornos.SUCESSO)
+        self.assertEqual(modulo_sessao.melhores_assentos(1, 4), [11, 12, 13, 14])
+
+        # Confirmar mantém os assentos indisponíveis; o índice é o mesmo que remontado do zero
+        _, bloqueio_id = modulo_sessao.bloqueia_assentos(1, [17, 18])
+        modulo_sessao.confirma_bloqueio(bloqueio_id)
+        sugestao = modulo_sessao.melhores_assentos(1, 3)
+        modulo_sessao._indicesFileiras.clear()
+        self.assertEqual(modulo_sessao.melhores_assentos(1, 3), sugestao)
+        self.assertEqual(sugestao, [12, 13, 14])
+
+    @patch('modulos.sessao.sessao.busca_filme')
+    def test_42_layout_gravado_no_xml(self, mock_busca_filme):
+        print("Teste 42: Layout das salas é gravado no XML e lido de volta")
+        mock_busca_filme.return_value = {"id": 1}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_xml = os.path.join(pasta, "sessoes.xml")
+            arquivo_journal = os.path.join(pasta, "sessoes.journal")
+
+            with patch.object(modulo_sessao, "nome_arquivo", arquivo_xml), \
+                 patch.object(modulo_sessao, "nome_arquivo_journal", arquivo_journal):
+                modulo_sessao.ler_dados_xml()
+                cria_sessao(1, 3, "20:00", 24, "dublado")
+                modulo_sessao.define_layout_sala(3, 8)
+                reserva_assento(1, 12)
+
+                modulo_sessao.layoutSalas.clear()
+                modulo_sessao._indicesFileiras.clear()
+                modulo_sessao.ler_dados_xml()
+
+                self.assertEqual(modulo_sessao.layoutSalas, {3: 8})
+                self.assertEqual(len(obtem_todas_sessoes()), 1)
+                # 3 fileiras de 8; o 12 está vendido no meio da central (9 a 16)
+                self.assertEqual(modulo_sessao.melhores_assentos(1, 2), [13, 14])
+
+    @patch("modulos.sessao.sessao.busca_filme")
+    def test_43_listagem_paginada(self, mock_busca_filme):
+        print("Teste 43: Sessões percorridas por gerador e por páginas com cursor")
+        mock_busca_filme.return_value = {"id": 1}
+        for sala in range(1, 6):
+            cria_sessao(1, sala, "20:00", 10, "dublado")
+
+        visao = modulo_sessao.visao_sessoes()
+        self.assertEqual(len(visao), 5)
+        self.assertEqual(visao, obtem_todas_sessoes())
+        self.assertEqual([s["sala"] for s in modulo_sessao.itera_sessoes(3)], [4, 5])
+
+        ids = [s["id"] for s in visao]
+        primeira = modulo_sessao.pagina_sessoes(2)
+        self.assertEqual([s["id"] for s in primeira["registros"]], ids[:2])
+
+        # Uma sessão nova entre as páginas aparece no fim, sem repetir as já vistas
+        cria_sessao(1, 6, "20:00", 10, "dublado")
+        restantes, cursor = [], primeira["proximo_cursor"]
+        while cursor is not None:
+            pagina = modulo_sessao.pagina_sessoes(2, cursor)
+            restantes += [s["id"] for s in pagina["registros"]]
+            cursor = pagina["proximo_cursor"]
+        self.assertEqual(restantes, [s["id"] for s in visao][2:])
+        self.assertEqual(len(restantes), 4)
+
+        self.assertEqual(modulo_sessao.pagina_sessoes(2.5), padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(modulo_sessao.itera_sessoes(0, -1), padrao_retornos.PARAMETRO_INVALIDO)
+
+    @patch("modulos.sessao.sessao.busca_filme")
+    def test_44_id_da_sessao_apagada_nao_reaproveitado(self, mock_busca_filme):
+        print("Teste 44: Id da sessão mais nova, depois de apagada, não volta a ser usado")
+        mock_busca_filme.return_value = {"id": 1}
+        cria_sessao(1, 1, "20:00", 10, "dublado")
+        cria_sessao(1, 2, "20:00", 10, "dublado")
+        modulo_sessao.apaga_sessao(2)
+        cria_sessao(1, 3, "20:00", 10, "dublado")
+        self.assertIsNone(busca_sessao(2))
+        self.assertEqual(busca_sessao(3)["sala"], 3)
+
+        # O maior id usado vai para o sessoes.xml e sobrevive ao reinício
+        modulo_sessao.apaga_sessao(3)
+        modulo_sessao.listaSessoes.clear()
+        modulo_sessao.indiceSessoes.clear()
+        modulo_sessao.ler_dados_xml()
+        self.assertEqual([s["id"] for s in obtem_todas_sessoes()], [1])
+        cria_sessao(1, 4, "20:00", 10, "dublado")
+        self.assertEqual(busca_sessao(4)["sala"], 4)
+        self.assertEqual(modulo_sessao.ultimo_id_sessao(), 4)
+
+
+class TestIndiceFileiras(unittest.TestCase):
+
+    def test_01_divide_e_junta_trechos(self):
+        print("Fileiras 01: Ocupar divide o trecho livre; liberar junta de novo")
+        indice = IndiceFileiras(25, 10, indisponiveis=[5])
+        self.assertEqual(indice._trechos, [[(1, 4), (6, 10)], [(11, 20)], [(21, 25)]])
+
+        indice.ocupa(8)
+        indice.ocupa(8)
+        self.assertEqual(indice._trechos[0], [(1, 4), (6, 7), (9, 10)])
+        self.assertEqual(indice._maiorTrecho[0], 4)
+
+        indice.libera(5)
+        indice.libera(8)
+        indice.libera(8)
+        self.assertEqual(indice._trechos[0], [(1, 10)])
+        self.assertEqual(indice._maiorTrecho[0], 10)
+
+    def test_02_ultima_fileira_incompleta(self):
+        print("Fileiras 02: Fileiras pares e última incompleta escolhem o bloco mais central")
+        # Fileiras 0 a 3, centro entre as fileiras 1 e 2: empate fica com a da frente
+        indice = IndiceFileiras(36, 10)
+        self.assertEqual(indice.melhor_bloco(2), [15, 16])
+        for assento in range(11, 21):
+            indice.ocupa(assento)
+        self.assertEqual(indice.melhor_bloco(2), [25, 26])
+        for assento in range(21, 31):
+            indice.ocupa(assento)
+        # Restam a fileira 0 (1-10) e a incompleta 3 (31-36), à mesma distância
+        self.assertEqual(indice.melhor_bloco(6), [3, 4, 5, 6, 7, 8])
+        self.assertEqual(indice.melhor_bloco(7), [2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(indice.melhor_bloco(11), [])
+
+
+class TestRodaTemporizacao(unittest.TestCase):
+
+    def setUp(self):
+        self.agora = 0.0
+        self.roda = RodaTemporizacao(resolucao=1.0, tamanho=4, relogio=lambda: self.agora)
+
+    def test_01_vence_no_tick(self):
+        print("Roda 01: Itens vencem no tick do prazo, nem antes nem depois")
+        self.roda.agenda("a", 2)
+        self.roda.agenda("b", 5)
+
+        self.agora = 2.5
+        self.assertEqual(self.roda.avanca(), [])
+        self.agora = 3.0
+        self.assertEqual(self.roda.avanca(), ["a"])
+        self.agora = 6.0
+        self.assertEqual(self.roda.avanca(), ["b"])
+        self.assertEqual(len(self.roda), 0)
+
+    def test_02_cancela_e_reagenda(self):
+        print("Roda 02: Cancelar tira o item; reagendar troca o prazo")
+        self.roda.agenda("a", 1)
+        self.roda.agenda("b", 1)
+        self.assertTrue(self.roda.cancela("a"))
+        self.assertFalse(self.roda.cancela("a"))
+        self.roda.agenda("b", 10)
+
+        self.agora = 5.0
+        self.assertEqual(self.roda.avanca(), [])
+        self.assertIn("b", self.roda)
+        self.agora = 50.0
+        self.assertEqual(self.roda.avanca(), ["b"])
+
+
+class TestMapaAssentos(unittest.TestCase):
+
+    def test_01_ocupa_e_libera(self):
+        print("Mapa 01: Ocupar e liberar assentos")
+        mapa = MapaAssentos(10)
+
+        self.assertTrue(mapa.ocupa(3))
+        self.assertFalse(mapa.ocupa(3))
+        self.assertIn(3, mapa)
+        self.assertEqual(len(mapa), 1)
+
+        self.assertTrue(mapa.libera(3))
+        self.assertFalse(mapa.libera(3))
+        self.assertNotIn(3, mapa)
+        self.assertEqual(len(mapa), 0)
+
+    def test_02_fora_da_sala(self):
+        print("Mapa 02: Assentos fora da capacidade são rejeitados")
+        mapa = MapaAssentos(10)
+
+        self.assertFalse(mapa.ocupa(0))
+        self.assertFalse(mapa.ocupa(11))
+        self.assertNotIn(11, mapa)
+        self.assertEqual(len(mapa), 0)
+
+    def test_03_livres_e_ocupados(self):
+        print("Mapa 03: Iteração de livres e ocupados")
+        mapa = MapaAssentos(20, range(1, 17))
+
+        self.assertEqual(list(mapa.livres()), [17, 18, 19, 20])
+        self.assertEqual(list(mapa), list(range(1, 17)))
+        self.assertEqual(mapa.quantidade_livres(), 4)
+
+    def test_04_serializacao(self):
+        print("Mapa 04: Serialização em texto")
+        mapa = MapaAssentos(13, [1, 5, 13])
+        copia = MapaAssentos.de_texto(13, mapa.para_texto())
+
+        self.assertEqual(list(copia), [1, 5, 13])
+        self.assertEqual(len(copia), 3)
+        self.assertEqual(len(MapaAssentos.de_texto(13, None)), 0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
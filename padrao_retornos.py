@@ -11,6 +11,7 @@ JA_EXISTE = 2                # duplicado / já existe
 CONFLITO = 3                 # conflito / regra de negócio
 DEPENDENCIA_INEXISTENTE = 4  # ex.: filme_id não encontrado ao criar sessão
 ERRO_SESSAO_LOTADA = 5       # sessão lotada
+ERRO_INTERNO = 6             # falha inesperada (ex.: exceção no servidor)
 
 
 MENSAGENS = {
@@ -20,7 +21,8 @@ MENSAGENS = {
     "JA_EXISTE": "Registro duplicado",
     "CONFLITO": "Conflito de regra de negócio",
     "DEPENDENCIA_INEXISTENTE": "Dependência inexistente",
-    "ERRO_SESSAO_LOTADA": "Sessão lotada"
+    "ERRO_SESSAO_LOTADA": "Sessão lotada",
+    "ERRO_INTERNO": "Erro interno"
 }
 
 def imprime_mensagem(codigo: int) -> str:
@@ -55,6 +57,10 @@ def imprime_mensagem(codigo: int) -> str:
         print(MENSAGENS["ERRO_SESSAO_LOTADA"])
         return MENSAGENS["ERRO_SESSAO_LOTADA"]
 
+    elif codigo == ERRO_INTERNO:
+        print(MENSAGENS["ERRO_INTERNO"])
+        return MENSAGENS["ERRO_INTERNO"]
+
     else:
         # fallback — mas não existe no padrão oficial
         print("Erro desconhecido")
@@ -3,6 +3,10 @@ import modulos.ingresso.ingresso as Ingresso
 import modulos.sessao.sessao as Sessao
 import modulos.filme.filme as Filme
 import modulos.monitoramento.monitoramento as Monitoramento
+import modulos.armazenamento.armazenamento as Armazenamento
+import modulos.armazenamento.snapshot as Snapshot
+import modulos.particao.particao as Particao
+import modulos.instrumentacao as Instrumentacao
 import padrao_retornos
 import sys
 import os
@@ -13,6 +17,32 @@ ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 if ROOT_DIR not in sys.path:
     sys.path.append(ROOT_DIR)
 
+# Linhas exibidas por vez nas listagens
+TAMANHO_PAGINA = 20
+
+def exibe_em_paginas(registros, cabecalho: str, formata_linha, largura: int = 60) -> int:
+    """
+    Imprime `registros` (lista ou gerador) de TAMANHO_PAGINA em TAMANHO_PAGINA
+    linhas, perguntando antes de cada página nova se deve continuar.
+    Retorna quantos registros foram exibidos.
+    """
+    exibidos = 0
+    for registro in registros:
+        if exibidos == 0:
+            print("-" * largura)
+            print(cabecalho)
+            print("-" * largura)
+        elif exibidos % TAMANHO_PAGINA == 0:
+            # Só pergunta se ainda há registros para mostrar
+            if input(f"-- {exibidos} exibidos. ENTER para continuar, 0 para parar: ").strip() == '0':
+                break
+        print(formata_linha(registro))
+        exibidos += 1
+
+    if exibidos:
+        print("-" * largura)
+    return exibidos
+
 def menu_filmes():
     while True:
         print("\n" + "-"*30)
@@ -23,6 +53,7 @@ def menu_filmes():
         print("3 - Buscar filme por ID")
         print("4 - Atualizar dados do filme")
         print("5 - Remover filme")
+        print("6 - Buscar filmes por texto")
         print("0 - Voltar")
         print("-" * 30)
         
@@ -59,10 +90,9 @@ def menu_filmes():
             if not lista:
                 print("Nenhum filme cadastrado.")
             else:
-                print("-" * 90)
-                print(f"{'ID':<5} | {'Título':<20} | {'Gênero':<12} | {'Dur.':<6} | {'Class.':<6} | {'Lançamento'}")
-                print("-" * 90)
-                for f in lista:
+                print(f"Total em cartaz: {len(lista)}")
+
+                def linha_filme(f):
                     data_obj = f.get('dataLancamento')
                     data_str = str(data_obj) if data_obj else "N/A"
                     classif_raw = f.get('classificacao')
@@ -71,9 +101,11 @@ def menu_filmes():
                     genero = f.get('genero', 'N/A')[:12]
                     duracao = f.get('duracao', 0)
                     
-                    print(f"{f['id']:<5} | {titulo:<20} | {genero:<12} | {duracao:<6} | {classif_str:<6} | {data_str}")
-                
-                print("-" * 90)
+                    return f"{f['id']:<5} | {titulo:<20} | {genero:<12} | {duracao:<6} | {classif_str:<6} | {data_str}"
+
+                exibe_em_paginas(Filme.itera_filmes(),
+                                 f"{'ID':<5} | {'Título':<20} | {'Gênero':<12} | {'Dur.':<6} | {'Class.':<6} | {'Lançamento'}",
+                                 linha_filme, largura=90)
 
         elif opcao == '3':
             print("\n--- Buscar Filme ---")
@@ -133,6 +165,27 @@ def menu_filmes():
             except ValueError:
                 print("Erro: O ID deve ser um número.")
 
+        elif opcao == '6':
+            print("\n--- Buscar Filmes por Texto ---")
+            consulta = input("Palavras do título, gênero ou sinopse: ").strip()
+
+            encontrados = Filme.busca_filmes_texto(consulta, limite=20)
+
+            if encontrados:
+                print("-" * 50)
+                print(f"{'ID':<5} | {'Título':<25} | {'Gênero'}")
+                print("-" * 50)
+                for f in encontrados:
+                    print(f"{f['id']:<5} | {f['titulo'][:25]:<25} | {f['genero']}")
+                print("-" * 50)
+            else:
+                print("Nenhum filme encontrado.")
+                # Sugere palavras do catálogo que começam como a última digitada
+                palavras = consulta.split()
+                sugestoes = Filme.completa_termos(palavras[-1][:3]) if palavras else []
+                if sugestoes:
+                    print(f"Palavras parecidas no catálogo: {', '.join(sugestoes)}")
+
         elif opcao == '0':
             break
         else:
@@ -146,6 +199,8 @@ def menu_ingressos():
         print("1 - Vender Ingresso")
         print("2 - Listar ingressos de um Cliente")
         print("3 - Listar ingressos de uma Sessão")
+        print("4 - Vender vários ingressos (mesma sessão)")
+        print("5 - Listar todos os ingressos")
         print("0 - Voltar")
         print("-" * 30)
         
@@ -185,17 +240,8 @@ def menu_ingressos():
                     print("Nenhum ingresso encontrado para este cliente.")
                 else:
                     print(f"Total encontrados: {len(lista)}")
-                    print("-" * 60)
-                    print(f"{'ID':<5} | {'Sessão':<8} | {'Assento':<8} | {'Preço'}")
-                    print("-" * 60)
-                    for ing in lista:
-                        id_ing = ing.get('id', 'N/A')
-                        id_sess = ing.get('sessao_id', 'N/A')
-                        num_assento = ing.get('numero_assento', 'N/A')
-                        val_preco = ing.get('preco', 0.0)
-                        
-                        print(f"{id_ing:<5} | {id_sess:<8} | {num_assento:<8} | R$ {val_preco:.2f}")
-                    print("-" * 60)
+                    exibe_em_paginas(lista, f"{'ID':<5} | {'Sessão':<8} | {'Assento':<8} | {'Preço'}",
+                                     lambda ing: f"{ing['id']:<5} | {ing['sessao_id']:<8} | {ing['numero_assento']:<8} | R$ {ing['preco']:.2f}")
             except ValueError:
                 print("Erro: O ID deve ser um número inteiro.")
 
@@ -211,20 +257,44 @@ def menu_ingressos():
                     print("Nenhum ingresso vendido para esta sessão.")
                 else:
                     print(f"Total vendidos: {len(lista)}")
-                    print("-" * 60)
-                    print(f"{'ID':<5} | {'Cliente':<8} | {'Assento':<8} | {'Preço'}")
-                    print("-" * 60)
-                    for ing in lista:
-                        id_ing = ing.get('id', 'N/A')
-                        id_cli = ing.get('cliente_id', 'N/A')
-                        num_assento = ing.get('numero_assento', 'N/A')
-                        val_preco = ing.get('preco', 0.0)
-                        
-                        print(f"{id_ing:<5} | {id_cli:<8} | {num_assento:<8} | R$ {val_preco:.2f}")
-                    print("-" * 60)
+                    exibe_em_paginas(lista, f"{'ID':<5} | {'Cliente':<8} | {'Assento':<8} | {'Preço'}",
+                                     lambda ing: f"{ing['id']:<5} | {ing['cliente_id']:<8} | {ing['numero_assento']:<8} | R$ {ing['preco']:.2f}")
             except ValueError:
                 print("Erro: O ID deve ser um número inteiro.")
 
+        elif opcao == '4':
+            print("\n--- Venda em Lote ---")
+            try:
+                cliente_id = int(input("ID do Cliente: "))
+                sessao_id = int(input("ID da Sessão: "))
+                entrada_assentos = input("Números dos Assentos (separados por vírgula): ")
+                assentos = [int(a) for a in entrada_assentos.split(",") if a.strip()]
+                preco = float(input("Preço de cada Ingresso (R$): "))
+
+                # Reserva todos os assentos ou nenhum
+                codigo_retorno = Ingresso.cria_ingressos_lote(cliente_id, sessao_id, assentos, preco)
+
+                if codigo_retorno == 5:
+                    print("Erro: A sessão está LOTADA.")
+                else:
+                    padrao_retornos.imprime_mensagem(codigo_retorno)
+
+            except ValueError:
+                print("Erro: Certifique-se de digitar números válidos (Preço usa ponto, ex: 25.50).")
+
+        elif opcao == '5':
+            print("\n--- Todos os Ingressos ---")
+            total = len(Ingresso.visao_ingressos())
+
+            if not total:
+                print("Nenhum ingresso vendido.")
+            else:
+                print(f"Total vendidos: {total}")
+                exibe_em_paginas(Ingresso.itera_ingressos(),
+                                 f"{'ID':<5} | {'Cliente':<8} | {'Sessão':<8} | {'Assento':<8} | {'Preço'}",
+                                 lambda ing: f"{ing['id']:<5} | {ing['cliente_id']:<8} | {ing['sessao_id']:<8} | {ing['numero_assento']:<8} | R$ {ing['preco']:.2f}",
+                                 largura=70)
+
         elif opcao == '0':
             break
         else:
@@ -239,6 +309,7 @@ def menu_clientes():
         print("2 - Listar clientes")
         print("3 - Buscar cliente por ID")
         print("4 - Remover cliente")
+        print("5 - Buscar cliente por CPF")
         print("0 - Voltar")
         print("-" * 30)
         
@@ -257,22 +328,22 @@ def menu_clientes():
 
         elif opcao == '2':
             print("\n--- Lista de Clientes ---")
-            lista = Cliente.lista_clientes()
+            # Sem copiar o cadastro: os clientes são lidos uma página por vez
+            total = len(Cliente.visao_clientes())
             
-            if not lista:
+            if not total:
                 print("Nenhum cliente cadastrado.")
             else:
-                print(f"Total encontrados: {len(lista)}")
-                print("-" * 60)
-                print(f"{'ID':<5} | {'Nome':<30} | {'CPF'}")
-                print("-" * 60)
-                for c in lista:
+                print(f"Total encontrados: {total}")
+
+                def linha_cliente(c):
                     id_c = c.get('id', 'N/A')
                     nome_c = c.get('nome', 'Sem Nome')[:30] # Corta nomes muito longos
                     cpf_c = c.get('cpf', 'N/A')
                     
-                    print(f"{id_c:<5} | {nome_c:<30} | {cpf_c}")
-                print("-" * 60)
+                    return f"{id_c:<5} | {nome_c:<30} | {cpf_c}"
+
+                exibe_em_paginas(Cliente.itera_clientes(), f"{'ID':<5} | {'Nome':<30} | {'CPF'}", linha_cliente)
 
         elif opcao == '3':
             print("\n--- Buscar Cliente ---")
@@ -311,6 +382,22 @@ def menu_clientes():
             except ValueError:
                 print("Erro: O ID deve ser um número inteiro.")
 
+        elif opcao == '5':
+            print("\n--- Buscar Cliente por CPF ---")
+            cpf_busca = input("Digite o CPF (com ou sem pontuação): ").strip()
+
+            cliente_encontrado = Cliente.busca_cliente_por_cpf(cpf_busca)
+
+            if cliente_encontrado:
+                print("\n" + "="*30)
+                print(f"CLIENTE #{cliente_encontrado['id']}")
+                print("="*30)
+                print(f"Nome: {cliente_encontrado['nome']}")
+                print(f"CPF:  {cliente_encontrado['cpf']}")
+                print("="*30)
+            else:
+                padrao_retornos.imprime_mensagem(padrao_retornos.NAO_ENCONTRADO)
+
         elif opcao == '0':
             break
         else:
@@ -325,6 +412,8 @@ def menu_sessoes():
         print("2 - Listar sessões")
         print("3 - Apagar sessão")
         print("4 - Buscar detalhes da sessão") 
+        print("5 - Definir assentos por fileira de uma sala")
+        print("6 - Sugerir melhores assentos")
         print("0 - Voltar")
         print("-" * 30)
         
@@ -384,11 +473,17 @@ def menu_sessoes():
                     f_horario = entrada_horario
 
            
-            codigo, lista = Sessao.lista_sessoes(
-                filtro_filme_id=f_id, 
-                formato_exibicao=f_formato, 
-                horario_minimo=f_horario
-            )
+            if f_id is None and f_formato is None and f_horario is None:
+                # Sem filtros: percorre as sessões sem copiar a lista
+                codigo, lista = padrao_retornos.SUCESSO, Sessao.visao_sessoes()
+                registros = Sessao.itera_sessoes()
+            else:
+                codigo, lista = Sessao.lista_sessoes(
+                    filtro_filme_id=f_id, 
+                    formato_exibicao=f_formato, 
+                    horario_minimo=f_horario
+                )
+                registros = lista
             
             # --- EXIBIÇÃO DOS RESULTADOS ---
             if codigo == padrao_retornos.SUCESSO:
@@ -396,12 +491,8 @@ def menu_sessoes():
                     print("\nNenhuma sessão encontrada com esses critérios.")
                 else:
                     print(f"\nTotal encontradas: {len(lista)}")
-                    print("-" * 60)
-                    print(f"{'ID':<5} | {'Filme ID':<10} | {'Sala':<5} | {'Horário':<8} | {'Formato'}")
-                    print("-" * 60)
-                    for s in lista:
-                        print(f"{s['id']:<5} | {s['filme_id']:<10} | {s['sala']:<5} | {s['horario']:<8} | {s['formato_exibicao']}")
-                    print("-" * 60)
+                    exibe_em_paginas(registros, f"{'ID':<5} | {'Filme ID':<10} | {'Sala':<5} | {'Horário':<8} | {'Formato'}",
+                                     lambda s: f"{s['id']:<5} | {s['filme_id']:<10} | {s['sala']:<5} | {s['horario']:<8} | {s['formato_exibicao']}")
             else:
                 padrao_retornos.imprime_mensagem(codigo)
         
@@ -449,6 +540,38 @@ def menu_sessoes():
             except ValueError:
                 print("Erro: O ID deve ser um número.")
 
+        elif opcao == '5':
+            print("\n--- Layout da Sala ---")
+            try:
+                sala = int(input("Número da Sala: "))
+                assentos_por_fileira = int(input("Assentos por fileira: "))
+
+                codigo_retorno = Sessao.define_layout_sala(sala, assentos_por_fileira)
+                padrao_retornos.imprime_mensagem(codigo_retorno)
+
+            except ValueError:
+                print("Erro: Sala e assentos por fileira devem ser números.")
+
+        elif opcao == '6':
+            print("\n--- Melhores Assentos ---")
+            try:
+                sessao_id = int(input("Digite o ID da sessão: "))
+                quantidade = int(input("Quantos assentos juntos: "))
+
+                assentos = Sessao.melhores_assentos(sessao_id, quantidade)
+
+                if assentos is None:
+                    padrao_retornos.imprime_mensagem(padrao_retornos.NAO_ENCONTRADO)
+                elif not assentos:
+                    print("Não há assentos vizinhos livres em quantidade suficiente nesta sessão.")
+                else:
+                    sessao = Sessao.busca_sessao(sessao_id)
+                    fileira = (assentos[0] - 1) // Sessao.assentos_por_fileira(sessao['sala']) + 1
+                    print(f"Sugestão: fileira {fileira}, assentos {', '.join(str(a) for a in assentos)}")
+
+            except ValueError:
+                print("Erro: O ID e a quantidade devem ser números.")
+
         elif opcao == '0':
             break
         else:
@@ -463,6 +586,7 @@ def menu_monitoramento():
         print("2 - Filme Mais Assistido")
         print("3 - Receita e Ocupação de uma Sessão")
         print("4 - Total Geral de Ingressos Vendidos")
+        print("5 - Desempenho das Operações (instrumentação)")
         print("0 - Voltar")
         print("-" * 30)
         
@@ -492,7 +616,7 @@ def menu_monitoramento():
             print("\n--- Filme Mais Assistido ---")
             
 
-            todas_sessoes = Sessao.obtem_todas_sessoes()
+            todas_sessoes = Sessao.visao_sessoes()
             
 
             resultado = Monitoramento.filme_mais_assistido(todas_sessoes)
@@ -527,7 +651,7 @@ def menu_monitoramento():
             print("\n--- Contagem Global ---")
             
             # Obtém a lista de sessões novamente
-            todas_sessoes = Sessao.obtem_todas_sessoes()
+            todas_sessoes = Sessao.visao_sessoes()
             
             # Chama a função
             total = Monitoramento.conta_ingressos(todas_sessoes)
@@ -539,6 +663,37 @@ def menu_monitoramento():
             else:
                 print(f"\nTotal de ingressos vendidos em TODAS as sessões: {total}")
 
+        # --- Opção 5: Chamadas, códigos e latência de cada operação ---
+        elif opcao == '5':
+            print("\n--- Desempenho das Operações ---")
+
+            if not Instrumentacao.ATIVA:
+                print("Instrumentação desligada. Inicie com BILHETERIA_INSTRUMENTACAO=1 para medir as operações.")
+                continue
+
+            resumo = Instrumentacao.resumo()
+            if not resumo:
+                print("Nenhuma operação medida ainda.")
+                continue
+
+            def linha_operacao(item):
+                nome, dados = item
+                codigos = ", ".join(f"{codigo}={quantidade}" for codigo, quantidade in dados["codigos"].items())
+                return (f"{nome:<36} | {dados['chamadas']:>8} | {dados['media_us']:>10.1f} | "
+                        f"{dados['p95_us']:>8} | {dados['max_us']:>10.1f} | {codigos}")
+
+            exibe_em_paginas(resumo.items(),
+                             f"{'Operação':<36} | {'Chamadas':>8} | {'Média (µs)':>10} | {'p95 (µs)':>8} | {'Máx. (µs)':>10} | Códigos",
+                             linha_operacao, largura=120)
+
+            caminho = input("Arquivo para salvar em JSON (ENTER para não salvar): ").strip()
+            if caminho:
+                try:
+                    Instrumentacao.exporta_json(caminho)
+                    print(f"Estatísticas salvas em {caminho}.")
+                except OSError as erro:
+                    print(f"Erro ao salvar: {erro}")
+
         elif opcao == '0':
             break
         else:
@@ -585,10 +740,22 @@ def main():
             
         elif opcao == '0':
             print("\nSaindo do sistema. Até logo!")
+            # Grava o que ainda estiver aguardando a gravação adiada
+            Filme.flush()
+            Sessao.flush()
+            # O próximo início lê o snapshot em vez dos arquivos de dados
+            Snapshot.grava()
             break
             
         else:
             print("\n[Erro] Opção inválida! Tente novamente.")
 
 if __name__ == "__main__":
+    # BILHETERIA_BANCO=arquivo.db troca os arquivos XML por um banco SQLite
+    if os.environ.get("BILHETERIA_BANCO"):
+        Armazenamento.usa_sqlite(os.environ["BILHETERIA_BANCO"])
+    else:
+        # Dados deixados divididos pelo servidor com --particoes
+        Particao.junta_dados(os.getcwd())
+        Snapshot.restaura()
     main()
\ No newline at end of file
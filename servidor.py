@@ -0,0 +1,309 @@
+"""
+Servidor da bilheteria para vários terminais ao mesmo tempo.
+
+Expõe as operações de venda, sessões, filmes e clientes por um socket TCP
+local, usando asyncio. O protocolo é de uma mensagem JSON por linha:
+
+    -> {"id": 1, "operacao": "cria_ingresso",
+        "parametros": {"cliente_id": 1, "sessao_id": 2, "numero_assento": 10, "preco": 25.0}}
+    <- {"id": 1, "codigo": 0, "resultado": 0}
+
+"codigo" segue padrao_retornos. As chamadas aos módulos (e a gravação em
+disco que elas fazem) rodam em um pool de threads, fora do event loop; a
+consistência entre terminais vem das travas dos próprios módulos.
+
+Com --particoes N, as vendas rodam em N processos, cada um dono das
+sessões de parte das salas (ver modulos/particao); as threads do pool só
+encaminham as operações a eles.
+
+Uso: python servidor.py [--host 127.0.0.1] [--porta 8765] [--workers 8] [--dados PASTA] [--banco ARQUIVO.db]
+                        [--particoes N]
+"""
+
+import modulos.cliente.cliente as Cliente
+import modulos.ingresso.ingresso as Ingresso
+import modulos.sessao.sessao as Sessao
+import modulos.filme.filme as Filme
+import modulos.monitoramento.monitoramento as Monitoramento
+import modulos.armazenamento.armazenamento as Armazenamento
+import modulos.armazenamento.snapshot as Snapshot
+import modulos.particao.particao as Particao
+import modulos.instrumentacao as Instrumentacao
+from modulos.sessao.mapa_assentos import MapaAssentos
+from modulos.registros import Registro
+from modulos.paginacao import VisaoLista
+import padrao_retornos
+import argparse
+import asyncio
+import inspect
+import json
+import sys
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+
+def _codigo_de_retorno(codigo: int) -> tuple:
+    """Operações que só retornam um código de padrao_retornos."""
+    return codigo, codigo
+
+
+def _codigo_de_busca(resultado) -> tuple:
+    """Converte o retorno de uma busca (dict, None ou -1) em (codigo, resultado)."""
+    if resultado is None:
+        return padrao_retornos.NAO_ENCONTRADO, None
+    if isinstance(resultado, int):
+        return resultado, None
+    return padrao_retornos.SUCESSO, resultado
+
+
+def _codigo_de_contagem(resultado: int | dict) -> tuple:
+    """assentos_disponiveis retorna -1 quando a sessão não existe."""
+    if isinstance(resultado, int) and resultado < 0:
+        return padrao_retornos.NAO_ENCONTRADO, None
+    return padrao_retornos.SUCESSO, resultado
+
+
+def _codigo_de_total(resultado: int | None) -> tuple:
+    """conta_ingressos retorna None quando não há sessões."""
+    if resultado is None:
+        return padrao_retornos.NAO_ENCONTRADO, None
+    return padrao_retornos.SUCESSO, resultado
+
+
+def _sucesso(resultado) -> tuple:
+    """Listagens, que sempre têm resultado (ainda que vazio)."""
+    return padrao_retornos.SUCESSO, resultado
+
+
+def _operacao(funcao, converte=None):
+    """
+    Operação que repassa os parâmetros nomeados a `funcao` e passa o retorno
+    por `converte`. Leva a assinatura de `funcao`, com a qual
+    processa_requisicao confere os parâmetros antes de chamá-la.
+    """
+    def executa(**parametros):
+        resultado = funcao(**parametros)
+        return resultado if converte is None else converte(resultado)
+
+    executa.__signature__ = inspect.signature(funcao)
+    return executa
+
+
+# Cada operação recebe os parâmetros nomeados da requisição e
+# devolve a tupla (codigo, resultado).
+OPERACOES = {
+    "cria_ingresso": _operacao(Ingresso.cria_ingresso, _codigo_de_retorno),
+    "cria_ingressos_lote": _operacao(Ingresso.cria_ingressos_lote, _codigo_de_retorno),
+    "lista_ingressos_cliente": _operacao(Ingresso.lista_ingressos_cliente, _codigo_de_busca),
+    "lista_ingressos_sessao": _operacao(Ingresso.lista_ingressos_sessao, _sucesso),
+    "lista_sessoes": _operacao(Sessao.lista_sessoes),
+    "busca_sessao": _operacao(Sessao.busca_sessao, _codigo_de_busca),
+    "assentos_disponiveis": _operacao(Sessao.assentos_disponiveis, _codigo_de_contagem),
+    "bloqueia_assentos": _operacao(Sessao.bloqueia_assentos),
+    "busca_bloqueio": _operacao(Sessao.busca_bloqueio, _codigo_de_busca),
+    "libera_bloqueio": _operacao(Sessao.libera_bloqueio, _codigo_de_retorno),
+    "compra_bloqueio": _operacao(Ingresso.compra_bloqueio, _codigo_de_retorno),
+    "define_layout_sala": _operacao(Sessao.define_layout_sala, _codigo_de_retorno),
+    "melhores_assentos": _operacao(Sessao.melhores_assentos, _codigo_de_busca),
+    "busca_filme": _operacao(Filme.busca_filme, _codigo_de_busca),
+    "lista_filmes": _operacao(Filme.lista_filmes, _sucesso),
+    "busca_filmes_texto": _operacao(Filme.busca_filmes_texto, _codigo_de_busca),
+    "completa_termos": _operacao(Filme.completa_termos, _codigo_de_busca),
+    "cadastra_cliente": _operacao(Cliente.cadastra_cliente, _codigo_de_retorno),
+    "busca_cliente": _operacao(Cliente.busca_cliente, _codigo_de_busca),
+    "busca_cliente_por_cpf": _operacao(Cliente.busca_cliente_por_cpf, _codigo_de_busca),
+    "lista_clientes": _operacao(Cliente.lista_clientes, _sucesso),
+    "pagina_clientes": _operacao(Cliente.pagina_clientes, _codigo_de_busca),
+    "pagina_sessoes": _operacao(Sessao.pagina_sessoes, _codigo_de_busca),
+    "pagina_ingressos": _operacao(Ingresso.pagina_ingressos, _codigo_de_busca),
+    "remove_cliente": _operacao(Cliente.remove_cliente, _codigo_de_retorno),
+    "conta_ingressos": lambda: _codigo_de_total(Monitoramento.conta_ingressos(Sessao.visao_sessoes())),
+    "filme_mais_assistido": lambda: _codigo_de_busca(Monitoramento.filme_mais_assistido(Sessao.visao_sessoes())),
+    "receita_e_ingressos": _operacao(Monitoramento.receita_e_ingressos, _codigo_de_busca),
+    "receita_e_ocupacao_sessao": _operacao(Monitoramento.receita_e_ocupacao_sessao, _codigo_de_busca),
+    "instrumentacao": lambda: (padrao_retornos.SUCESSO, Instrumentacao.resumo()),
+}
+
+
+def _operacoes_particionadas(roteador: Particao.Roteador) -> dict:
+    """Operações de sessões, ingressos, clientes e relatórios atendidas pelo roteador."""
+    return {
+        "cria_ingresso": _operacao(roteador.cria_ingresso, _codigo_de_retorno),
+        "cria_ingressos_lote": _operacao(roteador.cria_ingressos_lote, _codigo_de_retorno),
+        "lista_ingressos_cliente": _operacao(roteador.lista_ingressos_cliente, _codigo_de_busca),
+        "lista_ingressos_sessao": _operacao(roteador.lista_ingressos_sessao, _sucesso),
+        "lista_sessoes": _operacao(roteador.lista_sessoes),
+        "busca_sessao": _operacao(roteador.busca_sessao, _codigo_de_busca),
+        "assentos_disponiveis": _operacao(roteador.assentos_disponiveis, _codigo_de_contagem),
+        "bloqueia_assentos": _operacao(roteador.bloqueia_assentos),
+        "busca_bloqueio": _operacao(roteador.busca_bloqueio, _codigo_de_busca),
+        "libera_bloqueio": _operacao(roteador.libera_bloqueio, _codigo_de_retorno),
+        "compra_bloqueio": _operacao(roteador.compra_bloqueio, _codigo_de_retorno),
+        "define_layout_sala": _operacao(roteador.define_layout_sala, _codigo_de_retorno),
+        "melhores_assentos": _operacao(roteador.melhores_assentos, _codigo_de_busca),
+        "pagina_sessoes": _operacao(roteador.pagina_sessoes, _codigo_de_busca),
+        "pagina_ingressos": _operacao(roteador.pagina_ingressos, _codigo_de_busca),
+        "cadastra_cliente": _operacao(roteador.cadastra_cliente, _codigo_de_retorno),
+        "remove_cliente": _operacao(roteador.remove_cliente, _codigo_de_retorno),
+        "conta_ingressos": lambda: _codigo_de_total(roteador.conta_ingressos()),
+        "filme_mais_assistido": lambda: _codigo_de_busca(roteador.filme_mais_assistido()),
+        "receita_e_ingressos": _operacao(roteador.receita_e_ingressos, _codigo_de_busca),
+        "receita_e_ocupacao_sessao": _operacao(roteador.receita_e_ocupacao_sessao, _codigo_de_busca),
+        "instrumentacao": lambda: (padrao_retornos.SUCESSO, Instrumentacao.resumo(roteador.estatisticas_instrumentacao())),
+    }
+
+
+def _para_json(valor):
+    """Serializa tipos que o json não conhece (o mapa de assentos vira lista)."""
+    if isinstance(valor, MapaAssentos):
+        return list(valor)
+    if isinstance(valor, Registro):
+        return valor.para_dict()
+    if isinstance(valor, VisaoLista):
+        return list(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def _resposta(id_requisicao, codigo: int, resultado=None, erro: str | None = None) -> bytes:
+    corpo = {"id": id_requisicao, "codigo": codigo, "resultado": resultado}
+    if erro is not None:
+        corpo["erro"] = erro
+    return (json.dumps(corpo, default=_para_json, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def processa_requisicao(linha: bytes, executor: ThreadPoolExecutor) -> bytes:
+    """Interpreta uma linha do protocolo, executa a operação e monta a resposta."""
+    try:
+        requisicao = json.loads(linha)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return _resposta(None, padrao_retornos.PARAMETRO_INVALIDO, erro="JSON inválido")
+
+    if not isinstance(requisicao, dict):
+        return _resposta(None, padrao_retornos.PARAMETRO_INVALIDO, erro="Requisição deve ser um objeto")
+
+    id_requisicao = requisicao.get("id")
+    nome_operacao = requisicao.get("operacao")
+    # Um nome que não é texto (lista, objeto...) nem pode ser procurado no dicionário
+    operacao = OPERACOES.get(nome_operacao) if isinstance(nome_operacao, str) else None
+    parametros = requisicao.get("parametros") or {}
+
+    if operacao is None:
+        return _resposta(id_requisicao, padrao_retornos.PARAMETRO_INVALIDO, erro="Operação desconhecida")
+
+    if not isinstance(parametros, dict):
+        return _resposta(id_requisicao, padrao_retornos.PARAMETRO_INVALIDO, erro="Parâmetros devem ser um objeto")
+
+    try:
+        inspect.signature(operacao).bind(**parametros)
+    except TypeError as erro:
+        # Parâmetros faltando ou com nome errado
+        return _resposta(id_requisicao, padrao_retornos.PARAMETRO_INVALIDO, erro=str(erro))
+
+    loop = asyncio.get_running_loop()
+    try:
+        codigo, resultado = await loop.run_in_executor(executor, partial(operacao, **parametros))
+    except Exception:
+        # Uma falha dentro da operação não derruba a conexão do terminal
+        print(f"[Erro] Falha na operação {nome_operacao}:\n{traceback.format_exc()}",
+              file=sys.stderr, end="")
+        return _resposta(id_requisicao, padrao_retornos.ERRO_INTERNO, erro="Erro interno do servidor")
+
+    return _resposta(id_requisicao, codigo, resultado)
+
+
+async def atende_terminal(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                          executor: ThreadPoolExecutor) -> None:
+    """Atende um terminal até ele fechar a conexão."""
+    try:
+        while True:
+            linha = await reader.readline()
+            if not linha:
+                break
+            if not linha.strip():
+                continue
+            writer.write(await processa_requisicao(linha, executor))
+            await writer.drain()
+    except (ConnectionResetError, asyncio.LimitOverrunError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def inicia_servidor(host: str, porta: int, workers: int) -> None:
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bilheteria")
+    servidor = await asyncio.start_server(
+        lambda r, w: atende_terminal(r, w, executor), host, porta
+    )
+    enderecos = ", ".join(str(sock.getsockname()) for sock in servidor.sockets)
+    print(f"[Info] Bilheteria atendendo em {enderecos}")
+
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor da bilheteria de cinema")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dados", default=None, help="Pasta com filmes.xml e sessoes.xml")
+    parser.add_argument("--banco", default=None, help="Usa o banco SQLite indicado em vez dos arquivos XML")
+    parser.add_argument("--particoes", type=int, default=0,
+                        help="Número de processos de venda, divididos por sala (0 = tudo neste processo)")
+    argumentos = parser.parse_args()
+
+    if argumentos.particoes < 0:
+        parser.error("--particoes não pode ser negativo")
+    if argumentos.banco and argumentos.particoes:
+        parser.error("--particoes só funciona com os arquivos de dados, não com --banco")
+
+    if argumentos.banco:
+        Armazenamento.usa_sqlite(argumentos.banco)
+
+    pasta = argumentos.dados or os.getcwd()
+    roteador = None
+    if argumentos.particoes:
+        # Filmes e clientes ficam neste processo; sessões e ingressos, nos de venda
+        Filme.carrega(pasta)
+        Cliente.carrega(pasta)
+        roteador = Particao.Roteador(pasta, argumentos.particoes)
+        roteador.inicia()
+        OPERACOES.update(_operacoes_particionadas(roteador))
+    else:
+        if not argumentos.banco:
+            # Dados deixados divididos por uma execução com --particoes
+            Particao.junta_dados(pasta)
+
+        # Carrega antes de aceitar conexões, para o primeiro terminal não pagar a
+        # leitura; o snapshot do último encerramento evita reler os arquivos
+        if not Snapshot.restaura(argumentos.dados):
+            Filme.carrega(argumentos.dados)
+            Sessao.carrega(argumentos.dados)
+            Cliente.carrega(argumentos.dados)
+            Ingresso.carrega(argumentos.dados)
+
+    try:
+        asyncio.run(inicia_servidor(argumentos.host, argumentos.porta, argumentos.workers))
+    except KeyboardInterrupt:
+        print("\nEncerrando o servidor. Até logo!")
+    finally:
+        Filme.flush()
+        if roteador is not None:
+            Cliente.grava_pendentes()
+            roteador.encerra()
+        else:
+            Sessao.flush()
+            Snapshot.grava()
+
+
+if __name__ == "__main__":
+    main()
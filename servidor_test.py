@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import io
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+if TEST_DIR not in sys.path:
+    sys.path.append(TEST_DIR)
+
+import padrao_retornos
+import servidor
+
+
+def _falha(**parametros):
+    raise RuntimeError("falha simulada")
+
+
+class TestProcessaRequisicao(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.executor = ThreadPoolExecutor(max_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown(wait=True)
+
+    def processa(self, requisicao) -> dict:
+        linha = requisicao if isinstance(requisicao, bytes) else json.dumps(requisicao).encode("utf-8")
+        resposta = asyncio.run(servidor.processa_requisicao(linha, self.executor))
+        self.assertTrue(resposta.endswith(b"\n"))
+        return json.loads(resposta)
+
+    def test_01_operacao_desconhecida(self):
+        print("Teste 01: Operação desconhecida é recusada")
+        resposta = self.processa({"id": 7, "operacao": "nao_existe"})
+        self.assertEqual(resposta["id"], 7)
+        self.assertEqual(resposta["codigo"], padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(resposta["erro"], "Operação desconhecida")
+
+    def test_02_nome_de_operacao_que_nao_e_texto(self):
+        print("Teste 02: Nome de operação em lista ou objeto é recusado, sem derrubar a conexão")
+        for nome in (["cria_ingresso"], {"nome": "cria_ingresso"}, 3, None):
+            resposta = self.processa({"id": 1, "operacao": nome})
+            self.assertEqual(resposta["codigo"], padrao_retornos.PARAMETRO_INVALIDO)
+            self.assertEqual(resposta["erro"], "Operação desconhecida")
+
+    def test_03_corpo_que_nao_e_objeto(self):
+        print("Teste 03: Corpo em lista, texto ou JSON inválido é recusado")
+        for linha in (b'["cria_ingresso"]', b'"cria_ingresso"', b"42", b"{quebrado", b"\xff\xfe"):
+            resposta = self.processa(linha)
+            self.assertIsNone(resposta["id"])
+            self.assertEqual(resposta["codigo"], padrao_retornos.PARAMETRO_INVALIDO)
+
+    def test_04_parametros_faltando_ou_a_mais(self):
+        print("Teste 04: Número errado de parâmetros é recusado antes de chamar a operação")
+        faltando = self.processa({"id": 2, "operacao": "cria_ingresso", "parametros": {"cliente_id": 1}})
+        self.assertEqual(faltando["codigo"], padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertIn("missing", faltando["erro"])
+
+        parametros = {"cliente_id": 1, "sessao_id": 1, "numero_assento": 1, "preco": 10.0, "extra": 1}
+        a_mais = self.processa({"id": 3, "operacao": "cria_ingresso", "parametros": parametros})
+        self.assertEqual(a_mais["codigo"], padrao_retornos.PARAMETRO_INVALIDO)
+
+        lista = self.processa({"id": 4, "operacao": "cria_ingresso", "parametros": [1, 1, 1, 10.0]})
+        self.assertEqual(lista["codigo"], padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertEqual(lista["erro"], "Parâmetros devem ser um objeto")
+
+    def test_05_parametros_de_tipo_errado(self):
+        print("Teste 05: Parâmetros de tipo errado voltam como PARAMETRO_INVALIDO da operação")
+        parametros = {"cliente_id": "1", "sessao_id": [1], "numero_assento": {}, "preco": "dez"}
+        resposta = self.processa({"id": 5, "operacao": "cria_ingresso", "parametros": parametros})
+        self.assertEqual(resposta["id"], 5)
+        self.assertEqual(resposta["codigo"], padrao_retornos.PARAMETRO_INVALIDO)
+        self.assertNotIn("erro", resposta)
+
+    def test_06_excecao_na_operacao(self):
+        print("Teste 06: Exceção dentro da operação vira ERRO_INTERNO")
+        with patch.dict(servidor.OPERACOES, {"falha": servidor._operacao(_falha)}), \
+             patch("sys.stderr", new_callable=io.StringIO) as saida_erro:
+            resposta = self.processa({"id": 6, "operacao": "falha"})
+        self.assertEqual(resposta["id"], 6)
+        self.assertEqual(resposta["codigo"], padrao_retornos.ERRO_INTERNO)
+        self.assertEqual(resposta["erro"], "Erro interno do servidor")
+        self.assertIn("RuntimeError: falha simulada", saida_erro.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()